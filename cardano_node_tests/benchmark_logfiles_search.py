@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""Benchmark searching of log files for errors on a synthetic node log.
+
+Compares the byte level search used by `logfiles.search_cluster_artifacts` with decoding and
+matching every line (how the log files were searched originally), and with a case insensitive
+regex over the memory mapped file.
+"""
+import argparse
+import logging
+import mmap
+import random
+import re
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable
+from typing import List
+from typing import Optional
+from typing import Pattern
+
+from cardano_node_tests.utils import logfiles
+
+LOGGER = logging.getLogger(__name__)
+
+LINE_TEMPLATES = (
+    "[bft1:cardano.node.ChainDB:Info:{thread}] [{ts} UTC] Chain extended, new tip: {hash} at "
+    "slot {slot}\n",
+    '[bft1:cardano.node.Forge:Info:{thread}] [{ts} UTC] fromList [("credentials",String '
+    '"Cardano"),("val",Object (fromList [("kind",String "TraceNodeNotLeader"),("slot",Number '
+    "{slot}.0)]))]\n",
+    "[bft1:cardano.node.IpSubscription:Info:{thread}] [{ts} UTC] IPs: 0.0.0.0:0 "
+    "[127.0.0.1:30001] Connection Attempt Start, destination 127.0.0.1:30001\n",
+    '[bft1:cardano.node.Mempool:Info:{thread}] [{ts} UTC] fromList [("kind",String '
+    '"TraceMempoolRemoveTxs"),("mempoolSize",Object (fromList [("bytes",Number 0.0)]))]\n',
+)
+ERROR_TEMPLATES = (
+    "[bft1:cardano.node.ChainDB:Error:{thread}] [{ts} UTC] Invalid block {hash}: Failed\n",
+    # ignored by `logfiles.ERRORS_IGNORED`
+    "[bft1:cardano.node.ErrorPolicy:Error:{thread}] [{ts} UTC] IP 127.0.0.1:30001 "
+    "ErrorPolicyUnhandledApplicationException Connection Attempt Exception, failure\n",
+)
+ERRORS_RATIO = 10_000
+
+
+def get_args() -> argparse.Namespace:
+    """Get command line arguments."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument(
+        "-s",
+        "--size",
+        type=int,
+        default=256,
+        help="Size of the synthetic log file in MiB (default: 256)",
+    )
+    parser.add_argument(
+        "-f",
+        "--logfile",
+        help="Path to an existing log file to use instead of generating a synthetic one",
+    )
+    return parser.parse_args()
+
+
+def generate_log(logfile: Path, size: int) -> None:
+    """Write a synthetic node log of approximately the given size in bytes."""
+    rng = random.Random(0)
+    written = 0
+    slot = 0
+    with open(logfile, "w", encoding="utf-8") as outfile:
+        while written < size:
+            lines = []
+            for __ in range(1000):
+                slot += 1
+                templates = ERROR_TEMPLATES if rng.randrange(ERRORS_RATIO) == 0 else LINE_TEMPLATES
+                lines.append(
+                    rng.choice(templates).format(
+                        thread=rng.randrange(10, 99),
+                        ts=time.strftime("%Y-%m-%d %H:%M:%S.00", time.gmtime(slot / 10)),
+                        hash=f"{rng.getrandbits(256):064x}",
+                        slot=slot,
+                    )
+                )
+            chunk = "".join(lines)
+            outfile.write(chunk)
+            written += len(chunk)
+
+
+def search_lines(logfile: Path, errors_ignored_re: Optional[Pattern[str]]) -> List[str]:
+    """Decode and match every line of the log file."""
+    errors = []
+    with open(logfile, encoding="utf-8", errors="replace") as infile:
+        for line in infile:
+            if logfiles.ERRORS_RE.search(line) and not (
+                errors_ignored_re and errors_ignored_re.search(line)
+            ):
+                errors.append(line)
+    return errors
+
+
+def search_bytes(logfile: Path, errors_ignored_re: Optional[Pattern[str]]) -> List[str]:
+    """Search the log file the same way as `logfiles.search_cluster_artifacts`."""
+    errors, __ = logfiles._search_errors_bytes(
+        logfile=logfile, seek=0, errors_ignored_re=errors_ignored_re
+    )
+    return errors
+
+
+def search_mmap_regex(logfile: Path, errors_ignored_re: Optional[Pattern[str]]) -> List[str]:
+    """Search the memory mapped log file using case insensitive regex."""
+    errors = []
+    errors_re = re.compile(logfiles.ERRORS_RE.pattern.encode(), re.IGNORECASE)
+    with open(logfile, "rb") as infile:
+        with mmap.mmap(infile.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            last_line_start = -1
+            for match in errors_re.finditer(mm):
+                line_start = mm.rfind(b"\n", 0, match.start()) + 1
+                if line_start == last_line_start:
+                    continue
+                last_line_start = line_start
+                line_end = mm.find(b"\n", match.end())
+                line_end = len(mm) if line_end == -1 else line_end + 1
+                line = mm[line_start:line_end].decode("utf-8", errors="replace")
+                if not (errors_ignored_re and errors_ignored_re.search(line)):
+                    errors.append(line)
+    return errors
+
+
+def run_benchmark(
+    name: str,
+    search_func: Callable[[Path, Optional[Pattern[str]]], List[str]],
+    logfile: Path,
+    errors_ignored_re: Optional[Pattern[str]],
+) -> List[str]:
+    size_mib = logfile.stat().st_size / 1024 / 1024
+    start = time.perf_counter()
+    errors = search_func(logfile, errors_ignored_re)
+    duration = time.perf_counter() - start
+    LOGGER.info(f"{name}: {duration:.1f} s ({size_mib / duration:.0f} MiB/s), {len(errors)} errors")
+    return errors
+
+
+def main() -> int:
+    logging.basicConfig(
+        format="%(name)s:%(levelname)s:%(message)s",
+        level=logging.INFO,
+    )
+    args = get_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        if args.logfile:
+            logfile = Path(args.logfile)
+        else:
+            logfile = Path(tmp_dir) / "bft1.stdout"
+            LOGGER.info(f"Generating {args.size} MiB synthetic log file.")
+            generate_log(logfile=logfile, size=args.size * 1024 * 1024)
+
+        errors_ignored_re = logfiles._get_ignore_re(ignore_rules=(), logfile_name=logfile.name)
+
+        # warm up page cache
+        with open(logfile, "rb") as infile:
+            while infile.read(logfiles.SCAN_CHUNK_SIZE):
+                pass
+
+        lines_errors = run_benchmark(
+            name="decode and match every line",
+            search_func=search_lines,
+            logfile=logfile,
+            errors_ignored_re=errors_ignored_re,
+        )
+        run_benchmark(
+            name="case insensitive regex over mmap",
+            search_func=search_mmap_regex,
+            logfile=logfile,
+            errors_ignored_re=errors_ignored_re,
+        )
+        bytes_errors = run_benchmark(
+            name="byte level keyword search",
+            search_func=search_bytes,
+            logfile=logfile,
+            errors_ignored_re=errors_ignored_re,
+        )
+
+    if bytes_errors != lines_errors:
+        LOGGER.error("The byte level search returned different results.")
+        return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""Generate a pool of keys that are used by tests instead of generating the keys during tests.
+
+Point the `KEY_POOL_DIR` env variable to the pool directory when running tests.
+"""
+import argparse
+import logging
+import sys
+from pathlib import Path
+
+from cardano_node_tests.utils import helpers
+from cardano_node_tests.utils import key_pool
+
+LOGGER = logging.getLogger(__name__)
+
+
+def get_args() -> argparse.Namespace:
+    """Get command line arguments."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument(
+        "-d",
+        "--pool-dir",
+        required=True,
+        help="Path to the key pool directory",
+    )
+    parser.add_argument(
+        "-c",
+        "--count",
+        required=True,
+        type=int,
+        help="Number of available key sets of each kind to have in the pool",
+    )
+    parser.add_argument(
+        "-k",
+        "--kind",
+        action="append",
+        choices=list(key_pool.KEY_KINDS),
+        help="Kind of keys to generate (default: all kinds)",
+    )
+    parser.add_argument(
+        "-w",
+        "--workers",
+        type=int,
+        default=helpers.RUN_COMMANDS_WORKERS,
+        help=f"Number of keys generated at a time (default: {helpers.RUN_COMMANDS_WORKERS})",
+    )
+    return parser.parse_args()
+
+
+def main() -> int:
+    logging.basicConfig(
+        format="%(name)s:%(levelname)s:%(message)s",
+        level=logging.INFO,
+    )
+    args = get_args()
+
+    pool_dir = Path(args.pool_dir)
+    pool_dir.mkdir(parents=True, exist_ok=True)
+
+    for kind in args.kind or key_pool.KEY_KINDS:
+        available = key_pool.get_available_count(kind=kind, pool_dir=pool_dir)
+        missing = args.count - available
+        if missing <= 0:
+            LOGGER.info(f"There are already {available} '{kind}' key sets available.")
+            continue
+
+        LOGGER.info(f"Generating {missing} '{kind}' key sets.")
+        try:
+            key_pool.generate_keys(
+                kind=kind, count=missing, pool_dir=pool_dir, max_workers=args.workers
+            )
+        except Exception as exc:
+            LOGGER.error(str(exc))
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,20 +3,23 @@
 
 * withdraw rewards
 * deregister stake addresses
-* return funds to faucet
+* return funds to faucet, including funds left in faucet shards of pytest workers
 """
 import argparse
 import concurrent.futures
+import itertools
 import logging
 import random
 import time
 from pathlib import Path
 from typing import Generator
+from typing import Iterable
 from typing import List
 
 from cardano_clusterlib import clusterlib
 
 from cardano_node_tests.utils import cluster_nodes
+from cardano_node_tests.utils import clusterlib_utils
 from cardano_node_tests.utils import helpers
 from cardano_node_tests.utils.types import FileType
 
@@ -135,7 +138,7 @@ def find_files(location: FileType) -> Generator[Path, None, None]:
     return location.glob("**/*.addr")
 
 
-def group_files(file_paths: Generator[Path, None, None]) -> List[List[Path]]:
+def group_files(file_paths: Iterable[Path]) -> List[List[Path]]:
     """Group payment address files with corresponding stake address files.
 
     These need to be processed together - funds are transfered from payment address after
@@ -168,7 +171,9 @@ def cleanup(
     cluster_env = cluster_nodes.get_cluster_env()
     faucet_addr_file = cluster_env.state_dir / "shelley" / "faucet.addr"
     faucet_payment = create_addr_record(faucet_addr_file)
-    files_found = group_files(find_files(location))
+    # faucet shards are not part of testing artifacts, they are in the cluster state dir
+    shards_dir = cluster_env.state_dir / clusterlib_utils.FAUCET_SHARDS_DIR
+    files_found = group_files(itertools.chain(find_files(location), find_files(shards_dir)))
 
     def _run(files: List[Path]) -> None:
         for fpath in files:
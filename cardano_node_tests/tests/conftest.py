@@ -45,6 +45,12 @@ def pytest_addoption(parser: Any) -> None:
         default=False,
         help="Skip all tests",
     )
+    parser.addoption(
+        "--run-benchmarks",
+        action="store_true",
+        default=False,
+        help="Run also performance benchmarks (tests marked with 'benchmark')",
+    )
 
 
 def pytest_configure(config: Any) -> None:
@@ -80,9 +86,25 @@ def _skip_all_tests(config: Any, items: list) -> None:
         item.add_marker(marker)
 
 
+def _skip_benchmarks(config: Any, items: list) -> None:
+    """Skip performance benchmarks unless specified on command line.
+
+    The benchmarks take long time and their results are not pass / fail.
+    """
+    if config.getvalue("run_benchmarks"):
+        return
+
+    marker = pytest.mark.skip(reason="benchmarks run only with `--run-benchmarks`")
+
+    for item in items:
+        if "benchmark" in item.keywords:
+            item.add_marker(marker)
+
+
 @pytest.mark.tryfirst
 def pytest_collection_modifyitems(config: Any, items: list) -> None:
     _skip_all_tests(config=config, items=items)
+    _skip_benchmarks(config=config, items=items)
 
 
 @pytest.fixture(scope="session")
@@ -139,6 +161,7 @@ def cluster_cleanup(
         cluster_manager_obj = cluster_management.ClusterManager(
             tmp_path_factory=tmp_path_factory, worker_id=worker_id, pytest_config=request.config
         )
+        cluster_manager_obj.return_worker_faucet_shards()
         cluster_manager_obj.save_worker_cli_coverage()
         _stop_all_cluster_instances(
             tmp_path_factory=tmp_path_factory,
@@ -154,10 +177,13 @@ def cluster_cleanup(
 
     yield
 
+    cluster_manager_obj = cluster_management.ClusterManager(
+        tmp_path_factory=tmp_path_factory, worker_id=worker_id, pytest_config=request.config
+    )
+    # the cluster instances are still running, as this session is still marked as started
+    cluster_manager_obj.return_worker_faucet_shards()
+
     with helpers.FileLockIfXdist(f"{lock_dir}/{cluster_management.CLUSTER_LOCK}"):
-        cluster_manager_obj = cluster_management.ClusterManager(
-            tmp_path_factory=tmp_path_factory, worker_id=worker_id, pytest_config=request.config
-        )
         cluster_manager_obj.save_worker_cli_coverage()
 
         os.remove(lock_dir / f".started_session_{worker_id}")
@@ -0,0 +1,91 @@
+"""Tests for bech32 encoding and decoding."""
+import json
+import logging
+import shutil
+import time
+from pathlib import Path
+
+import allure
+import pytest
+
+from cardano_node_tests.utils import bech32
+from cardano_node_tests.utils import helpers
+
+LOGGER = logging.getLogger(__name__)
+DATA_DIR = Path(__file__).parent / "data"
+
+
+def _load_addresses() -> list:
+    with open(DATA_DIR / "bech32_addresses.json") as in_json:
+        addresses: list = json.load(in_json)
+    return addresses
+
+
+class TestBech32:
+    """Tests for bech32 encoding and decoding."""
+
+    ADDRESSES = _load_addresses()
+
+    @allure.link(helpers.get_vcs_link())
+    @pytest.mark.parametrize("addr_rec", ADDRESSES, ids=[r["bech32"] for r in ADDRESSES])
+    def test_decode_address(self, addr_rec: dict):
+        """Decode stored addresses and check that encoding the result gives the same address."""
+        assert helpers.decode_bech32(addr_rec["bech32"]) == addr_rec["hex"]
+
+        decoded = bech32.decode(addr_rec["bech32"])
+        assert decoded.variant == bech32.Variants.BECH32
+        assert bech32.encode(decoded.hrp, decoded.data) == addr_rec["bech32"]
+
+    @allure.link(helpers.get_vcs_link())
+    @pytest.mark.parametrize(
+        "bech32m_str",
+        ("a1lqfn3a", "abcdef1l7aum6echk45nj3s0wdvt2fg8x9yrzpqzd3ryx"),
+    )
+    def test_bech32m_round_trip(self, bech32m_str: str):
+        """Decode bech32m strings and check that encoding the result gives the same string."""
+        decoded = bech32.decode(bech32m_str)
+        assert decoded.variant == bech32.Variants.BECH32M
+        assert bech32.encode(decoded.hrp, decoded.data, decoded.variant) == bech32m_str
+
+    @allure.link(helpers.get_vcs_link())
+    @pytest.mark.parametrize(
+        "invalid_str",
+        (
+            "addr1vx2fxv2umyhttkxyxp8x0dlpdt3k6cwng5pxj3jhsydzers66hrl9",  # invalid checksum
+            "Addr1vx2fxv2umyhttkxyxp8x0dlpdt3k6cwng5pxj3jhsydzers66hrl8",  # mixed case
+            "addr1vx2fxv2umyhttkxyxp8x0dlpdt3k6cwng5pxj3jhsydzers66hrlb",  # invalid character
+            "vx2fxv2umyhttkxyxp8x0dlpdt3k6cwng5pxj3jhsydzers66hrl8",  # missing separator
+        ),
+    )
+    def test_decode_invalid(self, invalid_str: str):
+        """Try to decode invalid bech32 strings.
+
+        Expect failure.
+        """
+        with pytest.raises(bech32.Bech32Error):
+            bech32.decode(invalid_str)
+
+    @allure.link(helpers.get_vcs_link())
+    @pytest.mark.skipif(not shutil.which("bech32"), reason="the `bech32` tool is not available")
+    def test_compare_with_bech32_tool(self):
+        """Compare results and speed of decoding with the `bech32` tool."""
+        addresses = [r["bech32"] for r in self.ADDRESSES]
+
+        start = time.perf_counter()
+        tool_results = [
+            helpers.run_command(f"echo '{a}' | bech32", shell=True).decode().strip()
+            for a in addresses
+        ]
+        tool_duration = time.perf_counter() - start
+
+        bech32.decode.cache_clear()
+        start = time.perf_counter()
+        native_results = [bech32.decode_hex(a) for a in addresses]
+        native_duration = time.perf_counter() - start
+
+        LOGGER.info(
+            f"Decoded {len(addresses)} addresses: `bech32` tool {tool_duration:.6f} sec, "
+            f"native {native_duration:.6f} sec"
+        )
+        assert native_results == tool_results
+        assert native_duration < tool_duration
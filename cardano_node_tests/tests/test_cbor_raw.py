@@ -0,0 +1,125 @@
+"""Tests for working with raw CBOR encoded data."""
+import logging
+
+import allure
+import cbor2
+import pytest
+
+from cardano_node_tests.utils import cbor_raw
+from cardano_node_tests.utils import helpers
+
+LOGGER = logging.getLogger(__name__)
+
+
+class TestEncode:
+    """Tests for encoding of CBOR data items from already encoded parts."""
+
+    @allure.link(helpers.get_vcs_link())
+    @pytest.mark.parametrize(
+        "value",
+        (0, 23, 24, 255, 256, 2 ** 16 - 1, 2 ** 16, 2 ** 32 - 1, 2 ** 32, 2 ** 64 - 1),
+    )
+    def test_encode_head(self, value: int):
+        """Check that the head is encoded the same way as by `cbor2`, using the shortest form."""
+        assert cbor_raw.encode_head(cbor_raw.MAJOR_UINT, value) == cbor2.dumps(value)
+        assert cbor_raw.encode_head(cbor_raw.MAJOR_ARRAY, value)[0] >> 5 == cbor_raw.MAJOR_ARRAY
+
+        major, arg, offset = cbor_raw.read_head(cbor_raw.encode_head(cbor_raw.MAJOR_MAP, value))
+        assert (major, arg) == (cbor_raw.MAJOR_MAP, value)
+        assert offset == len(cbor_raw.encode_head(cbor_raw.MAJOR_MAP, value))
+
+    @allure.link(helpers.get_vcs_link())
+    def test_encode_head_too_big(self):
+        """Check that values that don't fit into 8 bytes are rejected."""
+        with pytest.raises(cbor_raw.CBORError):
+            cbor_raw.encode_head(cbor_raw.MAJOR_UINT, 2 ** 64)
+
+    @allure.link(helpers.get_vcs_link())
+    @pytest.mark.parametrize("length", (0, 1, 23, 24, 25))
+    def test_encode_array(self, length: int):
+        """Check that arrays longer than 23 items are encoded with indefinite length."""
+        values = list(range(length))
+        items = [cbor2.dumps(v) for v in values]
+
+        encoded = cbor_raw.encode_array(items)
+        if length > cbor_raw.MAX_DEFINITE_ARRAY_LEN:
+            assert encoded[:1] == cbor_raw.INDEFINITE_ARRAY
+            assert encoded[-1:] == cbor_raw.BREAK
+        else:
+            assert encoded == cbor2.dumps(values)
+        assert cbor2.loads(encoded) == values
+
+        # definite length can be forced, e.g. for the transaction itself
+        assert cbor_raw.encode_array(items, indefinite_allowed=False) == cbor2.dumps(values)
+
+    @allure.link(helpers.get_vcs_link())
+    def test_encode_list_and_map(self):
+        """Check that lists always have indefinite length and that maps have definite length."""
+        assert cbor_raw.encode_list([]) == cbor_raw.INDEFINITE_ARRAY + cbor_raw.BREAK
+        assert cbor_raw.encode_list([cbor2.dumps(1)]) == b"\x9f\x01\xff"
+
+        pairs = [cbor2.dumps(k) + cbor2.dumps(str(k)) for k in range(3)]
+        assert cbor2.loads(cbor_raw.encode_map(pairs)) == {0: "0", 1: "1", 2: "2"}
+
+
+class TestSplit:
+    """Tests for splitting CBOR data items into raw encoded parts."""
+
+    # indefinite length array containing a definite length array, an indefinite length array,
+    # an indefinite length byte string and a tagged item
+    INDEFINITE_DATA = bytes.fromhex("9f" "820102" "9f03ff" "5f420405ff" "d81843a10106" "ff")
+
+    @allure.link(helpers.get_vcs_link())
+    def test_get_item_end(self):
+        """Check that end of the item is found without decoding the item."""
+        data = self.INDEFINITE_DATA + b"\x07"
+
+        assert cbor_raw.get_item_end(data) == len(self.INDEFINITE_DATA)
+        assert cbor_raw.get_item_end(data, offset=1) == 4
+        assert cbor_raw.get_item_end(data, offset=4) == 7
+        assert cbor_raw.get_item_end(data, offset=7) == 12
+        assert cbor_raw.get_item_end(data, offset=12) == 18
+
+    @allure.link(helpers.get_vcs_link())
+    def test_split_array_indefinite(self):
+        """Check that items of indefinite length array are returned byte for byte unchanged."""
+        items = cbor_raw.split_array(self.INDEFINITE_DATA)
+
+        assert items == [
+            bytes.fromhex("820102"),
+            bytes.fromhex("9f03ff"),
+            bytes.fromhex("5f420405ff"),
+            bytes.fromhex("d81843a10106"),
+        ]
+        assert cbor_raw.encode_list(items) == self.INDEFINITE_DATA
+
+    @allure.link(helpers.get_vcs_link())
+    @pytest.mark.parametrize("length", (0, 23, 24))
+    def test_split_array_round_trip(self, length: int):
+        """Check that splitting an encoded array gives the original items."""
+        items = [cbor2.dumps(str(i)) for i in range(length)]
+        assert cbor_raw.split_array(cbor_raw.encode_array(items)) == items
+
+    @allure.link(helpers.get_vcs_link())
+    def test_split_map_indefinite(self):
+        """Check that pairs of indefinite length map are returned."""
+        assert cbor_raw.split_map(bytes.fromhex("bf0102" "039f04ff" "ff")) == [
+            (b"\x01", b"\x02"),
+            (b"\x03", bytes.fromhex("9f04ff")),
+        ]
+
+    @allure.link(helpers.get_vcs_link())
+    @pytest.mark.parametrize(
+        "data",
+        (
+            "9f0102",  # missing "break"
+            "8301",  # missing items
+            "43aabb",  # truncated byte string
+            "1a0102",  # truncated head
+            "1c",  # reserved additional information
+        ),
+    )
+    def test_truncated(self, data: str):
+        """Check that invalid data are reported."""
+        with pytest.raises(cbor_raw.CBORError):
+            cbor_raw.get_item_end(bytes.fromhex(data))
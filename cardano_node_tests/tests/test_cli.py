@@ -1,5 +1,6 @@
 """Tests for cardano-cli that doesn't fit into any other test file."""
 import logging
+import time
 from pathlib import Path
 
 import allure
@@ -7,6 +8,7 @@ import pytest
 from _pytest.tmpdir import TempdirFactory
 from cardano_clusterlib import clusterlib
 
+from cardano_node_tests.utils import clusterlib_utils
 from cardano_node_tests.utils import configuration
 from cardano_node_tests.utils import helpers
 
@@ -46,3 +48,64 @@ class TestCLI:
         if cluster.protocol != clusterlib.Protocols.CARDANO:
             pytest.skip("runs on cluster in full cardano mode")
         cluster.cli(["query", "utxo", *cluster.magic_args])
+
+
+@pytest.mark.benchmark
+class TestAddrCreation:
+    """Benchmarks for creating addresses and keys."""
+
+    @allure.link(helpers.get_vcs_link())
+    @pytest.mark.skipif(
+        bool(configuration.TX_ERA),
+        reason="different TX eras doesn't affect this test, pointless to run",
+    )
+    @pytest.mark.skipif(
+        bool(configuration.KEY_POOL_DIR),
+        reason="keys would be taken from the key pool instead of being generated",
+    )
+    @pytest.mark.skipif(
+        configuration.NATIVE_KEYS,
+        reason="keys are generated in-process, not using `cardano-cli`",
+    )
+    @pytest.mark.parametrize("no_of_users", (10, 100, 1000))
+    def test_create_pool_users(self, cluster: clusterlib.ClusterLib, no_of_users: int):
+        """Create pool users concurrently and measure the creation time.
+
+        * create pool users, running `cardano-cli` commands concurrently
+        * check that stake and payment keys and addresses of each pool user belong together
+        * for up to 100 pool users, create the same number of pool users serially, for comparison
+        """
+        temp_template = f"{helpers.get_func_name()}_{no_of_users}"
+
+        start = time.perf_counter()
+        pool_users = clusterlib_utils.create_pool_users(
+            cluster_obj=cluster,
+            name_template=f"{temp_template}_concurrent",
+            no_of_addr=no_of_users,
+        )
+        concurrent_duration = time.perf_counter() - start
+        LOGGER.info(f"Created {no_of_users} pool users concurrently in {concurrent_duration:.2f} s")
+
+        assert len(pool_users) == no_of_users
+        for idx, pool_user in enumerate(pool_users):
+            assert (
+                pool_user.stake.vkey_file.name == f"{temp_template}_concurrent_addr{idx}_stake.vkey"
+            )
+            assert pool_user.payment.vkey_file.name == f"{temp_template}_concurrent_addr{idx}.vkey"
+            # the stake part of the base address is the hash of the pool user's stake key
+            assert helpers.decode_bech32(pool_user.payment.address).endswith(
+                helpers.decode_bech32(pool_user.stake.address)[2:]
+            )
+
+        if no_of_users > 100:
+            return
+
+        start = time.perf_counter()
+        clusterlib_utils.create_pool_users(
+            cluster_obj=cluster,
+            name_template=f"{temp_template}_serial",
+            no_of_addr=no_of_users,
+            max_workers=1,
+        )
+        serial_duration = time.perf_counter() - start
+        LOGGER.info(f"Created {no_of_users} pool users serially in {serial_duration:.2f} s")
@@ -0,0 +1,245 @@
+"""Tests for coin selection, i.e. selection of UTxOs that are used as transaction inputs."""
+import logging
+import random
+from typing import List
+
+import allure
+import pytest
+from cardano_clusterlib import clusterlib
+
+from cardano_node_tests.utils import coin_selection
+from cardano_node_tests.utils import helpers
+
+LOGGER = logging.getLogger(__name__)
+
+ADDR = "addr_test_src"
+DST_ADDR = "addr_test_dst"
+TOKEN = f"{'ab' * 28}.couttscoin"
+FEE_PER_BYTE = 44
+
+# size of CBOR encoded input with index < 24
+TXIN_SIZE = 36
+TXIN_FEE = FEE_PER_BYTE * TXIN_SIZE
+
+STRATEGIES = (coin_selection.Strategies.LARGEST_FIRST, coin_selection.Strategies.RANDOM_IMPROVE)
+
+
+def _utxo(idx: int, amount: int, coin: str = clusterlib.DEFAULT_COIN) -> clusterlib.UTXOData:
+    return clusterlib.UTXOData(
+        utxo_hash=f"{idx:064x}", utxo_ix=0, amount=amount, address=ADDR, coin=coin
+    )
+
+
+def _txouts(amount: int, coin: str = clusterlib.DEFAULT_COIN) -> List[clusterlib.TxOut]:
+    return [clusterlib.TxOut(address=DST_ADDR, amount=amount, coin=coin)]
+
+
+def _select(
+    utxos: List[clusterlib.UTXOData], txouts: List[clusterlib.TxOut], **kwargs
+) -> coin_selection.CoinSelection:
+    return coin_selection.select_utxos(
+        utxos=utxos, txouts=txouts, fee_per_byte=FEE_PER_BYTE, rng=random.Random(42), **kwargs
+    )
+
+
+class TestCoinSelection:
+    """Tests for `coin_selection.select_utxos`."""
+
+    @allure.link(helpers.get_vcs_link())
+    def test_txin_size(self):
+        """Check size of CBOR encoded inputs."""
+        assert coin_selection.get_txin_size(0) == TXIN_SIZE
+        assert coin_selection.get_txin_size(23) == TXIN_SIZE
+        assert coin_selection.get_txin_size(24) == TXIN_SIZE + 1
+        assert coin_selection.get_txin_size(65535) == coin_selection.MAX_TXIN_SIZE
+
+    @allure.link(helpers.get_vcs_link())
+    def test_largest_first(self):
+        """Check that the largest UTxOs are selected and that the fee for inputs is covered."""
+        utxos = [_utxo(idx=i, amount=a) for i, a in enumerate((1_000_000, 5_000_000, 3_000_000))]
+
+        selection = _select(utxos=utxos, txouts=_txouts(5_000_000), fee=200_000)
+
+        assert selection.txins == [utxos[1], utxos[2]]
+        assert selection.strategy == coin_selection.Strategies.LARGEST_FIRST
+        assert selection.txins_size == 2 * TXIN_SIZE
+        assert selection.fee == 200_000 + 2 * TXIN_FEE
+        assert selection.value == {clusterlib.DEFAULT_COIN: 8_000_000}
+        assert selection.change == {clusterlib.DEFAULT_COIN: 8_000_000 - 5_000_000 - selection.fee}
+
+    @allure.link(helpers.get_vcs_link())
+    @pytest.mark.parametrize("strategy", STRATEGIES)
+    def test_dust_excluded(self, strategy: str):
+        """Check that Lovelace-only UTxOs worth less than their fee are never selected."""
+        dust = [_utxo(idx=i, amount=TXIN_FEE) for i in range(50)]
+        big = _utxo(idx=100, amount=10_000_000)
+
+        selection = _select(utxos=[*dust, big], txouts=_txouts(1_000_000), strategy=strategy)
+        assert selection.txins == [big]
+
+        # not even when there's not enough funds without them
+        with pytest.raises(coin_selection.CoinSelectionError, match="Insufficient funds"):
+            _select(utxos=[*dust, big], txouts=_txouts(10_000_000), strategy=strategy)
+
+    @allure.link(helpers.get_vcs_link())
+    @pytest.mark.parametrize("strategy", STRATEGIES)
+    def test_multi_asset(self, strategy: str):
+        """Check that records of a multi-asset UTxO are selected together."""
+        token_utxo = [
+            _utxo(idx=0, amount=1_500_000),
+            _utxo(idx=0, amount=TXIN_FEE, coin=TOKEN),
+        ]
+        utxos = [*token_utxo, _utxo(idx=1, amount=5_000_000)]
+
+        selection = _select(
+            utxos=utxos,
+            txouts=[*_txouts(1_000_000), *_txouts(10, coin=TOKEN)],
+            strategy=strategy,
+        )
+
+        # the token amount is the same as fee for the input, but the UTxO is not dust
+        assert selection.txins[:2] == token_utxo
+        assert selection.value[TOKEN] == TXIN_FEE
+        assert selection.change[TOKEN] == TXIN_FEE - 10
+        assert selection.change[clusterlib.DEFAULT_COIN] >= 0
+
+    @allure.link(helpers.get_vcs_link())
+    def test_minted_and_required(self):
+        """Check that minted tokens don't need to be covered and required UTxOs are selected."""
+        required = _utxo(idx=0, amount=2_000_000)
+        utxos = [required, _utxo(idx=1, amount=5_000_000)]
+        mint = [clusterlib.TxOut(address=DST_ADDR, amount=10, coin=TOKEN)]
+
+        selection = _select(
+            utxos=utxos,
+            txouts=_txouts(10, coin=TOKEN),
+            mint=mint,
+            required_utxos=[required],
+        )
+
+        assert selection.txins == [required]
+        assert TOKEN not in selection.change
+
+    @allure.link(helpers.get_vcs_link())
+    def test_minted_change(self):
+        """Check that minted tokens that are not paid to outputs are part of the change."""
+        utxos = [_utxo(idx=0, amount=5_000_000)]
+        mint = [clusterlib.TxOut(address=DST_ADDR, amount=100, coin=TOKEN)]
+
+        selection = _select(utxos=utxos, txouts=_txouts(50, coin=TOKEN), mint=mint)
+
+        assert TOKEN not in selection.value
+        assert selection.change[TOKEN] == 50
+        assert selection.change[clusterlib.DEFAULT_COIN] == 5_000_000 - selection.fee
+
+    @allure.link(helpers.get_vcs_link())
+    @pytest.mark.parametrize("strategy", STRATEGIES)
+    def test_min_utxo_value(self, strategy: str):
+        """Check that the Lovelace change is either zero or at least the min UTxO value."""
+        min_utxo_value = 1_000_000
+        exact = _utxo(idx=0, amount=2_000_000 + TXIN_FEE)
+        small_change = _utxo(idx=1, amount=2_500_000)
+        utxos = [exact, small_change, _utxo(idx=2, amount=1_500_000)]
+
+        # no change is fine
+        selection = _select(
+            utxos=[exact],
+            txouts=_txouts(2_000_000),
+            strategy=strategy,
+            min_utxo_value=min_utxo_value,
+        )
+        assert selection.change == {}
+
+        # the change of 500_000 Lovelace is not enough for a change output
+        selection = _select(
+            utxos=utxos[1:],
+            txouts=_txouts(2_000_000),
+            strategy=strategy,
+            min_utxo_value=min_utxo_value,
+        )
+        assert len(selection.txins) == 2
+        assert selection.change[clusterlib.DEFAULT_COIN] >= min_utxo_value
+
+        # the change output is needed for tokens, even when there's no change in Lovelace
+        token_utxo = [
+            _utxo(idx=3, amount=2_000_000 + TXIN_FEE),
+            _utxo(idx=3, amount=10, coin=TOKEN),
+        ]
+        selection = _select(
+            utxos=[*token_utxo, utxos[2]],
+            txouts=[*_txouts(2_000_000), *_txouts(5, coin=TOKEN)],
+            strategy=strategy,
+            min_utxo_value=min_utxo_value,
+        )
+        assert selection.change[TOKEN] == 5
+        assert selection.change[clusterlib.DEFAULT_COIN] == 1_500_000 - TXIN_FEE
+
+        with pytest.raises(coin_selection.CoinSelectionError, match="Insufficient funds"):
+            _select(
+                utxos=[small_change],
+                txouts=_txouts(2_000_000),
+                strategy=strategy,
+                min_utxo_value=min_utxo_value,
+            )
+
+    @allure.link(helpers.get_vcs_link())
+    @pytest.mark.parametrize("strategy", STRATEGIES)
+    def test_limits(self, strategy: str):
+        """Check that the selection is bounded by number of inputs and by space for inputs."""
+        utxos = [_utxo(idx=i, amount=1_000_000) for i in range(10)]
+
+        selection = _select(utxos=utxos, txouts=_txouts(2_500_000), strategy=strategy, max_txins=3)
+        assert len(selection.txins) == 3
+
+        for limit in ({"max_txins": 2}, {"max_txins_size": 2 * TXIN_SIZE}):
+            with pytest.raises(coin_selection.CoinSelectionError, match="Limit"):
+                _select(utxos=utxos, txouts=_txouts(2_500_000), strategy=strategy, **limit)
+
+    @allure.link(helpers.get_vcs_link())
+    def test_random_improve(self):
+        """Check that random-improve selects funds close to twice the needed amount."""
+        utxos = [_utxo(idx=i, amount=1_000_000) for i in range(100)]
+
+        selection = _select(
+            utxos=utxos,
+            txouts=_txouts(5_000_000),
+            strategy=coin_selection.Strategies.RANDOM_IMPROVE,
+        )
+
+        assert selection.strategy == coin_selection.Strategies.RANDOM_IMPROVE
+        assert len(selection.txins) == 10
+        assert selection.txins != utxos[:10], "The selected UTxOs are not random"
+
+        # the selection is deterministic with seeded random number generator
+        assert (
+            _select(
+                utxos=utxos,
+                txouts=_txouts(5_000_000),
+                strategy=coin_selection.Strategies.RANDOM_IMPROVE,
+            )
+            == selection
+        )
+
+    @allure.link(helpers.get_vcs_link())
+    def test_random_improve_fallback(self):
+        """Check that largest-first is used when random-improve reaches a limit."""
+        utxos = [
+            *[_utxo(idx=i, amount=1_000_000) for i in range(100)],
+            _utxo(idx=1000, amount=20_000_000),
+        ]
+
+        selection = _select(
+            utxos=utxos,
+            txouts=_txouts(15_000_000),
+            strategy=coin_selection.Strategies.RANDOM_IMPROVE,
+            max_txins=1,
+        )
+
+        assert selection.strategy == coin_selection.Strategies.LARGEST_FIRST
+        assert selection.txins == [utxos[-1]]
+
+    @allure.link(helpers.get_vcs_link())
+    def test_unknown_strategy(self):
+        """Check that unknown strategy is reported."""
+        with pytest.raises(AssertionError, match="Unknown coin selection strategy"):
+            _select(utxos=[_utxo(idx=0, amount=1)], txouts=_txouts(1), strategy="smallest_first")
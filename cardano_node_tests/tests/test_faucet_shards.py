@@ -0,0 +1,122 @@
+"""Tests for bookkeeping of faucet shards of pytest workers."""
+import logging
+import shutil
+from pathlib import Path
+from typing import List
+
+import allure
+import pytest
+from cardano_clusterlib import clusterlib
+
+from cardano_node_tests.utils import clusterlib_utils
+from cardano_node_tests.utils import helpers
+
+LOGGER = logging.getLogger(__name__)
+
+FAUCET_ADDR = "addr_test_faucet"
+
+
+class FakeCluster:
+    """The part of `ClusterLib` needed for creating and emptying faucet shards."""
+
+    def __init__(self, state_dir: Path) -> None:
+        self.state_dir = state_dir
+        self.sent: List[str] = []
+
+    def gen_payment_addr_and_keys(
+        self, name: str, destination_dir: Path
+    ) -> clusterlib.AddressRecord:
+        addr_file = destination_dir / f"{name}.addr"
+        addr_file.write_text(f"addr_{name}_{len(self.sent)}")
+        for ext in ("vkey", "skey"):
+            (destination_dir / f"{name}.{ext}").touch()
+        return clusterlib.AddressRecord(
+            address=clusterlib.read_address_from_file(addr_file),
+            vkey_file=destination_dir / f"{name}.vkey",
+            skey_file=destination_dir / f"{name}.skey",
+        )
+
+    def send_funds(
+        self, src_address: str, destinations: List[clusterlib.TxOut], **kwargs: dict
+    ) -> None:
+        # pylint: disable=unused-argument
+        assert destinations == [clusterlib.TxOut(address=FAUCET_ADDR, amount=-1)]
+        self.sent.append(src_address)
+
+
+@pytest.fixture
+def faucet_data() -> dict:
+    """Return faucet data with the faucet address record."""
+    return {
+        "payment": clusterlib.AddressRecord(
+            address=FAUCET_ADDR, vkey_file=Path("faucet.vkey"), skey_file=Path("faucet.skey")
+        )
+    }
+
+
+@pytest.fixture(autouse=True)
+def clear_shards():
+    """Don't leak faucet shards between tests."""
+    yield
+    clusterlib_utils._FAUCET_SHARDS.clear()
+
+
+class TestFaucetShards:
+    """Tests for `clusterlib_utils.get_faucet_shard` and the related functions."""
+
+    @allure.link(helpers.get_vcs_link())
+    def test_shard_per_cluster_instance(self, tmp_path: Path, faucet_data: dict):
+        """Check that each cluster instance has its own faucet shard."""
+        cluster_obj0 = FakeCluster(state_dir=tmp_path / "state-cluster0")
+        cluster_obj1 = FakeCluster(state_dir=tmp_path / "state-cluster1")
+
+        shard0 = clusterlib_utils.get_faucet_shard(
+            cluster_obj=cluster_obj0, faucet_data=faucet_data  # type: ignore
+        )
+        shard1 = clusterlib_utils.get_faucet_shard(
+            cluster_obj=cluster_obj1, faucet_data=faucet_data  # type: ignore
+        )
+        assert Path(shard0.skey_file).parent == cluster_obj0.state_dir / "faucet_shards"
+        assert Path(shard1.skey_file).parent == cluster_obj1.state_dir / "faucet_shards"
+        assert (
+            clusterlib_utils.get_faucet_shard(
+                cluster_obj=cluster_obj0, faucet_data=faucet_data  # type: ignore
+            )
+            is shard0
+        )
+
+    @allure.link(helpers.get_vcs_link())
+    def test_forget_on_respin(self, tmp_path: Path, faucet_data: dict):
+        """Check that a stale faucet shard is not used after the cluster instance was respun."""
+        cluster_obj = FakeCluster(state_dir=tmp_path / "state-cluster0")
+        shard = clusterlib_utils.get_faucet_shard(
+            cluster_obj=cluster_obj, faucet_data=faucet_data  # type: ignore
+        )
+
+        # respin removes the whole state dir
+        shutil.rmtree(cluster_obj.state_dir)
+        clusterlib_utils.forget_faucet_shards(state_dir=cluster_obj.state_dir)
+
+        new_shard = clusterlib_utils.get_faucet_shard(
+            cluster_obj=cluster_obj, faucet_data=faucet_data  # type: ignore
+        )
+        assert new_shard is not shard
+        assert Path(new_shard.skey_file).exists()
+
+    @allure.link(helpers.get_vcs_link())
+    def test_return_funds(self, tmp_path: Path, faucet_data: dict):
+        """Check that funds are returned from faucet shards of the given cluster instance."""
+        cluster_obj0 = FakeCluster(state_dir=tmp_path / "state-cluster0")
+        cluster_obj1 = FakeCluster(state_dir=tmp_path / "state-cluster1")
+        shard0 = clusterlib_utils.get_faucet_shard(
+            cluster_obj=cluster_obj0, faucet_data=faucet_data  # type: ignore
+        )
+        clusterlib_utils.get_faucet_shard(
+            cluster_obj=cluster_obj1, faucet_data=faucet_data  # type: ignore
+        )
+
+        clusterlib_utils.return_funds_from_faucet_shards(
+            cluster_obj=cluster_obj0, destination_dir=tmp_path  # type: ignore
+        )
+        assert cluster_obj0.sent == [shard0.address]
+        assert list(clusterlib_utils._FAUCET_SHARDS) == [(str(cluster_obj1.state_dir), FAUCET_ADDR)]
@@ -0,0 +1,194 @@
+"""Tests for coalescing of funding requests of multiple pytest workers."""
+import contextlib
+import json
+import logging
+import shutil
+from pathlib import Path
+from typing import Iterator
+from typing import List
+from typing import Optional
+
+import allure
+import pytest
+from cardano_clusterlib import clusterlib
+
+from cardano_node_tests.utils import clusterlib_utils
+from cardano_node_tests.utils import helpers
+
+LOGGER = logging.getLogger(__name__)
+
+INVALID_ADDR = "addr_invalid"
+
+
+class FakeCluster:
+    """The part of `ClusterLib` needed for paying funding requests.
+
+    Transactions paying to `INVALID_ADDR` fail.
+    """
+
+    def __init__(self, exc: Optional[Exception] = None) -> None:
+        self.exc = exc
+        self.txs: List[List[clusterlib.TxOut]] = []
+
+    def send_funds(
+        self, destinations: List[clusterlib.TxOut], tx_name: str, **kwargs: dict
+    ) -> clusterlib.TxRawOutput:
+        # pylint: disable=unused-argument
+        if self.exc:
+            raise self.exc
+        if any(d.address == INVALID_ADDR for d in destinations):
+            raise clusterlib.CLIError("invalid address")
+        self.txs.append(destinations)
+        return clusterlib.TxRawOutput(  # type: ignore
+            txins=[],
+            txouts=destinations,
+            tx_files=clusterlib.TxFiles(),
+            out_file=Path(tx_name),
+            fee=0,
+        )
+
+
+@pytest.fixture
+def src_rec() -> Iterator[clusterlib.AddressRecord]:
+    """Return source address record with a queue of funding requests unique to the test."""
+    address = f"addr_src_{helpers.get_timestamped_rand_str()}"
+    yield clusterlib.AddressRecord(
+        address=address, vkey_file=Path("src.vkey"), skey_file=Path("src.skey")
+    )
+    shutil.rmtree(helpers.get_basetemp() / f"funding_queue_{address}", ignore_errors=True)
+
+
+def _get_queue_dir(src_rec: clusterlib.AddressRecord) -> Path:
+    queue_dir = helpers.get_basetemp() / f"funding_queue_{src_rec.address}"
+    queue_dir.mkdir(exist_ok=True)
+    return queue_dir
+
+
+def _queue_request(
+    src_rec: clusterlib.AddressRecord, req_id: str, destinations: List[clusterlib.TxOut]
+) -> Path:
+    """Queue a request as if it was made by another pytest worker."""
+    req_file = _get_queue_dir(src_rec) / f"{req_id}.req"
+    clusterlib_utils._write_json_atomic(req_file, [(d.address, d.amount) for d in destinations])
+    return req_file
+
+
+def _read_result(req_file: Path) -> dict:
+    with open(req_file.with_suffix(".res"), encoding="utf-8") as in_json:
+        result: dict = json.load(in_json)
+    return result
+
+
+def _send(
+    cluster_obj: FakeCluster,
+    src_rec: clusterlib.AddressRecord,
+    destinations: List[clusterlib.TxOut],
+) -> str:
+    return clusterlib_utils.send_funds_coalesced(
+        cluster_obj=cluster_obj,  # type: ignore
+        src_rec=src_rec,
+        destinations=destinations,
+        tx_name="funding",
+    )
+
+
+class TestSendFundsCoalesced:
+    """Tests for `clusterlib_utils.send_funds_coalesced`."""
+
+    @allure.link(helpers.get_vcs_link())
+    def test_single_request(self, src_rec: clusterlib.AddressRecord):
+        """Check that a single request is paid and the queue is left empty."""
+        cluster_obj = FakeCluster()
+        destinations = [clusterlib.TxOut(address="addr0", amount=1_000_000)]
+
+        assert _send(cluster_obj=cluster_obj, src_rec=src_rec, destinations=destinations)
+        assert cluster_obj.txs == [destinations]
+        assert not list(_get_queue_dir(src_rec).iterdir())
+
+    @allure.link(helpers.get_vcs_link())
+    def test_batch(self, src_rec: clusterlib.AddressRecord, monkeypatch):
+        """Check that queued requests are paid in batches, in the order they were made."""
+        monkeypatch.setattr(clusterlib_utils, "FUNDING_MAX_TXOUTS", 3)
+        cluster_obj = FakeCluster()
+        queued_txouts = [clusterlib.TxOut(address=f"addr{i}", amount=1_000_000) for i in range(4)]
+        queued_files = [
+            _queue_request(src_rec=src_rec, req_id=f"000000_{i}", destinations=[t])
+            for i, t in enumerate(queued_txouts)
+        ]
+        destinations = [clusterlib.TxOut(address="addr_last", amount=1_000_000)]
+
+        out_file = _send(cluster_obj=cluster_obj, src_rec=src_rec, destinations=destinations)
+
+        # the first three requests were paid in the first tx, the rest in the second tx
+        assert cluster_obj.txs == [queued_txouts[:3], [queued_txouts[3], *destinations]]
+        assert out_file == "funding_coalesced0"
+        for req_file in queued_files[:3]:
+            assert not req_file.exists()
+            assert _read_result(req_file)
+        assert _read_result(queued_files[3])["out_file"] == out_file
+
+    @allure.link(helpers.get_vcs_link())
+    def test_invalid_request(self, src_rec: clusterlib.AddressRecord):
+        """Check that an invalid request doesn't affect the other requests in the batch."""
+        cluster_obj = FakeCluster()
+        invalid_file = _queue_request(
+            src_rec=src_rec,
+            req_id="000000_0",
+            destinations=[clusterlib.TxOut(address=INVALID_ADDR, amount=1_000_000)],
+        )
+        destinations = [clusterlib.TxOut(address="addr0", amount=1_000_000)]
+
+        out_file = _send(cluster_obj=cluster_obj, src_rec=src_rec, destinations=destinations)
+
+        # the whole batch failed, the valid request was paid separately
+        assert cluster_obj.txs == [destinations]
+        assert out_file == "funding_coalesced2"
+        assert _read_result(invalid_file) == {"error": "invalid address"}
+
+        with pytest.raises(clusterlib.CLIError, match="invalid address"):
+            _send(
+                cluster_obj=cluster_obj,
+                src_rec=src_rec,
+                destinations=[clusterlib.TxOut(address=INVALID_ADDR, amount=1_000_000)],
+            )
+
+    @allure.link(helpers.get_vcs_link())
+    def test_unexpected_error(self, src_rec: clusterlib.AddressRecord):
+        """Check that requests are not left in the queue when paying fails unexpectedly."""
+        cluster_obj = FakeCluster(exc=RuntimeError("unexpected"))
+        queued_file = _queue_request(
+            src_rec=src_rec,
+            req_id="000000_0",
+            destinations=[clusterlib.TxOut(address="addr0", amount=1_000_000)],
+        )
+        destinations = [clusterlib.TxOut(address="addr1", amount=1_000_000)]
+
+        with pytest.raises(RuntimeError, match="unexpected"):
+            _send(cluster_obj=cluster_obj, src_rec=src_rec, destinations=destinations)
+
+        # the other worker gets an error instead of waiting forever
+        assert "error" in _read_result(queued_file)
+        assert [f.name for f in _get_queue_dir(src_rec).iterdir()] == ["000000_0.res"]
+
+    @allure.link(helpers.get_vcs_link())
+    def test_dropped_request(self, src_rec: clusterlib.AddressRecord, monkeypatch):
+        """Check that a request dropped by another worker is not waited for forever."""
+        queue_dir = _get_queue_dir(src_rec)
+
+        @contextlib.contextmanager
+        def _drop_requests(lock_file: str) -> Iterator[None]:
+            # pylint: disable=unused-argument
+            for req_file in queue_dir.glob("*.req"):
+                req_file.unlink()
+            yield
+
+        monkeypatch.setattr(helpers, "FileLockIfXdist", _drop_requests)
+        cluster_obj = FakeCluster()
+
+        with pytest.raises(clusterlib.CLIError, match="was dropped"):
+            _send(
+                cluster_obj=cluster_obj,
+                src_rec=src_rec,
+                destinations=[clusterlib.TxOut(address="addr0", amount=1_000_000)],
+            )
+        assert not cluster_obj.txs
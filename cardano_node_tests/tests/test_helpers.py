@@ -0,0 +1,73 @@
+"""Tests for running commands using helper functions."""
+import logging
+import os
+import time
+from pathlib import Path
+
+import allure
+import pytest
+
+from cardano_node_tests.utils import helpers
+
+LOGGER = logging.getLogger(__name__)
+
+
+class TestRunCommands:
+    """Tests for `helpers.run_command` and `helpers.run_commands`."""
+
+    @allure.link(helpers.get_vcs_link())
+    def test_workdir_and_env(self, tmp_path: Path):
+        """Check that the command runs in the `workdir` with additional env variables."""
+        orig_cwd = os.getcwd()
+
+        out = helpers.run_command(
+            'echo "$(pwd) $FOO"', workdir=tmp_path, shell=True, env={"FOO": "bar"}
+        )
+        assert out.decode().strip() == f"{tmp_path.resolve()} bar"
+        assert os.getcwd() == orig_cwd, "CWD of the current process was changed"
+
+        # the rest of the environment is preserved
+        assert helpers.run_command('echo "$PATH"', shell=True, env={"FOO": "bar"}).decode().strip()
+
+    @allure.link(helpers.get_vcs_link())
+    def test_error(self):
+        """Check that failed command is reported together with its stderr."""
+        with pytest.raises(AssertionError, match="An error occurred.*oops"):
+            helpers.run_command("echo oops >&2; exit 1", shell=True)
+
+    @allure.link(helpers.get_vcs_link())
+    def test_timeout(self):
+        """Check that the command is killed once the timeout expires."""
+        start = time.perf_counter()
+        with pytest.raises(AssertionError, match="Timed out after 0.1 sec"):
+            helpers.run_command("sleep 10", timeout=0.1)
+        assert time.perf_counter() - start < 5
+
+    @allure.link(helpers.get_vcs_link())
+    def test_order_of_results(self, tmp_path: Path):
+        """Check that outputs are in the order of the commands, not in order of completion."""
+        commands = [f"sleep 0.{5 - i}; echo {i}" for i in range(5)]
+
+        outputs = helpers.run_commands(commands, workdir=tmp_path, shell=True)
+        assert [o.decode().strip() for o in outputs] == [str(i) for i in range(5)]
+
+    @allure.link(helpers.get_vcs_link())
+    def test_max_workers(self, tmp_path: Path):
+        """Check that at most `max_workers` commands run at a time."""
+        (tmp_path / "running").mkdir()
+        # each command reports how many commands were running when it started
+        commands = [
+            f"mkdir running/{i}; ls running | wc -l; sleep 0.2; rmdir running/{i}" for i in range(6)
+        ]
+
+        start = time.perf_counter()
+        outputs = helpers.run_commands(commands, workdir=tmp_path, shell=True, max_workers=2)
+
+        assert max(int(o) for o in outputs) <= 2
+        assert time.perf_counter() - start >= 3 * 0.2
+
+    @allure.link(helpers.get_vcs_link())
+    def test_error_in_batch(self, tmp_path: Path):
+        """Check that failure of any of the commands is reported."""
+        with pytest.raises(AssertionError, match="An error occurred.*missing_file"):
+            helpers.run_commands(["true", "cat missing_file", "true"], workdir=tmp_path)
@@ -0,0 +1,117 @@
+"""Tests for incremental extraction of data from JSON documents."""
+import io
+import json
+import logging
+import sys
+from typing import Any
+from typing import Dict
+
+import allure
+import pytest
+from cardano_clusterlib import clusterlib
+
+from cardano_node_tests.utils import clusterlib_utils
+from cardano_node_tests.utils import helpers
+from cardano_node_tests.utils import json_stream
+
+LOGGER = logging.getLogger(__name__)
+
+LEDGER_STATE: Dict[str, Any] = {
+    "blocksBefore": {},
+    "blocksCurrent": {"8d1ef3": 12},
+    "lastEpoch": 5,
+    "possibleRewardUpdate": {"rs": [["a7bd", [{"rewardAmount": 10, "rewardType": "Member"}]]]},
+    "stakeDistrib": {"8d1ef3": {"individualPoolStake": 1.0}},
+    "stateBefore": {
+        "esLState": {"utxoState": {f"{i:064x}#0": {"value": [i, ']}{\\"[']} for i in range(500)}},
+        "esSnapshots": {"pstakeMark": {"stake": [[{"key hash": "a7bd"}, 1000]]}},
+    },
+}
+
+
+class TestJSONStream:
+    """Tests for incremental extraction of data from JSON documents."""
+
+    @allure.link(helpers.get_vcs_link())
+    @pytest.mark.parametrize("chunk_size", (1, 7, 4096))
+    @pytest.mark.parametrize("indent", (None, 2))
+    def test_extract(self, chunk_size: int, indent: int):
+        """Extract selected paths and compare the result with the original document."""
+        ledger_state_json = json.dumps(LEDGER_STATE, indent=indent)
+
+        extracted = json_stream.extract(
+            stream=io.StringIO(ledger_state_json),
+            paths=("stateBefore.esSnapshots", "possibleRewardUpdate.rs"),
+            chunk_size=chunk_size,
+        )
+        assert extracted == {
+            "stateBefore": {"esSnapshots": LEDGER_STATE["stateBefore"]["esSnapshots"]},
+            "possibleRewardUpdate": {"rs": LEDGER_STATE["possibleRewardUpdate"]["rs"]},
+        }
+
+        filtered = json_stream.extract(
+            stream=io.StringIO(ledger_state_json), exclude=("*.esLState",), chunk_size=chunk_size
+        )
+        expected = json.loads(ledger_state_json)
+        del expected["stateBefore"]["esLState"]
+        assert filtered == expected
+
+        assert (
+            json_stream.extract(stream=io.StringIO(ledger_state_json), chunk_size=chunk_size)
+            == LEDGER_STATE
+        )
+
+    @allure.link(helpers.get_vcs_link())
+    def test_stop_early(self):
+        """Check that the rest of the stream is not read once all the paths are found."""
+        extracted = json_stream.extract_str(
+            '{"lastEpoch": 5, "blocksCurrent": {"8d1ef3": 12}, "stateBefore": <not read>',
+            paths=("blocksCurrent",),
+        )
+        assert extracted == {"blocksCurrent": {"8d1ef3": 12}}
+
+    @allure.link(helpers.get_vcs_link())
+    @pytest.mark.parametrize(
+        "invalid_json",
+        ("", '{"lastEpoch": 5', '{"lastEpoch" 5}', '{"lastEpoch": 5} 6', '{"lastEpoch": "5}'),
+    )
+    def test_invalid_json(self, invalid_json: str):
+        """Try to extract data from invalid JSON.
+
+        Expect failure.
+        """
+        with pytest.raises(json_stream.JSONStreamError):
+            json_stream.extract_str(invalid_json)
+
+
+class TestQueryLedgerState:
+    """Tests for querying ledger state using a fake CLI command."""
+
+    @staticmethod
+    def _fake_cli(monkeypatch, stderr_size: int, returncode: int) -> None:
+        script = (
+            "import json, sys; "
+            f"sys.stderr.write('e' * {stderr_size}); sys.stderr.flush(); "
+            f"json.dump({LEDGER_STATE!r}, sys.stdout); sys.exit({returncode})"
+        )
+        monkeypatch.setattr(
+            clusterlib_utils, "_get_ledger_state_cmd", lambda c: [sys.executable, "-c", script]
+        )
+
+    @allure.link(helpers.get_vcs_link())
+    def test_lot_of_stderr(self, monkeypatch):
+        """Check that lot of output on stderr doesn't block the CLI."""
+        self._fake_cli(monkeypatch=monkeypatch, stderr_size=1024 * 1024, returncode=0)
+        ledger_state = clusterlib_utils.query_ledger_state(cluster_obj=None)  # type: ignore
+        assert ledger_state["lastEpoch"] == LEDGER_STATE["lastEpoch"]
+        assert "esLState" not in ledger_state["stateBefore"]
+
+    @allure.link(helpers.get_vcs_link())
+    def test_cli_error(self, monkeypatch):
+        """Check that stderr of the failed CLI command is part of the error.
+
+        Expect failure.
+        """
+        self._fake_cli(monkeypatch=monkeypatch, stderr_size=10, returncode=1)
+        with pytest.raises(clusterlib.CLIError, match="e{10}"):
+            clusterlib_utils.query_ledger_state(cluster_obj=None)  # type: ignore
@@ -108,13 +108,18 @@ class TestKES:
             ("*.stdout", "KESCouldNotEvolve"),
             ("*.stdout", r"ExceededTimeLimit \(ChainSync"),
         ]
+        kes_period_timeout = int(cluster.slots_per_kes_period * cluster.slot_length + 1)
+
         with logfiles.expect_errors(expected_errors):
-            LOGGER.info(f"Waiting for {expire_timeout} sec for KES expiration.")
-            time.sleep(expire_timeout)
+            LOGGER.info(f"Waiting up to {expire_timeout} sec for KES expiration.")
+            logfiles.wait_for_log_line(
+                files_glob="*.stdout",
+                regex="KESCouldNotEvolve|TraceNoLedgerView",
+                timeout=expire_timeout + kes_period_timeout,
+            )
 
             init_slot = cluster.get_slot_no()
 
-            kes_period_timeout = int(cluster.slots_per_kes_period * cluster.slot_length + 1)
             LOGGER.info(f"Waiting for {kes_period_timeout} sec for next KES period.")
             time.sleep(kes_period_timeout)
 
@@ -191,9 +196,9 @@ class TestKES:
                     this_epoch = cluster.get_epoch()
 
                     # check that the pool is not producing any blocks
-                    blocks_made = clusterlib_utils.get_ledger_state(cluster_obj=cluster)[
-                        "blocksCurrent"
-                    ]
+                    blocks_made = clusterlib_utils.get_ledger_state(
+                        cluster_obj=cluster, paths=["blocksCurrent"]
+                    )["blocksCurrent"]
                     if blocks_made:
                         assert (
                             stake_pool_id_dec not in blocks_made
@@ -222,9 +227,9 @@ class TestKES:
                 this_epoch = cluster.get_epoch()
 
                 # check that the pool is producing blocks
-                blocks_made = clusterlib_utils.get_ledger_state(cluster_obj=cluster)[
-                    "blocksCurrent"
-                ]
+                blocks_made = clusterlib_utils.get_ledger_state(
+                    cluster_obj=cluster, paths=["blocksCurrent"]
+                )["blocksCurrent"]
                 blocks_made_db.append(stake_pool_id_dec in blocks_made)
 
             assert any(blocks_made_db), (
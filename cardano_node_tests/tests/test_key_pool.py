@@ -0,0 +1,312 @@
+"""Tests for the pool of pre-generated keys.
+
+`cardano-cli` is replaced by in-process generation of the keys, so the tests don't need
+a cluster.
+"""
+import concurrent.futures
+import hashlib
+import logging
+import multiprocessing
+import shlex
+from pathlib import Path
+from typing import Iterator
+from typing import List
+
+import allure
+import nacl.signing
+import pytest
+from cardano_clusterlib import clusterlib
+
+from cardano_node_tests.utils import clusterlib_utils
+from cardano_node_tests.utils import configuration
+from cardano_node_tests.utils import helpers
+from cardano_node_tests.utils import key_pool
+from cardano_node_tests.utils import keys
+
+LOGGER = logging.getLogger(__name__)
+
+
+class FakeCluster:
+    """The part of `ClusterLib` needed for building addresses."""
+
+    magic_args = ["--testnet-magic", "42"]
+    overwrite_outfiles = False
+
+    def __init__(self) -> None:
+        self.cli_coverage: List[List[str]] = []
+
+    def record_cli_coverage(self, cli_args: List[str]) -> None:
+        self.cli_coverage.append(cli_args)
+
+
+def _fake_key_gen(commands: List[str], workdir: Path, **kwargs: dict) -> List[bytes]:
+    """Generate the keys the same way as the `cardano-cli ... key-gen` commands."""
+    # pylint: disable=unused-argument
+    for cmd in commands:
+        args = shlex.split(cmd)
+        out_files = {
+            args[i]: Path(workdir) / args[i + 1] for i, a in enumerate(args) if a.startswith("--")
+        }
+        skey = bytes(nacl.signing.SigningKey.generate())
+        keys.write_text_envelope(
+            out_file=out_files["--signing-key-file"], type="SKey", description="", payload=skey
+        )
+        keys.write_text_envelope(
+            out_file=out_files["--verification-key-file"],
+            type="VKey",
+            description="",
+            payload=keys.get_vkey(skey),
+        )
+        if "--operational-certificate-issue-counter" in out_files:
+            out_files["--operational-certificate-issue-counter"].write_text("{}")
+    return [b"" for __ in commands]
+
+
+class FakeCLI:
+    """Fake `helpers.run_commands` that generates keys and builds addresses like `cardano-cli`.
+
+    The built address is made of names of the vkey files, so it is possible to check which keys
+    were used.
+    """
+
+    def __init__(self) -> None:
+        self.batches: List[List[str]] = []
+
+    def run_commands(
+        self, commands: List[str], workdir: Path = Path(), **kwargs: dict
+    ) -> List[bytes]:
+        self.batches.append(commands)
+        for cmd in commands:
+            args = cmd.split(" ")
+            if args[2] == "key-gen":
+                _fake_key_gen([cmd], workdir=workdir)
+                continue
+            opts = {args[i]: args[i + 1] for i, a in enumerate(args) if a.startswith("--")}
+            vkeys = [Path(v).stem for k, v in opts.items() if k.endswith("verification-key-file")]
+            Path(workdir, opts["--out-file"]).write_text(f"addr_{'_'.join(vkeys)}")
+        return [b"" for __ in commands]
+
+
+def _checkout_all(kind: str, pool_dir: Path, worker: str, destination_dir: Path) -> List[str]:
+    """Check out key sets until the pool is exhausted, return hashes of the checked out vkeys."""
+    # the process might be forked with the candidates of the parent process
+    key_pool._CANDIDATES.clear()
+    key_pool._SCANNED_MTIMES.clear()
+    vkey_hashes = []
+    for idx in range(1000):
+        out_files = key_pool.checkout_keys(
+            kind=kind,
+            name=f"{worker}_{idx}",
+            destination_dir=destination_dir,
+            pool_dir=pool_dir,
+        )
+        if not out_files:
+            break
+        vkey_hashes.append(hashlib.sha256(out_files[0].read_bytes()).hexdigest())
+    return vkey_hashes
+
+
+@pytest.fixture(autouse=True)
+def key_pool_dir(tmp_path: Path, monkeypatch) -> Path:
+    """Use empty key pool in a temporary dir, with fake `cardano-cli` for generating keys."""
+    pool_dir = tmp_path / "key_pool"
+    monkeypatch.setattr(configuration, "KEY_POOL_DIR", str(pool_dir))
+    monkeypatch.setattr(helpers, "run_commands", _fake_key_gen)
+    # build addresses without `cardano-cli`
+    monkeypatch.setattr(configuration, "NATIVE_KEYS", True)
+    monkeypatch.setattr(key_pool, "_CANDIDATES", {})
+    monkeypatch.setattr(key_pool, "_SCANNED_MTIMES", {})
+    monkeypatch.setattr(key_pool, "_REPORTED_UNAVAILABLE", set())
+    return pool_dir
+
+
+@pytest.fixture
+def destination_dir(tmp_path: Path) -> Path:
+    """Create a dir for the checked out keys."""
+    out_dir = tmp_path / "out"
+    out_dir.mkdir()
+    return out_dir
+
+
+class TestKeyPool:
+    """Tests for `key_pool`."""
+
+    @allure.link(helpers.get_vcs_link())
+    @pytest.mark.parametrize("kind", tuple(key_pool.KEY_KINDS))
+    def test_generate_keys(self, kind: str, key_pool_dir: Path):
+        """Check that the key sets are stored in directories named by hash of the vkey file."""
+        key_dirs = key_pool.generate_keys(kind=kind, count=3)
+
+        assert sorted(key_dirs) == sorted((key_pool_dir / kind).iterdir())
+        for key_dir in key_dirs:
+            expected_files = {"key.vkey", "key.skey"}
+            if kind == "cold":
+                expected_files.add("key.counter")
+            assert {p.name for p in key_dir.iterdir()} == expected_files
+            assert key_dir.name == hashlib.sha256((key_dir / "key.vkey").read_bytes()).hexdigest()
+
+        assert key_pool.get_available_count(kind=kind) == 3
+
+    @allure.link(helpers.get_vcs_link())
+    @pytest.mark.parametrize("kind", tuple(key_pool.KEY_KINDS))
+    def test_file_names(self, kind: str, destination_dir: Path):
+        """Check that checked out files are named the same way as files created by `clusterlib`."""
+        key_pool.generate_keys(kind=kind, count=1)
+        out_files = key_pool.checkout_keys(kind=kind, name="user0", destination_dir=destination_dir)
+
+        suffix = key_pool.KEY_KINDS[kind].suffix
+        expected_files = [
+            destination_dir / f"user0{suffix}.vkey",
+            destination_dir / f"user0{suffix}.skey",
+        ]
+        if kind == "cold":
+            expected_files.append(destination_dir / "user0_cold.counter")
+        assert out_files == expected_files
+        assert all(f.exists() for f in expected_files)
+
+        # the file names match the names used by the key generation in `keys`
+        if kind == "payment":
+            assert suffix == keys.KeyTypes.PAYMENT.suffix
+        elif kind == "stake":
+            assert suffix == keys.KeyTypes.STAKE.suffix
+
+    @allure.link(helpers.get_vcs_link())
+    def test_addr_records(self, key_pool_dir: Path, destination_dir: Path):
+        """Check that address records are created from the checked out keys."""
+        for kind in ("payment", "stake"):
+            key_pool.generate_keys(kind=kind, count=1)
+        pool_vkeys = {
+            kind: next((key_pool_dir / kind).iterdir()) / "key.vkey"
+            for kind in ("payment", "stake")
+        }
+
+        stake_rec = clusterlib_utils._create_stake_addr_record(
+            name="user0", cluster_obj=FakeCluster(), destination_dir=destination_dir  # type: ignore
+        )
+        payment_rec = clusterlib_utils._create_payment_addr_record(
+            name="user0",
+            cluster_obj=FakeCluster(),  # type: ignore
+            stake_vkey_file=stake_rec.vkey_file,
+            destination_dir=destination_dir,
+        )
+
+        assert stake_rec.vkey_file == destination_dir / "user0_stake.vkey"
+        assert stake_rec.skey_file == destination_dir / "user0_stake.skey"
+        assert payment_rec.vkey_file == destination_dir / "user0.vkey"
+        assert payment_rec.skey_file == destination_dir / "user0.skey"
+        assert Path(stake_rec.vkey_file).read_bytes() == pool_vkeys["stake"].read_bytes()
+        assert Path(payment_rec.vkey_file).read_bytes() == pool_vkeys["payment"].read_bytes()
+
+        assert clusterlib.read_address_from_file(destination_dir / "user0.addr") == (
+            payment_rec.address
+        )
+        assert clusterlib.read_address_from_file(destination_dir / "user0_stake.addr") == (
+            stake_rec.address
+        )
+        assert payment_rec.address == keys.build_payment_address(
+            payment_vkey_file=pool_vkeys["payment"], stake_vkey_file=pool_vkeys["stake"]
+        )
+
+    @allure.link(helpers.get_vcs_link())
+    def test_exhausted(self, destination_dir: Path):
+        """Check that keys are generated when the pool is exhausted."""
+        key_pool.generate_keys(kind="payment", count=1)
+
+        assert key_pool.checkout_key_pair(
+            kind="payment", name="user0", destination_dir=destination_dir
+        )
+        assert key_pool.get_available_count(kind="payment") == 0
+        assert not key_pool.checkout_key_pair(
+            kind="payment", name="user1", destination_dir=destination_dir
+        )
+
+        payment_rec = clusterlib_utils._create_payment_addr_record(
+            name="user1", cluster_obj=FakeCluster(), destination_dir=destination_dir  # type: ignore
+        )
+        assert payment_rec.vkey_file == destination_dir / "user1.vkey"
+        assert Path(payment_rec.skey_file).exists()
+        assert payment_rec.address == keys.build_payment_address(
+            payment_vkey_file=payment_rec.vkey_file
+        )
+
+    @allure.link(helpers.get_vcs_link())
+    def test_exhausted_not_rescanned(self, key_pool_dir: Path, destination_dir: Path, monkeypatch):
+        """Check that the exhausted pool is scanned again only when key sets were added."""
+        scanned: List[Path] = []
+        orig_iterdir = Path.iterdir
+
+        def _iterdir(self: Path) -> Iterator[Path]:
+            scanned.append(self)
+            return orig_iterdir(self)
+
+        key_pool.generate_keys(kind="payment", count=1)
+        monkeypatch.setattr(Path, "iterdir", _iterdir)
+
+        for idx in range(5):
+            key_pool.checkout_key_pair(
+                kind="payment", name=f"user{idx}", destination_dir=destination_dir
+            )
+        assert scanned == [key_pool_dir / "payment"]
+
+        # new key sets were added, the pool is scanned again
+        key_pool.generate_keys(kind="payment", count=1)
+        assert key_pool.checkout_key_pair(
+            kind="payment", name="user5", destination_dir=destination_dir
+        )
+        assert len(scanned) == 2
+
+    @allure.link(helpers.get_vcs_link())
+    def test_pool_users_cli(self, destination_dir: Path, monkeypatch):
+        """Check that pool users are created using batches of concurrent `cardano-cli` commands.
+
+        The keys of the first pool user are taken from the key pool.
+        """
+        for kind in ("payment", "stake"):
+            key_pool.generate_keys(kind=kind, count=1)
+        fake_cli = FakeCLI()
+        monkeypatch.setattr(helpers, "run_commands", fake_cli.run_commands)
+        monkeypatch.setattr(configuration, "NATIVE_KEYS", False)
+        cluster_obj = FakeCluster()
+
+        with helpers.change_cwd(destination_dir):
+            pool_users = clusterlib_utils.create_pool_users(
+                cluster_obj=cluster_obj, name_template="user", no_of_addr=3  # type: ignore
+            )
+
+        # stake keys, stake addresses, payment keys, payment addresses
+        assert [[c.split(" ")[1:3] for c in b] for b in fake_cli.batches] == [
+            [["stake-address", "key-gen"]] * 2,
+            [["stake-address", "build"]] * 3,
+            [["address", "key-gen"]] * 2,
+            [["address", "build"]] * 3,
+        ]
+        assert len(cluster_obj.cli_coverage) == 10
+
+        for idx, pool_user in enumerate(pool_users):
+            assert pool_user.stake.vkey_file == Path(f"user_addr{idx}_stake.vkey")
+            assert pool_user.payment.vkey_file == Path(f"user_addr{idx}.vkey")
+            assert pool_user.stake.address == f"addr_user_addr{idx}_stake"
+            assert pool_user.payment.address == f"addr_user_addr{idx}_user_addr{idx}_stake"
+
+    @allure.link(helpers.get_vcs_link())
+    def test_concurrent_checkout(self, key_pool_dir: Path, destination_dir: Path):
+        """Check that concurrent workers never check out the same key set."""
+        key_pool.generate_keys(kind="payment", count=40)
+
+        ctx = multiprocessing.get_context("fork")
+        with concurrent.futures.ProcessPoolExecutor(max_workers=4, mp_context=ctx) as executor:
+            futures = [
+                executor.submit(
+                    _checkout_all,
+                    kind="payment",
+                    pool_dir=key_pool_dir,
+                    worker=f"gw{i}",
+                    destination_dir=destination_dir,
+                )
+                for i in range(4)
+            ]
+            checked_out = [h for f in futures for h in f.result()]
+
+        assert len(checked_out) == 40
+        assert sorted(checked_out) == sorted(d.name for d in (key_pool_dir / "payment").iterdir())
+        assert key_pool.get_available_count(kind="payment") == 0
@@ -0,0 +1,161 @@
+"""Conformance tests for in-process generation of keys and addresses."""
+import logging
+from pathlib import Path
+
+import allure
+import pytest
+from _pytest.tmpdir import TempdirFactory
+from cardano_clusterlib import clusterlib
+
+from cardano_node_tests.utils import helpers
+from cardano_node_tests.utils import keys
+
+LOGGER = logging.getLogger(__name__)
+
+
+@pytest.fixture(scope="module")
+def create_temp_dir(tmp_path_factory: TempdirFactory):
+    """Create a temporary dir."""
+    p = Path(tmp_path_factory.getbasetemp()).joinpath(helpers.get_id_for_mktemp(__file__)).resolve()
+    p.mkdir(exist_ok=True, parents=True)
+    return p
+
+
+@pytest.fixture
+def temp_dir(create_temp_dir: Path):
+    """Change to a temporary dir."""
+    with helpers.change_cwd(create_temp_dir):
+        yield create_temp_dir
+
+
+# use the "temp_dir" fixture for all tests automatically
+pytestmark = pytest.mark.usefixtures("temp_dir")
+
+
+class TestKeyFiles:
+    """Tests for key files generated in-process."""
+
+    @allure.link(helpers.get_vcs_link())
+    def test_no_overwrite(self, tmp_path: Path):
+        """Check that existing key files are not overwritten."""
+        key_pair = keys.gen_key_pair(key_name="user0", destination_dir=tmp_path)
+        skey = key_pair.skey_file.read_bytes()
+
+        with pytest.raises(clusterlib.CLIError, match="already exist"):
+            keys.gen_key_pair(key_name="user0", destination_dir=tmp_path)
+        assert key_pair.skey_file.read_bytes() == skey
+
+        # the vkey file alone is enough to refuse generating new keys
+        key_pair.skey_file.unlink()
+        with pytest.raises(clusterlib.CLIError, match="already exist"):
+            keys.gen_key_pair(key_name="user0", destination_dir=tmp_path)
+        assert not key_pair.skey_file.exists()
+
+
+@pytest.mark.testnets
+class TestKeys:
+    """Compare keys and addresses generated in-process with the ones generated by `cardano-cli`."""
+
+    @allure.link(helpers.get_vcs_link())
+    @pytest.mark.parametrize("key_type", ("payment", "stake"))
+    def test_key_files(self, cluster: clusterlib.ClusterLib, key_type: str):
+        """Check that key files have the same format as key files created by `cardano-cli`.
+
+        * generate key pair in-process
+        * check that the key files have the same type and description as CLI generated keys
+        * derive vkey from the skey generated in-process using `key verification-key` and check
+          that it's the same as the vkey generated in-process
+        * derive vkey from CLI generated skey in-process and check that the vkey file is
+          identical to the CLI generated vkey file
+        * check that payment key hash is the same as the one returned by `address key-hash`
+        """
+        temp_template = f"{helpers.get_func_name()}_{key_type}"
+
+        if key_type == "stake":
+            native_type = keys.KeyTypes.STAKE
+            cli_key_pair = cluster.gen_stake_key_pair(key_name=f"{temp_template}_cli")
+        else:
+            native_type = keys.KeyTypes.PAYMENT
+            cli_key_pair = cluster.gen_payment_key_pair(key_name=f"{temp_template}_cli")
+
+        native_key_pair = keys.gen_key_pair(
+            key_name=f"{temp_template}_native", key_type=native_type
+        )
+
+        # check that the key files are compatible
+        for native_file, cli_file in zip(native_key_pair, cli_key_pair):
+            native_envelope = keys.read_text_envelope(native_file)
+            cli_envelope = keys.read_text_envelope(cli_file)
+            assert native_envelope["type"] == cli_envelope["type"]
+            assert native_envelope["description"] == cli_envelope["description"]
+
+        # check that `cardano-cli` accepts the skey generated in-process and derives the same vkey
+        cli_derived_vkey_file = Path(f"{temp_template}_native_cli_derived.vkey")
+        cluster.cli(
+            [
+                "key",
+                "verification-key",
+                "--signing-key-file",
+                str(native_key_pair.skey_file),
+                "--verification-key-file",
+                str(cli_derived_vkey_file),
+            ]
+        )
+        assert keys.read_text_envelope(cli_derived_vkey_file)["type"] == native_type.vkey_type
+        assert keys.read_key(cli_derived_vkey_file) == keys.read_key(native_key_pair.vkey_file)
+
+        # derive vkey from the CLI generated skey and compare the files byte for byte
+        derived_vkey_file = keys.write_text_envelope(
+            out_file=f"{temp_template}_derived.vkey",
+            type=native_type.vkey_type,
+            description=native_type.vkey_description,
+            payload=keys.get_vkey(keys.read_key(cli_key_pair.skey_file)),
+        )
+        assert derived_vkey_file.read_bytes() == Path(cli_key_pair.vkey_file).read_bytes()
+
+        # check that `cardano-cli` accepts the key generated in-process; stake key hashes are
+        # checked as part of stake addresses
+        if key_type == "payment":
+            assert keys.get_key_hash(native_key_pair.vkey_file) == cluster.get_payment_vkey_hash(
+                payment_vkey_file=native_key_pair.vkey_file
+            )
+
+    @allure.link(helpers.get_vcs_link())
+    def test_addresses(self, cluster: clusterlib.ClusterLib):
+        """Check that addresses are the same as addresses built by `cardano-cli`.
+
+        * generate payment and stake key pairs in-process
+        * build enterprise, base and stake address in-process and using `cardano-cli`
+        * compare the addresses
+        * check that the address generated in-process is accepted by `query utxo`
+        """
+        temp_template = helpers.get_func_name()
+
+        stake_addr_rec = keys.gen_stake_addr_and_keys(name=temp_template, cluster_obj=cluster)
+        base_addr_rec = keys.gen_payment_addr_and_keys(
+            name=f"{temp_template}_base",
+            cluster_obj=cluster,
+            stake_vkey_file=stake_addr_rec.vkey_file,
+        )
+        enterprise_addr_rec = keys.gen_payment_addr_and_keys(
+            name=f"{temp_template}_enterprise", cluster_obj=cluster
+        )
+
+        assert stake_addr_rec.address == cluster.gen_stake_addr(
+            addr_name=f"{temp_template}_cli", stake_vkey_file=stake_addr_rec.vkey_file
+        )
+        assert base_addr_rec.address == cluster.gen_payment_addr(
+            addr_name=f"{temp_template}_base_cli",
+            payment_vkey_file=base_addr_rec.vkey_file,
+            stake_vkey_file=stake_addr_rec.vkey_file,
+        )
+        assert enterprise_addr_rec.address == cluster.gen_payment_addr(
+            addr_name=f"{temp_template}_enterprise_cli",
+            payment_vkey_file=enterprise_addr_rec.vkey_file,
+        )
+
+        # the address files are written the same way as by `clusterlib`
+        assert Path(f"{temp_template}_stake.addr").read_text().strip() == stake_addr_rec.address
+        assert Path(f"{temp_template}_base.addr").read_text().strip() == base_addr_rec.address
+
+        assert not cluster.get_utxo(address=base_addr_rec.address)
@@ -0,0 +1,171 @@
+"""Tests for ledger state snapshots shared by pytest workers."""
+import json
+import logging
+import os
+import sys
+from pathlib import Path
+from typing import Any
+from typing import Dict
+from typing import List
+
+import allure
+import pytest
+
+from cardano_node_tests.utils import clusterlib_utils
+from cardano_node_tests.utils import helpers
+
+LOGGER = logging.getLogger(__name__)
+
+EPOCH_LENGTH = 1000
+BUCKET_SLOTS = EPOCH_LENGTH // clusterlib_utils.LEDGER_STATE_CACHE_BUCKETS
+
+LEDGER_STATE: Dict[str, Any] = {
+    "lastEpoch": 5,
+    "possibleRewardUpdate": {"rs": [["a7bd", [{"rewardAmount": 10}]]]},
+    "stateBefore": {
+        "esLState": {"utxoState": {"8d1ef3#0": {"value": 1}}},
+        "esSnapshots": {"pstakeMark": {"stake": [[{"key hash": "a7bd"}, 1000]]}},
+    },
+}
+
+
+class FakeCluster:
+    """The part of `ClusterLib` needed for caching ledger state."""
+
+    def __init__(self, state_dir: Path) -> None:
+        self.state_dir = state_dir
+        self.epoch_length = EPOCH_LENGTH
+        self.slot = 0
+
+    def get_tip(self) -> dict:
+        return {"epoch": self.slot // EPOCH_LENGTH, "slot": self.slot}
+
+
+@pytest.fixture
+def cluster_obj(tmp_path: Path, monkeypatch) -> FakeCluster:
+    """Return fake cluster whose ledger state queries are recorded in `queries`."""
+    cluster_obj = FakeCluster(state_dir=tmp_path)
+    queries: List[int] = []
+
+    def _query_ledger_state(cluster_obj: FakeCluster, paths: tuple = ()) -> dict:
+        queries.append(cluster_obj.slot)
+        # the ledger state contains the slot it was queried at
+        ledger_state: dict = json.loads(json.dumps(LEDGER_STATE))
+        ledger_state["lastEpoch"] = cluster_obj.slot
+        if paths:
+            return {k: ledger_state[k] for k in paths}
+        return ledger_state
+
+    monkeypatch.setattr(clusterlib_utils, "query_ledger_state", _query_ledger_state)
+    cluster_obj.queries = queries  # type: ignore
+    return cluster_obj
+
+
+def _get_ledger_state(cluster_obj: FakeCluster, **kwargs: Any) -> dict:
+    ledger_state: dict = clusterlib_utils.get_ledger_state(
+        cluster_obj=cluster_obj, **kwargs  # type: ignore
+    )
+    return ledger_state
+
+
+class TestLedgerStateCache:
+    """Tests for `clusterlib_utils.get_ledger_state` using the cached snapshots."""
+
+    @allure.link(helpers.get_vcs_link())
+    def test_cache_key(self, cluster_obj: FakeCluster):
+        """Check that the cache key is the epoch and bucket of slots of the tip."""
+        assert clusterlib_utils._get_ledger_state_cache_key(cluster_obj) == (0, 0)  # type: ignore
+
+        cluster_obj.slot = BUCKET_SLOTS - 1
+        assert clusterlib_utils._get_ledger_state_cache_key(cluster_obj) == (0, 0)  # type: ignore
+
+        cluster_obj.slot = EPOCH_LENGTH + BUCKET_SLOTS
+        assert clusterlib_utils._get_ledger_state_cache_key(cluster_obj) == (  # type: ignore
+            1,
+            EPOCH_LENGTH // BUCKET_SLOTS + 1,
+        )
+
+    @allure.link(helpers.get_vcs_link())
+    def test_fresh_by_default(self, cluster_obj: FakeCluster):
+        """Check that the cache is used only when requested."""
+        _get_ledger_state(cluster_obj)
+        _get_ledger_state(cluster_obj)
+        assert cluster_obj.queries == [0, 0]  # type: ignore
+        assert not list((cluster_obj.state_dir / "ledger_state_cache").glob("*.json"))
+
+    @allure.link(helpers.get_vcs_link())
+    def test_bucket(self, cluster_obj: FakeCluster):
+        """Check that the snapshot is used until the tip moves to next bucket of slots."""
+        ledger_state = _get_ledger_state(cluster_obj, fresh=False)
+        assert "esLState" in ledger_state["stateBefore"]
+
+        cluster_obj.slot = BUCKET_SLOTS - 1
+        assert _get_ledger_state(cluster_obj, fresh=False) == ledger_state
+        assert _get_ledger_state(cluster_obj, paths=("stateBefore.esSnapshots",), fresh=False) == {
+            "stateBefore": {"esSnapshots": LEDGER_STATE["stateBefore"]["esSnapshots"]}
+        }
+        assert cluster_obj.queries == [0]  # type: ignore
+
+        cluster_obj.slot = BUCKET_SLOTS
+        assert _get_ledger_state(cluster_obj, fresh=False)["lastEpoch"] == BUCKET_SLOTS
+        assert cluster_obj.queries == [0, BUCKET_SLOTS]  # type: ignore
+
+    @allure.link(helpers.get_vcs_link())
+    def test_bucket_crossed_while_querying(self, cluster_obj: FakeCluster, monkeypatch):
+        """Check that the queried data are returned, but not cached, when the tip moved.
+
+        The data from later slots must not be cached under the original key.
+        """
+        orig_query = clusterlib_utils.query_ledger_state
+
+        def _slow_query(cluster_obj: FakeCluster, paths: tuple = ()) -> dict:
+            cluster_obj.slot += BUCKET_SLOTS
+            ledger_state: dict = orig_query(cluster_obj=cluster_obj, paths=paths)  # type: ignore
+            return ledger_state
+
+        monkeypatch.setattr(clusterlib_utils, "query_ledger_state", _slow_query)
+        ledger_state = _get_ledger_state(
+            cluster_obj, paths=("lastEpoch", "possibleRewardUpdate.rs"), fresh=False
+        )
+        assert ledger_state == {
+            "lastEpoch": BUCKET_SLOTS,
+            "possibleRewardUpdate": LEDGER_STATE["possibleRewardUpdate"],
+        }
+        assert cluster_obj.queries == [BUCKET_SLOTS]  # type: ignore
+        assert not list((cluster_obj.state_dir / "ledger_state_cache").glob("*.json"))
+
+    @allure.link(helpers.get_vcs_link())
+    def test_eviction(self, cluster_obj: FakeCluster, monkeypatch):
+        """Check that the oldest snapshots are evicted when the cache is full."""
+        snapshot_size = len(json.dumps(LEDGER_STATE))
+        monkeypatch.setattr(clusterlib_utils, "LEDGER_STATE_CACHE_MAX_SIZE", snapshot_size * 2.5)
+
+        cache_dir = cluster_obj.state_dir / "ledger_state_cache"
+        for bucket in range(3):
+            cluster_obj.slot = bucket * BUCKET_SLOTS
+            _get_ledger_state(cluster_obj, fresh=False)
+            # make the order of snapshots independent of resolution of file timestamps
+            os.utime(cache_dir / f"ledger_state_0_{bucket}.json", (bucket, bucket))
+
+        assert sorted(p.name for p in cache_dir.glob("*.json")) == [
+            "ledger_state_0_1.json",
+            "ledger_state_0_2.json",
+        ]
+
+
+class TestFilteredLedgerState:
+    """Tests for `clusterlib_utils.filtered_ledger_state`."""
+
+    @allure.link(helpers.get_vcs_link())
+    def test_filtered(self, monkeypatch):
+        """Check that the UTxO part of ledger state is left out."""
+        script = f"import json, sys; json.dump({LEDGER_STATE!r}, sys.stdout)"
+        monkeypatch.setattr(
+            clusterlib_utils, "_get_ledger_state_cmd", lambda c: [sys.executable, "-c", script]
+        )
+
+        filtered_json = clusterlib_utils.filtered_ledger_state(cluster_obj=None)  # type: ignore
+        filtered = json.loads(filtered_json)
+        expected = json.loads(json.dumps(LEDGER_STATE))
+        del expected["stateBefore"]["esLState"]
+        assert filtered == expected
@@ -0,0 +1,243 @@
+"""Tests for searching cluster log files for errors."""
+import logging
+import os
+import time
+from pathlib import Path
+from typing import List
+from typing import Tuple
+
+import allure
+import pytest
+
+from cardano_node_tests.utils import helpers
+from cardano_node_tests.utils import logfiles
+
+LOGGER = logging.getLogger(__name__)
+
+ERROR_LINE = "[2021-06-01 10:00:00.00 UTC] something failed\n"
+INFO_LINE = "[2021-06-01 10:00:00.00 UTC] all good\n"
+
+
+@pytest.fixture
+def state_dir(tmp_path: Path) -> Path:
+    """Create a fake cluster state dir with a log file."""
+    (tmp_path / "bft1.stdout").touch()
+    return tmp_path
+
+
+def _append(logfile: Path, *lines: str) -> None:
+    with open(logfile, "a", encoding="utf-8") as outfile:
+        outfile.write("".join(lines))
+
+
+def _get_lines(errors: List[Tuple[Path, str]]) -> List[str]:
+    return [line for __, line in errors]
+
+
+class TestSearchArtifacts:
+    """Tests for searching new lines of log files, including rotated log files."""
+
+    @allure.link(helpers.get_vcs_link())
+    def test_search_once(self, state_dir: Path):
+        """Check that each line is searched only once."""
+        logfile = state_dir / "bft1.stdout"
+        _append(logfile, INFO_LINE, ERROR_LINE)
+
+        errors = logfiles.search_cluster_artifacts(state_dir=state_dir)
+        assert _get_lines(errors) == [ERROR_LINE]
+        assert errors[0][0] == logfile
+
+        assert not logfiles.search_cluster_artifacts(state_dir=state_dir)
+
+        _append(logfile, ERROR_LINE)
+        assert _get_lines(logfiles.search_cluster_artifacts(state_dir=state_dir)) == [ERROR_LINE]
+
+    @allure.link(helpers.get_vcs_link())
+    def test_incomplete_line(self, state_dir: Path):
+        """Check that incomplete last line of the "live" log file is searched once it's complete."""
+        logfile = state_dir / "bft1.stdout"
+        _append(logfile, ERROR_LINE[:20])
+        assert not logfiles.search_cluster_artifacts(state_dir=state_dir)
+
+        _append(logfile, ERROR_LINE[20:])
+        assert _get_lines(logfiles.search_cluster_artifacts(state_dir=state_dir)) == [ERROR_LINE]
+
+    @allure.link(helpers.get_vcs_link())
+    def test_ignored_errors(self, state_dir: Path):
+        """Check that errors matching the ignore rules are not reported."""
+        logfile = state_dir / "bft1.stdout"
+        ignored_line = "[2021-06-01 10:00:00.00 UTC] expected failure\n"
+        (state_dir / logfiles.ERRORS_RULES_FILE_NAME).write_text("bft*;;expected failure\n")
+        _append(logfile, ignored_line, ERROR_LINE)
+
+        assert _get_lines(logfiles.search_cluster_artifacts(state_dir=state_dir)) == [ERROR_LINE]
+
+    @allure.link(helpers.get_vcs_link())
+    def test_rotated_logfile(self, state_dir: Path):
+        """Check that lines written to a log file just before it was rotated are searched.
+
+        The offsets are keyed by inode, so the rotated log file is searched from the offset where
+        the previous search ended, and the new "live" log file from the beginning.
+        """
+        logfile = state_dir / "bft1.stdout"
+        _append(logfile, ERROR_LINE)
+        assert len(logfiles.search_cluster_artifacts(state_dir=state_dir)) == 1
+
+        rotated_inode = str(logfile.stat().st_ino)
+        _append(logfile, "[2021-06-01 10:00:01.00 UTC] failed before rotation\n")
+        os.rename(logfile, state_dir / "bft1.stdout.1")
+        # make sure the new "live" log file is newer than the rotated one
+        time.sleep(0.01)
+        _append(logfile, "[2021-06-01 10:00:02.00 UTC] failed after rotation\n")
+
+        errors = logfiles.search_cluster_artifacts(state_dir=state_dir)
+        assert [line.split("] ")[1] for line in _get_lines(errors)] == [
+            "failed before rotation\n",
+            "failed after rotation\n",
+        ]
+        # errors from all generations are reported for the "live" log file
+        assert {p for p, __ in errors} == {logfile}
+
+        state = logfiles._load_state(state_dir / logfiles.LOGFILES_STATE_FILE_NAME)
+        assert state["bft1.stdout"] == {
+            rotated_inode: (state_dir / "bft1.stdout.1").stat().st_size,
+            str(logfile.stat().st_ino): logfile.stat().st_size,
+        }
+
+        # offsets of generations that no longer exist are dropped
+        os.remove(state_dir / "bft1.stdout.1")
+        assert not logfiles.search_cluster_artifacts(state_dir=state_dir)
+        state = logfiles._load_state(state_dir / logfiles.LOGFILES_STATE_FILE_NAME)
+        assert list(state["bft1.stdout"]) == [str(logfile.stat().st_ino)]
+
+    @allure.link(helpers.get_vcs_link())
+    def test_truncated_logfile(self, state_dir: Path):
+        """Check that truncated log file (or reused inode) is searched from the beginning."""
+        logfile = state_dir / "bft1.stdout"
+        _append(logfile, INFO_LINE, INFO_LINE, ERROR_LINE)
+        assert len(logfiles.search_cluster_artifacts(state_dir=state_dir)) == 1
+
+        logfile.write_text(ERROR_LINE)
+        assert _get_lines(logfiles.search_cluster_artifacts(state_dir=state_dir)) == [ERROR_LINE]
+
+
+class TestDirWatch:
+    """Tests for waiting for changes of files in a directory."""
+
+    @allure.link(helpers.get_vcs_link())
+    def test_wait(self, tmp_path: Path):
+        """Check that changed files are reported (`None` means unknown when polling)."""
+        dir_watch = logfiles._DirWatch(dir_path=tmp_path, poll_interval=0.1)
+        try:
+            # start watching
+            dir_watch.wait(timeout=0.01)
+            _append(tmp_path / "bft1.stdout", INFO_LINE)
+            changed = dir_watch.wait(timeout=1)
+            assert changed is None or changed == {"bft1.stdout"}
+
+            if changed is not None:
+                # nothing changed since the last call
+                assert dir_watch.wait(timeout=0.01) == set()
+        finally:
+            dir_watch.close()
+
+    @allure.link(helpers.get_vcs_link())
+    def test_dir_removed(self, tmp_path: Path):
+        """Check that removal of the watched directory doesn't break the watch."""
+        watched_dir = tmp_path / "state-cluster0"
+        watched_dir.mkdir()
+        dir_watch = logfiles._DirWatch(dir_path=watched_dir, poll_interval=0.1)
+        try:
+            dir_watch.wait(timeout=0.01)
+            watched_dir.rmdir()
+            assert not dir_watch.wait(timeout=1)
+
+            # the directory is watched again once it's re-created
+            watched_dir.mkdir()
+            dir_watch.wait(timeout=0.01)
+            _append(watched_dir / "bft1.stdout", INFO_LINE)
+            changed = dir_watch.wait(timeout=1)
+            assert changed is None or changed == {"bft1.stdout"}
+        finally:
+            dir_watch.close()
+
+
+class TestLogWatcher:
+    """Tests for searching log files in background."""
+
+    @allure.link(helpers.get_vcs_link())
+    def test_errors_in_background(self, state_dir: Path):
+        """Check that errors are found while the watcher is resumed."""
+        logfile = state_dir / "bft1.stdout"
+        log_watcher = logfiles.LogWatcher(state_dir=state_dir, poll_interval=0.1, delay=0.01)
+        log_watcher.resume()
+        try:
+            _append(logfile, ERROR_LINE)
+            for __ in range(50):
+                if log_watcher._errors:
+                    break
+                time.sleep(0.1)
+            assert _get_lines(log_watcher.get_errors()) == [ERROR_LINE]
+        finally:
+            log_watcher.stop()
+
+    @allure.link(helpers.get_vcs_link())
+    def test_pause_searches_last_lines(self, state_dir: Path):
+        """Check that lines written just before the watcher is paused are searched on pause.
+
+        The errors must not be attributed to the test that resumes the watcher next.
+        """
+        logfile = state_dir / "bft1.stdout"
+        # the background search is delayed, so it's not done before the watcher is paused
+        log_watcher = logfiles.LogWatcher(state_dir=state_dir, poll_interval=0.1, delay=1)
+        log_watcher.resume()
+        try:
+            _append(logfile, ERROR_LINE)
+            log_watcher.pause()
+            assert _get_lines(log_watcher.get_errors()) == [ERROR_LINE]
+
+            # the errors were already reported, they are not found again on next resume
+            log_watcher.resume()
+            log_watcher.pause()
+            assert not log_watcher.get_errors()
+        finally:
+            log_watcher.stop()
+
+    @allure.link(helpers.get_vcs_link())
+    def test_pause_searches_changed_files(self, state_dir: Path, monkeypatch):
+        """Check that only log files with pending changes are searched on pause."""
+        dir_watch = logfiles._DirWatch(dir_path=state_dir, poll_interval=0.1)
+        inotify_available = dir_watch.start()
+        dir_watch.close()
+        if not inotify_available:
+            pytest.skip("names of changed files are not known when polling")
+
+        searched: List[List[str]] = []
+        orig_search = logfiles.search_cluster_artifacts
+
+        def _search(state_dir: Path, logfile_names: List[str]) -> List[Tuple[Path, str]]:
+            searched.append(logfile_names)
+            return orig_search(state_dir=state_dir, logfile_names=logfile_names)
+
+        monkeypatch.setattr(logfiles, "search_cluster_artifacts", _search)
+
+        (state_dir / "pool1.stdout").touch()
+        log_watcher = logfiles.LogWatcher(state_dir=state_dir, poll_interval=0.1, delay=0.01)
+        log_watcher.resume()
+        try:
+            # wait until the initial search of all log files is done
+            for __ in range(50):
+                if searched:
+                    break
+                time.sleep(0.1)
+            assert searched == [["bft1.stdout", "pool1.stdout"]]
+
+            log_watcher.pause()
+            assert len(searched) == 1, "No log file changed, nothing is searched"
+
+            _append(state_dir / "pool1.stdout", ERROR_LINE)
+            log_watcher.pause()
+            assert searched[-1] == ["pool1.stdout"]
+            assert _get_lines(log_watcher.get_errors()) == [ERROR_LINE]
+        finally:
+            log_watcher.stop()
@@ -6,7 +6,6 @@
 * transactions
 """
 import itertools
-import json
 import logging
 from pathlib import Path
 from typing import List
@@ -24,6 +23,7 @@ from cardano_node_tests.utils import cluster_nodes
 from cardano_node_tests.utils import clusterlib_utils
 from cardano_node_tests.utils import dbsync_utils
 from cardano_node_tests.utils import helpers
+from cardano_node_tests.utils import simple_scripts
 from cardano_node_tests.utils.versions import VERSIONS
 
 LOGGER = logging.getLogger(__name__)
@@ -90,13 +90,11 @@ def simple_script_policyid(
     issuer_addr = issuers_addrs[1]
 
     # create simple script
-    keyhash = cluster.get_payment_vkey_hash(issuer_addr.vkey_file)
-    script_content = {"keyHash": keyhash, "type": "sig"}
-    script = Path(f"{temp_template}.script")
-    with open(script, "w") as out_json:
-        json.dump(script_content, out_json)
+    script = simple_scripts.build_sig_script(
+        script_name=temp_template, payment_vkey_file=issuer_addr.vkey_file
+    )
 
-    policyid = cluster.get_policyid(script)
+    policyid = simple_scripts.get_policyid(script)
 
     return script, policyid
 
@@ -116,12 +114,12 @@ def multisig_script_policyid(
     payment_vkey_files = [p.vkey_file for p in issuers_addrs]
 
     # create multisig script
-    multisig_script = cluster.build_multisig_script(
+    multisig_script = simple_scripts.build_multisig_script(
         script_name=temp_template,
         script_type_arg=clusterlib.MultiSigTypeArgs.ALL,
         payment_vkey_files=payment_vkey_files[1:],
     )
-    policyid = cluster.get_policyid(multisig_script)
+    policyid = simple_scripts.get_policyid(multisig_script)
 
     return multisig_script, policyid
 
@@ -173,13 +171,13 @@ class TestMinting:
             token_issuers = [issuers_addrs[0], *_empty_issuers]
 
         # create multisig script
-        multisig_script = cluster.build_multisig_script(
+        multisig_script = simple_scripts.build_multisig_script(
             script_name=temp_template,
             script_type_arg=clusterlib.MultiSigTypeArgs.ALL,
             payment_vkey_files=payment_vkey_files,
         )
 
-        policyid = cluster.get_policyid(multisig_script)
+        policyid = simple_scripts.get_policyid(multisig_script)
         token = f"{policyid}.{asset_name}" if asset_name else policyid
 
         assert not cluster.get_utxo(
@@ -259,13 +257,11 @@ class TestMinting:
             )[0]
 
         # create simple script
-        keyhash = cluster.get_payment_vkey_hash(issuer_addr.vkey_file)
-        script_content = {"keyHash": keyhash, "type": "sig"}
-        script = Path(f"{temp_template}.script")
-        with open(script, "w") as out_json:
-            json.dump(script_content, out_json)
+        script = simple_scripts.build_sig_script(
+            script_name=temp_template, payment_vkey_file=issuer_addr.vkey_file
+        )
 
-        policyid = cluster.get_policyid(script)
+        policyid = simple_scripts.get_policyid(script)
         token = f"{policyid}.{asset_name}" if asset_name else policyid
 
         assert not cluster.get_utxo(
@@ -345,14 +341,12 @@ class TestMinting:
         tokens_mint = []
         for i in range(num_of_scripts):
             # create simple script
-            keyhash = cluster.get_payment_vkey_hash(i_addrs[i].vkey_file)
-            script_content = {"keyHash": keyhash, "type": "sig"}
-            script = Path(f"{temp_template}_{i}.script")
-            with open(script, "w") as out_json:
-                json.dump(script_content, out_json)
+            script = simple_scripts.build_sig_script(
+                script_name=f"{temp_template}_{i}", payment_vkey_file=i_addrs[i].vkey_file
+            )
 
             asset_name = f"couttscoin{clusterlib.get_rand_str(4)}"
-            policyid = cluster.get_policyid(script)
+            policyid = simple_scripts.get_policyid(script)
             aname_token = f"{policyid}.{asset_name}"
 
             assert not cluster.get_utxo(
@@ -444,13 +438,11 @@ class TestMinting:
         issuer_addr = issuers_addrs[1]
 
         # create simple script
-        keyhash = cluster.get_payment_vkey_hash(issuer_addr.vkey_file)
-        script_content = {"keyHash": keyhash, "type": "sig"}
-        script = Path(f"{temp_template}.script")
-        with open(script, "w") as out_json:
-            json.dump(script_content, out_json)
+        script = simple_scripts.build_sig_script(
+            script_name=temp_template, payment_vkey_file=issuer_addr.vkey_file
+        )
 
-        policyid = cluster.get_policyid(script)
+        policyid = simple_scripts.get_policyid(script)
         asset_names = [
             f"couttscoin{clusterlib.get_rand_str(4)}",
             f"couttscoin{clusterlib.get_rand_str(4)}",
@@ -540,13 +532,11 @@ class TestMinting:
         issuer_addr = issuers_addrs[1]
 
         # create simple script
-        keyhash = cluster.get_payment_vkey_hash(issuer_addr.vkey_file)
-        script_content = {"keyHash": keyhash, "type": "sig"}
-        script = Path(f"{temp_template}.script")
-        with open(script, "w") as out_json:
-            json.dump(script_content, out_json)
+        script = simple_scripts.build_sig_script(
+            script_name=temp_template, payment_vkey_file=issuer_addr.vkey_file
+        )
 
-        policyid = cluster.get_policyid(script)
+        policyid = simple_scripts.get_policyid(script)
         token = f"{policyid}.{asset_name}"
 
         assert not cluster.get_utxo(
@@ -805,13 +795,13 @@ class TestMinting:
         token_mint_addr = issuers_addrs[0]
 
         # create multisig script
-        multisig_script = cluster.build_multisig_script(
+        multisig_script = simple_scripts.build_multisig_script(
             script_name=temp_template,
             script_type_arg=clusterlib.MultiSigTypeArgs.ALL,
             payment_vkey_files=payment_vkey_files[1:],
         )
 
-        policyid = cluster.get_policyid(multisig_script)
+        policyid = simple_scripts.get_policyid(multisig_script)
         token = f"{policyid}.{asset_name}"
 
         assert not cluster.get_utxo(
@@ -893,13 +883,11 @@ class TestMinting:
         issuer_addr = issuers_addrs[1]
 
         # create simple script
-        keyhash = cluster.get_payment_vkey_hash(issuer_addr.vkey_file)
-        script_content = {"keyHash": keyhash, "type": "sig"}
-        script = Path(f"{temp_template}.script")
-        with open(script, "w") as out_json:
-            json.dump(script_content, out_json)
+        script = simple_scripts.build_sig_script(
+            script_name=temp_template, payment_vkey_file=issuer_addr.vkey_file
+        )
 
-        policyid = cluster.get_policyid(script)
+        policyid = simple_scripts.get_policyid(script)
         token = f"{policyid}.{asset_name}"
 
         assert not cluster.get_utxo(
@@ -973,14 +961,14 @@ class TestPolicies:
         payment_vkey_files = [p.vkey_file for p in issuers_addrs]
 
         # create multisig script
-        multisig_script = cluster.build_multisig_script(
+        multisig_script = simple_scripts.build_multisig_script(
             script_name=temp_template,
             script_type_arg=clusterlib.MultiSigTypeArgs.ALL,
             payment_vkey_files=payment_vkey_files[1:],
             slot=100,
             slot_type_arg=clusterlib.MultiSlotTypeArgs.AFTER,
         )
-        policyid = cluster.get_policyid(multisig_script)
+        policyid = simple_scripts.get_policyid(multisig_script)
 
         tokens_to_mint = []
         for tnum in range(5):
@@ -1057,14 +1045,14 @@ class TestPolicies:
         before_slot = cluster.get_slot_no() + 10_000
 
         # create multisig script
-        multisig_script = cluster.build_multisig_script(
+        multisig_script = simple_scripts.build_multisig_script(
             script_name=temp_template,
             script_type_arg=clusterlib.MultiSigTypeArgs.ALL,
             payment_vkey_files=payment_vkey_files[1:],
             slot=before_slot,
             slot_type_arg=clusterlib.MultiSlotTypeArgs.BEFORE,
         )
-        policyid = cluster.get_policyid(multisig_script)
+        policyid = simple_scripts.get_policyid(multisig_script)
 
         tokens_to_mint = []
         for tnum in range(5):
@@ -1138,14 +1126,14 @@ class TestPolicies:
         before_slot = cluster.get_slot_no() - 1
 
         # create multisig script
-        multisig_script = cluster.build_multisig_script(
+        multisig_script = simple_scripts.build_multisig_script(
             script_name=temp_template,
             script_type_arg=clusterlib.MultiSigTypeArgs.ALL,
             payment_vkey_files=payment_vkey_files[1:],
             slot=before_slot,
             slot_type_arg=clusterlib.MultiSlotTypeArgs.BEFORE,
         )
-        policyid = cluster.get_policyid(multisig_script)
+        policyid = simple_scripts.get_policyid(multisig_script)
 
         tokens_to_mint = []
         for tnum in range(5):
@@ -1211,14 +1199,14 @@ class TestPolicies:
         before_slot = cluster.get_slot_no() + 10_000
 
         # create multisig script
-        multisig_script = cluster.build_multisig_script(
+        multisig_script = simple_scripts.build_multisig_script(
             script_name=temp_template,
             script_type_arg=clusterlib.MultiSigTypeArgs.ALL,
             payment_vkey_files=payment_vkey_files[1:],
             slot=before_slot,
             slot_type_arg=clusterlib.MultiSlotTypeArgs.BEFORE,
         )
-        policyid = cluster.get_policyid(multisig_script)
+        policyid = simple_scripts.get_policyid(multisig_script)
 
         tokens_to_mint = []
         for tnum in range(5):
@@ -1273,14 +1261,14 @@ class TestPolicies:
         after_slot = cluster.get_slot_no() + 10_000
 
         # create multisig script
-        multisig_script = cluster.build_multisig_script(
+        multisig_script = simple_scripts.build_multisig_script(
             script_name=temp_template,
             script_type_arg=clusterlib.MultiSigTypeArgs.ALL,
             payment_vkey_files=payment_vkey_files[1:],
             slot=after_slot,
             slot_type_arg=clusterlib.MultiSlotTypeArgs.AFTER,
         )
-        policyid = cluster.get_policyid(multisig_script)
+        policyid = simple_scripts.get_policyid(multisig_script)
 
         tokens_to_mint = []
         for tnum in range(5):
@@ -1346,14 +1334,14 @@ class TestPolicies:
         after_slot = cluster.get_slot_no() - 1
 
         # create multisig script
-        multisig_script = cluster.build_multisig_script(
+        multisig_script = simple_scripts.build_multisig_script(
             script_name=temp_template,
             script_type_arg=clusterlib.MultiSigTypeArgs.ALL,
             payment_vkey_files=payment_vkey_files[1:],
             slot=after_slot,
             slot_type_arg=clusterlib.MultiSlotTypeArgs.AFTER,
         )
-        policyid = cluster.get_policyid(multisig_script)
+        policyid = simple_scripts.get_policyid(multisig_script)
 
         tokens_to_mint = []
         for tnum in range(5):
@@ -178,9 +178,13 @@ def _create_register_pool_delegate_stake_tx(
     Common functionality for tests.
     """
     # create node VRF key pair
-    node_vrf = cluster_obj.gen_vrf_key_pair(node_name=pool_data.pool_name)
+    node_vrf = clusterlib_utils.gen_vrf_key_pair(
+        cluster_obj=cluster_obj, node_name=pool_data.pool_name
+    )
     # create node cold key pair and counter
-    node_cold = cluster_obj.gen_cold_key_pair_and_counter(node_name=pool_data.pool_name)
+    node_cold = clusterlib_utils.gen_cold_key_pair_and_counter(
+        cluster_obj=cluster_obj, node_name=pool_data.pool_name
+    )
 
     # create stake address registration certs
     stake_addr_reg_cert_files = [
@@ -1152,9 +1156,13 @@ class TestStakePool:
         )
 
         # create node VRF key pair
-        node_vrf = cluster.gen_vrf_key_pair(node_name=pool_data.pool_name)
+        node_vrf = clusterlib_utils.gen_vrf_key_pair(
+            cluster_obj=cluster, node_name=pool_data.pool_name
+        )
         # create node cold key pair and counter
-        node_cold = cluster.gen_cold_key_pair_and_counter(node_name=pool_data.pool_name)
+        node_cold = clusterlib_utils.gen_cold_key_pair_and_counter(
+            cluster_obj=cluster, node_name=pool_data.pool_name
+        )
 
         # create stake pool registration cert
         pool_reg_cert_file = cluster.gen_pool_registration_cert(
@@ -1196,19 +1204,12 @@ class TestStakePool:
             fee=fee,
         )
 
-        # create witness file for each signing key
-        witness_files = [
-            cluster.witness_tx(
-                tx_body_file=tx_raw_output.out_file,
-                witness_name=f"{temp_template}_skey{idx}",
-                signing_key_files=[skey],
-            )
-            for idx, skey in enumerate(witness_skeys)
-        ]
-
-        # sign TX using witness files
-        tx_witnessed_file = cluster.assemble_tx(
-            tx_body_file=tx_raw_output.out_file, witness_files=witness_files, tx_name=temp_template
+        # create witness file for each signing key and sign TX using the witness files
+        tx_witnessed_file = clusterlib_utils.witness_and_assemble_tx(
+            cluster_obj=cluster,
+            tx_body_file=tx_raw_output.out_file,
+            signing_key_files=witness_skeys,
+            tx_name=temp_template,
         )
         # create and register pool
         cluster.submit_tx(tx_file=tx_witnessed_file, txins=tx_raw_output.txins)
@@ -1283,8 +1284,12 @@ class TestStakePool:
             pool_owner.stake.address
         ).reward_account_balance
 
-        node_vrf = cluster.gen_vrf_key_pair(node_name=pool_data.pool_name)
-        node_cold = cluster.gen_cold_key_pair_and_counter(node_name=pool_data.pool_name)
+        node_vrf = clusterlib_utils.gen_vrf_key_pair(
+            cluster_obj=cluster, node_name=pool_data.pool_name
+        )
+        node_cold = clusterlib_utils.gen_cold_key_pair_and_counter(
+            cluster_obj=cluster, node_name=pool_data.pool_name
+        )
 
         # create pool registration cert
         pool_reg_cert_file = cluster.gen_pool_registration_cert(
@@ -1514,9 +1519,11 @@ class TestNegative:
         pool_metadata_hash = cluster.gen_pool_metadata_hash(pool_metadata_file)
 
         # create node VRF key pair
-        node_vrf = cluster.gen_vrf_key_pair(node_name=pool_name)
+        node_vrf = clusterlib_utils.gen_vrf_key_pair(cluster_obj=cluster, node_name=pool_name)
         # create node cold key pair and counter
-        node_cold = cluster.gen_cold_key_pair_and_counter(node_name=pool_name)
+        node_cold = clusterlib_utils.gen_cold_key_pair_and_counter(
+            cluster_obj=cluster, node_name=pool_name
+        )
 
         return pool_name, pool_metadata_hash, node_vrf, node_cold
 
@@ -1531,8 +1538,12 @@ class TestNegative:
 
         Expect failure.
         """
-        node_vrf = cluster.gen_vrf_key_pair(node_name=pool_data.pool_name)
-        node_cold = cluster.gen_cold_key_pair_and_counter(node_name=pool_data.pool_name)
+        node_vrf = clusterlib_utils.gen_vrf_key_pair(
+            cluster_obj=cluster, node_name=pool_data.pool_name
+        )
+        node_cold = clusterlib_utils.gen_cold_key_pair_and_counter(
+            cluster_obj=cluster, node_name=pool_data.pool_name
+        )
 
         with pytest.raises(clusterlib.CLIError) as excinfo:
             cluster.gen_pool_registration_cert(
@@ -1554,8 +1565,12 @@ class TestNegative:
 
         Expect failure.
         """
-        node_vrf = cluster.gen_vrf_key_pair(node_name=pool_data.pool_name)
-        node_cold = cluster.gen_cold_key_pair_and_counter(node_name=pool_data.pool_name)
+        node_vrf = clusterlib_utils.gen_vrf_key_pair(
+            cluster_obj=cluster, node_name=pool_data.pool_name
+        )
+        node_cold = clusterlib_utils.gen_cold_key_pair_and_counter(
+            cluster_obj=cluster, node_name=pool_data.pool_name
+        )
 
         with pytest.raises(clusterlib.CLIError) as excinfo:
             cluster.gen_pool_registration_cert(
@@ -1577,8 +1592,12 @@ class TestNegative:
 
         Expect failure.
         """
-        node_vrf = cluster.gen_vrf_key_pair(node_name=pool_data.pool_name)
-        node_cold = cluster.gen_cold_key_pair_and_counter(node_name=pool_data.pool_name)
+        node_vrf = clusterlib_utils.gen_vrf_key_pair(
+            cluster_obj=cluster, node_name=pool_data.pool_name
+        )
+        node_cold = clusterlib_utils.gen_cold_key_pair_and_counter(
+            cluster_obj=cluster, node_name=pool_data.pool_name
+        )
 
         with pytest.raises(clusterlib.CLIError) as excinfo:
             cluster.gen_pool_registration_cert(
@@ -1600,8 +1619,12 @@ class TestNegative:
 
         Expect failure.
         """
-        node_vrf = cluster.gen_vrf_key_pair(node_name=pool_data.pool_name)
-        node_cold = cluster.gen_cold_key_pair_and_counter(node_name=pool_data.pool_name)
+        node_vrf = clusterlib_utils.gen_vrf_key_pair(
+            cluster_obj=cluster, node_name=pool_data.pool_name
+        )
+        node_cold = clusterlib_utils.gen_cold_key_pair_and_counter(
+            cluster_obj=cluster, node_name=pool_data.pool_name
+        )
 
         pool_reg_cert_file = cluster.gen_pool_registration_cert(
             pool_data=pool_data,
@@ -1637,8 +1660,12 @@ class TestNegative:
 
         Expect failure.
         """
-        node_vrf = cluster.gen_vrf_key_pair(node_name=pool_data.pool_name)
-        node_cold = cluster.gen_cold_key_pair_and_counter(node_name=pool_data.pool_name)
+        node_vrf = clusterlib_utils.gen_vrf_key_pair(
+            cluster_obj=cluster, node_name=pool_data.pool_name
+        )
+        node_cold = clusterlib_utils.gen_cold_key_pair_and_counter(
+            cluster_obj=cluster, node_name=pool_data.pool_name
+        )
 
         pool_reg_cert_file = cluster.gen_pool_registration_cert(
             pool_data=pool_data,
@@ -1672,7 +1699,9 @@ class TestNegative:
 
         Expect failure.
         """
-        node_cold = cluster.gen_cold_key_pair_and_counter(node_name=pool_data.pool_name)
+        node_cold = clusterlib_utils.gen_cold_key_pair_and_counter(
+            cluster_obj=cluster, node_name=pool_data.pool_name
+        )
 
         pool_dereg_cert_file = cluster.gen_pool_deregistration_cert(
             pool_name=pool_data.pool_name,
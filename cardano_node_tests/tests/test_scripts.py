@@ -21,6 +21,9 @@ from cardano_node_tests.utils import cluster_management
 from cardano_node_tests.utils import clusterlib_utils
 from cardano_node_tests.utils import dbsync_utils
 from cardano_node_tests.utils import helpers
+from cardano_node_tests.utils import keys
+from cardano_node_tests.utils import simple_scripts
+from cardano_node_tests.utils import tx_fees
 from cardano_node_tests.utils.versions import VERSIONS
 
 LOGGER = logging.getLogger(__name__)
@@ -76,7 +79,8 @@ def multisig_tx(
         witness_count_add += 5
 
     ttl = cluster_obj.calculate_tx_ttl()
-    fee = cluster_obj.calculate_tx_fee(
+    fee = tx_fees.calculate_tx_fee(
+        cluster_obj=cluster_obj,
         src_address=src_address,
         tx_name=temp_template,
         txouts=destinations,
@@ -95,20 +99,11 @@ def multisig_tx(
         invalid_before=invalid_before,
     )
 
-    # create witness file for each key
-    witness_files = [
-        cluster_obj.witness_tx(
-            tx_body_file=tx_raw_output.out_file,
-            witness_name=f"{temp_template}_skey{idx}",
-            signing_key_files=[skey],
-        )
-        for idx, skey in enumerate(payment_skey_files)
-    ]
-
-    # sign TX using witness files
-    tx_witnessed_file = cluster_obj.assemble_tx(
+    # sign TX using witness file for each key
+    tx_witnessed_file = clusterlib_utils.witness_and_assemble_tx(
+        cluster_obj=cluster_obj,
         tx_body_file=tx_raw_output.out_file,
-        witness_files=witness_files,
+        signing_key_files=payment_skey_files,
         tx_name=temp_template,
     )
 
@@ -172,7 +167,7 @@ class TestBasic:
         payment_vkey_files = [p.vkey_file for p in payment_addrs]
 
         # create multisig script
-        multisig_script = cluster.build_multisig_script(
+        multisig_script = simple_scripts.build_multisig_script(
             script_name=temp_template,
             script_type_arg=clusterlib.MultiSigTypeArgs.ALL,
             payment_vkey_files=payment_vkey_files,
@@ -198,7 +193,7 @@ class TestBasic:
         payment_skey_files = [p.skey_file for p in payment_addrs]
 
         # create multisig script
-        multisig_script = cluster.build_multisig_script(
+        multisig_script = simple_scripts.build_multisig_script(
             script_name=temp_template,
             script_type_arg=clusterlib.MultiSigTypeArgs.ALL,
             payment_vkey_files=payment_vkey_files,
@@ -252,7 +247,7 @@ class TestBasic:
         skeys_len = len(payment_skey_files)
 
         # create multisig script
-        multisig_script = cluster.build_multisig_script(
+        multisig_script = simple_scripts.build_multisig_script(
             script_name=temp_template,
             script_type_arg=clusterlib.MultiSigTypeArgs.ANY,
             payment_vkey_files=payment_vkey_files,
@@ -324,7 +319,7 @@ class TestBasic:
         required = skeys_len - 4
 
         # create multisig script
-        multisig_script = cluster.build_multisig_script(
+        multisig_script = simple_scripts.build_multisig_script(
             script_name=temp_template,
             script_type_arg=clusterlib.MultiSigTypeArgs.AT_LEAST,
             payment_vkey_files=payment_vkey_files,
@@ -379,7 +374,7 @@ class TestBasic:
         amount = 1000
 
         # create multisig script
-        multisig_script = cluster.build_multisig_script(
+        multisig_script = simple_scripts.build_multisig_script(
             script_name=temp_template,
             script_type_arg=clusterlib.MultiSigTypeArgs.ALL,
             payment_vkey_files=[p.vkey_file for p in payment_addrs],
@@ -431,7 +426,7 @@ class TestBasic:
         payment_skey_files = [p.skey_file for p in payment_addrs]
 
         # create multisig script
-        multisig_script = cluster.build_multisig_script(
+        multisig_script = simple_scripts.build_multisig_script(
             script_name=temp_template,
             script_type_arg=clusterlib.MultiSigTypeArgs.ANY,
             payment_vkey_files=payment_vkey_files,
@@ -494,7 +489,7 @@ class TestBasic:
         payment_skey_files = [p.skey_file for p in payment_addrs]
 
         # create multisig script
-        multisig_script = cluster.build_multisig_script(
+        multisig_script = simple_scripts.build_multisig_script(
             script_name=temp_template,
             script_type_arg=clusterlib.MultiSigTypeArgs.ALL,
             payment_vkey_files=(),
@@ -542,7 +537,7 @@ class TestBasic:
         payment_skey_files = [p.skey_file for p in payment_addrs]
 
         # create multisig script
-        multisig_script = cluster.build_multisig_script(
+        multisig_script = simple_scripts.build_multisig_script(
             script_name=temp_template,
             script_type_arg=clusterlib.MultiSigTypeArgs.AT_LEAST,
             payment_vkey_files=payment_vkey_files,
@@ -579,6 +574,145 @@ class TestBasic:
         dbsync_utils.check_tx(cluster_obj=cluster, tx_raw_output=tx_out_from)
 
 
+@pytest.mark.testnets
+class TestScriptTools:
+    """Compare policy IDs and script addresses computed in-process with `cardano-cli`."""
+
+    @pytest.fixture(scope="module")
+    def payment_vkey_files(self, create_temp_dir: Path) -> List[Path]:
+        """Create 30 new payment key pairs, shared by all the tests of the class.
+
+        Scripts with up to 23 keys are encoded as definite length arrays, longer ones as
+        indefinite length arrays, the same way as by `cardano-cli`.
+        """
+        temp_template = helpers.get_func_name()
+        return [
+            keys.gen_key_pair(
+                key_name=f"{temp_template}_{i}",
+                key_type=keys.KeyTypes.PAYMENT,
+                destination_dir=create_temp_dir,
+            ).vkey_file
+            for i in range(30)
+        ]
+
+    def _check_script(self, cluster_obj: clusterlib.ClusterLib, script_file: Path):
+        assert simple_scripts.get_policyid(script_file) == cluster_obj.get_policyid(script_file)
+
+        addr_name = script_file.name.replace(".", "_")
+        script_address = simple_scripts.gen_script_addr(
+            addr_name=f"{addr_name}_native", cluster_obj=cluster_obj, script_file=script_file
+        )
+        assert script_address == cluster_obj.gen_script_addr(
+            addr_name=f"{addr_name}_cli", script_file=script_file
+        )
+
+    @allure.link(helpers.get_vcs_link())
+    def test_sig_script(self, cluster: clusterlib.ClusterLib, payment_vkey_files: List[Path]):
+        """Check policy ID and script address of the *sig* script."""
+        temp_template = helpers.get_func_name()
+
+        script = simple_scripts.build_sig_script(
+            script_name=temp_template, payment_vkey_file=payment_vkey_files[0]
+        )
+        with open(script, encoding="utf-8") as in_json:
+            assert json.load(in_json)["keyHash"] == cluster.get_payment_vkey_hash(
+                payment_vkey_files[0]
+            )
+
+        self._check_script(cluster_obj=cluster, script_file=script)
+
+    @allure.link(helpers.get_vcs_link())
+    @pytest.mark.parametrize(
+        "script_type",
+        (
+            clusterlib.MultiSigTypeArgs.ALL,
+            clusterlib.MultiSigTypeArgs.ANY,
+            clusterlib.MultiSigTypeArgs.AT_LEAST,
+        ),
+    )
+    @pytest.mark.parametrize("no_of_keys", (0, 1, 23, 24, 30))
+    def test_multisig_script(
+        self,
+        cluster: clusterlib.ClusterLib,
+        payment_vkey_files: List[Path],
+        script_type: str,
+        no_of_keys: int,
+    ):
+        """Check policy ID and script address of multisig scripts.
+
+        Lists of more than 23 scripts are encoded as indefinite length arrays.
+        """
+        temp_template = f"{helpers.get_func_name()}_{script_type}_{no_of_keys}"
+
+        script = simple_scripts.build_multisig_script(
+            script_name=temp_template,
+            script_type_arg=script_type,
+            payment_vkey_files=payment_vkey_files[:no_of_keys],
+            required=no_of_keys // 2,
+        )
+        # the CLI builds the same script
+        cli_script = cluster.build_multisig_script(
+            script_name=f"{temp_template}_cli",
+            script_type_arg=script_type,
+            payment_vkey_files=payment_vkey_files[:no_of_keys],
+            required=no_of_keys // 2,
+        )
+        assert simple_scripts.read_script(script) == simple_scripts.read_script(cli_script)
+
+        self._check_script(cluster_obj=cluster, script_file=script)
+
+    @allure.link(helpers.get_vcs_link())
+    @pytest.mark.skipif(
+        VERSIONS.transaction_era == VERSIONS.SHELLEY,
+        reason="time locking scripts are not available in Shelley era",
+    )
+    @pytest.mark.parametrize(
+        "slot_type",
+        (clusterlib.MultiSlotTypeArgs.BEFORE, clusterlib.MultiSlotTypeArgs.AFTER),
+    )
+    @pytest.mark.parametrize("slot", (1, 23, 24, 2**32))
+    def test_time_locking_script(
+        self,
+        cluster: clusterlib.ClusterLib,
+        payment_vkey_files: List[Path],
+        slot_type: str,
+        slot: int,
+    ):
+        """Check policy ID and script address of time locking scripts."""
+        temp_template = f"{helpers.get_func_name()}_{slot_type}_{slot}"
+
+        script = simple_scripts.build_multisig_script(
+            script_name=temp_template,
+            script_type_arg=clusterlib.MultiSigTypeArgs.ALL,
+            payment_vkey_files=payment_vkey_files[:2],
+            slot=slot,
+            slot_type_arg=slot_type,
+        )
+        self._check_script(cluster_obj=cluster, script_file=script)
+
+    @allure.link(helpers.get_vcs_link())
+    def test_nested_script(self, cluster: clusterlib.ClusterLib, payment_vkey_files: List[Path]):
+        """Check policy ID and script address of a script with nested scripts."""
+        temp_template = helpers.get_func_name()
+
+        sig_scripts = [{"keyHash": keys.get_key_hash(f), "type": "sig"} for f in payment_vkey_files]
+        sub_scripts: List[dict] = [
+            {"type": "atLeast", "required": 2, "scripts": sig_scripts[:3]},
+            {"type": "all", "scripts": sig_scripts[3:]},
+            {"type": "any", "scripts": []},
+        ]
+        if VERSIONS.transaction_era != VERSIONS.SHELLEY:
+            sub_scripts.append(
+                {"type": "all", "scripts": [*sig_scripts[:1], {"type": "after", "slot": 100}]}
+            )
+        script_content = {"type": "any", "scripts": sub_scripts}
+
+        script = Path(f"{temp_template}.script")
+        helpers.write_json(script, script_content)
+
+        self._check_script(cluster_obj=cluster, script_file=script)
+
+
 @pytest.mark.testnets
 class TestNegative:
     """Transaction tests that are expected to fail."""
@@ -624,7 +758,7 @@ class TestNegative:
         payment_skey_files = [p.skey_file for p in payment_addrs]
 
         # create multisig script
-        multisig_script = cluster.build_multisig_script(
+        multisig_script = simple_scripts.build_multisig_script(
             script_name=temp_template,
             script_type_arg=clusterlib.MultiSigTypeArgs.ALL,
             payment_vkey_files=payment_vkey_files,
@@ -675,7 +809,7 @@ class TestNegative:
         payment_skey_files = [p.skey_file for p in payment_addrs]
 
         # create multisig script
-        multisig_script = cluster.build_multisig_script(
+        multisig_script = simple_scripts.build_multisig_script(
             script_name=temp_template,
             script_type_arg=clusterlib.MultiSigTypeArgs.ANY,
             payment_vkey_files=payment_vkey_files,
@@ -729,7 +863,7 @@ class TestNegative:
         required = skeys_len - 4
 
         # create multisig script
-        multisig_script = cluster.build_multisig_script(
+        multisig_script = simple_scripts.build_multisig_script(
             script_name=temp_template,
             script_type_arg=clusterlib.MultiSigTypeArgs.AT_LEAST,
             payment_vkey_files=payment_vkey_files,
@@ -820,7 +954,7 @@ class TestTimeLocking:
         payment_skey_files = [p.skey_file for p in payment_addrs]
 
         # create multisig script
-        multisig_script = cluster.build_multisig_script(
+        multisig_script = simple_scripts.build_multisig_script(
             script_name=temp_template,
             script_type_arg=clusterlib.MultiSigTypeArgs.ALL,
             payment_vkey_files=payment_vkey_files,
@@ -873,7 +1007,7 @@ class TestTimeLocking:
         before_slot = cluster.get_slot_no() + 10_000
 
         # create multisig script
-        multisig_script = cluster.build_multisig_script(
+        multisig_script = simple_scripts.build_multisig_script(
             script_name=temp_template,
             script_type_arg=clusterlib.MultiSigTypeArgs.ALL,
             payment_vkey_files=payment_vkey_files,
@@ -929,7 +1063,7 @@ class TestTimeLocking:
         before_slot = cluster.get_slot_no() - 1
 
         # create multisig script
-        multisig_script = cluster.build_multisig_script(
+        multisig_script = simple_scripts.build_multisig_script(
             script_name=temp_template,
             script_type_arg=clusterlib.MultiSigTypeArgs.ALL,
             payment_vkey_files=payment_vkey_files,
@@ -1001,7 +1135,7 @@ class TestTimeLocking:
         before_slot = cluster.get_slot_no() + 10_000
 
         # create multisig script
-        multisig_script = cluster.build_multisig_script(
+        multisig_script = simple_scripts.build_multisig_script(
             script_name=temp_template,
             script_type_arg=clusterlib.MultiSigTypeArgs.ALL,
             payment_vkey_files=payment_vkey_files,
@@ -1058,7 +1192,7 @@ class TestTimeLocking:
         after_slot = cluster.get_slot_no() + 10_000
 
         # create multisig script
-        multisig_script = cluster.build_multisig_script(
+        multisig_script = simple_scripts.build_multisig_script(
             script_name=temp_template,
             script_type_arg=clusterlib.MultiSigTypeArgs.ALL,
             payment_vkey_files=payment_vkey_files,
@@ -1130,7 +1264,7 @@ class TestTimeLocking:
         after_slot = cluster.get_slot_no() - 1
 
         # create multisig script
-        multisig_script = cluster.build_multisig_script(
+        multisig_script = simple_scripts.build_multisig_script(
             script_name=temp_template,
             script_type_arg=clusterlib.MultiSigTypeArgs.ALL,
             payment_vkey_files=payment_vkey_files,
@@ -1227,7 +1361,7 @@ class TestAuxiliaryScripts:
         payment_vkey_files = [p.vkey_file for p in payment_addrs]
 
         # create multisig script
-        multisig_script = cluster.build_multisig_script(
+        multisig_script = simple_scripts.build_multisig_script(
             script_name=temp_template,
             script_type_arg=clusterlib.MultiSigTypeArgs.ALL,
             payment_vkey_files=payment_vkey_files,
@@ -1275,7 +1409,7 @@ class TestAuxiliaryScripts:
         payment_vkey_files = [p.vkey_file for p in payment_addrs]
 
         # create multisig script
-        multisig_script = cluster.build_multisig_script(
+        multisig_script = simple_scripts.build_multisig_script(
             script_name=temp_template,
             script_type_arg=clusterlib.MultiSigTypeArgs.AT_LEAST,
             payment_vkey_files=payment_vkey_files,
@@ -1324,7 +1458,7 @@ class TestAuxiliaryScripts:
         payment_vkey_files = [p.vkey_file for p in payment_addrs]
 
         # create multisig script
-        multisig_script = cluster.build_multisig_script(
+        multisig_script = simple_scripts.build_multisig_script(
             script_name=temp_template,
             script_type_arg=clusterlib.MultiSigTypeArgs.ANY,
             payment_vkey_files=payment_vkey_files,
@@ -0,0 +1,156 @@
+"""Tests for computing slots and epochs timing locally, using genesis parameters."""
+import datetime
+import logging
+import os
+from pathlib import Path
+
+import allure
+import pytest
+
+from cardano_node_tests.utils import clusterlib_utils
+from cardano_node_tests.utils import helpers
+
+LOGGER = logging.getLogger(__name__)
+
+SYSTEM_START = "2021-06-01T10:00:00Z"
+SYSTEM_START_TS = datetime.datetime(2021, 6, 1, 10, tzinfo=datetime.timezone.utc).timestamp()
+
+# one Byron epoch of 5 slots, 20 seconds each, followed by Shelley epochs of 100 slots, 1 second
+# each; the Shelley era starts at slot 5 and `slots_offset` is 100 - 5
+BYRON_EPOCH_SLOTS = 5
+SHELLEY_EPOCH_LENGTH = 100
+SLOTS_OFFSET = SHELLEY_EPOCH_LENGTH - BYRON_EPOCH_SLOTS
+
+
+class FakeCluster:
+    """The part of `ClusterLib` needed for creating slot clock."""
+
+    def __init__(self, state_dir: Path, slots_offset: int = 0) -> None:
+        self.state_dir = state_dir
+        self.genesis_json = state_dir / "shelley" / "genesis.json"
+        self.slots_offset = slots_offset
+
+
+def _write_genesis(genesis_json: Path, system_start: str, slot_length: float) -> None:
+    genesis_json.parent.mkdir(parents=True, exist_ok=True)
+    helpers.write_json(
+        genesis_json,
+        {
+            "systemStart": system_start,
+            "slotLength": slot_length,
+            "epochLength": SHELLEY_EPOCH_LENGTH,
+        },
+    )
+
+
+class TestSlotClock:
+    """Tests for `clusterlib_utils.SlotClock`."""
+
+    @allure.link(helpers.get_vcs_link())
+    def test_no_offset(self):
+        """Check slots and epochs timing when all epochs have the same slot length."""
+        slot_clock = clusterlib_utils.SlotClock(
+            system_start=SYSTEM_START_TS, slot_length=0.2, epoch_length=1500
+        )
+
+        assert slot_clock.slot_at(SYSTEM_START_TS) == 0
+        assert slot_clock.slot_at(SYSTEM_START_TS + 0.19) == 0
+        assert slot_clock.slot_at(SYSTEM_START_TS + 0.2) == 1
+        assert slot_clock.slot_time(1500) == SYSTEM_START_TS + 300
+        assert slot_clock.epoch_of_slot(1499) == 0
+        assert slot_clock.epoch_of_slot(1500) == 1
+        assert slot_clock.epoch_first_slot(2) == 3000
+        assert slot_clock.epoch_time(2) == SYSTEM_START_TS + 600
+
+    @allure.link(helpers.get_vcs_link())
+    def test_epoch_boundary_offset(self):
+        """Check the epoch boundary when Byron era had longer slots."""
+        slot_clock = clusterlib_utils.SlotClock(
+            system_start=SYSTEM_START_TS,
+            slot_length=1,
+            epoch_length=SHELLEY_EPOCH_LENGTH,
+            slots_offset=SLOTS_OFFSET,
+        )
+
+        # the last Byron slot and the first Shelley slot
+        assert slot_clock.epoch_of_slot(BYRON_EPOCH_SLOTS - 1) == 0
+        assert slot_clock.epoch_of_slot(BYRON_EPOCH_SLOTS) == 1
+        assert slot_clock.epoch_first_slot(1) == BYRON_EPOCH_SLOTS
+        assert slot_clock.epoch_time(1) == SYSTEM_START_TS + 100
+        assert slot_clock.slot_at(SYSTEM_START_TS + 100) == BYRON_EPOCH_SLOTS
+
+        # the last slot of the first Shelley epoch and the first slot of the next one
+        last_slot = BYRON_EPOCH_SLOTS + SHELLEY_EPOCH_LENGTH - 1
+        assert slot_clock.epoch_of_slot(last_slot) == 1
+        assert slot_clock.epoch_of_slot(last_slot + 1) == 2
+        assert slot_clock.epoch_first_slot(2) == last_slot + 1
+        assert slot_clock.slot_at(slot_clock.epoch_time(2) - 0.5) == last_slot
+
+    @allure.link(helpers.get_vcs_link())
+    @pytest.mark.parametrize("slots_offset", (0, SLOTS_OFFSET))
+    def test_round_trip(self, slots_offset: int):
+        """Check that slot time and epoch of a slot are consistent with each other."""
+        slot_clock = clusterlib_utils.SlotClock(
+            system_start=SYSTEM_START_TS,
+            slot_length=0.2,
+            epoch_length=SHELLEY_EPOCH_LENGTH,
+            slots_offset=slots_offset,
+        )
+
+        for slot in range(BYRON_EPOCH_SLOTS, 1000):
+            assert slot_clock.slot_at(slot_clock.slot_time(slot)) == slot
+            epoch = slot_clock.epoch_of_slot(slot)
+            assert (
+                slot_clock.epoch_first_slot(epoch) <= slot < slot_clock.epoch_first_slot(epoch + 1)
+            )
+
+    @allure.link(helpers.get_vcs_link())
+    def test_sleep_until_epoch_interval_passed(self):
+        """Check that interval that already passed cannot be reached."""
+        slot_clock = clusterlib_utils.SlotClock(
+            system_start=SYSTEM_START_TS, slot_length=1, epoch_length=SHELLEY_EPOCH_LENGTH
+        )
+        with pytest.raises(AssertionError, match="Cannot reach the given interval"):
+            slot_clock.sleep_until_epoch_interval(start=0, stop=10, epoch=0)
+
+
+class TestGetSlotClock:
+    """Tests for caching of slot clocks."""
+
+    @allure.link(helpers.get_vcs_link())
+    def test_from_genesis(self, tmp_path: Path):
+        """Check that the slot clock is created using the genesis file."""
+        cluster_obj = FakeCluster(state_dir=tmp_path, slots_offset=SLOTS_OFFSET)
+        _write_genesis(cluster_obj.genesis_json, system_start=SYSTEM_START, slot_length=1)
+
+        slot_clock = clusterlib_utils.get_slot_clock(cluster_obj)  # type: ignore
+        assert slot_clock.system_start == SYSTEM_START_TS
+        assert slot_clock.slot_length == 1
+        assert slot_clock.epoch_length == SHELLEY_EPOCH_LENGTH
+        assert slot_clock.slots_offset == SLOTS_OFFSET
+
+        # the slot clock is cached
+        assert clusterlib_utils.get_slot_clock(cluster_obj) is slot_clock  # type: ignore
+
+    @allure.link(helpers.get_vcs_link())
+    def test_respin(self, tmp_path: Path):
+        """Check that a stale slot clock is not used after the cluster instance was respun."""
+        cluster_obj = FakeCluster(state_dir=tmp_path)
+        _write_genesis(cluster_obj.genesis_json, system_start=SYSTEM_START, slot_length=1)
+        slot_clock = clusterlib_utils.get_slot_clock(cluster_obj)  # type: ignore
+
+        # respin with new system start and slot length
+        _write_genesis(
+            cluster_obj.genesis_json, system_start="2021-06-02T10:00:00Z", slot_length=0.2
+        )
+        genesis_stat = cluster_obj.genesis_json.stat()
+        # make sure the mtime changed even on file systems with coarse timestamps
+        os.utime(
+            cluster_obj.genesis_json,
+            ns=(genesis_stat.st_atime_ns, genesis_stat.st_mtime_ns + 1_000_000_000),
+        )
+
+        new_slot_clock = clusterlib_utils.get_slot_clock(cluster_obj)  # type: ignore
+        assert new_slot_clock is not slot_clock
+        assert new_slot_clock.system_start == SYSTEM_START_TS + 86400
+        assert new_slot_clock.slot_length == 0.2
@@ -18,6 +18,9 @@ from cardano_node_tests.utils.versions import VERSIONS
 
 LOGGER = logging.getLogger(__name__)
 
+# parts of ledger state needed for checking rewards
+LEDGER_STATE_REWARD_PATHS = ("stateBefore.esSnapshots", "possibleRewardUpdate.rs")
+
 
 @pytest.fixture(scope="module")
 def create_temp_dir(tmp_path_factory: TempdirFactory):
@@ -88,31 +91,6 @@ def pool_users_disposable(
     return pool_users
 
 
-def _get_key_hashes(rec: dict) -> List[str]:
-    """Get key hashes in ledger state snapshot record."""
-    return [r[0]["key hash"] for r in rec]
-
-
-def _get_val_for_key_hash(key_hash: str, rec: list) -> Any:
-    """Get value for key hash in ledger state snapshot record."""
-    for r in rec:
-        if r[0]["key hash"] == key_hash:
-            return r[1]
-    return None
-
-
-def _get_reward_for_key_hash(key_hash: str, rec: list) -> int:
-    """Get reward value for key hash in ledger state snapshot record."""
-    for r in rec:
-        if r[0]["key hash"] != key_hash:
-            continue
-        rew_amount = 0
-        for sr in r[1]:
-            rew_amount += sr["rewardAmount"]
-        return rew_amount
-    return 0
-
-
 def _delegate_stake_addr(
     cluster_obj: clusterlib.ClusterLib,
     addrs_data: dict,
@@ -849,7 +827,7 @@ class TestRewards:
         user_payment_balance = cluster.get_address_balance(pool_user.payment.address)
 
         # ledger state db
-        rs_records: dict = {init_epoch: None}
+        rewards_records: dict = {init_epoch: None}
 
         def _check_ledger_state(
             this_epoch: int,
@@ -858,31 +836,28 @@ class TestRewards:
             abs_user_reward: int,
             abs_owner_reward: int,
         ) -> None:
-            ledger_state = clusterlib_utils.get_ledger_state(cluster_obj=cluster)
+            ledger_state = clusterlib_utils.get_ledger_state(
+                cluster_obj=cluster, paths=LEDGER_STATE_REWARD_PATHS
+            )
             clusterlib_utils.save_ledger_state(
                 cluster_obj=cluster,
                 state_name=f"{temp_template}_{this_epoch}",
                 ledger_state=ledger_state,
             )
-            es_snapshot: dict = ledger_state["stateBefore"]["esSnapshots"]
-            rs_record: list = ledger_state["possibleRewardUpdate"]["rs"]
-            rs_records[this_epoch] = rs_record
+            ledger_view = clusterlib_utils.LedgerStateView(ledger_state)
+            rewards_records[this_epoch] = ledger_view.get_rewards()
 
             # Make sure reward amount corresponds with ledger state.
             # Reward is received on epoch boundary, so check reward with record for previous epoch.
-            prev_rs_record = rs_records.get(this_epoch - 1)
-            if abs_user_reward and prev_rs_record:
-                assert abs_user_reward == _get_reward_for_key_hash(
-                    user_stake_addr_dec, prev_rs_record
-                )
-            if abs_owner_reward and prev_rs_record:
-                assert abs_owner_reward == _get_reward_for_key_hash(
-                    pool_reward_addr_dec, prev_rs_record
-                )
+            prev_rewards_record = rewards_records.get(this_epoch - 1)
+            if abs_user_reward and prev_rewards_record:
+                assert abs_user_reward == prev_rewards_record.get(user_stake_addr_dec, 0)
+            if abs_owner_reward and prev_rewards_record:
+                assert abs_owner_reward == prev_rewards_record.get(pool_reward_addr_dec, 0)
 
-            pstake_mark = _get_key_hashes(es_snapshot["pstakeMark"]["stake"])
-            pstake_set = _get_key_hashes(es_snapshot["pstakeSet"]["stake"])
-            pstake_go = _get_key_hashes(es_snapshot["pstakeGo"]["stake"])
+            pstake_mark = ledger_view.get_stake("pstakeMark")
+            pstake_set = ledger_view.get_stake("pstakeSet")
+            pstake_go = ledger_view.get_stake("pstakeGo")
 
             if this_epoch == init_epoch + 1:
                 assert pool_stake_addr_dec in pstake_mark
@@ -910,17 +885,12 @@ class TestRewards:
             # wait 4 epochs for first rewards
             if this_epoch >= init_epoch + 4:
                 # make sure ledger state and actual stake correspond
+                assert pstake_mark.get(user_stake_addr_dec) == user_reward + user_payment_balance
                 assert (
-                    _get_val_for_key_hash(user_stake_addr_dec, es_snapshot["pstakeMark"]["stake"])
-                    == user_reward + user_payment_balance
+                    pstake_set.get(user_stake_addr_dec) == prev_user_reward + user_payment_balance
                 )
                 assert (
-                    _get_val_for_key_hash(user_stake_addr_dec, es_snapshot["pstakeSet"]["stake"])
-                    == prev_user_reward + user_payment_balance
-                )
-                assert (
-                    _get_val_for_key_hash(user_stake_addr_dec, es_snapshot["pstakeGo"]["stake"])
-                    == user_rewards[-3][1] + user_payment_balance
+                    pstake_go.get(user_stake_addr_dec) == user_rewards[-3][1] + user_payment_balance
                 )
 
         LOGGER.info("Checking rewards for 9 epochs.")
@@ -1102,7 +1072,7 @@ class TestRewards:
         ), "Pool update took longer than expected and would affect other checks"
 
         # ledger state db
-        rs_records: dict = {init_epoch: None}
+        rewards_records: dict = {init_epoch: None}
 
         def _check_ledger_state(
             this_epoch: int,
@@ -1111,25 +1081,26 @@ class TestRewards:
             abs_owner_reward: int,
             owner_rewards: list,
         ) -> None:
-            ledger_state = clusterlib_utils.get_ledger_state(cluster_obj=cluster)
+            ledger_state = clusterlib_utils.get_ledger_state(
+                cluster_obj=cluster, paths=LEDGER_STATE_REWARD_PATHS
+            )
             clusterlib_utils.save_ledger_state(
                 cluster_obj=cluster,
                 state_name=f"{temp_template}_{this_epoch}",
                 ledger_state=ledger_state,
             )
-            es_snapshot: dict = ledger_state["stateBefore"]["esSnapshots"]
-            rs_record: list = ledger_state["possibleRewardUpdate"]["rs"]
-            rs_records[this_epoch] = rs_record
+            ledger_view = clusterlib_utils.LedgerStateView(ledger_state)
+            rewards_records[this_epoch] = ledger_view.get_rewards()
 
             # Make sure reward amount corresponds with ledger state.
             # Reward is received on epoch boundary, so check reward with record for previous epoch.
-            prev_rs_record = rs_records.get(this_epoch - 1)
-            if abs_owner_reward and prev_rs_record:
-                assert abs_owner_reward == _get_reward_for_key_hash(reward_addr_dec, prev_rs_record)
+            prev_rewards_record = rewards_records.get(this_epoch - 1)
+            if abs_owner_reward and prev_rewards_record:
+                assert abs_owner_reward == prev_rewards_record.get(reward_addr_dec, 0)
 
-            pstake_mark = _get_key_hashes(es_snapshot["pstakeMark"]["stake"])
-            pstake_set = _get_key_hashes(es_snapshot["pstakeSet"]["stake"])
-            pstake_go = _get_key_hashes(es_snapshot["pstakeGo"]["stake"])
+            pstake_mark = ledger_view.get_stake("pstakeMark")
+            pstake_set = ledger_view.get_stake("pstakeSet")
+            pstake_go = ledger_view.get_stake("pstakeGo")
 
             if this_epoch == init_epoch + 2:
                 assert reward_addr_dec not in pstake_mark
@@ -1163,18 +1134,9 @@ class TestRewards:
                 assert stake_addr_dec not in pstake_go
 
                 # make sure ledger state and actual stake correspond
-                assert (
-                    _get_val_for_key_hash(reward_addr_dec, es_snapshot["pstakeMark"]["stake"])
-                    == owner_reward
-                )
-                assert (
-                    _get_val_for_key_hash(reward_addr_dec, es_snapshot["pstakeSet"]["stake"])
-                    == prev_owner_reward
-                )
-                assert (
-                    _get_val_for_key_hash(reward_addr_dec, es_snapshot["pstakeGo"]["stake"])
-                    == owner_rewards[-3][1]
-                )
+                assert pstake_mark.get(reward_addr_dec) == owner_reward
+                assert pstake_set.get(reward_addr_dec) == prev_owner_reward
+                assert pstake_go.get(reward_addr_dec) == owner_rewards[-3][1]
 
         LOGGER.info("Checking rewards for 9 epochs.")
         for __ in range(9):
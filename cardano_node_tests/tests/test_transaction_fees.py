@@ -1,6 +1,7 @@
 """Tests for fees of various kinds of transactions."""
 import itertools
 import logging
+import os
 from pathlib import Path
 from typing import List
 from typing import Tuple
@@ -15,9 +16,13 @@ from cardano_clusterlib import clusterlib
 from cardano_node_tests.utils import cluster_management
 from cardano_node_tests.utils import clusterlib_utils
 from cardano_node_tests.utils import helpers
+from cardano_node_tests.utils import keys
+from cardano_node_tests.utils import tx_fees
 
 LOGGER = logging.getLogger(__name__)
 
+DATA_DIR = Path(__file__).parent / "data"
+
 
 @pytest.fixture(scope="module")
 def create_temp_dir(tmp_path_factory: TempdirFactory):
@@ -231,9 +236,13 @@ class TestExpectedFees:
     ) -> Tuple[str, clusterlib.TxFiles]:
         """Create certificates for registering a stake pool, delegating stake address."""
         # create node VRF key pair
-        node_vrf = cluster_obj.gen_vrf_key_pair(node_name=pool_data.pool_name)
+        node_vrf = clusterlib_utils.gen_vrf_key_pair(
+            cluster_obj=cluster_obj, node_name=pool_data.pool_name
+        )
         # create node cold key pair and counter
-        node_cold = cluster_obj.gen_cold_key_pair_and_counter(node_name=pool_data.pool_name)
+        node_cold = clusterlib_utils.gen_cold_key_pair_and_counter(
+            cluster_obj=cluster_obj, node_name=pool_data.pool_name
+        )
 
         # create stake address registration certs
         stake_addr_reg_cert_files = [
@@ -314,6 +323,17 @@ class TestExpectedFees:
             tx_fee, expected_fee
         ), "Expected fee doesn't match the actual fee"
 
+        # check that the fee estimated offline is the same
+        offline_fee = tx_fees.calculate_tx_fee(
+            cluster_obj=cluster_obj,
+            src_address=src_address,
+            tx_name=f"{tx_name}_offline",
+            txins=txins,
+            txouts=txouts,
+            tx_files=tx_files,
+        )
+        assert offline_fee == tx_fee, "Fee estimated offline doesn't match the CLI fee"
+
     @allure.link(helpers.get_vcs_link())
     @pytest.mark.parametrize("addr_fee", [(1, 197753), (3, 234009), (5, 270265), (10, 360905)])
     def test_pool_registration_fees(
@@ -406,7 +426,9 @@ class TestExpectedFees:
         selected_owners = pool_users[:no_of_addr]
 
         # create node cold key pair and counter
-        node_cold = cluster.gen_cold_key_pair_and_counter(node_name=pool_data.pool_name)
+        node_cold = clusterlib_utils.gen_cold_key_pair_and_counter(
+            cluster_obj=cluster, node_name=pool_data.pool_name
+        )
 
         # create deregistration certificate
         pool_dereg_cert_file = cluster.gen_pool_deregistration_cert(
@@ -617,3 +639,109 @@ class TestExpectedFees:
             to_num=100,
             amount_expected=amount_expected,
         )
+
+
+@pytest.mark.testnets
+class TestOfflineFees:
+    """Compare fees estimated offline with fees estimated by `cardano-cli`."""
+
+    @allure.link(helpers.get_vcs_link())
+    def test_estimate_fees(self, cluster: clusterlib.ClusterLib):
+        """Estimate fees of many tx bodies offline at once and compare them with CLI fees.
+
+        * build tx bodies with various numbers of inputs and outputs
+        * estimate fees of all the tx bodies offline, for various numbers of witnesses
+        * check that the fees match the fees estimated using `cardano-cli`
+        """
+        temp_template = helpers.get_func_name()
+        addrs = [
+            keys.gen_payment_addr_and_keys(name=f"{temp_template}_{i}", cluster_obj=cluster)
+            for i in range(3)
+        ]
+        ttl = cluster.get_slot_no() + 1000
+
+        tx_body_files = []
+        for no_of_txins, no_of_txouts in itertools.product((1, 24, 100), (1, 24, 100)):
+            txins = [
+                clusterlib.UTXOData(
+                    utxo_hash=os.urandom(32).hex(), utxo_ix=i, amount=1, address=addrs[0].address
+                )
+                for i in range(no_of_txins)
+            ]
+            txouts = [
+                clusterlib.TxOut(address=addrs[i % len(addrs)].address, amount=1_000_000 + i)
+                for i in range(no_of_txouts)
+            ]
+            tx_raw_output = cluster.build_raw_tx_bare(
+                out_file=f"{temp_template}_{no_of_txins}_{no_of_txouts}_tx.body",
+                txins=txins,
+                txouts=txouts,
+                tx_files=clusterlib.TxFiles(),
+                fee=200_000,
+                ttl=ttl,
+                join_txouts=False,
+            )
+            tx_body_files.append(tx_raw_output.out_file)
+
+        witness_counts = (0, 1, 25)
+        tx_sizes = [
+            tx_fees.TxSize(tx_size=tx_fees.get_tx_size_from_file(f), witness_count=w)
+            for f, w in itertools.product(tx_body_files, witness_counts)
+        ]
+        offline_fees = tx_fees.estimate_fees(
+            fee_params=tx_fees.get_fee_params(cluster), tx_sizes=tx_sizes
+        )
+
+        cli_fees = [
+            cluster.estimate_fee(txbody_file=f, txin_count=1, txout_count=1, witness_count=w)
+            for f, w in itertools.product(tx_body_files, witness_counts)
+        ]
+        assert offline_fees == cli_fees
+
+    @allure.link(helpers.get_vcs_link())
+    def test_calculate_tx_fee(self, cluster: clusterlib.ClusterLib):
+        """Compare fee calculated offline with fee calculated using `cardano-cli`.
+
+        * calculate fee of a tx with certificates and metadata offline
+        * check that the fee matches the fee calculated using `cardano-cli`
+        """
+        temp_template = helpers.get_func_name()
+        payment_addr = keys.gen_payment_addr_and_keys(name=temp_template, cluster_obj=cluster)
+        stake_addr = keys.gen_stake_addr_and_keys(name=temp_template, cluster_obj=cluster)
+
+        # `build-raw` doesn't check that the inputs exist
+        txins = [
+            clusterlib.UTXOData(
+                utxo_hash=os.urandom(32).hex(),
+                utxo_ix=0,
+                amount=10_000_000,
+                address=payment_addr.address,
+            )
+        ]
+        txouts = [clusterlib.TxOut(address=payment_addr.address, amount=2_000_000)]
+        tx_files = clusterlib.TxFiles(
+            certificate_files=[
+                cluster.gen_stake_addr_registration_cert(
+                    addr_name=temp_template, stake_vkey_file=stake_addr.vkey_file
+                )
+            ],
+            metadata_cbor_files=[DATA_DIR / "tx_metadata.cbor"],
+            signing_key_files=[payment_addr.skey_file, stake_addr.skey_file],
+        )
+
+        cli_fee = cluster.calculate_tx_fee(
+            src_address=payment_addr.address,
+            tx_name=temp_template,
+            txins=txins,
+            txouts=txouts,
+            tx_files=tx_files,
+        )
+        offline_fee = tx_fees.calculate_tx_fee(
+            cluster_obj=cluster,
+            src_address=payment_addr.address,
+            tx_name=f"{temp_template}_offline",
+            txins=txins,
+            txouts=txouts,
+            tx_files=tx_files,
+        )
+        assert offline_fee == cli_fee
@@ -7,8 +7,6 @@
 * transactions with metadata
 * transactions with many UTxOs
 """
-import functools
-import itertools
 import json
 import logging
 import random
@@ -28,8 +26,11 @@ from cardano_clusterlib import clusterlib
 
 from cardano_node_tests.utils import cluster_management
 from cardano_node_tests.utils import clusterlib_utils
+from cardano_node_tests.utils import coin_selection
 from cardano_node_tests.utils import dbsync_utils
 from cardano_node_tests.utils import helpers
+from cardano_node_tests.utils import tx_builder
+from cardano_node_tests.utils import tx_fees
 from cardano_node_tests.utils.versions import VERSIONS
 
 LOGGER = logging.getLogger(__name__)
@@ -551,18 +552,15 @@ class TestMultiInOut:
         )
 
         # record initial balances
-        src_init_balance = cluster_obj.get_address_balance(src_address)
-        from_init_total_balance = functools.reduce(
-            lambda x, y: x + y,
-            (cluster_obj.get_address_balance(r.address) for r in from_addr_recs),
-            0,
+        from_addresses = [r.address for r in from_addr_recs]
+        init_balances = clusterlib_utils.get_balances(
+            cluster_obj=cluster_obj, addresses=[src_address, *from_addresses, *dst_addresses]
         )
-        dst_init_balances = {addr: cluster_obj.get_address_balance(addr) for addr in dst_addresses}
+        src_init_balance = init_balances[src_address]
+        from_init_total_balance = sum(init_balances[a] for a in from_addresses)
 
         # create TX data
-        _txins = [cluster_obj.get_utxo(r.address) for r in from_addr_recs]
-        # flatten the list of lists that is _txins
-        txins = list(itertools.chain.from_iterable(_txins))
+        txins = clusterlib_utils.get_utxo_multi(cluster_obj=cluster_obj, addresses=from_addresses)
         txouts = [clusterlib.TxOut(address=addr, amount=amount) for addr in dst_addresses]
         tx_files = clusterlib.TxFiles(signing_key_files=[r.skey_file for r in from_addr_recs])
 
@@ -576,12 +574,11 @@ class TestMultiInOut:
         )
 
         # check balances
-        from_final_balance = functools.reduce(
-            lambda x, y: x + y,
-            (cluster_obj.get_address_balance(r.address) for r in from_addr_recs),
-            0,
+        final_balances = clusterlib_utils.get_balances(
+            cluster_obj=cluster_obj, addresses=[src_address, *from_addresses, *dst_addresses]
         )
-        src_final_balance = cluster_obj.get_address_balance(src_address)
+        from_final_balance = sum(final_balances[a] for a in from_addresses)
+        src_final_balance = final_balances[src_address]
 
         assert (
             from_final_balance == 0
@@ -597,7 +594,7 @@ class TestMultiInOut:
 
         for addr in dst_addresses:
             assert (
-                cluster_obj.get_address_balance(addr) == dst_init_balances[addr] + amount
+                final_balances[addr] == init_balances[addr] + amount
             ), f"Incorrect balance for destination address `{addr}`"
 
         dbsync_utils.check_tx(cluster_obj=cluster_obj, tx_raw_output=tx_raw_output)
@@ -751,6 +748,12 @@ class TestMultiInOut:
 class TestManyUTXOs:
     """Test transaction with many UTxOs and small amounts of Lovelace."""
 
+    # UTxOs with smaller amount of Lovelace are considered tiny
+    TINY_AMOUNT = 1000_000
+    # space (in number of inputs) left for UTxOs with "big funds" in the "mini transactions";
+    # the random-improve strategy selects UTxOs worth up to 3 times the needed funds
+    BIG_TXINS_SPACE = 100
+
     @pytest.fixture
     def payment_addrs(
         self,
@@ -866,12 +869,11 @@ class TestManyUTXOs:
 
         * use source address with many UTxOs (100000+)
         * use destination address with many UTxOs (100000+)
-        * sent transaction with many UTxOs (300+) with tiny amounts of Lovelace from source address
-          to destination address
+        * sent transaction with as many UTxOs as fits into the max TX size, with tiny amounts
+          of Lovelace, from source address to destination address
         * check expected balances for both source and destination addresses
         """
         temp_template = f"{helpers.get_func_name()}_{amount}"
-        big_funds_idx = -190
 
         src_address = many_utxos[0].address
         dst_address = many_utxos[1].address
@@ -882,46 +884,54 @@ class TestManyUTXOs:
         src_init_balance = cluster.get_address_balance(src_address)
         dst_init_balance = cluster.get_address_balance(dst_address)
 
-        # sort UTxOs by amount
-        utxos_sorted = sorted(cluster.get_utxo(src_address), key=lambda x: x.amount)
+        utxos = cluster.get_utxo(src_address)
+
+        # select as many UTxOs with tiny amounts as fits into the max TX size, with space left
+        # for the UTxOs with "big funds" selected below; the TX body is built in-process,
+        # so there's no limit given by length of command line arguments
+        max_tx_size = tx_fees.get_fee_params(cluster).max_tx_size
+        no_of_txins = (
+            max_tx_size - clusterlib_utils.TX_SIZE_RESERVE
+        ) // coin_selection.MAX_TXIN_SIZE - self.BIG_TXINS_SPACE
+        tiny_txins = random.sample([u for u in utxos if u.amount < self.TINY_AMOUNT], k=no_of_txins)
 
-        # select 350 UTxOs, so we are in a limit of command line arguments lenght and size of the TX
-        txins = random.sample(utxos_sorted[:big_funds_idx], k=350)
-        # add several UTxOs with "big funds" so we can pay fees
-        txins.extend(utxos_sorted[-30:])
+        # add UTxOs with "big funds" so we can pay fees; the total amount of funds in selected
+        # UTxOs is close to the ideal amount of random-improve, i.e. twice the needed funds
+        selection = clusterlib_utils.select_txins(
+            cluster_obj=cluster,
+            src_address=src_address,
+            txouts=destinations,
+            tx_files=tx_files,
+            utxos=[u for u in utxos if u.amount >= self.TINY_AMOUNT],
+            required_utxos=tiny_txins,
+            strategy=coin_selection.Strategies.RANDOM_IMPROVE,
+        )
+        assert (
+            selection.strategy == coin_selection.Strategies.RANDOM_IMPROVE
+        ), "Random-improve reached the limit of space for inputs, largest-first was used instead"
 
         ttl = cluster.calculate_tx_ttl()
-        fee = cluster.calculate_tx_fee(
+        fee = tx_fees.calculate_tx_fee(
+            cluster_obj=cluster,
             src_address=src_address,
             tx_name=temp_template,
-            txins=txins,
+            txins=selection.txins,
             txouts=destinations,
             tx_files=tx_files,
             ttl=ttl,
         )
-
-        # optimize list of txins so the total amount of funds in selected UTxOs is close
-        # to the amount of needed funds
-        needed_funds = amount + fee + 100_000  # add a buffer
-        total_funds = functools.reduce(lambda x, y: x + y.amount, txins, 0)
-        funds_optimized = total_funds
-        txins_optimized = txins[:]
-        while funds_optimized > needed_funds:
-            popped_txin = txins_optimized.pop()
-            funds_optimized -= popped_txin.amount
-            if funds_optimized < needed_funds:
-                txins_optimized.append(popped_txin)
-                break
+        assert fee <= selection.fee, "The selected funds don't cover the fee"
 
         # build, sign and submit the transaction
         txins_filtered, txouts_balanced = cluster.get_tx_ins_outs(
             src_address=src_address,
             tx_files=tx_files,
-            txins=txins_optimized,
+            txins=selection.txins,
             txouts=destinations,
             fee=fee,
         )
-        tx_raw_output = cluster.build_raw_tx_bare(
+        tx_raw_output = tx_builder.build_raw_tx_bare(
+            cluster_obj=cluster,
             out_file=f"{temp_template}_tx.body",
             txins=txins_filtered,
             txouts=txouts_balanced,
@@ -947,6 +957,78 @@ class TestManyUTXOs:
 
         dbsync_utils.check_tx(cluster_obj=cluster, tx_raw_output=tx_raw_output)
 
+    @allure.link(helpers.get_vcs_link())
+    @pytest.mark.parametrize(
+        "strategy",
+        (coin_selection.Strategies.LARGEST_FIRST, coin_selection.Strategies.RANDOM_IMPROVE),
+    )
+    def test_coin_selection(
+        self,
+        cluster: clusterlib.ClusterLib,
+        many_utxos: Tuple[clusterlib.AddressRecord, clusterlib.AddressRecord],
+        strategy: str,
+    ):
+        """Select inputs from address with many UTxOs (100000+).
+
+        * select inputs for transactions with various amounts, using the given strategy
+        * check that the selected funds cover the amount and fee, and that the tiny UTxOs
+          that are not worth their fee are not selected
+        * check that the transactions built from the selected inputs fit into the max TX size
+        """
+        temp_template = f"{helpers.get_func_name()}_{strategy}"
+        src_address = many_utxos[0].address
+        dst_address = many_utxos[1].address
+        tx_files = clusterlib.TxFiles(signing_key_files=[many_utxos[0].skey_file])
+        fee_params = tx_fees.get_fee_params(cluster)
+        ttl = cluster.calculate_tx_ttl()
+
+        start = time.perf_counter()
+        utxos = cluster.get_utxo(src_address)
+        LOGGER.info(f"Queried {len(utxos)} UTxOs in {time.perf_counter() - start:.2f} seconds.")
+
+        for amount in (1, 2_000_000, 50_000_000, 150_000_000):
+            destinations = [clusterlib.TxOut(address=dst_address, amount=amount)]
+
+            start = time.perf_counter()
+            selection = clusterlib_utils.select_txins(
+                cluster_obj=cluster,
+                src_address=src_address,
+                txouts=destinations,
+                tx_files=tx_files,
+                utxos=utxos,
+                strategy=strategy,
+            )
+            LOGGER.info(
+                f"Selected {len(selection.txins)} inputs for {amount} Lovelace using "
+                f"'{strategy}' in {time.perf_counter() - start:.2f} seconds."
+            )
+
+            assert selection.change.get(clusterlib.DEFAULT_COIN, 0) >= 0
+            assert selection.txins_size <= fee_params.max_tx_size
+            assert all(
+                u.amount > fee_params.fee_per_byte * coin_selection.get_txin_size(u.utxo_ix)
+                for u in selection.txins
+            ), "Tiny UTxOs that are not worth their fee were selected"
+
+            tx_raw_output = tx_builder.build_raw_tx(
+                cluster_obj=cluster,
+                src_address=src_address,
+                tx_name=f"{temp_template}_{amount}",
+                txins=selection.txins,
+                txouts=destinations,
+                tx_files=tx_files,
+                fee=selection.fee,
+                ttl=ttl,
+            )
+            tx_size = tx_fees.get_tx_size_from_file(tx_raw_output.out_file)
+            assert (
+                tx_size + tx_fees.SHELLEY_WITNESS_SIZE <= fee_params.max_tx_size
+            ), "The transaction doesn't fit into the max TX size"
+            assert (
+                tx_fees.estimate_fee(cluster_obj=cluster, txbody_file=tx_raw_output.out_file)
+                <= selection.fee
+            ), "The selected funds don't cover the fee"
+
 
 @pytest.mark.testnets
 class TestNotBalanced:
@@ -1088,7 +1170,7 @@ class TestNotBalanced:
                 ttl=ttl,
             )
         except clusterlib.CLIError as exc:
-            if change_amount >= 2 ** 64:
+            if change_amount >= 2**64:
                 exc_val = str(exc)
                 assert "out of bounds" in exc_val or "exceeds the max bound" in exc_val
                 return
@@ -0,0 +1,240 @@
+"""Differential tests for in-process building of transaction bodies.
+
+Tx body files built in-process are compared with tx body files built by `cardano-cli`. The
+`build-raw` command doesn't check that the inputs exist, so no funds are needed.
+"""
+import json
+import logging
+import os
+from pathlib import Path
+from typing import List
+
+import allure
+import pytest
+from _pytest.tmpdir import TempdirFactory
+from cardano_clusterlib import clusterlib
+
+from cardano_node_tests.utils import cbor_raw
+from cardano_node_tests.utils import helpers
+from cardano_node_tests.utils import keys
+from cardano_node_tests.utils import tx_builder
+from cardano_node_tests.utils.versions import VERSIONS
+
+LOGGER = logging.getLogger(__name__)
+
+DATA_DIR = Path(__file__).parent / "data"
+
+
+@pytest.fixture(scope="module")
+def create_temp_dir(tmp_path_factory: TempdirFactory):
+    """Create a temporary dir."""
+    p = Path(tmp_path_factory.getbasetemp()).joinpath(helpers.get_id_for_mktemp(__file__)).resolve()
+    p.mkdir(exist_ok=True, parents=True)
+    return p
+
+
+@pytest.fixture
+def temp_dir(create_temp_dir: Path):
+    """Change to a temporary dir."""
+    with helpers.change_cwd(create_temp_dir):
+        yield create_temp_dir
+
+
+# use the "temp_dir" fixture for all tests automatically
+pytestmark = pytest.mark.usefixtures("temp_dir")
+
+
+def _get_txins(address: str, count: int) -> List[clusterlib.UTXOData]:
+    """Return fake inputs, `build-raw` doesn't check that they exist."""
+    return [
+        clusterlib.UTXOData(
+            utxo_hash=os.urandom(32).hex(), utxo_ix=i % 300, amount=1_000_000, address=address
+        )
+        for i in range(count)
+    ]
+
+
+def _build_both(cluster_obj: clusterlib.ClusterLib, temp_template: str, **kwargs) -> List[bytes]:
+    """Build tx body using `cardano-cli` and in-process, return content of both files."""
+    tx_files = kwargs.pop("tx_files", None) or clusterlib.TxFiles()
+    cli_tx_files = kwargs.pop("cli_tx_files", None) or tx_files
+
+    cli_output = cluster_obj.build_raw_tx_bare(
+        out_file=f"{temp_template}_cli_tx.body", tx_files=cli_tx_files, **kwargs
+    )
+    native_output = tx_builder.build_raw_tx_bare(
+        cluster_obj=cluster_obj,
+        out_file=f"{temp_template}_native_tx.body",
+        tx_files=tx_files,
+        **kwargs,
+    )
+    return [
+        Path(cli_output.out_file).read_bytes(),
+        Path(native_output.out_file).read_bytes(),
+    ]
+
+
+@pytest.mark.testnets
+class TestTxBuilder:
+    """Compare tx bodies built in-process with tx bodies built by `cardano-cli`."""
+
+    @allure.link(helpers.get_vcs_link())
+    @pytest.mark.parametrize("no_of_txins", (1, 23, 24, 500))
+    @pytest.mark.parametrize("no_of_txouts", (1, 24, 100))
+    @pytest.mark.parametrize("join_txouts", (True, False))
+    def test_inputs_outputs(
+        self,
+        cluster: clusterlib.ClusterLib,
+        no_of_txins: int,
+        no_of_txouts: int,
+        join_txouts: bool,
+    ):
+        """Compare tx bodies with many inputs and outputs.
+
+        Arrays with more than 23 items are encoded with indefinite length.
+        """
+        temp_template = f"{helpers.get_func_name()}_{no_of_txins}_{no_of_txouts}_{join_txouts}"
+        addrs = [
+            keys.gen_payment_addr_and_keys(name=f"{temp_template}_{i}", cluster_obj=cluster)
+            for i in range(5)
+        ]
+
+        txins = _get_txins(address=addrs[0].address, count=no_of_txins)
+        # duplicate input is filtered out
+        txins.append(txins[0])
+        txouts = [
+            clusterlib.TxOut(address=addrs[i % len(addrs)].address, amount=1_000_000 + i)
+            for i in range(no_of_txouts)
+        ]
+
+        cli_body, native_body = _build_both(
+            cluster_obj=cluster,
+            temp_template=temp_template,
+            txins=txins,
+            txouts=txouts,
+            fee=170_000 + no_of_txins,
+            ttl=cluster.get_slot_no() + 1000,
+            join_txouts=join_txouts,
+        )
+        assert native_body == cli_body
+
+    @allure.link(helpers.get_vcs_link())
+    @pytest.mark.skipif(
+        VERSIONS.transaction_era == VERSIONS.SHELLEY,
+        reason="validity interval start is not available in Shelley era",
+    )
+    @pytest.mark.parametrize("invalid_before", (None, 0, 2 ** 32))
+    @pytest.mark.parametrize("invalid_hereafter", (None, 1, 2 ** 40))
+    def test_validity_interval(
+        self, cluster: clusterlib.ClusterLib, invalid_before: int, invalid_hereafter: int
+    ):
+        """Compare tx bodies with validity interval."""
+        temp_template = f"{helpers.get_func_name()}_{invalid_before}_{invalid_hereafter}"
+        addr = keys.gen_payment_addr_and_keys(name=temp_template, cluster_obj=cluster)
+
+        cli_body, native_body = _build_both(
+            cluster_obj=cluster,
+            temp_template=temp_template,
+            txins=_get_txins(address=addr.address, count=2),
+            txouts=[clusterlib.TxOut(address=addr.address, amount=2_000_000)],
+            fee=200_000,
+            invalid_before=invalid_before,
+            invalid_hereafter=invalid_hereafter,
+        )
+        assert native_body == cli_body
+
+    @allure.link(helpers.get_vcs_link())
+    @pytest.mark.skipif(
+        VERSIONS.transaction_era < VERSIONS.MARY,
+        reason="multi-assets are available only in Mary+ eras",
+    )
+    def test_multi_assets(self, cluster: clusterlib.ClusterLib):
+        """Compare tx bodies with multi-asset outputs and minting.
+
+        Minting needs a minting script, so only the bodies themselves are compared.
+        """
+        temp_template = helpers.get_func_name()
+        addrs = [
+            keys.gen_payment_addr_and_keys(name=f"{temp_template}_{i}", cluster_obj=cluster)
+            for i in range(2)
+        ]
+
+        script = Path(f"{temp_template}.script")
+        helpers.write_json(
+            script, {"keyHash": keys.get_key_hash(addrs[0].vkey_file), "type": "sig"}
+        )
+        policyid = cluster.get_policyid(script)
+        other_policyid = os.urandom(28).hex()
+
+        tokens = [
+            f"{policyid}.couttscoin",
+            f"{policyid}.a",
+            f"{policyid}",
+            f"{other_policyid}.zz",
+            f"{other_policyid}.b",
+        ]
+        txouts = [
+            clusterlib.TxOut(address=addrs[0].address, amount=2_000_000),
+            *[
+                clusterlib.TxOut(address=addrs[i % 2].address, amount=10 + i, coin=t)
+                for i, t in enumerate(tokens)
+            ],
+            # tokens with zero total amount are left out
+            clusterlib.TxOut(address=addrs[1].address, amount=0, coin=f"{policyid}.zero"),
+        ]
+        mint = [
+            clusterlib.TxOut(address=addrs[0].address, amount=1_000, coin=f"{policyid}.couttscoin"),
+            clusterlib.TxOut(address=addrs[0].address, amount=-5, coin=f"{policyid}.a"),
+        ]
+
+        cli_body, native_body = _build_both(
+            cluster_obj=cluster,
+            temp_template=temp_template,
+            cli_tx_files=clusterlib.TxFiles(
+                script_files=clusterlib.ScriptFiles(minting_scripts=[script])
+            ),
+            txins=_get_txins(address=addrs[0].address, count=3),
+            txouts=txouts,
+            fee=200_000,
+            ttl=cluster.get_slot_no() + 1000,
+            mint=mint,
+        )
+        cli_parts = cbor_raw.split_array(bytes.fromhex(json.loads(cli_body)["cborHex"]))
+        native_parts = cbor_raw.split_array(bytes.fromhex(json.loads(native_body)["cborHex"]))
+        assert native_parts[0] == cli_parts[0]
+
+    @allure.link(helpers.get_vcs_link())
+    def test_certs_withdrawals_metadata(self, cluster: clusterlib.ClusterLib):
+        """Compare tx bodies with certificates, withdrawals and metadata."""
+        temp_template = helpers.get_func_name()
+        addr = keys.gen_payment_addr_and_keys(name=temp_template, cluster_obj=cluster)
+        stake_addrs = [
+            keys.gen_stake_addr_and_keys(name=f"{temp_template}_{i}", cluster_obj=cluster)
+            for i in range(3)
+        ]
+
+        certificate_files = [
+            cluster.gen_stake_addr_registration_cert(
+                addr_name=f"{temp_template}_{i}", stake_vkey_file=s.vkey_file
+            )
+            for i, s in enumerate(stake_addrs)
+        ]
+        tx_files = clusterlib.TxFiles(
+            certificate_files=certificate_files,
+            metadata_cbor_files=[DATA_DIR / "tx_metadata.cbor"],
+        )
+        withdrawals = [
+            clusterlib.TxOut(address=s.address, amount=1_000 * i) for i, s in enumerate(stake_addrs)
+        ]
+
+        cli_body, native_body = _build_both(
+            cluster_obj=cluster,
+            temp_template=temp_template,
+            tx_files=tx_files,
+            txins=_get_txins(address=addr.address, count=2),
+            txouts=[clusterlib.TxOut(address=addr.address, amount=2_000_000)],
+            fee=200_000,
+            ttl=cluster.get_slot_no() + 1000,
+            withdrawals=withdrawals,
+        )
+        assert native_body == cli_body
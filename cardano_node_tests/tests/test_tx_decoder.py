@@ -0,0 +1,196 @@
+"""Tests for lazy decoding of transaction files.
+
+Transaction files are built by `cardano-cli` and the decoded fields are compared with the values
+the transactions were built from. The `build-raw` command doesn't check that the inputs exist,
+so no funds are needed.
+"""
+import logging
+import os
+from pathlib import Path
+from typing import List
+
+import allure
+import cbor2
+import pytest
+from _pytest.tmpdir import TempdirFactory
+from cardano_clusterlib import clusterlib
+
+from cardano_node_tests.utils import helpers
+from cardano_node_tests.utils import keys
+from cardano_node_tests.utils import tx_builder
+from cardano_node_tests.utils import tx_decoder
+from cardano_node_tests.utils.versions import VERSIONS
+
+LOGGER = logging.getLogger(__name__)
+
+DATA_DIR = Path(__file__).parent / "data"
+
+
+@pytest.fixture(scope="module")
+def create_temp_dir(tmp_path_factory: TempdirFactory):
+    """Create a temporary dir."""
+    p = Path(tmp_path_factory.getbasetemp()).joinpath(helpers.get_id_for_mktemp(__file__)).resolve()
+    p.mkdir(exist_ok=True, parents=True)
+    return p
+
+
+@pytest.fixture
+def temp_dir(create_temp_dir: Path):
+    """Change to a temporary dir."""
+    with helpers.change_cwd(create_temp_dir):
+        yield create_temp_dir
+
+
+# use the "temp_dir" fixture for all tests automatically
+pytestmark = pytest.mark.usefixtures("temp_dir")
+
+
+def _get_txins(address: str, count: int) -> List[clusterlib.UTXOData]:
+    """Return fake inputs, `build-raw` doesn't check that they exist."""
+    return [
+        clusterlib.UTXOData(
+            utxo_hash=os.urandom(32).hex(), utxo_ix=i, amount=1_000_000, address=address
+        )
+        for i in range(count)
+    ]
+
+
+class TestDecodeAssets:
+    """Tests for decoding of native tokens."""
+
+    @allure.link(helpers.get_vcs_link())
+    def test_non_utf8_asset_name(self):
+        """Check that asset names that are not valid UTF-8 are decoded as hex."""
+        policyid = bytes(range(28))
+        body = {
+            tx_builder.BODY_INPUTS: [],
+            tx_builder.BODY_OUTPUTS: [],
+            tx_builder.BODY_FEE: 0,
+            tx_builder.BODY_MINT: {policyid: {b"couttscoin": 5, b"\xff\xfe": -3}},
+        }
+        tx = tx_decoder.Tx(envelope_type="TxBodyMary", cbor_data=cbor2.dumps([body, [], None]))
+
+        assert tx.mint == [
+            clusterlib.TxOut(address="", amount=5, coin=f"{policyid.hex()}.couttscoin"),
+            clusterlib.TxOut(address="", amount=-3, coin=f"{policyid.hex()}.fffe"),
+        ]
+
+
+@pytest.mark.testnets
+class TestTxDecoder:
+    """Compare decoded transactions with the values they were built from."""
+
+    @allure.link(helpers.get_vcs_link())
+    @pytest.mark.parametrize("with_metadata", (True, False))
+    def test_decode_tx(self, cluster: clusterlib.ClusterLib, with_metadata: bool):
+        """Decode tx body and signed tx.
+
+        * build a tx with certificates, withdrawals and (optionally) metadata
+        * sign the tx
+        * check decoded fields of both the tx body and the signed tx
+        * check that the tx ID is the same as the one computed by `cardano-cli`
+        """
+        temp_template = f"{helpers.get_func_name()}_{with_metadata}"
+        addr = keys.gen_payment_addr_and_keys(name=temp_template, cluster_obj=cluster)
+        stake_addrs = [
+            keys.gen_stake_addr_and_keys(name=f"{temp_template}_{i}", cluster_obj=cluster)
+            for i in range(2)
+        ]
+
+        certificate_files = [
+            cluster.gen_stake_addr_registration_cert(
+                addr_name=f"{temp_template}_{i}", stake_vkey_file=s.vkey_file
+            )
+            for i, s in enumerate(stake_addrs)
+        ]
+        tx_files = clusterlib.TxFiles(
+            certificate_files=certificate_files,
+            metadata_cbor_files=[DATA_DIR / "tx_metadata.cbor"] if with_metadata else [],
+        )
+        txins = _get_txins(address=addr.address, count=30)
+        txouts = [clusterlib.TxOut(address=addr.address, amount=2_000_000 + i) for i in range(3)]
+        withdrawals = [
+            clusterlib.TxOut(address=s.address, amount=1_000 + i) for i, s in enumerate(stake_addrs)
+        ]
+        ttl = cluster.get_slot_no() + 1000
+
+        tx_raw_output = cluster.build_raw_tx_bare(
+            out_file=f"{temp_template}_tx.body",
+            txins=txins,
+            txouts=txouts,
+            tx_files=tx_files,
+            fee=200_000,
+            ttl=ttl,
+            withdrawals=withdrawals,
+            join_txouts=False,
+        )
+        signed_file = cluster.sign_tx(
+            tx_body_file=tx_raw_output.out_file,
+            signing_key_files=[addr.skey_file],
+            tx_name=temp_template,
+        )
+
+        tx_body = tx_decoder.read_tx(tx_raw_output.out_file)
+        tx_signed = tx_decoder.read_tx(signed_file)
+
+        txid = cluster.get_txid(tx_body_file=tx_raw_output.out_file)
+        assert tx_body.txid == txid
+        assert tx_signed.txid == txid
+
+        with open(DATA_DIR / "tx_metadata.cbor", "rb") as in_cbor:
+            expected_metadata = cbor2.load(in_cbor) if with_metadata else {}
+
+        for tx in (tx_body, tx_signed):
+            assert sorted(tx.txins) == sorted(
+                tx_decoder.TxIn(utxo_hash=t.utxo_hash, utxo_ix=t.utxo_ix) for t in txins
+            )
+            assert tx.txouts == txouts
+            assert tx.fee == 200_000
+            assert tx.invalid_hereafter == ttl
+            assert tx.invalid_before is None
+            assert len(tx.certificates) == len(certificate_files)
+            assert sorted(tx.withdrawals) == sorted(withdrawals)
+            assert tx.mint == []
+            assert tx.metadata == expected_metadata
+
+    @allure.link(helpers.get_vcs_link())
+    @pytest.mark.skipif(
+        VERSIONS.transaction_era < VERSIONS.MARY,
+        reason="multi-assets are available only in Mary+ eras",
+    )
+    def test_decode_multi_assets(self, cluster: clusterlib.ClusterLib):
+        """Decode tx body with multi-asset outputs, minting and validity interval."""
+        temp_template = helpers.get_func_name()
+        addr = keys.gen_payment_addr_and_keys(name=temp_template, cluster_obj=cluster)
+
+        script = Path(f"{temp_template}.script")
+        helpers.write_json(script, {"keyHash": keys.get_key_hash(addr.vkey_file), "type": "sig"})
+        policyid = cluster.get_policyid(script)
+
+        token = f"{policyid}.couttscoin"
+        txouts = [
+            clusterlib.TxOut(address=addr.address, amount=2_000_000),
+            clusterlib.TxOut(address=addr.address, amount=1_000, coin=token),
+        ]
+        mint = [clusterlib.TxOut(address=addr.address, amount=1_000, coin=token)]
+        invalid_before = cluster.get_slot_no()
+
+        tx_raw_output = cluster.build_raw_tx_bare(
+            out_file=f"{temp_template}_tx.body",
+            txins=_get_txins(address=addr.address, count=1),
+            txouts=txouts,
+            tx_files=clusterlib.TxFiles(
+                script_files=clusterlib.ScriptFiles(minting_scripts=[script])
+            ),
+            fee=200_000,
+            invalid_before=invalid_before,
+            invalid_hereafter=invalid_before + 1000,
+            mint=mint,
+        )
+
+        tx = tx_decoder.read_tx(tx_raw_output.out_file)
+        assert tx.txid == cluster.get_txid(tx_body_file=tx_raw_output.out_file)
+        assert tx.txouts == txouts
+        assert tx.mint == [clusterlib.TxOut(address="", amount=1_000, coin=token)]
+        assert tx.invalid_before == invalid_before
+        assert tx.invalid_hereafter == invalid_before + 1000
@@ -0,0 +1,319 @@
+"""Tests for in-process signing of transactions."""
+import json
+import logging
+import time
+from pathlib import Path
+from typing import List
+
+import allure
+import cbor2
+import nacl.signing
+import pytest
+from _pytest.tmpdir import TempdirFactory
+from cardano_clusterlib import clusterlib
+
+from cardano_node_tests.utils import cluster_management
+from cardano_node_tests.utils import clusterlib_utils
+from cardano_node_tests.utils import helpers
+from cardano_node_tests.utils import keys
+from cardano_node_tests.utils import simple_scripts
+from cardano_node_tests.utils import tx_signing
+
+LOGGER = logging.getLogger(__name__)
+
+
+@pytest.fixture(scope="module")
+def create_temp_dir(tmp_path_factory: TempdirFactory):
+    """Create a temporary dir."""
+    p = Path(tmp_path_factory.getbasetemp()).joinpath(helpers.get_id_for_mktemp(__file__)).resolve()
+    p.mkdir(exist_ok=True, parents=True)
+    return p
+
+
+@pytest.fixture
+def temp_dir(create_temp_dir: Path):
+    """Change to a temporary dir."""
+    with helpers.change_cwd(create_temp_dir):
+        yield create_temp_dir
+
+
+# use the "temp_dir" fixture for all tests automatically
+pytestmark = pytest.mark.usefixtures("temp_dir")
+
+
+def _load_envelope_cbor(envelope_file: Path) -> dict:
+    envelope = keys.read_text_envelope(envelope_file)
+    envelope["cborHex"] = cbor2.loads(bytes.fromhex(envelope["cborHex"]))
+    return envelope
+
+
+@pytest.fixture
+def payment_addrs(
+    cluster_manager: cluster_management.ClusterManager,
+    cluster: clusterlib.ClusterLib,
+) -> List[clusterlib.AddressRecord]:
+    """Create 3 new payment addresses."""
+    with cluster_manager.cache_fixture() as fixture_cache:
+        if fixture_cache.value:
+            return fixture_cache.value  # type: ignore
+
+        addrs = clusterlib_utils.create_payment_addr_records(
+            *[f"tx_signing_ci{cluster_manager.cluster_instance}_{i}" for i in range(3)],
+            cluster_obj=cluster,
+        )
+        fixture_cache.value = addrs
+
+    # fund source addresses
+    clusterlib_utils.fund_from_faucet(
+        *addrs[:2],
+        cluster_obj=cluster,
+        faucet_data=cluster_manager.cache.addrs_data["user1"],
+    )
+
+    return addrs
+
+
+def _build_tx(
+    cluster_obj: clusterlib.ClusterLib,
+    payment_addrs: List[clusterlib.AddressRecord],
+    temp_template: str,
+    script_files: clusterlib.OptionalFiles = (),
+) -> clusterlib.TxRawOutput:
+    """Build a tx that spends funds from two addresses, i.e. needs two signatures."""
+    src_addrs = payment_addrs[:2]
+    txins = [cluster_obj.get_utxo(a.address)[0] for a in src_addrs]
+    destinations = [clusterlib.TxOut(address=payment_addrs[2].address, amount=2_000_000)]
+    tx_files = clusterlib.TxFiles(
+        signing_key_files=[a.skey_file for a in src_addrs],
+        script_files=clusterlib.ScriptFiles(txin_scripts=script_files),
+    )
+
+    fee = cluster_obj.calculate_tx_fee(
+        src_address=src_addrs[0].address,
+        tx_name=temp_template,
+        txins=txins,
+        txouts=destinations,
+        tx_files=tx_files,
+    )
+    return cluster_obj.build_raw_tx(
+        src_address=src_addrs[0].address,
+        tx_name=temp_template,
+        txins=txins,
+        txouts=destinations,
+        tx_files=tx_files,
+        fee=fee,
+    )
+
+
+@pytest.mark.testnets
+class TestTxSigning:
+    """Compare transactions signed in-process with transactions signed by `cardano-cli`."""
+
+    @allure.link(helpers.get_vcs_link())
+    def test_sign_tx(
+        self, cluster: clusterlib.ClusterLib, payment_addrs: List[clusterlib.AddressRecord]
+    ):
+        """Sign a transaction in-process and submit it.
+
+        * build a tx that needs two signatures
+        * sign the tx in-process and using `cardano-cli`
+        * check that the signed tx files are equivalent and have the same tx ID
+        * submit the tx signed in-process
+        * check expected balance of the destination address
+        """
+        temp_template = helpers.get_func_name()
+        skey_files = [a.skey_file for a in payment_addrs[:2]]
+        dst_address = payment_addrs[2].address
+        dst_init_balance = cluster.get_address_balance(dst_address)
+
+        tx_raw_output = _build_tx(
+            cluster_obj=cluster, payment_addrs=payment_addrs, temp_template=temp_template
+        )
+
+        cli_signed_file = cluster.sign_tx(
+            tx_body_file=tx_raw_output.out_file,
+            signing_key_files=skey_files,
+            tx_name=f"{temp_template}_cli",
+        )
+        native_signed_file = tx_signing.sign_tx(
+            tx_body_file=tx_raw_output.out_file,
+            signing_key_files=skey_files,
+            tx_name=f"{temp_template}_native",
+        )
+
+        # ed25519 signatures are deterministic, the signed transactions must be the same
+        assert _load_envelope_cbor(native_signed_file) == _load_envelope_cbor(cli_signed_file)
+
+        txid = tx_signing.read_tx_body(tx_raw_output.out_file).body_hash.hex()
+        assert cluster.get_txid(tx_file=native_signed_file) == txid
+        assert cluster.get_txid(tx_body_file=tx_raw_output.out_file) == txid
+
+        cluster.submit_tx(tx_file=native_signed_file, txins=tx_raw_output.txins)
+
+        assert (
+            cluster.get_address_balance(dst_address) == dst_init_balance + 2_000_000
+        ), f"Incorrect balance for destination address `{dst_address}`"
+
+    @allure.link(helpers.get_vcs_link())
+    def test_witness_tx(
+        self, cluster: clusterlib.ClusterLib, payment_addrs: List[clusterlib.AddressRecord]
+    ):
+        """Create transaction witnesses in-process and submit the assembled transaction.
+
+        * build a tx that needs two signatures
+        * create witnesses in-process and using `cardano-cli`
+        * check that the witness files are equivalent
+        * assemble the tx from witnesses created in-process and submit it
+        * check expected balance of the destination address
+        """
+        temp_template = helpers.get_func_name()
+        skey_files = [a.skey_file for a in payment_addrs[:2]]
+        dst_address = payment_addrs[2].address
+        dst_init_balance = cluster.get_address_balance(dst_address)
+
+        tx_raw_output = _build_tx(
+            cluster_obj=cluster, payment_addrs=payment_addrs, temp_template=temp_template
+        )
+
+        native_witness_files = []
+        for idx, skey_file in enumerate(skey_files):
+            cli_witness_file = cluster.witness_tx(
+                tx_body_file=tx_raw_output.out_file,
+                witness_name=f"{temp_template}_cli{idx}",
+                signing_key_files=[skey_file],
+            )
+            native_witness_file = tx_signing.witness_tx(
+                tx_body_file=tx_raw_output.out_file,
+                witness_name=f"{temp_template}_native{idx}",
+                signing_key_files=[skey_file],
+            )
+            assert _load_envelope_cbor(native_witness_file) == _load_envelope_cbor(cli_witness_file)
+            native_witness_files.append(native_witness_file)
+
+        tx_witnessed_file = cluster.assemble_tx(
+            tx_body_file=tx_raw_output.out_file,
+            witness_files=native_witness_files,
+            tx_name=temp_template,
+        )
+        cluster.submit_tx(tx_file=tx_witnessed_file, txins=tx_raw_output.txins)
+
+        assert (
+            cluster.get_address_balance(dst_address) == dst_init_balance + 2_000_000
+        ), f"Incorrect balance for destination address `{dst_address}`"
+
+    @allure.link(helpers.get_vcs_link())
+    def test_sign_tx_scripts(
+        self, cluster: clusterlib.ClusterLib, payment_addrs: List[clusterlib.AddressRecord]
+    ):
+        """Sign a transaction with multiple scripts in the witness set in-process.
+
+        The ledger orders the scripts by script hash, so the scripts are passed to `cardano-cli`
+        in the opposite order.
+
+        * build multisig scripts
+        * build a tx that needs two signatures, with the scripts in reversed order of their hashes
+        * sign the tx in-process and using `cardano-cli`
+        * check that the signed tx files are equivalent and have the same tx ID
+        """
+        temp_template = helpers.get_func_name()
+        skey_files = [a.skey_file for a in payment_addrs[:2]]
+        vkey_files = [a.vkey_file for a in payment_addrs]
+
+        script_files = [
+            cluster.build_multisig_script(
+                script_name=f"{temp_template}_{i}",
+                script_type_arg=clusterlib.MultiSigTypeArgs.AT_LEAST,
+                payment_vkey_files=vkey_files,
+                required=i + 1,
+            )
+            for i in range(3)
+        ]
+        script_files.sort(
+            key=lambda f: simple_scripts.get_script_hash_bytes(simple_scripts.read_script(f)),
+            reverse=True,
+        )
+
+        tx_raw_output = _build_tx(
+            cluster_obj=cluster,
+            payment_addrs=payment_addrs,
+            temp_template=temp_template,
+            script_files=script_files,
+        )
+
+        cli_signed_file = cluster.sign_tx(
+            tx_body_file=tx_raw_output.out_file,
+            signing_key_files=skey_files,
+            tx_name=f"{temp_template}_cli",
+        )
+        native_signed_file = tx_signing.sign_tx(
+            tx_body_file=tx_raw_output.out_file,
+            signing_key_files=skey_files,
+            tx_name=f"{temp_template}_native",
+        )
+
+        native_signed = _load_envelope_cbor(native_signed_file)
+        assert len(native_signed["cborHex"][1][tx_signing.WITNESS_SET_SCRIPTS]) == 3
+        assert native_signed == _load_envelope_cbor(cli_signed_file)
+        assert cluster.get_txid(tx_file=native_signed_file) == cluster.get_txid(
+            tx_file=cli_signed_file
+        )
+
+
+@pytest.mark.benchmark
+class TestSigningThroughput:
+    """Benchmarks for in-process signing of transactions."""
+
+    @allure.link(helpers.get_vcs_link())
+    def test_signing_throughput(
+        self, cluster: clusterlib.ClusterLib, payment_addrs: List[clusterlib.AddressRecord]
+    ):
+        """Measure throughput of in-process signing.
+
+        * build a tx that needs two signatures
+        * sign the tx 10k times in-process, writing each signed tx to a file
+        * sign the tx 20 times using `cardano-cli`
+        * check signatures of a sample of the signed transactions
+        """
+        temp_template = helpers.get_func_name()
+        skey_files = [a.skey_file for a in payment_addrs[:2]]
+        no_of_txs = 10_000
+        no_of_cli_txs = 20
+
+        tx_raw_output = _build_tx(
+            cluster_obj=cluster, payment_addrs=payment_addrs, temp_template=temp_template
+        )
+        body_hash = tx_signing.read_tx_body(tx_raw_output.out_file).body_hash
+
+        out_dir = Path(f"{temp_template}_native")
+        out_dir.mkdir()
+        start = time.perf_counter()
+        signed_files = [
+            tx_signing.sign_tx(
+                tx_body_file=tx_raw_output.out_file,
+                signing_key_files=skey_files,
+                tx_name=f"{temp_template}_{i}",
+                destination_dir=out_dir,
+            )
+            for i in range(no_of_txs)
+        ]
+        native_tx_per_sec = no_of_txs / (time.perf_counter() - start)
+        LOGGER.info(f"Signed {no_of_txs} txs in-process, {native_tx_per_sec:.0f} tx/s")
+
+        start = time.perf_counter()
+        for i in range(no_of_cli_txs):
+            cluster.sign_tx(
+                tx_body_file=tx_raw_output.out_file,
+                signing_key_files=skey_files,
+                tx_name=f"{temp_template}_cli_{i}",
+            )
+        cli_tx_per_sec = no_of_cli_txs / (time.perf_counter() - start)
+        LOGGER.info(f"Signed {no_of_cli_txs} txs using `cardano-cli`, {cli_tx_per_sec:.0f} tx/s")
+
+        # check signatures of a sample of the signed transactions
+        for signed_file in signed_files[:: no_of_txs // 100]:
+            with open(signed_file, encoding="utf-8") as in_json:
+                signed_tx = cbor2.loads(bytes.fromhex(json.load(in_json)["cborHex"]))
+            vkey_witnesses = signed_tx[1][tx_signing.WITNESS_SET_VKEYS]
+            assert len(vkey_witnesses) == len(skey_files)
+            for vkey, signature in vkey_witnesses:
+                nacl.signing.VerifyKey(vkey).verify(body_hash, signature)
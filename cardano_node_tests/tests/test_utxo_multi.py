@@ -0,0 +1,82 @@
+"""Tests for querying UTxOs of multiple addresses using as few CLI calls as possible."""
+import json
+import logging
+from typing import Dict
+from typing import List
+
+import allure
+import pytest
+from cardano_clusterlib import clusterlib
+
+from cardano_node_tests.utils import clusterlib_utils
+from cardano_node_tests.utils import helpers
+
+LOGGER = logging.getLogger(__name__)
+
+TOKEN = f"{'ab' * 28}.couttscoin"
+
+
+class FakeCluster:
+    """The part of `ClusterLib` needed for querying UTxOs.
+
+    Like `cardano-cli query utxo`, the output contains only addresses that have some UTxO.
+    """
+
+    def __init__(self, utxo: Dict[str, List[int]]) -> None:
+        self.utxo = utxo
+        self.queries: List[List[str]] = []
+
+    def query_cli(self, cli_args: List[str]) -> str:
+        addresses = [cli_args[i + 1] for i, a in enumerate(cli_args) if a == "--address"]
+        self.queries.append(addresses)
+
+        out = {}
+        for addr in addresses:
+            for ix, amount in enumerate(self.utxo.get(addr, ())):
+                policyid, asset_name = TOKEN.split(".")
+                out[f"{addr.encode().hex():0>64}#{ix}"] = {
+                    "address": addr,
+                    "value": {
+                        clusterlib.DEFAULT_COIN: amount,
+                        policyid: {asset_name: 10},
+                    },
+                }
+        return json.dumps(out)
+
+
+class TestGetBalances:
+    """Tests for `clusterlib_utils.get_balances`."""
+
+    @allure.link(helpers.get_vcs_link())
+    def test_addresses_without_utxo(self):
+        """Check that addresses without any UTxO have zero balance."""
+        cluster_obj = FakeCluster(utxo={"addr_funded": [1_000_000, 2_000_000]})
+
+        addresses = ["addr_empty", "addr_funded"]
+
+        balances = clusterlib_utils.get_balances(
+            cluster_obj=cluster_obj, addresses=addresses  # type: ignore
+        )
+        assert balances == {"addr_empty": 0, "addr_funded": 3_000_000}
+
+        token_balances = clusterlib_utils.get_balances(
+            cluster_obj=cluster_obj, addresses=addresses, coin=TOKEN  # type: ignore
+        )
+        assert token_balances == {"addr_empty": 0, "addr_funded": 20}
+
+    @allure.link(helpers.get_vcs_link())
+    @pytest.mark.parametrize("addr_count", (1, clusterlib_utils.UTXO_QUERY_BATCH + 1))
+    def test_batches(self, addr_count: int):
+        """Check that the addresses are queried in batches and duplicates only once."""
+        addresses = [f"addr{i}" for i in range(addr_count)]
+        cluster_obj = FakeCluster(utxo={a: [i + 1] for i, a in enumerate(addresses)})
+
+        balances = clusterlib_utils.get_balances(
+            cluster_obj=cluster_obj, addresses=[*addresses, addresses[0]]  # type: ignore
+        )
+        assert balances == {a: i + 1 for i, a in enumerate(addresses)}
+
+        batch = clusterlib_utils.UTXO_QUERY_BATCH
+        assert cluster_obj.queries == [
+            addresses[i : i + batch] for i in range(0, addr_count, batch)
+        ]
@@ -0,0 +1,123 @@
+"""Pure Python implementation of bech32 and bech32m encoding (BIP-0173, BIP-0350).
+
+Unlike in BIP-0173, length of the encoded string is not limited to 90 characters, as Cardano
+addresses can be longer.
+"""
+import functools
+from typing import Iterable
+from typing import List
+from typing import NamedTuple
+
+CHARSET = "qpzry9x8gf2tvdw0s3jn54khce6mua7l"
+CHARSET_REV = {c: i for i, c in enumerate(CHARSET)}
+CHECKSUM_LEN = 6
+
+
+class Variants:
+    BECH32 = 1
+    BECH32M = 0x2BC830A3
+
+
+class Bech32Data(NamedTuple):
+    hrp: str
+    data: bytes
+    variant: int
+
+
+class Bech32Error(ValueError):
+    pass
+
+
+def _polymod(values: Iterable[int]) -> int:
+    """Compute the checksum over the values."""
+    generator = (0x3B6A57B2, 0x26508E6D, 0x1EA119FA, 0x3D4233DD, 0x2A1462B3)
+    chk = 1
+    for value in values:
+        top = chk >> 25
+        chk = (chk & 0x1FFFFFF) << 5 ^ value
+        for i in range(5):
+            chk ^= generator[i] if ((top >> i) & 1) else 0
+    return chk
+
+
+def _hrp_expand(hrp: str) -> List[int]:
+    """Expand the human readable part for checksum computation."""
+    return [ord(c) >> 5 for c in hrp] + [0] + [ord(c) & 31 for c in hrp]
+
+
+def _convert_bits(data: Iterable[int], from_bits: int, to_bits: int, pad: bool) -> List[int]:
+    """Convert groups of bits of the given size to groups of bits of another size."""
+    acc = 0
+    bits = 0
+    ret = []
+    maxv = (1 << to_bits) - 1
+    for value in data:
+        acc = (acc << from_bits) | value
+        bits += from_bits
+        while bits >= to_bits:
+            bits -= to_bits
+            ret.append((acc >> bits) & maxv)
+    if pad:
+        if bits:
+            ret.append((acc << (to_bits - bits)) & maxv)
+    elif bits >= from_bits or ((acc << (to_bits - bits)) & maxv):
+        raise Bech32Error("Invalid padding.")
+    return ret
+
+
+@functools.lru_cache(maxsize=1024)
+def decode(bech32: str) -> Bech32Data:
+    """Decode bech32 or bech32m string.
+
+    Args:
+        bech32: A bech32 or bech32m encoded string.
+
+    Returns:
+        Bech32Data: A tuple of human readable part, decoded data and used variant
+            (`Variants.BECH32` or `Variants.BECH32M`).
+    """
+    if bech32.lower() != bech32 and bech32.upper() != bech32:
+        raise Bech32Error(f"Mixed case in '{bech32}'.")
+    if any(ord(c) < 33 or ord(c) > 126 for c in bech32):
+        raise Bech32Error(f"Invalid character in '{bech32}'.")
+
+    bech32 = bech32.lower()
+    sep_pos = bech32.rfind("1")
+    if sep_pos < 1 or sep_pos + CHECKSUM_LEN + 1 > len(bech32):
+        raise Bech32Error(f"Invalid position of separator in '{bech32}'.")
+
+    hrp = bech32[:sep_pos]
+    try:
+        values = [CHARSET_REV[c] for c in bech32[sep_pos + 1 :]]
+    except KeyError as exc:
+        raise Bech32Error(f"Invalid character in data part of '{bech32}'.") from exc
+
+    variant = _polymod(_hrp_expand(hrp) + values)
+    if variant not in (Variants.BECH32, Variants.BECH32M):
+        raise Bech32Error(f"Invalid checksum of '{bech32}'.")
+
+    data = _convert_bits(values[:-CHECKSUM_LEN], from_bits=5, to_bits=8, pad=False)
+    return Bech32Data(hrp=hrp, data=bytes(data), variant=variant)
+
+
+@functools.lru_cache(maxsize=1024)
+def encode(hrp: str, data: bytes, variant: int = Variants.BECH32) -> str:
+    """Encode data to bech32 or bech32m string.
+
+    Args:
+        hrp: A human readable part.
+        data: Data to encode.
+        variant: A variant of the encoding (`Variants.BECH32` or `Variants.BECH32M`).
+
+    Returns:
+        str: The bech32 or bech32m encoded string.
+    """
+    values = _convert_bits(data, from_bits=8, to_bits=5, pad=True)
+    polymod = _polymod(_hrp_expand(hrp) + values + [0] * CHECKSUM_LEN) ^ variant
+    checksum = [(polymod >> 5 * (CHECKSUM_LEN - 1 - i)) & 31 for i in range(CHECKSUM_LEN)]
+    return f"{hrp}1{''.join(CHARSET[v] for v in values + checksum)}"
+
+
+def decode_hex(bech32: str) -> str:
+    """Decode bech32 or bech32m string to hex string (data part only)."""
+    return decode(bech32).data.hex()
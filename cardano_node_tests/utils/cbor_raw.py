@@ -0,0 +1,145 @@
+"""Work with raw CBOR encoded data without decoding it.
+
+Parts of transactions (e.g. transaction body) must be kept byte for byte the same as they were
+encoded, as hashes and signatures are computed over the original bytes. Decoding and re-encoding
+the data would not necessarily produce the same bytes.
+"""
+from typing import Iterable
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+MAJOR_UINT = 0
+MAJOR_NEGINT = 1
+MAJOR_BYTES = 2
+MAJOR_TEXT = 3
+MAJOR_ARRAY = 4
+MAJOR_MAP = 5
+MAJOR_TAG = 6
+MAJOR_SIMPLE = 7
+
+BREAK = b"\xff"
+NULL = b"\xf6"
+INDEFINITE_ARRAY = b"\x9f"
+
+# longer arrays are encoded with indefinite length by `cardano-binary`
+MAX_DEFINITE_ARRAY_LEN = 23
+
+
+class CBORError(ValueError):
+    pass
+
+
+def encode_head(major: int, value: int) -> bytes:
+    """Encode head of a data item - the major type and argument (value, length or tag)."""
+    if value < 24:
+        return bytes([major << 5 | value])
+    for info, size in ((24, 1), (25, 2), (26, 4), (27, 8)):
+        if value < 1 << (8 * size):
+            return bytes([major << 5 | info]) + value.to_bytes(size, "big")
+    raise CBORError(f"Value '{value}' is too big to be encoded in CBOR head.")
+
+
+def encode_array(items: Iterable[bytes], indefinite_allowed: bool = True) -> bytes:
+    """Encode array of already encoded items.
+
+    As in `cardano-binary`, arrays with more than 23 items are encoded with indefinite length.
+    """
+    items = list(items)
+    if indefinite_allowed and len(items) > MAX_DEFINITE_ARRAY_LEN:
+        return b"".join((INDEFINITE_ARRAY, *items, BREAK))
+    return b"".join((encode_head(MAJOR_ARRAY, len(items)), *items))
+
+
+def encode_list(items: Iterable[bytes]) -> bytes:
+    """Encode Haskell list of already encoded items, always with indefinite length.
+
+    This is how `cardano-binary` encodes Haskell lists (as opposed to other foldables).
+    """
+    return b"".join((INDEFINITE_ARRAY, *items, BREAK))
+
+
+def encode_map(items: Iterable[bytes]) -> bytes:
+    """Encode map of already encoded key and value pairs (key and value concatenated)."""
+    items = list(items)
+    return b"".join((encode_head(MAJOR_MAP, len(items)), *items))
+
+
+def read_head(data: bytes, offset: int = 0) -> Tuple[int, Optional[int], int]:
+    """Return major type, argument (None for indefinite length) and offset after the head."""
+    try:
+        initial = data[offset]
+    except IndexError:
+        raise CBORError("Unexpected end of CBOR data.") from None
+
+    major, info = initial >> 5, initial & 0x1F
+    offset += 1
+    if info < 24:
+        return major, info, offset
+    if info <= 27:
+        size = 1 << (info - 24)
+        if offset + size > len(data):
+            raise CBORError("Unexpected end of CBOR data.")
+        return major, int.from_bytes(data[offset : offset + size], "big"), offset + size
+    if info == 31 and major in (MAJOR_BYTES, MAJOR_TEXT, MAJOR_ARRAY, MAJOR_MAP):
+        return major, None, offset
+    raise CBORError(f"Invalid CBOR initial byte '{initial:#x}' at offset {offset - 1}.")
+
+
+def get_item_end(data: bytes, offset: int = 0) -> int:
+    """Return offset right after the end of the data item starting at `offset`."""
+    major, arg, offset = read_head(data, offset)
+
+    if major in (MAJOR_UINT, MAJOR_NEGINT, MAJOR_SIMPLE):
+        return offset
+    if major == MAJOR_TAG:
+        return get_item_end(data, offset)
+
+    if arg is None:
+        # indefinite length; items (or chunks of a string) follow until the "break" byte
+        while data[offset : offset + 1] != BREAK:
+            offset = get_item_end(data, offset)
+        return offset + 1
+
+    if major in (MAJOR_BYTES, MAJOR_TEXT):
+        end: int = offset + arg
+        if end > len(data):
+            raise CBORError("Unexpected end of CBOR data.")
+        return end
+
+    for __ in range(arg if major == MAJOR_ARRAY else 2 * arg):
+        offset = get_item_end(data, offset)
+    return offset
+
+
+def split_array(data: bytes, offset: int = 0) -> List[bytes]:
+    """Split CBOR array starting at `offset` into a list of raw encoded items."""
+    major, arg, offset = read_head(data, offset)
+    if major != MAJOR_ARRAY:
+        raise CBORError(f"Expected CBOR array, got major type {major}.")
+
+    items: List[bytes] = []
+    while len(items) != arg:
+        if arg is None and data[offset : offset + 1] == BREAK:
+            break
+        end = get_item_end(data, offset)
+        items.append(data[offset:end])
+        offset = end
+    return items
+
+
+def split_map(data: bytes, offset: int = 0) -> List[Tuple[bytes, bytes]]:
+    """Split CBOR map starting at `offset` into a list of raw encoded key and value pairs."""
+    major, arg, offset = read_head(data, offset)
+    if major != MAJOR_MAP:
+        raise CBORError(f"Expected CBOR map, got major type {major}.")
+
+    items: List[Tuple[bytes, bytes]] = []
+    while len(items) != arg:
+        if arg is None and data[offset : offset + 1] == BREAK:
+            break
+        key_end = get_item_end(data, offset)
+        value_end = get_item_end(data, key_end)
+        items.append((data[offset:key_end], data[key_end:value_end]))
+        offset = value_end
+    return items
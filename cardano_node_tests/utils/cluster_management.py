@@ -12,7 +12,9 @@ from pathlib import Path
 from typing import Any
 from typing import Dict
 from typing import Iterator
+from typing import List
 from typing import Optional
+from typing import Tuple
 
 import pytest
 from _pytest.config import Config
@@ -22,9 +24,11 @@ from cardano_clusterlib import clusterlib
 from cardano_node_tests.utils import cluster_nodes
 from cardano_node_tests.utils import cluster_scripts
 from cardano_node_tests.utils import clusterlib_cli_coverage
+from cardano_node_tests.utils import clusterlib_utils
 from cardano_node_tests.utils import configuration
 from cardano_node_tests.utils import helpers
 from cardano_node_tests.utils import logfiles
+from cardano_node_tests.utils import tx_fees
 from cardano_node_tests.utils.types import UnpackableSequence
 
 LOGGER = logging.getLogger(__name__)
@@ -92,6 +96,7 @@ class ClusterManagerCache:
     test_data: dict = dataclasses.field(default_factory=dict)
     addrs_data: dict = dataclasses.field(default_factory=dict)
     last_checksum: str = ""
+    log_watcher: Optional[logfiles.LogWatcher] = None
 
 
 @dataclasses.dataclass
@@ -219,6 +224,26 @@ class ClusterManager:
                 cluster_obj=cluster_obj, pytest_config=self.pytest_config
             )
 
+    def return_worker_faucet_shards(self) -> None:
+        """Return funds from faucet shards of this pytest worker back to the faucets.
+
+        Must be done when session of the worker is about to finish, while the cluster instances
+        are still running.
+        """
+        self._log("called `return_worker_faucet_shards`")
+        worker_cache = self.get_cache()
+        for cache_instance in worker_cache.values():
+            cluster_obj = cache_instance.cluster_obj
+            if not cluster_obj:
+                continue
+
+            try:
+                clusterlib_utils.return_funds_from_faucet_shards(
+                    cluster_obj=cluster_obj, destination_dir=self.pytest_tmp_dir
+                )
+            except Exception as exc:
+                LOGGER.error(f"While returning funds from faucet shards: {exc}")
+
     def stop_all_clusters(self) -> None:
         """Stop all cluster instances."""
         self._log("called `stop_all_clusters`")
@@ -276,44 +301,64 @@ class ClusterManager:
         if container.value != cached_value:
             self.cache.test_data[curline_hash] = container.value
 
+    def _get_logfiles_errors(self) -> List[Tuple[Path, str]]:
+        """Return errors found in cluster logfiles while the test was running."""
+        log_watcher = self.cache.log_watcher
+        if not log_watcher:
+            return logfiles.search_cluster_artifacts()
+
+        # the log files were searched in background, pausing the watcher searches just the lines
+        # written since the last search
+        log_watcher.pause()
+        return log_watcher.get_errors()
+
+    def _cleanup_status_files(self) -> None:
+        """Remove status files created by the worker for the finished test.
+
+        Needs to be called while having the global lock.
+        """
+        # remove resource locking files created by the worker
+        resource_locking_files = list(
+            self.instance_dir.glob(f"{RESOURCE_LOCKED_GLOB}_*_{self.worker_id}")
+        )
+        for f in resource_locking_files:
+            os.remove(f)
+
+        # remove "resource in use" files created by the worker
+        resource_in_use_files = list(
+            self.instance_dir.glob(f"{RESOURCE_IN_USE_GLOB}_*_{self.worker_id}")
+        )
+        for f in resource_in_use_files:
+            os.remove(f)
+
+        # remove file that indicates that a test is running on the worker
+        try:
+            os.remove(self.instance_dir / f"{TEST_RUNNING_GLOB}_{self.worker_id}")
+        except FileNotFoundError:
+            pass
+
+        # remove file that indicates the test was singleton
+        try:
+            os.remove(self.instance_dir / TEST_SINGLETON_FILE)
+        except FileNotFoundError:
+            pass
+
     def on_test_stop(self) -> None:
         """Perform actions after the test finished."""
         if self._cluster_instance == -1:
             return
 
+        # Get errors found in cluster logfiles. Nothing time consuming can go under the global
+        # lock, so this is done before the lock is acquired. The "test running" status file still
+        # exists at this point, so the cluster instance cannot be restarted in the meantime.
+        errors = self._get_logfiles_errors()
+
         with helpers.FileLockIfXdist(self.cluster_lock):
             self._log(f"c{self.cluster_instance}: called `on_test_stop`")
+            self._cleanup_status_files()
 
-            # remove resource locking files created by the worker
-            resource_locking_files = list(
-                self.instance_dir.glob(f"{RESOURCE_LOCKED_GLOB}_*_{self.worker_id}")
-            )
-            for f in resource_locking_files:
-                os.remove(f)
-
-            # remove "resource in use" files created by the worker
-            resource_in_use_files = list(
-                self.instance_dir.glob(f"{RESOURCE_IN_USE_GLOB}_*_{self.worker_id}")
-            )
-            for f in resource_in_use_files:
-                os.remove(f)
-
-            # remove file that indicates that a test is running on the worker
-            try:
-                os.remove(self.instance_dir / f"{TEST_RUNNING_GLOB}_{self.worker_id}")
-            except FileNotFoundError:
-                pass
-
-            # remove file that indicates the test was singleton
-            try:
-                os.remove(self.instance_dir / TEST_SINGLETON_FILE)
-            except FileNotFoundError:
-                pass
-
-            # search for errors in cluster logfiles
-            errors = logfiles.search_cluster_artifacts()
-            if errors:
-                logfiles.report_artifacts_errors(errors)
+        if errors:
+            logfiles.report_artifacts_errors(errors)
 
     def get(
         self,
@@ -552,12 +597,24 @@ class _ClusterGetter:
 
         # save CLI coverage collected by the old `cluster_obj` instance
         self._save_cli_coverage()
+        # faucet shards of the old cluster instance are not usable anymore
+        clusterlib_utils.forget_faucet_shards(state_dir=state_dir)
+        # protocol parameters of the old cluster instance are not valid anymore
+        tx_fees.forget_fee_params(state_dir=state_dir)
         # replace the old `cluster_obj` instance and reload data
         self.cm.cache.cluster_obj = cluster_nodes.get_cluster_type().get_cluster_obj()
         self.cm.cache.test_data = {}
         self.cm.cache.addrs_data = cluster_nodes.load_addrs_data()
         self.cm.cache.last_checksum = addrs_data_checksum
 
+    def _resume_log_watcher(self, state_dir: Path) -> None:
+        """Start searching log files of the selected cluster instance for errors in background."""
+        log_watcher = self.cm.cache.log_watcher
+        if not log_watcher:
+            log_watcher = logfiles.LogWatcher(state_dir=state_dir)
+            self.cm.cache.log_watcher = log_watcher
+        log_watcher.resume()
+
     def _reuse_dev_cluster(self) -> clusterlib.ClusterLib:
         """Reuse cluster that was already started outside of test framework."""
         instance_num = 0
@@ -581,6 +638,8 @@ class _ClusterGetter:
         # check if it is necessary to reload data
         self._reload_cluster_obj(state_dir=state_dir)
 
+        self._resume_log_watcher(state_dir=state_dir)
+
         return cluster_obj
 
     def get(  # noqa: C901
@@ -960,6 +1019,8 @@ class _ClusterGetter:
                 state_dir = cluster_nodes.get_cluster_env().state_dir
                 self._reload_cluster_obj(state_dir=state_dir)
 
+                self._resume_log_watcher(state_dir=state_dir)
+
                 cluster_obj = self.cm.cache.cluster_obj
                 if not cluster_obj:
                     cluster_obj = cluster_nodes.get_cluster_type().get_cluster_obj()
@@ -169,6 +169,7 @@ class LocalCluster(ClusterType):
             amount=6_000_000_000_000,
             destination_dir=destination_dir,
             force=True,
+            use_shards=False,
         )
 
         return addrs_data
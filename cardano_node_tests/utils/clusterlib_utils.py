@@ -1,22 +1,64 @@
+import datetime
+import functools
 import itertools
 import json
 import logging
+import math
+import os
+import subprocess
+import tempfile
 import time
 from pathlib import Path
 from typing import Any
+from typing import Dict
+from typing import Iterable
 from typing import List
 from typing import NamedTuple
 from typing import Optional
+from typing import Tuple
 from typing import Union
 
-import cbor2
 from cardano_clusterlib import clusterlib
 
+from cardano_node_tests.utils import coin_selection
+from cardano_node_tests.utils import configuration
 from cardano_node_tests.utils import helpers
+from cardano_node_tests.utils import json_stream
+from cardano_node_tests.utils import key_pool
+from cardano_node_tests.utils import keys
+from cardano_node_tests.utils import simple_scripts
+from cardano_node_tests.utils import tx_decoder
+from cardano_node_tests.utils import tx_fees
+from cardano_node_tests.utils import tx_signing
 from cardano_node_tests.utils.types import FileType
 
 LOGGER = logging.getLogger(__name__)
 
+# max number of addresses queried in a single `query utxo` call
+UTXO_QUERY_BATCH = 100
+
+# faucet shard is topped up with this fraction of the faucet balance
+FAUCET_SHARD_FRACTION = 20
+# funds left in faucet shard for paying fees
+FAUCET_SHARD_RESERVE = 5_000_000
+# faucet shards of the current pytest worker, keyed by cluster state dir and faucet address
+_FAUCET_SHARDS: Dict[Tuple[str, str], clusterlib.AddressRecord] = {}
+FAUCET_SHARDS_DIR = "faucet_shards"
+# max number of outputs of a transaction paying coalesced funding requests
+FUNDING_MAX_TXOUTS = 100
+# funding requests older than this number of seconds are considered abandoned
+FUNDING_REQUEST_MAX_AGE = 3600
+
+# space in a transaction for everything else than inputs (outputs, fee, TTL, witness, etc.)
+TX_SIZE_RESERVE = 1000
+
+# parts of ledger state we don't have any use for; it's a huge amount of data
+LEDGER_STATE_EXCLUDE = ("*.esLState",)
+# ledger state snapshots are cached for this fraction of an epoch
+LEDGER_STATE_CACHE_BUCKETS = 20
+# max size of ledger state cache of a cluster instance, in bytes
+LEDGER_STATE_CACHE_MAX_SIZE = 200 * 1024 * 1024
+
 
 class UpdateProposal(NamedTuple):
     arg: str
@@ -61,6 +103,160 @@ def deregister_stake_addr(
     return tx_raw_output
 
 
+def get_utxo_multi(
+    cluster_obj: clusterlib.ClusterLib, addresses: Iterable[str], coins: Iterable[str] = ()
+) -> List[clusterlib.UTXOData]:
+    """Return UTxO info for multiple payment addresses.
+
+    The addresses are queried in batches of `UTXO_QUERY_BATCH` addresses per one CLI call.
+
+    Args:
+        cluster_obj: An instance of `clusterlib.ClusterLib`.
+        addresses: Payment addresses.
+        coins: A list (iterable) of coin names (asset IDs).
+
+    Returns:
+        List[clusterlib.UTXOData]: A list of UTxO data.
+    """
+    addresses = list(dict.fromkeys(addresses))
+    utxo = []
+    for batch_start in range(0, len(addresses), UTXO_QUERY_BATCH):
+        addr_args = itertools.chain.from_iterable(
+            ("--address", a) for a in addresses[batch_start : batch_start + UTXO_QUERY_BATCH]
+        )
+        utxo_dict = json.loads(
+            cluster_obj.query_cli(["utxo", *addr_args, "--out-file", "/dev/stdout"])
+        )
+
+        for utxo_rec, utxo_data in utxo_dict.items():
+            utxo_hash, utxo_ix = utxo_rec.split("#")
+            address = utxo_data["address"]
+            for policyid, coin_data in utxo_data["value"].items():
+                if policyid == clusterlib.DEFAULT_COIN:
+                    utxo.append(
+                        clusterlib.UTXOData(
+                            utxo_hash=utxo_hash,
+                            utxo_ix=int(utxo_ix),
+                            amount=coin_data,
+                            address=address,
+                            coin=clusterlib.DEFAULT_COIN,
+                        )
+                    )
+                    continue
+                for asset_name, amount in coin_data.items():
+                    utxo.append(
+                        clusterlib.UTXOData(
+                            utxo_hash=utxo_hash,
+                            utxo_ix=int(utxo_ix),
+                            amount=amount,
+                            address=address,
+                            coin=f"{policyid}.{asset_name}" if asset_name else policyid,
+                        )
+                    )
+
+    coins = set(coins)
+    if coins:
+        return [u for u in utxo if u.coin in coins]
+
+    return utxo
+
+
+def get_balances(
+    cluster_obj: clusterlib.ClusterLib,
+    addresses: Iterable[str],
+    coin: str = clusterlib.DEFAULT_COIN,
+) -> Dict[str, int]:
+    """Get total balances of multiple addresses, using as few CLI calls as possible.
+
+    Args:
+        cluster_obj: An instance of `clusterlib.ClusterLib`.
+        addresses: Payment addresses.
+        coin: A coin name (asset ID).
+
+    Returns:
+        Dict[str, int]: A dictionary of total balance for each address, addresses without any
+            UTxO have zero balance.
+    """
+    addresses = list(addresses)
+    balances = dict.fromkeys(addresses, 0)
+    for u in get_utxo_multi(cluster_obj=cluster_obj, addresses=addresses, coins=[coin]):
+        # the address in the query output doesn't need to be in the same form as the requested one
+        if u.address in balances:
+            balances[u.address] += u.amount
+    return balances
+
+
+def select_txins(
+    cluster_obj: clusterlib.ClusterLib,
+    src_address: str,
+    txouts: clusterlib.OptionalTxOuts,
+    tx_files: Optional[clusterlib.TxFiles] = None,
+    fee: Optional[int] = None,
+    deposit: Optional[int] = None,
+    withdrawals: clusterlib.OptionalTxOuts = (),
+    mint: clusterlib.OptionalTxOuts = (),
+    utxos: Optional[List[clusterlib.UTXOData]] = None,
+    required_utxos: clusterlib.OptionalUTXOData = (),
+    strategy: str = coin_selection.Strategies.LARGEST_FIRST,
+    max_txins: Optional[int] = None,
+    tx_size_reserve: int = TX_SIZE_RESERVE,
+) -> coin_selection.CoinSelection:
+    """Select UTxOs of the source address that cover outputs, fee and deposit.
+
+    The inputs are selected so they fit into the max transaction size, with `tx_size_reserve`
+    bytes left for the rest of the transaction. Unless `fee` is specified, the selected funds
+    cover fee for the `tx_size_reserve` bytes and for the witnesses of `tx_files`. The fee for
+    bytes taken by the selected inputs is always added by the coin selection. When there's any
+    change, the Lovelace change is at least the `minUTxOValue` protocol parameter.
+
+    Args:
+        cluster_obj: An instance of `clusterlib.ClusterLib`.
+        src_address: An address used for inputs.
+        txouts: A list (iterable) of `TxOuts`, specifying transaction outputs.
+        tx_files: A `TxFiles` tuple containing files needed for the transaction (optional).
+        fee: A fee amount, without the fee for inputs (optional).
+        deposit: A deposit amount needed by the transaction (optional).
+        withdrawals: A list (iterable) of `TxOuts`, specifying reward withdrawals (optional).
+        mint: A list (iterable) of `TxOuts`, specifying minted tokens (optional).
+        utxos: A list of `UTXOData` to select from, instead of UTxOs of `src_address` (optional).
+        required_utxos: An iterable of `UTXOData` that are always selected (optional).
+        strategy: A coin selection strategy, see `coin_selection.Strategies` (optional).
+        max_txins: A max number of inputs (optional).
+        tx_size_reserve: A space in bytes for everything else than inputs (optional).
+
+    Returns:
+        coin_selection.CoinSelection: A tuple with selected UTxOs and details of the selection.
+    """
+    # pylint: disable=too-many-arguments
+    tx_files = tx_files or clusterlib.TxFiles()
+    fee_params = tx_fees.get_fee_params(cluster_obj)
+    if fee is None:
+        fee = tx_fees.estimate_fee_bare(
+            fee_params=fee_params,
+            tx_size=tx_size_reserve,
+            witness_count=len(tx_files.signing_key_files),
+        )
+    if deposit is None:
+        deposit = cluster_obj.get_tx_deposit(tx_files=tx_files)
+    if utxos is None:
+        utxos = cluster_obj.get_utxo(src_address)
+
+    return coin_selection.select_utxos(
+        utxos=utxos,
+        txouts=txouts,
+        fee=fee,
+        deposit=deposit,
+        withdrawals=withdrawals,
+        mint=mint,
+        required_utxos=required_utxos,
+        strategy=strategy,
+        max_txins=max_txins,
+        max_txins_size=fee_params.max_tx_size - tx_size_reserve,
+        fee_per_byte=fee_params.fee_per_byte,
+        min_utxo_value=fee_params.min_utxo_value,
+    )
+
+
 def fund_from_genesis(
     *dst_addrs: str,
     cluster_obj: clusterlib.ClusterLib,
@@ -69,10 +265,9 @@ def fund_from_genesis(
     destination_dir: FileType = ".",
 ) -> None:
     """Send `amount` from genesis addr to all `dst_addrs`."""
+    balances = get_balances(cluster_obj=cluster_obj, addresses=dst_addrs)
     fund_dst = [
-        clusterlib.TxOut(address=d, amount=amount)
-        for d in dst_addrs
-        if cluster_obj.get_address_balance(d) < amount
+        clusterlib.TxOut(address=d, amount=amount) for d in dst_addrs if balances[d] < amount
     ]
     if not fund_dst:
         return
@@ -108,6 +303,11 @@ def return_funds_to_faucet(
 
     The amount of "-1" means all available funds.
     """
+    # return funds to faucet shard of this worker, if there's one
+    faucet_shard = _FAUCET_SHARDS.get((str(cluster_obj.state_dir), faucet_addr))
+    if faucet_shard:
+        faucet_addr = faucet_shard.address
+
     tx_name = tx_name or helpers.get_timestamped_rand_str()
     tx_name = f"{tx_name}_return_funds"
     with helpers.FileLockIfXdist(f"{helpers.get_basetemp()}/{faucet_addr}.lock"):
@@ -131,6 +331,236 @@ def return_funds_to_faucet(
             logging.disable(logging.NOTSET)
 
 
+def _write_json_atomic(out_file: Path, content: Any) -> None:
+    """Write JSON file so that readers never see partially written content."""
+    tmp_file = out_file.parent / f".{out_file.name}.tmp"
+    with open(tmp_file, "w", encoding="utf-8") as out_json:
+        json.dump(content, out_json)
+    os.replace(tmp_file, out_file)
+
+
+def send_funds_coalesced(
+    cluster_obj: clusterlib.ClusterLib,
+    src_rec: clusterlib.AddressRecord,
+    destinations: List[clusterlib.TxOut],
+    tx_name: str,
+    destination_dir: FileType = ".",
+) -> str:
+    """Send funds from `src_rec`, coalesced with pending requests of other pytest workers.
+
+    Every request is queued as a file. The worker that acquires the lock of the source address
+    pays all the queued requests (up to `FUNDING_MAX_TXOUTS` outputs) in a single transaction
+    and writes the result for each request. Requests that arrive while the transaction is being
+    submitted are paid together in the next transaction, so the more workers wait for the lock,
+    the more requests are paid by a single transaction.
+
+    Args:
+        cluster_obj: An instance of `clusterlib.ClusterLib`.
+        src_rec: An `AddressRecord` of the source address.
+        destinations: A list of `TxOut`s to pay.
+        tx_name: A name of the transaction.
+        destination_dir: A path to directory for storing artifacts (optional).
+
+    Returns:
+        str: A path to the body file of the transaction that paid the request.
+    """
+    queue_dir = helpers.get_basetemp() / f"funding_queue_{src_rec.address}"
+    queue_dir.mkdir(exist_ok=True)
+
+    req_id = f"{helpers.get_timestamped_rand_str()}_{os.getpid()}"
+    req_file = queue_dir / f"{req_id}.req"
+    res_file = queue_dir / f"{req_id}.res"
+    _write_json_atomic(req_file, [(d.address, d.amount) for d in destinations])
+
+    while not res_file.exists():
+        with helpers.FileLockIfXdist(f"{helpers.get_basetemp()}/{src_rec.address}.lock"):
+            # the request could be paid by another worker while waiting for the lock
+            if res_file.exists():
+                break
+            # the request could be dropped as abandoned by another worker
+            if not req_file.exists():
+                raise clusterlib.CLIError(f"The funding request '{req_file}' was dropped.")
+
+            # select queued requests, in the order they were made
+            batch: List[Tuple[Path, List[clusterlib.TxOut]]] = []
+            num_txouts = 0
+            for queued_file in sorted(queue_dir.glob("*.req")):
+                # drop requests left behind by workers that are no longer running
+                if (
+                    queued_file != req_file
+                    and time.time() - queued_file.stat().st_mtime > FUNDING_REQUEST_MAX_AGE
+                ):
+                    os.remove(queued_file)
+                    continue
+                with open(queued_file, encoding="utf-8") as in_json:
+                    queued_txouts = [
+                        clusterlib.TxOut(address=a, amount=v) for a, v in json.load(in_json)
+                    ]
+                if batch and num_txouts + len(queued_txouts) > FUNDING_MAX_TXOUTS:
+                    break
+                batch.append((queued_file, queued_txouts))
+                num_txouts += len(queued_txouts)
+
+            # if paying the whole batch fails, pay each request separately, so a single
+            # invalid request doesn't affect the other requests
+            sub_batches = [batch] if len(batch) == 1 else [batch, *([b] for b in batch)]
+            try:
+                for sub_idx, sub_batch in enumerate(sub_batches):
+                    sub_tx_name = f"{tx_name}_coalesced{sub_idx}" if len(batch) > 1 else tx_name
+                    LOGGER.debug(
+                        f"Paying {len(sub_batch)} funding request(s) in single transaction."
+                    )
+                    try:
+                        tx_raw_output = cluster_obj.send_funds(
+                            src_address=src_rec.address,
+                            destinations=list(
+                                itertools.chain.from_iterable(b[1] for b in sub_batch)
+                            ),
+                            tx_name=sub_tx_name,
+                            tx_files=clusterlib.TxFiles(signing_key_files=[src_rec.skey_file]),
+                            destination_dir=destination_dir,
+                        )
+                        result = {"out_file": str(tx_raw_output.out_file)}
+                    except clusterlib.CLIError as exc:
+                        if len(sub_batch) > 1:
+                            continue
+                        result = {"error": str(exc)}
+
+                    for queued_file, __ in sub_batch:
+                        _write_json_atomic(queued_file.with_suffix(".res"), result)
+                        os.remove(queued_file)
+                    if len(sub_batch) > 1:
+                        break
+            finally:
+                # don't leave unpaid requests of the batch in the queue when paying failed
+                # unexpectedly, the workers that made them would wait for the result forever
+                for queued_file, __ in batch:
+                    if not queued_file.exists():
+                        continue
+                    if queued_file == req_file:
+                        # the exception is propagated to the caller
+                        os.remove(queued_file)
+                        continue
+                    _write_json_atomic(
+                        queued_file.with_suffix(".res"),
+                        {"error": "Paying the funding request failed unexpectedly."},
+                    )
+                    os.remove(queued_file)
+
+    with open(res_file, encoding="utf-8") as in_json:
+        result = json.load(in_json)
+    os.remove(res_file)
+
+    if "error" in result:
+        raise clusterlib.CLIError(result["error"])
+    return str(result["out_file"])
+
+
+def get_faucet_shard(
+    cluster_obj: clusterlib.ClusterLib, faucet_data: dict
+) -> clusterlib.AddressRecord:
+    """Return faucet shard of the current pytest worker, create it if needed.
+
+    The faucet shard is an address owned by a single pytest worker. It is used instead of
+    the faucet, so the workers don't need to wait for each other when funding addresses.
+    The shard is topped up from the faucet when it runs low (see `_top_up_faucet_shard`).
+    """
+    faucet_addr = faucet_data["payment"].address
+    shard_key = (str(cluster_obj.state_dir), faucet_addr)
+    faucet_shard = _FAUCET_SHARDS.get(shard_key)
+    if faucet_shard:
+        return faucet_shard
+
+    worker_id = os.environ.get("PYTEST_XDIST_WORKER") or "master"
+    shard_dir = cluster_obj.state_dir / FAUCET_SHARDS_DIR
+    shard_name = f"shard_{faucet_addr[-10:]}_{worker_id}"
+    addr_file = shard_dir / f"{shard_name}.addr"
+
+    if addr_file.exists():
+        faucet_shard = clusterlib.AddressRecord(
+            address=clusterlib.read_address_from_file(addr_file),
+            vkey_file=shard_dir / f"{shard_name}.vkey",
+            skey_file=shard_dir / f"{shard_name}.skey",
+        )
+    else:
+        shard_dir.mkdir(parents=True, exist_ok=True)
+        faucet_shard = cluster_obj.gen_payment_addr_and_keys(
+            name=shard_name, destination_dir=shard_dir
+        )
+
+    _FAUCET_SHARDS[shard_key] = faucet_shard
+    return faucet_shard
+
+
+def forget_faucet_shards(state_dir: Path) -> None:
+    """Forget faucet shards of the cluster instance, e.g. when the cluster instance was respun.
+
+    The shards are not usable after respin, as the funds were lost with the old chain.
+    """
+    for shard_key in [k for k in _FAUCET_SHARDS if k[0] == str(state_dir)]:
+        del _FAUCET_SHARDS[shard_key]
+
+
+def return_funds_from_faucet_shards(
+    cluster_obj: clusterlib.ClusterLib, destination_dir: FileType = "."
+) -> None:
+    """Return all funds from faucet shards of the current pytest worker back to the faucets.
+
+    Called at the end of pytest session, so the funds are not stuck in the shards.
+    """
+    state_dir = str(cluster_obj.state_dir)
+    for (shard_state_dir, faucet_addr), faucet_shard in list(_FAUCET_SHARDS.items()):
+        if shard_state_dir != state_dir:
+            continue
+
+        LOGGER.debug(f"Returning funds from faucet shard '{faucet_shard.address}'.")
+        with helpers.FileLockIfXdist(f"{helpers.get_basetemp()}/{faucet_shard.address}.lock"):
+            # don't mind if there's nothing to return
+            try:
+                cluster_obj.send_funds(
+                    src_address=faucet_shard.address,
+                    destinations=[clusterlib.TxOut(address=faucet_addr, amount=-1)],
+                    tx_name=f"{Path(faucet_shard.skey_file).stem}_return_funds",
+                    tx_files=clusterlib.TxFiles(signing_key_files=[faucet_shard.skey_file]),
+                    destination_dir=destination_dir,
+                )
+            except clusterlib.CLIError as exc:
+                LOGGER.warning(f"Failed to return funds from faucet shard: {exc}")
+
+        del _FAUCET_SHARDS[(shard_state_dir, faucet_addr)]
+
+
+def _top_up_faucet_shard(
+    cluster_obj: clusterlib.ClusterLib,
+    faucet_data: dict,
+    faucet_shard: clusterlib.AddressRecord,
+    amount: int,
+    tx_name: str,
+    destination_dir: FileType = ".",
+) -> None:
+    """Top up the faucet shard from the faucet if it has less than `amount` available.
+
+    Needs to be called with the faucet shard lock held.
+    """
+    amount += FAUCET_SHARD_RESERVE
+    if cluster_obj.get_address_balance(faucet_shard.address) >= amount:
+        return
+
+    # take a share of the faucet, so the shard doesn't need to be topped up too often
+    faucet_rec: clusterlib.AddressRecord = faucet_data["payment"]
+    faucet_balance = cluster_obj.get_address_balance(faucet_rec.address)
+    topup_amount = max(amount, faucet_balance // FAUCET_SHARD_FRACTION)
+    LOGGER.debug(f"Topping up faucet shard '{faucet_shard.address}' with {topup_amount}.")
+
+    send_funds_coalesced(
+        cluster_obj=cluster_obj,
+        src_rec=faucet_rec,
+        destinations=[clusterlib.TxOut(address=faucet_shard.address, amount=topup_amount)],
+        tx_name=f"{tx_name}_shard_topup",
+        destination_dir=destination_dir,
+    )
+
+
 def fund_from_faucet(
     *dst_addrs: Union[clusterlib.AddressRecord, clusterlib.PoolUser],
     cluster_obj: clusterlib.ClusterLib,
@@ -139,51 +569,225 @@ def fund_from_faucet(
     tx_name: Optional[str] = None,
     destination_dir: FileType = ".",
     force: bool = False,
+    use_shards: bool = True,
 ) -> None:
-    """Send `amount` from faucet addr to all `dst_addrs`."""
+    """Send `amount` from faucet addr to all `dst_addrs`.
+
+    When running with multiple pytest workers, the funds are sent from faucet shard of the
+    current worker (see `get_faucet_shard`), unless `use_shards` is False.
+    """
     # get payment AddressRecord out of PoolUser
     dst_addr_records: List[clusterlib.AddressRecord] = [
         (r.payment if hasattr(r, "payment") else r) for r in dst_addrs  # type: ignore
     ]
 
-    fund_dst = [
-        clusterlib.TxOut(address=d.address, amount=amount)
-        for d in dst_addr_records
-        if force or cluster_obj.get_address_balance(d.address) < amount
-    ]
+    if force:
+        fund_dst = [clusterlib.TxOut(address=d.address, amount=amount) for d in dst_addr_records]
+    else:
+        balances = get_balances(
+            cluster_obj=cluster_obj, addresses=[d.address for d in dst_addr_records]
+        )
+        fund_dst = [
+            clusterlib.TxOut(address=d.address, amount=amount)
+            for d in dst_addr_records
+            if balances[d.address] < amount
+        ]
     if not fund_dst:
         return
 
-    src_address = faucet_data["payment"].address
-    with helpers.FileLockIfXdist(f"{helpers.get_basetemp()}/{src_address}.lock"):
-        tx_name = tx_name or helpers.get_timestamped_rand_str()
-        tx_name = f"{tx_name}_funding"
-        fund_tx_files = clusterlib.TxFiles(signing_key_files=[faucet_data["payment"].skey_file])
+    tx_name = tx_name or helpers.get_timestamped_rand_str()
+    faucet_rec: clusterlib.AddressRecord = faucet_data["payment"]
 
-        cluster_obj.send_funds(
-            src_address=src_address,
+    # the faucet is shared by all workers, coalesce the request with requests of other workers
+    if not (use_shards and helpers.IS_XDIST):
+        send_funds_coalesced(
+            cluster_obj=cluster_obj,
+            src_rec=faucet_rec,
             destinations=fund_dst,
+            tx_name=f"{tx_name}_funding",
+            destination_dir=destination_dir,
+        )
+        return
+
+    # when running with multiple workers, fund from the faucet shard of this worker
+    shard_rec = get_faucet_shard(cluster_obj=cluster_obj, faucet_data=faucet_data)
+    with helpers.FileLockIfXdist(f"{helpers.get_basetemp()}/{shard_rec.address}.lock"):
+        _top_up_faucet_shard(
+            cluster_obj=cluster_obj,
+            faucet_data=faucet_data,
+            faucet_shard=shard_rec,
+            amount=sum(d.amount for d in fund_dst),
             tx_name=tx_name,
+            destination_dir=destination_dir,
+        )
+
+        fund_tx_files = clusterlib.TxFiles(signing_key_files=[shard_rec.skey_file])
+        cluster_obj.send_funds(
+            src_address=shard_rec.address,
+            destinations=fund_dst,
+            tx_name=f"{tx_name}_funding",
             tx_files=fund_tx_files,
             destination_dir=destination_dir,
         )
 
 
+def _create_payment_addr_record(
+    name: str,
+    cluster_obj: clusterlib.ClusterLib,
+    stake_vkey_file: Optional[FileType] = None,
+    destination_dir: FileType = ".",
+) -> clusterlib.AddressRecord:
+    """Create new payment address in-process, take the keys from the key pool when available."""
+    key_pair = key_pool.checkout_key_pair(
+        kind="payment", name=name, destination_dir=destination_dir
+    ) or keys.gen_key_pair(key_name=name, destination_dir=destination_dir)
+    return keys.build_payment_addr_record(
+        name=name,
+        cluster_obj=cluster_obj,
+        key_pair=key_pair,
+        stake_vkey_file=stake_vkey_file,
+        destination_dir=destination_dir,
+    )
+
+
+def _create_stake_addr_record(
+    name: str,
+    cluster_obj: clusterlib.ClusterLib,
+    destination_dir: FileType = ".",
+) -> clusterlib.AddressRecord:
+    """Create new stake address in-process, take the keys from the key pool when available."""
+    key_pair = key_pool.checkout_key_pair(
+        kind="stake", name=name, destination_dir=destination_dir
+    ) or keys.gen_key_pair(
+        key_name=name, key_type=keys.KeyTypes.STAKE, destination_dir=destination_dir
+    )
+    return keys.build_stake_addr_record(
+        name=name, cluster_obj=cluster_obj, key_pair=key_pair, destination_dir=destination_dir
+    )
+
+
+def _check_files_not_exist(cluster_obj: clusterlib.ClusterLib, *out_files: Path) -> None:
+    """Check that the output files don't exist yet, the same way as `clusterlib` does."""
+    if cluster_obj.overwrite_outfiles:
+        return
+    for out_file in out_files:
+        if out_file.exists():
+            raise clusterlib.CLIError(f"The expected file `{out_file}` already exist.")
+
+
+def _run_cli_batch(
+    cluster_obj: clusterlib.ClusterLib, cli_args_list: List[List[str]], max_workers: int
+) -> None:
+    """Run independent `cardano-cli` commands concurrently, at most `max_workers` at a time."""
+    commands = []
+    for cli_args in cli_args_list:
+        cmd = ["cardano-cli", *cli_args]
+        cluster_obj.record_cli_coverage(cmd)
+        commands.append(" ".join(cmd))
+    if commands:
+        helpers.run_commands(commands, max_workers=max_workers)
+
+
+def _create_addr_records_cli(
+    names: List[str],
+    kind: str,
+    cluster_obj: clusterlib.ClusterLib,
+    stake_vkey_files: Optional[List[Optional[FileType]]] = None,
+    destination_dir: FileType = ".",
+    max_workers: int = helpers.RUN_COMMANDS_WORKERS,
+) -> List[clusterlib.AddressRecord]:
+    """Create new payment or stake addresses using `cardano-cli`.
+
+    Keys are taken from the key pool when available. All the missing keys are generated first,
+    then all the addresses are built. The `cardano-cli` commands of each step run concurrently,
+    at most `max_workers` at a time.
+    """
+    # pylint: disable=too-many-locals
+    destination_dir = Path(destination_dir).expanduser()
+    cli_group = "address" if kind == "payment" else "stake-address"
+    suffix = key_pool.KEY_KINDS[kind].suffix
+
+    key_pairs = []
+    keygen_args = []
+    for name in names:
+        key_pair = key_pool.checkout_key_pair(kind=kind, name=name, destination_dir=destination_dir)
+        if not key_pair:
+            key_pair = clusterlib.KeyPair(
+                vkey_file=destination_dir / f"{name}{suffix}.vkey",
+                skey_file=destination_dir / f"{name}{suffix}.skey",
+            )
+            _check_files_not_exist(cluster_obj, Path(key_pair.vkey_file), Path(key_pair.skey_file))
+            keygen_args.append(
+                [
+                    cli_group,
+                    "key-gen",
+                    "--verification-key-file",
+                    str(key_pair.vkey_file),
+                    "--signing-key-file",
+                    str(key_pair.skey_file),
+                ]
+            )
+        key_pairs.append(key_pair)
+    _run_cli_batch(cluster_obj=cluster_obj, cli_args_list=keygen_args, max_workers=max_workers)
+
+    addr_files = [destination_dir / f"{name}{suffix}.addr" for name in names]
+    _check_files_not_exist(cluster_obj, *addr_files)
+    build_args = []
+    for idx, (key_pair, addr_file) in enumerate(zip(key_pairs, addr_files)):
+        if kind == "payment":
+            vkey_args = ["--payment-verification-key-file", str(key_pair.vkey_file)]
+            stake_vkey_file = stake_vkey_files[idx] if stake_vkey_files else None
+            if stake_vkey_file:
+                vkey_args.extend(["--stake-verification-key-file", str(stake_vkey_file)])
+        else:
+            vkey_args = ["--stake-verification-key-file", str(key_pair.vkey_file)]
+        build_args.append(
+            [cli_group, "build", *cluster_obj.magic_args, *vkey_args, "--out-file", str(addr_file)]
+        )
+    _run_cli_batch(cluster_obj=cluster_obj, cli_args_list=build_args, max_workers=max_workers)
+
+    return [
+        clusterlib.AddressRecord(
+            address=clusterlib.read_address_from_file(addr_file),
+            vkey_file=key_pair.vkey_file,
+            skey_file=key_pair.skey_file,
+        )
+        for key_pair, addr_file in zip(key_pairs, addr_files)
+    ]
+
+
 def create_payment_addr_records(
     *names: str,
     cluster_obj: clusterlib.ClusterLib,
     stake_vkey_file: Optional[FileType] = None,
     destination_dir: FileType = ".",
+    max_workers: int = helpers.RUN_COMMANDS_WORKERS,
 ) -> List[clusterlib.AddressRecord]:
-    """Create new payment address(es)."""
-    addrs = [
-        cluster_obj.gen_payment_addr_and_keys(
-            name=name,
-            stake_vkey_file=stake_vkey_file,
+    """Create new payment address(es).
+
+    Keys are taken from the key pool when available, otherwise they are generated - in-process
+    when `configuration.NATIVE_KEYS` is set, otherwise using `cardano-cli`, running at most
+    `max_workers` commands at a time.
+    """
+    if configuration.NATIVE_KEYS:
+        addrs = [
+            _create_payment_addr_record(
+                name=name,
+                cluster_obj=cluster_obj,
+                stake_vkey_file=stake_vkey_file,
+                destination_dir=destination_dir,
+            )
+            for name in names
+        ]
+    else:
+        addrs = _create_addr_records_cli(
+            names=list(names),
+            kind="payment",
+            cluster_obj=cluster_obj,
+            stake_vkey_files=[stake_vkey_file] * len(names),
             destination_dir=destination_dir,
+            max_workers=max_workers,
         )
-        for name in names
-    ]
 
     LOGGER.debug(f"Created {len(addrs)} payment address(es)")
     return addrs
@@ -193,12 +797,29 @@ def create_stake_addr_records(
     *names: str,
     cluster_obj: clusterlib.ClusterLib,
     destination_dir: FileType = ".",
+    max_workers: int = helpers.RUN_COMMANDS_WORKERS,
 ) -> List[clusterlib.AddressRecord]:
-    """Create new stake address(es)."""
-    addrs = [
-        cluster_obj.gen_stake_addr_and_keys(name=name, destination_dir=destination_dir)
-        for name in names
-    ]
+    """Create new stake address(es).
+
+    Keys are taken from the key pool when available, otherwise they are generated - in-process
+    when `configuration.NATIVE_KEYS` is set, otherwise using `cardano-cli`, running at most
+    `max_workers` commands at a time.
+    """
+    if configuration.NATIVE_KEYS:
+        addrs = [
+            _create_stake_addr_record(
+                name=name, cluster_obj=cluster_obj, destination_dir=destination_dir
+            )
+            for name in names
+        ]
+    else:
+        addrs = _create_addr_records_cli(
+            names=list(names),
+            kind="stake",
+            cluster_obj=cluster_obj,
+            destination_dir=destination_dir,
+            max_workers=max_workers,
+        )
 
     LOGGER.debug(f"Created {len(addrs)} stake address(es)")
     return addrs
@@ -208,26 +829,59 @@ def create_pool_users(
     cluster_obj: clusterlib.ClusterLib,
     name_template: str,
     no_of_addr: int = 1,
+    max_workers: int = helpers.RUN_COMMANDS_WORKERS,
 ) -> List[clusterlib.PoolUser]:
-    """Create PoolUsers."""
-    pool_users = []
-    payment_addrs = []
-    for i in range(no_of_addr):
-        # create key pairs and addresses
-        stake_addr_rec = create_stake_addr_records(
-            f"{name_template}_addr{i}", cluster_obj=cluster_obj
-        )[0]
-        payment_addr_rec = create_payment_addr_records(
-            f"{name_template}_addr{i}",
+    """Create PoolUsers.
+
+    The stake addresses of all the pool users are created first, as they are needed for creating
+    the payment addresses. When using `cardano-cli`, at most `max_workers` commands run at a time.
+    """
+    names = [f"{name_template}_addr{i}" for i in range(no_of_addr)]
+    # create key pairs and addresses
+    stake_addr_recs = create_stake_addr_records(
+        *names, cluster_obj=cluster_obj, max_workers=max_workers
+    )
+    if configuration.NATIVE_KEYS:
+        payment_addr_recs = [
+            _create_payment_addr_record(
+                name=name, cluster_obj=cluster_obj, stake_vkey_file=stake_rec.vkey_file
+            )
+            for name, stake_rec in zip(names, stake_addr_recs)
+        ]
+    else:
+        payment_addr_recs = _create_addr_records_cli(
+            names=names,
+            kind="payment",
             cluster_obj=cluster_obj,
-            stake_vkey_file=stake_addr_rec.vkey_file,
-        )[0]
-        # create pool user struct
-        pool_user = clusterlib.PoolUser(payment=payment_addr_rec, stake=stake_addr_rec)
-        payment_addrs.append(payment_addr_rec)
-        pool_users.append(pool_user)
+            stake_vkey_files=[r.vkey_file for r in stake_addr_recs],
+            max_workers=max_workers,
+        )
+
+    # create pool user structs
+    return [
+        clusterlib.PoolUser(payment=payment_rec, stake=stake_rec)
+        for payment_rec, stake_rec in zip(payment_addr_recs, stake_addr_recs)
+    ]
 
-    return pool_users
+
+def gen_vrf_key_pair(
+    cluster_obj: clusterlib.ClusterLib, node_name: str, destination_dir: FileType = "."
+) -> clusterlib.KeyPair:
+    """Generate a key pair for a node VRF operational key, or take it from the key pool."""
+    return key_pool.checkout_key_pair(
+        kind="vrf", name=node_name, destination_dir=destination_dir
+    ) or cluster_obj.gen_vrf_key_pair(node_name=node_name, destination_dir=destination_dir)
+
+
+def gen_cold_key_pair_and_counter(
+    cluster_obj: clusterlib.ClusterLib, node_name: str, destination_dir: FileType = "."
+) -> clusterlib.ColdKeyPair:
+    """Generate a cold key pair and a certificate issue counter, or take them from the key pool."""
+    return key_pool.checkout_cold_key_pair(
+        name=node_name, destination_dir=destination_dir
+    ) or cluster_obj.gen_cold_key_pair_and_counter(
+        node_name=node_name, destination_dir=destination_dir
+    )
 
 
 def wait_for_stake_distribution(cluster_obj: clusterlib.ClusterLib) -> dict:
@@ -369,6 +1023,73 @@ def update_params(
                 )
 
 
+def witness_and_assemble_tx(
+    cluster_obj: clusterlib.ClusterLib,
+    tx_body_file: FileType,
+    signing_key_files: Iterable[FileType],
+    tx_name: str,
+    destination_dir: FileType = ".",
+    max_workers: int = helpers.RUN_COMMANDS_WORKERS,
+) -> Path:
+    """Create a witness for each signing key and assemble the signed transaction.
+
+    The witnesses are created in-process when `configuration.NATIVE_SIGNING` is set, otherwise
+    concurrently using `cardano-cli`, at most `max_workers` at a time. The transaction is
+    assembled using `cardano-cli`.
+
+    Args:
+        cluster_obj: An instance of `clusterlib.ClusterLib`.
+        tx_body_file: A path to file with transaction body.
+        signing_key_files: A list of paths to signing key files, one witness is created for each.
+        tx_name: A name of the transaction.
+        destination_dir: A path to directory for storing artifacts (optional).
+        max_workers: Max number of `cardano-cli` processes running at a time (optional).
+
+    Returns:
+        Path: A path to signed transaction file.
+    """
+    if configuration.NATIVE_SIGNING:
+        witness_files = tx_signing.witness_tx_files(
+            tx_body_file=tx_body_file,
+            signing_key_files=signing_key_files,
+            tx_name=tx_name,
+            destination_dir=destination_dir,
+        )
+    else:
+        destination_dir = Path(destination_dir).expanduser()
+        skey_files = list(signing_key_files)
+        # the same file names as the names of witness files created by `tx_signing`
+        witness_files = [
+            destination_dir / f"{tx_name}_skey{idx}_tx.witness" for idx in range(len(skey_files))
+        ]
+        _check_files_not_exist(cluster_obj, *witness_files)
+        _run_cli_batch(
+            cluster_obj=cluster_obj,
+            cli_args_list=[
+                [
+                    "transaction",
+                    "witness",
+                    "--tx-body-file",
+                    str(tx_body_file),
+                    "--out-file",
+                    str(witness_file),
+                    *cluster_obj.magic_args,
+                    "--signing-key-file",
+                    str(skey_file),
+                ]
+                for skey_file, witness_file in zip(skey_files, witness_files)
+            ],
+            max_workers=max_workers,
+        )
+
+    return cluster_obj.assemble_tx(
+        tx_body_file=tx_body_file,
+        witness_files=witness_files,
+        tx_name=tx_name,
+        destination_dir=destination_dir,
+    )
+
+
 def mint_or_burn_witness(
     cluster_obj: clusterlib.ClusterLib,
     new_tokens: List[TokenRecord],
@@ -393,7 +1114,8 @@ def mint_or_burn_witness(
         clusterlib.TxOut(address=t.token_mint_addr.address, amount=t.amount, coin=t.token)
         for t in new_tokens
     ]
-    fee = cluster_obj.calculate_tx_fee(
+    fee = tx_fees.calculate_tx_fee(
+        cluster_obj=cluster_obj,
         src_address=src_address,
         tx_name=temp_template,
         tx_files=tx_files,
@@ -411,20 +1133,11 @@ def mint_or_burn_witness(
         mint=mint,
     )
 
-    # create witness file for each required key
-    witness_files = [
-        cluster_obj.witness_tx(
-            tx_body_file=tx_raw_output.out_file,
-            witness_name=f"{temp_template}_skey{idx}",
-            signing_key_files=[skey],
-        )
-        for idx, skey in enumerate(issuers_skey_files)
-    ]
-
-    # sign TX using witness files
-    tx_witnessed_file = cluster_obj.assemble_tx(
+    # sign TX using witness file for each required key
+    tx_witnessed_file = witness_and_assemble_tx(
+        cluster_obj=cluster_obj,
         tx_body_file=tx_raw_output.out_file,
-        witness_files=witness_files,
+        signing_key_files=issuers_skey_files,
         tx_name=temp_template,
     )
 
@@ -458,7 +1171,8 @@ def mint_or_burn_sign(
         clusterlib.TxOut(address=t.token_mint_addr.address, amount=t.amount, coin=t.token)
         for t in new_tokens
     ]
-    fee = cluster_obj.calculate_tx_fee(
+    fee = tx_fees.calculate_tx_fee(
+        cluster_obj=cluster_obj,
         src_address=src_address,
         tx_name=temp_template,
         tx_files=tx_files,
@@ -473,7 +1187,8 @@ def mint_or_burn_sign(
         fee=fee,
         mint=mint,
     )
-    out_file_signed = cluster_obj.sign_tx(
+    sign_tx = tx_signing.sign_tx if configuration.NATIVE_SIGNING else cluster_obj.sign_tx
+    out_file_signed = sign_tx(
         tx_body_file=tx_raw_output.out_file,
         signing_key_files=tx_files.signing_key_files,
         tx_name=temp_template,
@@ -495,13 +1210,11 @@ def new_tokens(
 ) -> List[TokenRecord]:
     """Mint new token, sign using skeys."""
     # create simple script
-    keyhash = cluster_obj.get_payment_vkey_hash(issuer_addr.vkey_file)
-    script_content = {"keyHash": keyhash, "type": "sig"}
-    script = Path(f"{temp_template}.script")
-    with open(f"{temp_template}.script", "w") as out_json:
-        json.dump(script_content, out_json)
+    script = simple_scripts.build_sig_script(
+        script_name=temp_template, payment_vkey_file=issuer_addr.vkey_file
+    )
 
-    policyid = cluster_obj.get_policyid(script)
+    policyid = simple_scripts.get_policyid(script)
 
     tokens_to_mint = []
     for asset_name in asset_names:
@@ -536,37 +1249,167 @@ def new_tokens(
     return tokens_to_mint
 
 
+def _get_ledger_state_cmd(cluster_obj: clusterlib.ClusterLib) -> List[str]:
+    return [
+        "cardano-cli",
+        "query",
+        "ledger-state",
+        *cluster_obj.magic_args,
+        f"--{cluster_obj.protocol}-mode",
+    ]
+
+
+def query_ledger_state(
+    cluster_obj: clusterlib.ClusterLib,
+    paths: Iterable[str] = (),
+    exclude: Iterable[str] = LEDGER_STATE_EXCLUDE,
+) -> dict:
+    """Query ledger state and extract only selected parts of it.
+
+    The output of `query ledger-state` is parsed incrementally as it is read from the CLI,
+    so only the requested parts of the (possibly huge) ledger state are kept in memory.
+
+    Args:
+        cluster_obj: An instance of `clusterlib.ClusterLib`.
+        paths: Dot separated paths to extract, e.g. "stateBefore.esSnapshots" (optional,
+            the whole ledger state by default).
+        exclude: Dot separated paths to leave out (optional, "stateBefore.esLState" by default).
+
+    Returns:
+        dict: The ledger state containing only the requested paths.
+    """
+    cmd = _get_ledger_state_cmd(cluster_obj)
+    LOGGER.debug("Running `%s`", " ".join(cmd))
+
+    # stderr is not read until the CLI finishes, it must not block the CLI when it fills the pipe
+    with tempfile.TemporaryFile(mode="w+") as stderr_file, subprocess.Popen(
+        cmd, stdout=subprocess.PIPE, stderr=stderr_file, universal_newlines=True
+    ) as proc:
+        assert proc.stdout
+        extract_err: Optional[json_stream.JSONStreamError] = None
+        try:
+            ledger_state = json_stream.extract(stream=proc.stdout, paths=paths, exclude=exclude)
+        except json_stream.JSONStreamError as exc:
+            # the CLI error takes precedence, if any
+            extract_err = exc
+
+        if extract_err is None and paths and proc.poll() is None:
+            # all the requested paths were found, the rest of the output is not needed
+            proc.kill()
+            proc.wait()
+            return ledger_state or {}
+
+        proc.stdout.read()
+        if proc.wait() != 0:
+            stderr_file.seek(0)
+            stderr = stderr_file.read()
+            raise clusterlib.CLIError(
+                f"An error occurred running a CLI command `{' '.join(cmd)}`: {stderr}"
+            )
+
+    if extract_err is not None:
+        raise extract_err
+    return ledger_state or {}
+
+
 def filtered_ledger_state(
     cluster_obj: clusterlib.ClusterLib,
 ) -> str:
     """Get filtered output of `query ledger-state`."""
-    cardano_cmd = " ".join(
-        [
-            "cardano-cli",
-            "query",
-            "ledger-state",
-            *cluster_obj.magic_args,
-            f"--{cluster_obj.protocol}-mode",
-        ]
-    )
     # get rid of a huge amount of data we don't have any use for
-    cmd = (
-        f"{cardano_cmd} | jq -n --stream -c "
-        "'fromstream(inputs|select((length == 2 and .[0][1] == \"esLState\")|not))'"
-    )
+    return json.dumps(query_ledger_state(cluster_obj=cluster_obj))
+
+
+def _get_ledger_state_cache_key(cluster_obj: clusterlib.ClusterLib) -> Tuple[int, int]:
+    """Return epoch and bucket of slots of the current tip."""
+    tip = cluster_obj.get_tip()
+    bucket_slots = max(1, cluster_obj.epoch_length // LEDGER_STATE_CACHE_BUCKETS)
+    return int(tip["epoch"]), int(tip["slot"]) // bucket_slots
+
+
+def _evict_ledger_state_cache(cache_dir: Path, keep: Path) -> None:
+    """Remove oldest cached snapshots so the cache doesn't exceed the max size."""
+    snapshots = sorted(cache_dir.glob("ledger_state_*.json"), key=lambda p: p.stat().st_mtime)
+    cache_size = sum(p.stat().st_size for p in snapshots)
+    for snapshot in snapshots:
+        if cache_size <= LEDGER_STATE_CACHE_MAX_SIZE:
+            break
+        if snapshot == keep:
+            continue
+        cache_size -= snapshot.stat().st_size
+        snapshot.unlink()
+
+
+def _read_ledger_state_file(ledger_state_file: Path, paths: Iterable[str]) -> dict:
+    with open(ledger_state_file, encoding="utf-8") as in_json:
+        ledger_state: dict = json_stream.extract(stream=in_json, paths=paths)
+    return ledger_state
 
-    return helpers.run_command(cmd, shell=True).decode("utf-8").strip()
+
+def _get_cached_ledger_state(cluster_obj: clusterlib.ClusterLib, paths: Iterable[str]) -> dict:
+    """Return ledger state from snapshot for the current tip, create the snapshot if needed.
+
+    The snapshot is shared by all pytest workers using the same cluster instance. If the tip
+    moved to next epoch or bucket of slots while the snapshot was being created, the queried
+    ledger state is returned, but it is not cached.
+    """
+    cache_dir = cluster_obj.state_dir / "ledger_state_cache"
+    cache_dir.mkdir(exist_ok=True)
+
+    epoch, bucket = _get_ledger_state_cache_key(cluster_obj)
+    cache_file = cache_dir / f"ledger_state_{epoch}_{bucket}.json"
+    try:
+        return _read_ledger_state_file(ledger_state_file=cache_file, paths=paths)
+    except FileNotFoundError:
+        pass
+
+    with helpers.FileLockIfXdist(f"{cache_dir}/ledger_state_cache.lock"):
+        # the snapshot might have been created by another worker while waiting for the lock
+        try:
+            return _read_ledger_state_file(ledger_state_file=cache_file, paths=paths)
+        except FileNotFoundError:
+            pass
+
+        ledger_state = query_ledger_state(cluster_obj=cluster_obj)
+        # don't store data from later epoch or slots under the original key
+        if _get_ledger_state_cache_key(cluster_obj) == (epoch, bucket):
+            _write_json_atomic(cache_file, ledger_state)
+            _evict_ledger_state_cache(cache_dir=cache_dir, keep=cache_file)
+
+    paths = list(paths)
+    if not paths:
+        return ledger_state
+    selected_state: dict = json_stream.extract_str(json.dumps(ledger_state), paths=paths)
+    return selected_state
 
 
 def get_ledger_state(
     cluster_obj: clusterlib.ClusterLib,
+    paths: Iterable[str] = (),
+    fresh: bool = True,
 ) -> dict:
-    """Return the current ledger state info."""
-    f_ledger_state = filtered_ledger_state(cluster_obj)
-    if not f_ledger_state:
-        return {}
-    ledger_state: dict = json.loads(f_ledger_state)
-    return ledger_state
+    """Return the current ledger state info.
+
+    When `fresh` is False, the ledger state is read from a snapshot cached for the current epoch
+    and bucket of slots (1/`LEDGER_STATE_CACHE_BUCKETS` of an epoch), so the ledger state is not
+    queried and parsed repeatedly by parallel pytest workers. Use it only for data that doesn't
+    change within the bucket of slots, e.g. stake snapshots. Not for "possibleRewardUpdate",
+    the reward update is computed gradually during the epoch.
+
+    Args:
+        cluster_obj: An instance of `clusterlib.ClusterLib`.
+        paths: Dot separated paths to return, e.g. "possibleRewardUpdate.rs" (optional,
+            everything except "stateBefore.esLState" by default).
+        fresh: Whether to query the ledger state instead of using the cached snapshot (optional,
+            True by default).
+
+    Returns:
+        dict: The ledger state info.
+    """
+    if fresh:
+        return query_ledger_state(cluster_obj=cluster_obj, paths=paths)
+
+    return _get_cached_ledger_state(cluster_obj=cluster_obj, paths=paths)
 
 
 def save_ledger_state(
@@ -593,6 +1436,229 @@ def save_ledger_state(
     return json_file
 
 
+def _get_cred_hash(cred: dict) -> str:
+    """Return key hash or script hash of a credential record in ledger state."""
+    cred_hash: str = cred.get("key hash") or cred.get("script hash") or ""
+    return cred_hash
+
+
+class LedgerStateView:
+    """Indexed access to stake snapshots and reward updates in ledger state.
+
+    Records in ledger state are lists of pairs of credential and value. The view builds dict
+    indexes keyed by key hash (or script hash) on first access, so repeated lookups don't need
+    to scan the lists.
+    """
+
+    SNAPSHOTS = ("pstakeMark", "pstakeSet", "pstakeGo")
+
+    def __init__(self, ledger_state: dict) -> None:
+        self.ledger_state = ledger_state
+        self._indexes: Dict[Tuple[str, str], dict] = {}
+
+    @property
+    def es_snapshots(self) -> dict:
+        es_snapshots: dict = self.ledger_state["stateBefore"]["esSnapshots"]
+        return es_snapshots
+
+    def _check_snapshot(self, snapshot: str) -> None:
+        if snapshot not in self.SNAPSHOTS:
+            raise AssertionError(f"Unknown snapshot '{snapshot}', expected one of {self.SNAPSHOTS}")
+
+    def get_stake(self, snapshot: str) -> Dict[str, int]:
+        """Return stake amounts in the given snapshot (e.g. "pstakeMark"), keyed by key hash."""
+        self._check_snapshot(snapshot)
+        index_key = (snapshot, "stake")
+        if index_key not in self._indexes:
+            self._indexes[index_key] = {
+                _get_cred_hash(r[0]): r[1] for r in self.es_snapshots[snapshot]["stake"]
+            }
+        return self._indexes[index_key]
+
+    def get_delegations(self, snapshot: str) -> Dict[str, str]:
+        """Return pool IDs in the given snapshot (e.g. "pstakeMark"), keyed by key hash."""
+        self._check_snapshot(snapshot)
+        index_key = (snapshot, "delegations")
+        if index_key not in self._indexes:
+            self._indexes[index_key] = {
+                _get_cred_hash(r[0]): r[1] for r in self.es_snapshots[snapshot]["delegations"]
+            }
+        return self._indexes[index_key]
+
+    def get_rewards(self) -> Dict[str, int]:
+        """Return amounts of the possible reward update, keyed by key hash."""
+        index_key = ("possibleRewardUpdate", "rs")
+        if index_key not in self._indexes:
+            reward_update = self.ledger_state.get("possibleRewardUpdate") or {}
+            self._indexes[index_key] = {
+                _get_cred_hash(r[0]): sum(sr["rewardAmount"] for sr in r[1])
+                for r in reward_update.get("rs") or []
+            }
+        return self._indexes[index_key]
+
+
+class SlotClock:
+    """Compute slots and epochs timing locally, using genesis parameters.
+
+    The slot numbering follows `clusterlib` - `slots_offset` is the difference between number of
+    slots in Byron era and number of slots the Byron era would have with current slot length.
+    """
+
+    # minimal number of seconds between checks of the computed values against the node tip
+    VERIFY_INTERVAL = 60.0
+    # tolerance (fraction of a slot) of float rounding errors
+    SLOT_EPSILON = 1e-6
+
+    def __init__(
+        self,
+        system_start: float,
+        slot_length: float,
+        epoch_length: int,
+        slots_offset: int = 0,
+        cluster_obj: Optional[clusterlib.ClusterLib] = None,
+    ) -> None:
+        self.system_start = system_start
+        self.slot_length = slot_length
+        self.epoch_length = epoch_length
+        self.slots_offset = slots_offset
+        self.cluster_obj = cluster_obj
+
+        self._last_verified = 0.0
+        self._verified = True
+
+    @classmethod
+    def from_cluster(cls, cluster_obj: clusterlib.ClusterLib) -> "SlotClock":
+        """Create slot clock for the cluster using its genesis parameters.
+
+        The genesis file is read again, the genesis loaded by `cluster_obj` can be outdated
+        when the cluster instance was respun.
+        """
+        with open(cluster_obj.genesis_json, encoding="utf-8") as in_json:
+            genesis = json.load(in_json)
+        system_start = datetime.datetime.fromisoformat(
+            genesis["systemStart"].replace("Z", "+00:00")
+        ).timestamp()
+        return cls(
+            system_start=system_start,
+            slot_length=float(genesis["slotLength"]),
+            epoch_length=int(genesis["epochLength"]),
+            slots_offset=int(cluster_obj.slots_offset),
+            cluster_obj=cluster_obj,
+        )
+
+    def slot_at(self, timestamp: float) -> int:
+        """Return slot number at the given time."""
+        # slot length is not exactly representable as float (e.g. 0.2), make sure that the start
+        # of a slot is not rounded down to the previous slot
+        slots = math.floor((timestamp - self.system_start) / self.slot_length + self.SLOT_EPSILON)
+        return slots - self.slots_offset
+
+    def slot_time(self, slot: int) -> float:
+        """Return time when the slot starts."""
+        return self.system_start + (slot + self.slots_offset) * self.slot_length
+
+    def epoch_of_slot(self, slot: int) -> int:
+        """Return epoch number of the slot."""
+        return (slot + self.slots_offset) // self.epoch_length
+
+    def epoch_first_slot(self, epoch: int) -> int:
+        """Return number of the first slot of the epoch."""
+        return epoch * self.epoch_length - self.slots_offset
+
+    def epoch_time(self, epoch: int) -> float:
+        """Return time when the epoch starts."""
+        return self.slot_time(self.epoch_first_slot(epoch))
+
+    def current_slot(self) -> int:
+        """Return current slot number."""
+        return self.slot_at(time.time())
+
+    def current_epoch(self) -> int:
+        """Return current epoch number."""
+        return self.epoch_of_slot(self.current_slot())
+
+    def time_to_slot(self, slot: int) -> float:
+        """Return number of seconds until the start of the slot (negative if in the past)."""
+        return self.slot_time(slot) - time.time()
+
+    def sleep_until_slot(self, slot: int) -> None:
+        """Sleep until the start of the slot."""
+        to_sleep = self.time_to_slot(slot)
+        if to_sleep > 0:
+            time.sleep(to_sleep)
+
+    def sleep_until_epoch_interval(
+        self, start: float, stop: float, epoch: Optional[int] = None
+    ) -> int:
+        """Sleep until time interval within an epoch.
+
+        Args:
+            start: A start of the interval, in seconds since the start of the epoch.
+            stop: An end of the interval, in seconds since the start of the epoch.
+            epoch: An epoch number (optional, the current epoch by default).
+
+        Returns:
+            int: The epoch number.
+        """
+        if epoch is None:
+            epoch = self.current_epoch()
+
+        epoch_start = self.epoch_time(epoch)
+        if time.time() > epoch_start + stop:
+            raise AssertionError(
+                f"Cannot reach the given interval ({start}s to {stop}s) in epoch {epoch}"
+            )
+
+        to_sleep = epoch_start + start - time.time()
+        if to_sleep > 0:
+            time.sleep(to_sleep)
+
+        return epoch
+
+    def verify(self, force: bool = False) -> bool:
+        """Check the computed values against the node tip.
+
+        The node is queried at most once per `VERIFY_INTERVAL` seconds, unless `force` is True.
+        The last result is returned otherwise.
+        """
+        if not self.cluster_obj:
+            return True
+        if not force and time.time() - self._last_verified < self.VERIFY_INTERVAL:
+            return self._verified
+
+        tip = self.cluster_obj.get_tip()
+        tip_slot = int(tip["slot"])
+        tip_epoch = int(tip["epoch"])
+        self._last_verified = time.time()
+
+        # the tip is the last block, it can be behind the clock, but never ahead of it
+        self._verified = (
+            self.epoch_of_slot(tip_slot) == tip_epoch and tip_slot <= self.current_slot() + 1
+        )
+        if not self._verified:
+            LOGGER.warning(
+                f"The slot clock doesn't match node tip (slot {tip_slot}, epoch {tip_epoch}), "
+                f"current slot is {self.current_slot()}."
+            )
+        return self._verified
+
+
+@functools.lru_cache(maxsize=32)
+def _get_slot_clock_cached(cluster_obj: clusterlib.ClusterLib, genesis_mtime_ns: int) -> SlotClock:
+    """Get slot clock for the cluster, cached per version (mtime) of the genesis file."""
+    # pylint: disable=unused-argument
+    return SlotClock.from_cluster(cluster_obj)
+
+
+def get_slot_clock(cluster_obj: clusterlib.ClusterLib) -> SlotClock:
+    """Return slot clock for the cluster.
+
+    The slot clock is cached until the genesis file changes, i.e. until the cluster instance
+    is respun.
+    """
+    return _get_slot_clock_cached(cluster_obj, cluster_obj.genesis_json.stat().st_mtime_ns)
+
+
 def wait_for_epoch_interval(
     cluster_obj: clusterlib.ClusterLib, start: int, stop: int, force_epoch: bool = True
 ) -> None:
@@ -615,6 +1681,31 @@ def wait_for_epoch_interval(
             f"The 'start' ({start_abs}) needs to be lower than 'stop' ({stop_abs})"
         )
 
+    slot_clock = get_slot_clock(cluster_obj)
+    if slot_clock.verify():
+        now = time.time()
+        epoch = slot_clock.epoch_of_slot(slot_clock.slot_at(now))
+        s_from_epoch_start = now - slot_clock.epoch_time(epoch)
+
+        # if we are already after the required interval, wait for next epoch
+        if stop_abs < s_from_epoch_start:
+            if force_epoch:
+                raise AssertionError(
+                    f"Cannot reach the given interval ({start_abs}s to {stop_abs}s) in this epoch"
+                )
+            epoch += 1
+
+        slot_clock.sleep_until_epoch_interval(start=start_abs, stop=stop_abs, epoch=epoch)
+
+        # make sure the node already applied a block from the expected epoch
+        stop_time = slot_clock.epoch_time(epoch) + stop_abs
+        while cluster_obj.get_epoch() < epoch and time.time() < stop_time:
+            time.sleep(min(slot_clock.slot_length, 1))
+        if time.time() <= stop_time:
+            return
+        raise AssertionError(f"Failed to wait for given interval from {start_abs}s to {stop_abs}s")
+
+    # the slot clock doesn't match the node, use the node tip
     for __ in range(20):
         s_to_epoch_stop = cluster_obj.time_to_epoch_end()
         s_from_epoch_start = cluster_obj.epoch_length_sec - s_to_epoch_stop
@@ -651,18 +1742,4 @@ def get_amount(
 
 def load_tx_metadata(tx_body_file: Path) -> dict:
     """Load transaction metadata from file containing transaction body."""
-    with open(tx_body_file) as body_fp:
-        tx_body_json = json.load(body_fp)
-
-    cbor_body = bytes.fromhex(tx_body_json["cborHex"])
-    metadata = cbor2.loads(cbor_body)[2]
-
-    if not metadata:
-        return {}
-
-    try:
-        metadata_dict: dict = metadata[0]
-    except KeyError:
-        metadata_dict = metadata
-
-    return metadata_dict
+    return tx_decoder.read_tx(tx_body_file).metadata
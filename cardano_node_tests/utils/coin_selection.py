@@ -0,0 +1,349 @@
+"""Coin selection, i.e. selection of UTxOs that are used as transaction inputs.
+
+Implements the "largest-first" and "random-improve" strategies described in CIP-2. Records of
+`clusterlib.UTXOData` with the same UTxO ID (i.e. multi-asset UTxOs) are selected together.
+The selection is bounded by max number of inputs and by space available for the inputs in
+the transaction, and the fee for the space taken by the selected inputs is included in the
+amount of Lovelace that needs to be covered. When there's any change, the Lovelace change is
+at least the min UTxO value, so the change output is valid.
+"""
+import functools
+import heapq
+import random
+from typing import Dict
+from typing import Iterable
+from typing import List
+from typing import NamedTuple
+from typing import Optional
+from typing import Set
+from typing import Tuple
+
+from cardano_clusterlib import clusterlib
+
+from cardano_node_tests.utils import cbor_raw
+
+# size of CBOR encoded input with index < 65536 (array header, tx ID and index)
+MAX_TXIN_SIZE = 38
+
+# random-improve: the ideal and the max amount of selected funds as a multiple of needed funds
+IDEAL_TARGET_MULTIPLIER = 2
+MAX_TARGET_MULTIPLIER = 3
+
+
+class Strategies:
+    LARGEST_FIRST = "largest_first"
+    RANDOM_IMPROVE = "random_improve"
+
+
+class CoinSelectionError(ValueError):
+    pass
+
+
+class CoinSelection(NamedTuple):
+    txins: List[clusterlib.UTXOData]
+    value: Dict[str, int]  # total value of selected inputs
+    change: Dict[str, int]  # value that is left after paying outputs, fee and deposit
+    fee: int  # fee including the fee for the space taken by the selected inputs
+    txins_size: int
+    strategy: str  # strategy that was actually used, see `Strategies`
+
+
+class _UTxO(NamedTuple):
+    records: List[clusterlib.UTXOData]
+    value: Dict[str, int]
+    size: int
+
+
+@functools.lru_cache(maxsize=1024)
+def get_txin_size(utxo_ix: int) -> int:
+    """Return size of CBOR encoded transaction input."""
+    # array header + bytes header + tx ID + index
+    return 1 + 2 + 32 + len(cbor_raw.encode_head(cbor_raw.MAJOR_UINT, utxo_ix))
+
+
+def _get_value(records: List[clusterlib.UTXOData]) -> Dict[str, int]:
+    if len(records) == 1:
+        return {records[0].coin: records[0].amount}
+    value: Dict[str, int] = {}
+    for rec in records:
+        value[rec.coin] = value.get(rec.coin, 0) + rec.amount
+    return value
+
+
+def _group_utxos(utxos: Iterable[clusterlib.UTXOData]) -> List[_UTxO]:
+    """Group records of the same UTxO together."""
+    grouped: Dict[Tuple[str, int], List[clusterlib.UTXOData]] = {}
+    for rec in utxos:
+        grouped.setdefault((rec.utxo_hash, rec.utxo_ix), []).append(rec)
+    return [
+        _UTxO(records=r, value=_get_value(r), size=get_txin_size(r[0].utxo_ix))
+        for r in grouped.values()
+    ]
+
+
+def get_needed_value(
+    txouts: Iterable[clusterlib.TxOut],
+    fee: int = 0,
+    deposit: int = 0,
+    withdrawals: Iterable[clusterlib.TxOut] = (),
+    mint: Iterable[clusterlib.TxOut] = (),
+) -> Dict[str, int]:
+    """Return value that needs to be covered by transaction inputs."""
+    needed: Dict[str, int] = {clusterlib.DEFAULT_COIN: fee + deposit}
+    for rec in txouts:
+        needed[rec.coin] = needed.get(rec.coin, 0) + rec.amount
+    for rec in withdrawals:
+        needed[clusterlib.DEFAULT_COIN] -= rec.amount
+    for rec in mint:
+        needed[rec.coin] = needed.get(rec.coin, 0) - rec.amount
+    return needed
+
+
+class _Selection:
+    """Selected UTxOs and limits of the selection."""
+
+    def __init__(
+        self,
+        needed: Dict[str, int],
+        fee_per_byte: int,
+        max_txins: Optional[int],
+        max_txins_size: Optional[int],
+        min_utxo_value: int = 0,
+    ):
+        self.needed = needed
+        self.fee_per_byte = fee_per_byte
+        self.min_utxo_value = min_utxo_value
+        self.max_txins = max_txins
+        self.max_txins_size = max_txins_size
+
+        self.utxos: List[_UTxO] = []
+        self.selected_ids: Set[int] = set()
+        self.value: Dict[str, int] = {}
+        self.size = 0
+
+    def get_target(self, coin: str) -> int:
+        """Return amount of the coin that needs to be covered by the selected UTxOs."""
+        target = self.needed.get(coin, 0)
+        if coin == clusterlib.DEFAULT_COIN:
+            target += self.fee_per_byte * self.size
+        return target
+
+    def get_change(self) -> Dict[str, int]:
+        """Return value that is left after covering the needed value, including minted tokens."""
+        change: Dict[str, int] = {}
+        for coin in dict.fromkeys([*self.needed, *self.value]):
+            amount = self.value.get(coin, 0) - self.get_target(coin)
+            if amount:
+                change[coin] = amount
+        return change
+
+    def is_covered(self, coin: str) -> bool:
+        change = self.value.get(coin, 0) - self.get_target(coin)
+        if coin != clusterlib.DEFAULT_COIN or change < 0:
+            return change >= 0
+        # the change output needs at least min UTxO value, unless there's no change at all
+        return change >= self.min_utxo_value or not self.get_change()
+
+    def is_candidate(self, utxo: _UTxO, coin: str) -> bool:
+        """Check that the UTxO contains the coin and that it is not worth less than its fee."""
+        amount = utxo.value.get(coin)
+        if amount is None:
+            return False
+        # "dust" UTxOs with only Lovelace would increase the needed funds by more than they add
+        return (
+            coin != clusterlib.DEFAULT_COIN
+            or len(utxo.value) > 1
+            or (amount > self.fee_per_byte * utxo.size)
+        )
+
+    def is_selected(self, utxo: _UTxO) -> bool:
+        return id(utxo) in self.selected_ids
+
+    def fits(self, utxo: _UTxO) -> bool:
+        """Check that the UTxO can be added without exceeding the limits."""
+        if self.max_txins is not None and len(self.utxos) >= self.max_txins:
+            return False
+        if self.max_txins_size is not None and self.size + utxo.size > self.max_txins_size:
+            return False
+        return True
+
+    def add(self, utxo: _UTxO) -> None:
+        if not self.fits(utxo):
+            raise CoinSelectionError(
+                "Limit of number of inputs or of space for inputs reached, "
+                f"selected {len(self.utxos)} inputs of {self.size} bytes."
+            )
+        self.utxos.append(utxo)
+        self.selected_ids.add(id(utxo))
+        self.size += utxo.size
+        for coin, amount in utxo.value.items():
+            self.value[coin] = self.value.get(coin, 0) + amount
+
+
+def _get_coins_order(needed: Dict[str, int]) -> List[str]:
+    """Return coins that need to be covered, native tokens first and Lovelace last."""
+    tokens = sorted(c for c, a in needed.items() if a > 0 and c != clusterlib.DEFAULT_COIN)
+    return [*tokens, clusterlib.DEFAULT_COIN]
+
+
+def _select_largest_first(selection: _Selection, utxos: List[_UTxO]) -> None:
+    for coin in _get_coins_order(selection.needed):
+        if selection.is_covered(coin):
+            continue
+
+        # a heap is cheaper than sorting, only a small part of UTxOs is usually needed
+        heap = [
+            (-u.value[coin], idx)
+            for idx, u in enumerate(utxos)
+            if selection.is_candidate(utxo=u, coin=coin)
+        ]
+        heapq.heapify(heap)
+        while not selection.is_covered(coin):
+            if not heap:
+                raise CoinSelectionError(f"Insufficient funds of '{coin}'.")
+            __, idx = heapq.heappop(heap)
+            if not selection.is_selected(utxos[idx]):
+                selection.add(utxos[idx])
+
+
+def _pop_random(pool: List[int], rng: random.Random) -> int:
+    """Remove and return random item of the pool."""
+    idx = rng.randrange(len(pool))
+    pool[idx], pool[-1] = pool[-1], pool[idx]
+    return pool.pop()
+
+
+def _select_random_improve(selection: _Selection, utxos: List[_UTxO], rng: random.Random) -> None:
+    coins = _get_coins_order(selection.needed)
+    pools = {
+        c: [idx for idx, u in enumerate(utxos) if selection.is_candidate(utxo=u, coin=c)]
+        for c in coins
+    }
+
+    # random selection phase: select random UTxOs until the needed amount is covered
+    for coin in coins:
+        pool = pools[coin]
+        while not selection.is_covered(coin):
+            if not pool:
+                raise CoinSelectionError(f"Insufficient funds of '{coin}'.")
+            utxo = utxos[_pop_random(pool, rng)]
+            if not selection.is_selected(utxo):
+                selection.add(utxo)
+
+    # improvement phase: select more random UTxOs while the selected amount gets closer to
+    # the ideal amount, so the change can be used for similar transactions in the future
+    for coin in rng.sample(coins, k=len(coins)):
+        pool = pools[coin]
+        while pool:
+            utxo = utxos[_pop_random(pool, rng)]
+            if selection.is_selected(utxo):
+                continue
+
+            target = selection.get_target(coin)
+            ideal = IDEAL_TARGET_MULTIPLIER * target
+            current = selection.value.get(coin, 0)
+            new = current + utxo.value[coin]
+            if (
+                abs(ideal - new) >= abs(ideal - current)
+                or new > MAX_TARGET_MULTIPLIER * target
+                or not selection.fits(utxo)
+            ):
+                break
+            selection.add(utxo)
+
+        # the Lovelace target grows with each selected UTxO, make sure it is still covered
+        if not selection.is_covered(clusterlib.DEFAULT_COIN):
+            _select_largest_first(selection=selection, utxos=utxos)
+
+
+def select_utxos(
+    utxos: Iterable[clusterlib.UTXOData],
+    txouts: Iterable[clusterlib.TxOut],
+    fee: int = 0,
+    deposit: int = 0,
+    withdrawals: Iterable[clusterlib.TxOut] = (),
+    mint: Iterable[clusterlib.TxOut] = (),
+    required_utxos: Iterable[clusterlib.UTXOData] = (),
+    strategy: str = Strategies.LARGEST_FIRST,
+    max_txins: Optional[int] = None,
+    max_txins_size: Optional[int] = None,
+    fee_per_byte: int = 0,
+    min_utxo_value: int = 0,
+    rng: Optional[random.Random] = None,
+) -> CoinSelection:
+    """Select UTxOs that cover outputs, fee and deposit.
+
+    If the random-improve strategy reaches a limit, the largest-first strategy is used instead.
+
+    Args:
+        utxos: An iterable of `UTXOData`, specifying available UTxOs.
+        txouts: An iterable of `TxOuts`, specifying transaction outputs.
+        fee: A fee amount, without the fee for the space taken by inputs (optional).
+        deposit: A deposit amount needed by the transaction (optional).
+        withdrawals: An iterable of `TxOuts`, specifying reward withdrawals (optional).
+        mint: An iterable of `TxOuts`, specifying minted tokens (optional).
+        required_utxos: An iterable of `UTXOData`, specifying UTxOs that are always selected
+            (optional).
+        strategy: A coin selection strategy, see `Strategies` (optional).
+        max_txins: A max number of selected UTxOs (optional).
+        max_txins_size: A max size of CBOR encoded inputs in bytes (optional).
+        fee_per_byte: A fee for each byte taken by inputs, i.e. `txFeePerByte` (optional).
+        min_utxo_value: A min amount of Lovelace in the change, unless there's no change,
+            i.e. `minUTxOValue` (optional).
+        rng: An instance of `random.Random` used by the random-improve strategy (optional).
+
+    Returns:
+        CoinSelection: A tuple with selected UTxOs and details of the selection.
+    """
+    # pylint: disable=too-many-arguments
+    needed = get_needed_value(
+        txouts=txouts, fee=fee, deposit=deposit, withdrawals=withdrawals, mint=mint
+    )
+    required = _group_utxos(required_utxos)
+    required_ids = {(r.utxo_hash, r.utxo_ix) for u in required for r in u.records}
+    available = [
+        u
+        for u in _group_utxos(utxos)
+        if (u.records[0].utxo_hash, u.records[0].utxo_ix) not in required_ids
+    ]
+
+    def _new_selection() -> _Selection:
+        selection = _Selection(
+            needed=needed,
+            fee_per_byte=fee_per_byte,
+            max_txins=max_txins,
+            max_txins_size=max_txins_size,
+            min_utxo_value=min_utxo_value,
+        )
+        for utxo in required:
+            selection.add(utxo)
+        return selection
+
+    selection = _new_selection()
+    used_strategy = strategy
+    if strategy == Strategies.LARGEST_FIRST:
+        _select_largest_first(selection=selection, utxos=available)
+    elif strategy == Strategies.RANDOM_IMPROVE:
+        try:
+            _select_random_improve(selection=selection, utxos=available, rng=rng or random.Random())
+        except CoinSelectionError:
+            selection = _new_selection()
+            used_strategy = Strategies.LARGEST_FIRST
+            _select_largest_first(selection=selection, utxos=available)
+    else:
+        raise AssertionError(f"Unknown coin selection strategy: '{strategy}'")
+
+    # there's always a txin needed, if only for the fee
+    if not selection.utxos and available:
+        selection.add(max(available, key=lambda u: u.value.get(clusterlib.DEFAULT_COIN, 0)))
+        # the change can be lower than the min UTxO value now
+        _select_largest_first(selection=selection, utxos=available)
+
+    return CoinSelection(
+        txins=[r for u in selection.utxos for r in u.records],
+        value=selection.value,
+        change=selection.get_change(),
+        fee=fee + fee_per_byte * selection.size,
+        txins_size=selection.size,
+        strategy=used_strategy,
+    )
@@ -21,6 +21,15 @@ HAS_DBSYNC = bool(os.environ.get("DBSYNC_REPO"))
 
 DONT_OVERWRITE_OUTFILES = bool(os.environ.get("DONT_OVERWRITE_OUTFILES"))
 
+# directory with pool of pre-generated keys (see `prepare_key_pool.py`)
+KEY_POOL_DIR = os.environ.get("KEY_POOL_DIR") or ""
+
+# generate payment and stake keys and addresses in-process instead of using `cardano-cli`
+NATIVE_KEYS = bool(os.environ.get("NATIVE_KEYS"))
+
+# sign transactions and create transaction witnesses in-process instead of using `cardano-cli`
+NATIVE_SIGNING = bool(os.environ.get("NATIVE_SIGNING"))
+
 if BOOTSTRAP_DIR and NOPOOLS:
     TESTNET_SCRIPTS_DIR = "testnets_nopools"
 elif BOOTSTRAP_DIR:
@@ -13,6 +13,8 @@ from cardano_clusterlib import clusterlib
 
 from cardano_node_tests.utils import clusterlib_utils
 from cardano_node_tests.utils import configuration
+from cardano_node_tests.utils import tx_builder
+from cardano_node_tests.utils import tx_decoder
 
 LOGGER = logging.getLogger(__name__)
 
@@ -235,7 +237,11 @@ def check_tx(
     if not configuration.HAS_DBSYNC:
         return None
 
-    txhash = cluster_obj.get_txid(tx_body_file=tx_raw_output.out_file)
+    # compute the tx ID in-process when the tx era is supported, it's much faster than CLI
+    if (cluster_obj.tx_era or tx_builder.DEFAULT_TX_ERA) in tx_builder.TX_BODY_ENVELOPE_TYPES:
+        txhash = tx_decoder.get_txid(tx_raw_output.out_file)
+    else:
+        txhash = cluster_obj.get_txid(tx_body_file=tx_raw_output.out_file)
 
     # under load it might be necessary to wait a bit and retry the query
     if retry:
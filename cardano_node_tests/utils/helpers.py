@@ -1,4 +1,5 @@
 import argparse
+import concurrent.futures
 import contextlib
 import datetime
 import functools
@@ -19,13 +20,16 @@ from pathlib import Path
 from typing import Any
 from typing import Callable
 from typing import Dict
+from typing import Iterable
 from typing import Iterator
+from typing import List
 from typing import Optional
 
 from _pytest.config import Config
 from _pytest.tmpdir import TempdirFactory
 from filelock import FileLock
 
+from cardano_node_tests.utils import bech32
 from cardano_node_tests.utils.types import FileType
 
 # suppress messages from filelock
@@ -36,6 +40,8 @@ LOGGER = logging.getLogger(__name__)
 
 LAUNCH_PATH = Path(os.getcwd())
 GITHUB_URL = "https://github.com/input-output-hk/cardano-node-tests"
+# max number of commands running concurrently in `run_commands`
+RUN_COMMANDS_WORKERS = 8
 
 
 # Use dummy locking if not executing with multiple workers.
@@ -90,18 +96,77 @@ def ignore_interrupt() -> Iterator[None]:
         signal.signal(signal.SIGINT, orig_handler)
 
 
-def run_command(command: str, workdir: FileType = "", shell: bool = False) -> bytes:
-    """Run command."""
+def _get_cmd_env(env: Optional[Dict[str, str]]) -> Optional[Dict[str, str]]:
+    """Return environment for the command - current environment updated with `env`."""
+    if not env:
+        return None
+    return {**os.environ, **env}
+
+
+def run_command(
+    command: str,
+    workdir: FileType = "",
+    shell: bool = False,
+    env: Optional[Dict[str, str]] = None,
+    timeout: Optional[float] = None,
+) -> bytes:
+    """Run command.
+
+    The command runs in the `workdir` without changing CWD of the current process, so it is safe
+    to run commands from multiple threads.
+
+    Args:
+        command: A command to run.
+        workdir: A directory to run the command in (optional).
+        shell: A bool indicating whether to run the command in shell.
+        env: Environment variables to set for the command, in addition to the current
+            environment (optional).
+        timeout: A number of seconds after which the command is killed (optional).
+
+    Returns:
+        bytes: Standard output of the command.
+    """
     cmd = command if shell else command.split(" ")
-    if workdir:
-        with change_cwd(workdir):
-            p = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, shell=shell)
-    else:
-        p = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, shell=shell)
-    stdout, stderr = p.communicate()
+    try:
+        p = subprocess.run(
+            cmd,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            shell=shell,
+            cwd=workdir or None,
+            env=_get_cmd_env(env),
+            timeout=timeout,
+        )
+    except subprocess.TimeoutExpired as exc:
+        raise AssertionError(f"Timed out after {timeout} sec while running `{command}`.") from exc
     if p.returncode != 0:
-        raise AssertionError(f"An error occurred while running `{command}`: {stderr.decode()}")
-    return stdout
+        raise AssertionError(f"An error occurred while running `{command}`: {p.stderr.decode()}")
+    return p.stdout
+
+
+def run_commands(
+    commands: Iterable[str],
+    workdir: FileType = "",
+    shell: bool = False,
+    env: Optional[Dict[str, str]] = None,
+    timeout: Optional[float] = None,
+    max_workers: int = RUN_COMMANDS_WORKERS,
+) -> List[bytes]:
+    """Run independent commands concurrently, at most `max_workers` commands at a time.
+
+    See `run_command` for description of the arguments.
+
+    Returns:
+        List[bytes]: Standard outputs of the commands, in the order of the commands.
+    """
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [
+            executor.submit(
+                run_command, command=c, workdir=workdir, shell=shell, env=env, timeout=timeout
+            )
+            for c in commands
+        ]
+        return [f.result() for f in futures]
 
 
 def run_in_bash(command: str, workdir: FileType = "") -> bytes:
@@ -208,9 +273,9 @@ def write_json(location: FileType, content: dict) -> FileType:
     return location
 
 
-def decode_bech32(bech32: str) -> str:
+def decode_bech32(bech32_str: str) -> str:
     """Convert from bech32 strings."""
-    return run_command(f"echo '{bech32}' | bech32", shell=True).decode().strip()
+    return bech32.decode_hex(bech32_str)
 
 
 def check_dir_arg(dir_path: str) -> Optional[Path]:
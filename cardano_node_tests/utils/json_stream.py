@@ -0,0 +1,325 @@
+"""Incremental extraction of selected parts of a big JSON document.
+
+The document is read from a text stream in chunks. Only the requested paths are materialized,
+everything else is skipped without building Python objects and without keeping it in memory.
+
+Paths are given as dot separated object keys (e.g. "stateBefore.esSnapshots"). A "*" path
+segment matches any key.
+"""
+import io
+import itertools
+import json
+import re
+from typing import IO
+from typing import Any
+from typing import Iterable
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+
+_WHITESPACE = " \t\n\r"
+# end of a JSON string, starting right after the opening quote
+_STRING_END_RE = re.compile(r'[^"\\]*(?:\\.[^"\\]*)*"', re.DOTALL)
+# characters relevant for finding the end of an array or object
+_STRUCTURAL_RE = re.compile(r'["\[\]{}]')
+# complete JSON string
+_STRING_RE = re.compile(r'"[^"\\]*(?:\\.[^"\\]*)*"', re.DOTALL)
+_NON_BRACKET_RE = re.compile(r"[^\[\]{}]+")
+_BRACKET_DEPTH = {"[": 1, "{": 1, "]": -1, "}": -1}
+# JSON scalar other than string
+_SCALAR_RE = re.compile(r"[^,:\[\]{}\s]+")
+
+PathType = Tuple[str, ...]
+
+
+class JSONStreamError(ValueError):
+    pass
+
+
+def _split_paths(paths: Iterable[str]) -> List[PathType]:
+    return [tuple(p.split(".")) for p in paths if p]
+
+
+def _prefix_matches(pattern: PathType, path: PathType) -> bool:
+    """Check if `path` starts with `pattern`, "*" on either side matches any key."""
+    if len(pattern) > len(path):
+        return False
+    return all(p == k or "*" in (p, k) for p, k in zip(pattern, path))
+
+
+class _Extractor:
+    """Extract selected paths from a JSON document read from a stream."""
+
+    _SKIP = object()
+
+    def __init__(
+        self,
+        stream: IO[str],
+        include: List[PathType],
+        exclude: List[PathType],
+        chunk_size: int,
+    ) -> None:
+        self.stream = stream
+        self.include = include
+        self.exclude = exclude
+        self.include_set = set(include)
+        self.chunk_size = chunk_size
+
+        self.buf = ""
+        self.pos = 0
+        # start of the value that is being materialized; data before it can be discarded
+        self.mark: Optional[int] = None
+        self.eof = False
+
+        # number of paths that still needs to be found; the extraction can stop early once all
+        # of them are found, unless the paths contain wildcards
+        has_wildcard = any("*" in p for p in include)
+        self.remaining = -1 if (has_wildcard or not include) else len(self.include_set)
+
+    def _fill(self) -> bool:
+        """Read next chunk of data, discard data that are no longer needed."""
+        if self.eof:
+            return False
+
+        data = self.stream.read(self.chunk_size)
+        if not data:
+            self.eof = True
+            return False
+
+        keep_from = self.pos if self.mark is None else self.mark
+        self.buf = self.buf[keep_from:] + data
+        self.pos -= keep_from
+        if self.mark is not None:
+            self.mark -= keep_from
+        return True
+
+    def _peek(self) -> str:
+        """Skip whitespace and return the next character without consuming it."""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                raise JSONStreamError("Unexpected end of JSON data.")
+
+    def _expect(self, char: str) -> None:
+        found = self._peek()
+        if found != char:
+            raise JSONStreamError(f"Expected '{char}', found '{found}' at offset {self.pos}.")
+        self.pos += 1
+
+    def _skip_string(self) -> None:
+        """Move position after the end of the string starting at the current position."""
+        while True:
+            match = _STRING_END_RE.match(self.buf, self.pos + 1)
+            if match:
+                self.pos = match.end()
+                return
+            if not self._fill():
+                raise JSONStreamError("Unterminated JSON string.")
+
+    def _skip_scalar(self) -> None:
+        while True:
+            match = _SCALAR_RE.match(self.buf, self.pos)
+            if not match:
+                raise JSONStreamError(f"Invalid JSON value at offset {self.pos}.")
+            # the scalar may continue in the next chunk
+            if match.end() < len(self.buf) or not self._fill():
+                self.pos = match.end()
+                return
+
+    def _skip_bulk(self, depth: int) -> int:
+        """Skip the rest of the buffer at once, unless the container ends in it.
+
+        Returns the new depth, or 0 if the buffer was not skipped.
+        """
+        tail = _STRING_RE.sub("", self.buf[self.pos :])
+        end = len(self.buf)
+        # a string that continues in the next chunk
+        unterminated = tail.find('"')
+        if unterminated != -1:
+            end -= len(tail) - unterminated
+            tail = tail[:unterminated]
+
+        brackets = _NON_BRACKET_RE.sub("", tail)
+        depths = list(
+            itertools.accumulate(map(_BRACKET_DEPTH.__getitem__, brackets), initial=depth)
+        )
+        if min(depths) <= 0:
+            return 0
+
+        self.pos = end
+        return depths[-1]
+
+    def _skip_container(self) -> None:
+        depth = 0
+        try_bulk = True
+        while True:
+            if depth and try_bulk:
+                new_depth = self._skip_bulk(depth)
+                if new_depth:
+                    depth = new_depth
+                    if not self._fill():
+                        raise JSONStreamError("Unterminated JSON array or object.")
+                    continue
+                # the container ends in the buffer, find the exact position
+                try_bulk = False
+
+            match = _STRUCTURAL_RE.search(self.buf, self.pos)
+            if not match:
+                self.pos = len(self.buf)
+                if not self._fill():
+                    raise JSONStreamError("Unterminated JSON array or object.")
+                try_bulk = True
+                continue
+
+            self.pos = match.start()
+            char = match.group()
+            if char == '"':
+                self._skip_string()
+                continue
+
+            self.pos += 1
+            depth += _BRACKET_DEPTH[char]
+            if depth == 0:
+                return
+
+    def _skip_value(self) -> None:
+        char = self._peek()
+        if char == '"':
+            self._skip_string()
+        elif char in "[{":
+            self._skip_container()
+        else:
+            self._skip_scalar()
+
+    def _read_value(self) -> Any:
+        """Materialize the value starting at the current position."""
+        self._peek()
+        self.mark = self.pos
+        try:
+            self._skip_value()
+            return json.loads(self.buf[self.mark : self.pos])
+        except json.JSONDecodeError as exc:
+            raise JSONStreamError(f"Invalid JSON value: {exc}") from exc
+        finally:
+            self.mark = None
+
+    def _read_key(self) -> str:
+        if self._peek() != '"':
+            raise JSONStreamError(f"Expected object key at offset {self.pos}.")
+        key: str = self._read_value()
+        self._expect(":")
+        return key
+
+    def _action(self, path: PathType) -> str:
+        """Decide what to do with the value on the given path.
+
+        Returns "take", "skip", "filter" (take but leave out excluded sub-paths) or "descend"
+        (look for included sub-paths).
+        """
+        if any(len(e) == len(path) and _prefix_matches(e, path) for e in self.exclude):
+            return "skip"
+
+        included = not self.include or any(_prefix_matches(i, path) for i in self.include)
+        if included:
+            if any(_prefix_matches(path, e) for e in self.exclude):
+                return "filter"
+            return "take"
+
+        if any(_prefix_matches(path, i) for i in self.include):
+            return "descend"
+        return "skip"
+
+    def _walk(self, path: PathType) -> Any:
+        action = self._action(path)
+
+        if action in ("filter", "descend") and self._peek() == "{":
+            value: Any = self._walk_object(path)
+        elif action in ("skip", "descend"):
+            self._skip_value()
+            return self._SKIP
+        else:
+            value = self._read_value()
+
+        if path in self.include_set:
+            self.remaining -= 1
+        return value
+
+    def _walk_object(self, path: PathType) -> dict:
+        self._expect("{")
+        result: dict = {}
+
+        if self._peek() == "}":
+            self.pos += 1
+            return result
+
+        while True:
+            key = self._read_key()
+            value = self._walk((*path, key))
+            if value is not self._SKIP:
+                result[key] = value
+
+            # all requested values were found, no need to read the rest of the document
+            if self.remaining == 0:
+                return result
+
+            char = self._peek()
+            self.pos += 1
+            if char == "}":
+                return result
+            if char != ",":
+                raise JSONStreamError(f"Expected ',' or '}}', found '{char}' at offset {self.pos}.")
+
+    def extract(self) -> Any:
+        value = self._walk(())
+        if value is self._SKIP:
+            return None
+        if self.remaining != 0:
+            self._check_trailing()
+        return value
+
+    def _check_trailing(self) -> None:
+        try:
+            char = self._peek()
+        except JSONStreamError:
+            return
+        raise JSONStreamError(f"Extra data '{char}' at offset {self.pos}.")
+
+
+def extract(
+    stream: IO[str],
+    paths: Iterable[str] = (),
+    exclude: Iterable[str] = (),
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Any:
+    """Extract selected paths from a JSON document read from a text stream.
+
+    The returned object has the same structure as the original document, but contains only
+    the requested paths. When all the requested paths are found, the rest of the stream is
+    not read.
+
+    Args:
+        stream: A text stream with a JSON document.
+        paths: Dot separated paths to extract (optional, the whole document by default).
+        exclude: Dot separated paths to leave out (optional).
+        chunk_size: A number of characters to read from the stream at once (optional).
+
+    Returns:
+        Any: The extracted data.
+    """
+    extractor = _Extractor(
+        stream=stream,
+        include=_split_paths(paths),
+        exclude=_split_paths(exclude),
+        chunk_size=chunk_size,
+    )
+    return extractor.extract()
+
+
+def extract_str(json_str: str, paths: Iterable[str] = (), exclude: Iterable[str] = ()) -> Any:
+    """Extract selected paths from a JSON string."""
+    return extract(stream=io.StringIO(json_str), paths=paths, exclude=exclude)
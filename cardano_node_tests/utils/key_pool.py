@@ -0,0 +1,268 @@
+"""Pool of pre-generated keys.
+
+Keys are generated in advance (see `prepare_key_pool.py`) and stored in a content-addressed
+directory - each key set is stored in `<pool dir>/<kind>/<sha256 of vkey file>/`. When a key set
+is checked out, a checkout record is created in its directory, so the same keys are never handed
+out twice, not even to different pytest workers or in subsequent test runs.
+
+The pool is used only when the `KEY_POOL_DIR` env variable is set.
+"""
+import hashlib
+import json
+import logging
+import os
+import random
+import shutil
+import time
+from pathlib import Path
+from typing import Dict
+from typing import List
+from typing import NamedTuple
+from typing import Optional
+from typing import Set
+
+from cardano_clusterlib import clusterlib
+
+from cardano_node_tests.utils import configuration
+from cardano_node_tests.utils import helpers
+from cardano_node_tests.utils.types import FileType
+
+LOGGER = logging.getLogger(__name__)
+
+CHECKOUT_FILE_NAME = "checkout.json"
+
+
+class KeyKind(NamedTuple):
+    cli_args: str
+    # suffix of file names used by `clusterlib` for this kind of keys
+    suffix: str
+    has_counter: bool = False
+
+
+KEY_KINDS = {
+    "payment": KeyKind(cli_args="address key-gen", suffix=""),
+    "stake": KeyKind(cli_args="stake-address key-gen", suffix="_stake"),
+    "vrf": KeyKind(cli_args="node key-gen-VRF", suffix="_vrf"),
+    "kes": KeyKind(cli_args="node key-gen-KES", suffix="_kes"),
+    "cold": KeyKind(cli_args="node key-gen", suffix="_cold", has_counter=True),
+}
+
+# key sets that can possibly be checked out by this process, keyed by kind
+_CANDIDATES: Dict[str, List[Path]] = {}
+# mtimes of the kind directories at the time they were scanned for candidates, keyed by kind
+_SCANNED_MTIMES: Dict[str, int] = {}
+# kinds of keys that were already reported as unavailable
+_REPORTED_UNAVAILABLE: Set[str] = set()
+
+
+def _get_kind(kind: str) -> KeyKind:
+    key_kind = KEY_KINDS.get(kind)
+    if not key_kind:
+        raise AssertionError(f"Unknown kind of keys '{kind}', expected one of {list(KEY_KINDS)}")
+    return key_kind
+
+
+def _get_pool_dir(pool_dir: Optional[FileType]) -> Optional[Path]:
+    pool_dir = pool_dir or configuration.KEY_POOL_DIR
+    return Path(pool_dir).expanduser() if pool_dir else None
+
+
+def _get_file_names(kind: str) -> List[str]:
+    """Return names of files in a key set directory."""
+    names = ["key.vkey", "key.skey"]
+    if _get_kind(kind).has_counter:
+        names.append("key.counter")
+    return names
+
+
+def generate_keys(
+    kind: str,
+    count: int,
+    pool_dir: Optional[FileType] = None,
+    max_workers: int = helpers.RUN_COMMANDS_WORKERS,
+) -> List[Path]:
+    """Generate key sets and add them to the pool.
+
+    Args:
+        kind: A kind of keys (one of `KEY_KINDS`).
+        count: A number of key sets to generate.
+        pool_dir: A path to the pool directory (optional, `KEY_POOL_DIR` by default).
+        max_workers: Max number of `cardano-cli` processes running at a time (optional).
+
+    Returns:
+        List[Path]: Paths to directories with the generated key sets.
+    """
+    key_kind = _get_kind(kind)
+    pool_path = _get_pool_dir(pool_dir)
+    if not pool_path:
+        raise AssertionError("The key pool directory is not set.")
+
+    kind_dir = pool_path / kind
+    tmp_dir = kind_dir / f".tmp_{helpers.get_timestamped_rand_str()}"
+    tmp_dir.mkdir(parents=True)
+
+    commands = []
+    for idx in range(count):
+        cmd = (
+            f"cardano-cli {key_kind.cli_args} "
+            f"--verification-key-file {idx}.vkey --signing-key-file {idx}.skey"
+        )
+        if key_kind.has_counter:
+            cmd = f"{cmd} --operational-certificate-issue-counter {idx}.counter"
+        commands.append(cmd)
+    helpers.run_commands(commands, workdir=tmp_dir, max_workers=max_workers)
+
+    key_dirs = []
+    for idx in range(count):
+        key_id = hashlib.sha256((tmp_dir / f"{idx}.vkey").read_bytes()).hexdigest()
+        # the key set directory becomes visible only when it is complete
+        tmp_key_dir = tmp_dir / key_id
+        tmp_key_dir.mkdir()
+        for fname in _get_file_names(kind):
+            (tmp_dir / f"{idx}{Path(fname).suffix}").rename(tmp_key_dir / fname)
+        key_dir = kind_dir / key_id
+        tmp_key_dir.rename(key_dir)
+        key_dirs.append(key_dir)
+
+    tmp_dir.rmdir()
+    LOGGER.debug(f"Added {count} '{kind}' key set(s) to the key pool '{pool_path}'")
+    return key_dirs
+
+
+def get_available_count(kind: str, pool_dir: Optional[FileType] = None) -> int:
+    """Return number of key sets of the given kind that were not checked out yet."""
+    _get_kind(kind)
+    pool_path = _get_pool_dir(pool_dir)
+    if not (pool_path and (pool_path / kind).exists()):
+        return 0
+    return sum(
+        1
+        for d in (pool_path / kind).iterdir()
+        if not d.name.startswith(".") and not (d / CHECKOUT_FILE_NAME).exists()
+    )
+
+
+def _claim(key_dir: Path, name: str) -> bool:
+    """Atomically mark the key set as checked out, return False if it was already claimed."""
+    try:
+        fd = os.open(key_dir / CHECKOUT_FILE_NAME, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+    except FileExistsError:
+        return False
+
+    record = {
+        "name": name,
+        "worker": os.environ.get("PYTEST_XDIST_WORKER", ""),
+        "pid": os.getpid(),
+        "timestamp": time.time(),
+    }
+    with os.fdopen(fd, "w", encoding="utf-8") as out_json:
+        json.dump(record, out_json)
+    return True
+
+
+def _get_mtime(kind_dir: Path) -> int:
+    try:
+        return kind_dir.stat().st_mtime_ns
+    except FileNotFoundError:
+        return -1
+
+
+def _checkout_key_dir(kind: str, name: str, pool_path: Path) -> Optional[Path]:
+    """Check out a key set of the given kind, return None if there's none available.
+
+    The kind directory is scanned again only when key sets were added to it since the last scan,
+    i.e. when its mtime changed, so checking out from an exhausted pool is cheap.
+    """
+    kind_dir = pool_path / kind
+    for refresh in (False, True):
+        candidates = _CANDIDATES.get(kind)
+        if refresh or candidates is None:
+            mtime = _get_mtime(kind_dir)
+            if candidates is not None and mtime == _SCANNED_MTIMES.get(kind):
+                break
+            # get the mtime before the scan, so key sets added during the scan are not missed
+            _SCANNED_MTIMES[kind] = mtime
+            candidates = (
+                [
+                    d
+                    for d in kind_dir.iterdir()
+                    if not d.name.startswith(".") and not (d / CHECKOUT_FILE_NAME).exists()
+                ]
+                if kind_dir.exists()
+                else []
+            )
+            # lower the chance that several workers compete for the same key sets
+            random.shuffle(candidates)
+            _CANDIDATES[kind] = candidates
+
+        while candidates:
+            key_dir = candidates.pop()
+            if _claim(key_dir=key_dir, name=name):
+                return key_dir
+
+    return None
+
+
+def checkout_keys(
+    kind: str,
+    name: str,
+    destination_dir: FileType = ".",
+    pool_dir: Optional[FileType] = None,
+) -> Optional[List[Path]]:
+    """Check out a key set from the pool and copy it to the destination directory.
+
+    The files are named the same way as the files created by `clusterlib`, e.g.
+    `<name>_stake.vkey` for stake keys.
+
+    Args:
+        kind: A kind of keys (one of `KEY_KINDS`).
+        name: A name of the keys (the same as `key_name` or `node_name` in `clusterlib`).
+        destination_dir: A path to directory for storing the keys (optional).
+        pool_dir: A path to the pool directory (optional, `KEY_POOL_DIR` by default).
+
+    Returns:
+        Optional[List[Path]]: Paths to vkey, skey and (for cold keys) counter files, or None
+            when the pool is not used or there are no keys available.
+    """
+    key_kind = _get_kind(kind)
+    pool_path = _get_pool_dir(pool_dir)
+    if not pool_path:
+        return None
+
+    key_dir = _checkout_key_dir(kind=kind, name=name, pool_path=pool_path)
+    if not key_dir:
+        if kind not in _REPORTED_UNAVAILABLE:
+            _REPORTED_UNAVAILABLE.add(kind)
+            LOGGER.warning(f"No '{kind}' keys available in the key pool '{pool_path}'")
+        return None
+
+    destination_dir = Path(destination_dir).expanduser()
+    out_files = []
+    for fname in _get_file_names(kind):
+        out_file = destination_dir / f"{name}{key_kind.suffix}{Path(fname).suffix}"
+        shutil.copyfile(key_dir / fname, out_file)
+        out_files.append(out_file)
+
+    return out_files
+
+
+def checkout_key_pair(
+    kind: str, name: str, destination_dir: FileType = "."
+) -> Optional[clusterlib.KeyPair]:
+    """Check out a key pair from the pool, return None if not available."""
+    out_files = checkout_keys(kind=kind, name=name, destination_dir=destination_dir)
+    if not out_files:
+        return None
+    return clusterlib.KeyPair(vkey_file=out_files[0], skey_file=out_files[1])
+
+
+def checkout_cold_key_pair(
+    name: str, destination_dir: FileType = "."
+) -> Optional[clusterlib.ColdKeyPair]:
+    """Check out a cold key pair and counter from the pool, return None if not available."""
+    out_files = checkout_keys(kind="cold", name=name, destination_dir=destination_dir)
+    if not out_files:
+        return None
+    return clusterlib.ColdKeyPair(
+        vkey_file=out_files[0], skey_file=out_files[1], counter_file=out_files[2]
+    )
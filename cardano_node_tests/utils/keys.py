@@ -0,0 +1,286 @@
+"""In-process generation of ed25519 keys and Shelley addresses.
+
+Key files are JSON text envelopes in the same format as the files written by `cardano-cli`,
+address derivation follows CIP-19.
+"""
+import hashlib
+import json
+from pathlib import Path
+from typing import NamedTuple
+from typing import Optional
+
+import cbor2
+import nacl.signing
+from cardano_clusterlib import clusterlib
+
+from cardano_node_tests.utils import bech32
+from cardano_node_tests.utils.types import FileType
+
+KEY_HASH_SIZE = 28
+
+# header nibbles of addresses (CIP-19)
+ADDR_TYPE_BASE = 0b0000
+ADDR_TYPE_ENTERPRISE = 0b0110
+ADDR_TYPE_SCRIPT_ENTERPRISE = 0b0111
+ADDR_TYPE_BYRON = 0b1000
+ADDR_TYPE_REWARD = 0b1110
+
+NETWORK_ID_TESTNET = 0
+NETWORK_ID_MAINNET = 1
+
+
+class KeyType(NamedTuple):
+    skey_type: str
+    skey_description: str
+    vkey_type: str
+    vkey_description: str
+    # suffix of file names used by `clusterlib` for this type of keys
+    suffix: str
+
+
+class KeyTypes:
+    PAYMENT = KeyType(
+        skey_type="PaymentSigningKeyShelley_ed25519",
+        skey_description="Payment Signing Key",
+        vkey_type="PaymentVerificationKeyShelley_ed25519",
+        vkey_description="Payment Verification Key",
+        suffix="",
+    )
+    STAKE = KeyType(
+        skey_type="StakeSigningKeyShelley_ed25519",
+        skey_description="Stake Signing Key",
+        vkey_type="StakeVerificationKeyShelley_ed25519",
+        vkey_description="Stake Verification Key",
+        suffix="_stake",
+    )
+
+
+def write_cbor_text_envelope(
+    out_file: FileType, type: str, description: str, cbor_data: bytes
+) -> Path:
+    """Write CBOR encoded data to a JSON text envelope file, formatted the same way as by CLI."""
+    # pylint: disable=redefined-builtin
+    out_file = Path(out_file).expanduser()
+    content = {"type": type, "description": description, "cborHex": cbor_data.hex()}
+    with open(out_file, "w", encoding="utf-8") as out_json:
+        out_json.write(f"{json.dumps(content, indent=4)}\n")
+    return out_file
+
+
+def write_text_envelope(out_file: FileType, type: str, description: str, payload: bytes) -> Path:
+    """Write data to a JSON text envelope file, formatted the same way as by `cardano-cli`."""
+    # pylint: disable=redefined-builtin
+    return write_cbor_text_envelope(
+        out_file=out_file, type=type, description=description, cbor_data=cbor2.dumps(payload)
+    )
+
+
+def read_text_envelope(envelope_file: FileType) -> dict:
+    """Read a JSON text envelope file."""
+    with open(Path(envelope_file).expanduser(), encoding="utf-8") as in_json:
+        envelope: dict = json.load(in_json)
+    return envelope
+
+
+def read_key(key_file: FileType) -> bytes:
+    """Read raw key bytes from a text envelope key file."""
+    key: bytes = cbor2.loads(bytes.fromhex(read_text_envelope(key_file)["cborHex"]))
+    return key
+
+
+def get_vkey(skey: bytes) -> bytes:
+    """Return verification key for the given signing key."""
+    return bytes(nacl.signing.SigningKey(skey).verify_key)
+
+
+def get_key_hash_bytes(vkey: bytes) -> bytes:
+    """Return blake2b-224 hash of the verification key."""
+    return hashlib.blake2b(vkey, digest_size=KEY_HASH_SIZE).digest()
+
+
+def get_key_hash(vkey_file: FileType) -> str:
+    """Return key hash of the verification key file, the same as `address key-hash`."""
+    return get_key_hash_bytes(read_key(vkey_file)).hex()
+
+
+def gen_key_pair(
+    key_name: str,
+    key_type: KeyType = KeyTypes.PAYMENT,
+    destination_dir: FileType = ".",
+) -> clusterlib.KeyPair:
+    """Generate a key pair.
+
+    The files are named the same way as the files created by `clusterlib`, e.g.
+    `<key_name>_stake.vkey` for stake keys. Existing key files are never overwritten.
+
+    Args:
+        key_name: A name of the key pair.
+        key_type: A type of the keys (one of `KeyTypes`, optional).
+        destination_dir: A path to directory for storing artifacts (optional).
+
+    Returns:
+        clusterlib.KeyPair: A tuple containing the key pair.
+    """
+    destination_dir = Path(destination_dir).expanduser()
+    skey_file = destination_dir / f"{key_name}{key_type.suffix}.skey"
+    vkey_file = destination_dir / f"{key_name}{key_type.suffix}.vkey"
+    for out_file in (skey_file, vkey_file):
+        if out_file.exists():
+            raise clusterlib.CLIError(f"The expected file `{out_file}` already exist.")
+
+    skey = bytes(nacl.signing.SigningKey.generate())
+    write_text_envelope(
+        out_file=skey_file,
+        type=key_type.skey_type,
+        description=key_type.skey_description,
+        payload=skey,
+    )
+    write_text_envelope(
+        out_file=vkey_file,
+        type=key_type.vkey_type,
+        description=key_type.vkey_description,
+        payload=get_vkey(skey),
+    )
+    return clusterlib.KeyPair(vkey_file=vkey_file, skey_file=skey_file)
+
+
+def get_network_id(cluster_obj: clusterlib.ClusterLib) -> int:
+    """Return network ID used in addresses on the cluster."""
+    return NETWORK_ID_MAINNET if "--mainnet" in cluster_obj.magic_args else NETWORK_ID_TESTNET
+
+
+def encode_address(prefix: str, network_id: int, addr_bytes: bytes) -> str:
+    """Encode raw address bytes to bech32, the prefix is "addr" or "stake"."""
+    hrp = prefix if network_id == NETWORK_ID_MAINNET else f"{prefix}_test"
+    return bech32.encode(hrp, addr_bytes)
+
+
+def build_payment_address(
+    payment_vkey_file: FileType,
+    stake_vkey_file: Optional[FileType] = None,
+    network_id: int = NETWORK_ID_TESTNET,
+) -> str:
+    """Build a payment address - a base address with stake key, or an enterprise address.
+
+    Args:
+        payment_vkey_file: A path to payment vkey file.
+        stake_vkey_file: A path to stake vkey file (optional).
+        network_id: A network ID (optional, testnet by default).
+
+    Returns:
+        str: The bech32 encoded address.
+    """
+    payment_hash = get_key_hash_bytes(read_key(payment_vkey_file))
+    if stake_vkey_file:
+        header = ADDR_TYPE_BASE << 4 | network_id
+        stake_hash = get_key_hash_bytes(read_key(stake_vkey_file))
+        addr_bytes = bytes([header]) + payment_hash + stake_hash
+    else:
+        header = ADDR_TYPE_ENTERPRISE << 4 | network_id
+        addr_bytes = bytes([header]) + payment_hash
+    return encode_address(prefix="addr", network_id=network_id, addr_bytes=addr_bytes)
+
+
+def build_stake_address(stake_vkey_file: FileType, network_id: int = NETWORK_ID_TESTNET) -> str:
+    """Build a stake (reward account) address.
+
+    Args:
+        stake_vkey_file: A path to stake vkey file.
+        network_id: A network ID (optional, testnet by default).
+
+    Returns:
+        str: The bech32 encoded address.
+    """
+    header = ADDR_TYPE_REWARD << 4 | network_id
+    addr_bytes = bytes([header]) + get_key_hash_bytes(read_key(stake_vkey_file))
+    return encode_address(prefix="stake", network_id=network_id, addr_bytes=addr_bytes)
+
+
+def _write_address(out_file: Path, address: str) -> None:
+    with open(out_file, "w", encoding="utf-8") as out_addr:
+        out_addr.write(address)
+
+
+def build_payment_addr_record(
+    name: str,
+    cluster_obj: clusterlib.ClusterLib,
+    key_pair: clusterlib.KeyPair,
+    stake_vkey_file: Optional[FileType] = None,
+    destination_dir: FileType = ".",
+) -> clusterlib.AddressRecord:
+    """Build payment address for existing key pair and write it to `<name>.addr` file."""
+    address = build_payment_address(
+        payment_vkey_file=key_pair.vkey_file,
+        stake_vkey_file=stake_vkey_file,
+        network_id=get_network_id(cluster_obj),
+    )
+    _write_address(out_file=Path(destination_dir).expanduser() / f"{name}.addr", address=address)
+    return clusterlib.AddressRecord(
+        address=address, vkey_file=key_pair.vkey_file, skey_file=key_pair.skey_file
+    )
+
+
+def gen_payment_addr_and_keys(
+    name: str,
+    cluster_obj: clusterlib.ClusterLib,
+    stake_vkey_file: Optional[FileType] = None,
+    destination_dir: FileType = ".",
+) -> clusterlib.AddressRecord:
+    """Generate payment address and key pair, the same as `ClusterLib.gen_payment_addr_and_keys`.
+
+    Args:
+        name: A name of the address and key pair.
+        cluster_obj: An instance of `clusterlib.ClusterLib`.
+        stake_vkey_file: A path to corresponding stake vkey file (optional).
+        destination_dir: A path to directory for storing artifacts (optional).
+
+    Returns:
+        clusterlib.AddressRecord: A tuple containing the address and key pair.
+    """
+    key_pair = gen_key_pair(key_name=name, destination_dir=destination_dir)
+    return build_payment_addr_record(
+        name=name,
+        cluster_obj=cluster_obj,
+        key_pair=key_pair,
+        stake_vkey_file=stake_vkey_file,
+        destination_dir=destination_dir,
+    )
+
+
+def build_stake_addr_record(
+    name: str,
+    cluster_obj: clusterlib.ClusterLib,
+    key_pair: clusterlib.KeyPair,
+    destination_dir: FileType = ".",
+) -> clusterlib.AddressRecord:
+    """Build stake address for existing key pair and write it to `<name>_stake.addr` file."""
+    address = build_stake_address(
+        stake_vkey_file=key_pair.vkey_file, network_id=get_network_id(cluster_obj)
+    )
+    _write_address(
+        out_file=Path(destination_dir).expanduser() / f"{name}_stake.addr", address=address
+    )
+    return clusterlib.AddressRecord(
+        address=address, vkey_file=key_pair.vkey_file, skey_file=key_pair.skey_file
+    )
+
+
+def gen_stake_addr_and_keys(
+    name: str,
+    cluster_obj: clusterlib.ClusterLib,
+    destination_dir: FileType = ".",
+) -> clusterlib.AddressRecord:
+    """Generate stake address and key pair, the same as `ClusterLib.gen_stake_addr_and_keys`.
+
+    Args:
+        name: A name of the address and key pair.
+        cluster_obj: An instance of `clusterlib.ClusterLib`.
+        destination_dir: A path to directory for storing artifacts (optional).
+
+    Returns:
+        clusterlib.AddressRecord: A tuple containing the address and key pair.
+    """
+    key_pair = gen_key_pair(key_name=name, key_type=KeyTypes.STAKE, destination_dir=destination_dir)
+    return build_stake_addr_record(
+        name=name, cluster_obj=cluster_obj, key_pair=key_pair, destination_dir=destination_dir
+    )
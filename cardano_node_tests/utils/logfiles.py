@@ -1,14 +1,30 @@
+import bisect
+import calendar
 import contextlib
+import ctypes
+import ctypes.util
 import fnmatch
+import functools
 import itertools
+import json
 import logging
+import mmap
 import os
 import re
+import select
+import struct
+import threading
 import time
 from pathlib import Path
+from typing import Any
+from typing import Dict
+from typing import Iterable
 from typing import Iterator
 from typing import List
 from typing import NamedTuple
+from typing import Optional
+from typing import Pattern
+from typing import Set
 from typing import Tuple
 
 import pytest
@@ -21,6 +37,9 @@ LOGGER = logging.getLogger(__name__)
 
 ROTATED_RE = re.compile(r".+\.[0-9]+")  # detect rotated log file
 ERRORS_RE = re.compile(":error:|failed|failure", re.IGNORECASE)
+# lowercase keywords present in every line matched by `ERRORS_RE`, for searching at the byte level
+ERRORS_KEYWORDS = (b":error:", b"fail")
+SCAN_CHUNK_SIZE = 16 * 1024 * 1024
 ERRORS_IGNORED = [
     "Connection Attempt Exception",
     "EKGServerStartupError",
@@ -32,40 +51,74 @@ ERRORS_IGNORED = [
 if configuration.TESTNET_SCRIPTS_DIR:
     ERRORS_IGNORED.extend(["closed when reading data, waiting on next header"])
 ERRORS_RULES_FILE_NAME = ".errors_rules"
-
-
-class RotableLog(NamedTuple):
+LOGFILES_STATE_FILE_NAME = ".logfiles_state.json"
+LOGFILES_LOCK_TEMPLATE = "logfiles_{}.lock"
+# sparse index of log lines timestamps (to byte offsets)
+TIME_INDEX_FILE_NAME = ".logfiles_index.json"
+TIME_INDEX_STEP = 1024 * 1024
+TIME_INDEX_LOOKAHEAD = 64 * 1024
+# log lines written by different threads are not strictly ordered by their timestamps
+TIME_INDEX_SLACK = 1.0
+TIMESTAMP_RE = re.compile(rb"\[([0-9]{4}-[0-9]{2}-[0-9]{2} [0-9:]{8})(\.[0-9]+)? UTC\]")
+
+
+class LogGeneration(NamedTuple):
     logfile: Path
-    seek: int
+    inode: int
+    size: int
     timestamp: float
 
 
-def get_rotated_logs(logfile: Path, seek: int = 0, timestamp: float = 0.0) -> List[RotableLog]:
-    """Return list of versions of the log file (list of `RotableLog`).
+def _get_generation_num(logfile_name: str) -> int:
+    """Return rotation number of the log file, 0 for the "live" log file."""
+    suffix = logfile_name.rsplit(".", 1)[-1]
+    return int(suffix) if suffix.isdigit() else 0
 
-    When the seek offset was recorded for a log file and the log file was rotated,
-    the seek offset now belongs to the rotated file and the "live" log file has seek offset 0.
-    """
-    # get logfile including rotated versions
-    logfiles = list(logfile.parent.glob(f"{logfile.name}*"))
 
-    # get list of logfiles modified after `timestamp`, sorted by their last modification time
-    # from oldest to newest
-    _logfile_records = [
-        RotableLog(logfile=f, seek=0, timestamp=os.path.getmtime(f)) for f in logfiles
-    ]
-    _logfile_records = [r for r in _logfile_records if r.timestamp > timestamp]
-    logfile_records = sorted(_logfile_records, key=lambda r: r.timestamp, reverse=True)
+def _get_live_name(logfile_name: str) -> str:
+    """Return name of the "live" log file for the given (possibly rotated) log file name."""
+    if _get_generation_num(logfile_name):
+        return logfile_name.rsplit(".", 1)[0]
+    return logfile_name
 
-    if not logfile_records:
-        return []
 
-    # the `seek` value belongs to the log file with modification time furthest in the past
-    oldest_record = logfile_records[0]
-    oldest_record = oldest_record._replace(seek=seek)
-    logfile_records[0] = oldest_record
+def get_log_generations(logfile: Path) -> List[LogGeneration]:
+    """Return list of generations of the log file (list of `LogGeneration`).
 
-    return logfile_records
+    The generations are the "live" log file and its rotated versions, sorted from oldest to newest.
+    The log file keeps its inode when it is rotated (renamed), so the inode identifies
+    the generation of the log file no matter what its current name is.
+    """
+    generation_re = re.compile(rf"{re.escape(logfile.name)}(\.[0-9]+)?")
+
+    # the log file can be rotated while the generations are being listed, so repeat until
+    # the listing is consistent
+    for __ in range(5):
+        names = {f.name for f in logfile.parent.glob(f"{logfile.name}*")}
+        generations = []
+        for name in names:
+            if not generation_re.fullmatch(name):
+                continue
+            try:
+                fstat = (logfile.parent / name).stat()
+            except FileNotFoundError:
+                continue
+            generations.append(
+                LogGeneration(
+                    logfile=logfile.parent / name,
+                    inode=fstat.st_ino,
+                    size=fstat.st_size,
+                    timestamp=fstat.st_mtime,
+                )
+            )
+        if names == {f.name for f in logfile.parent.glob(f"{logfile.name}*")}:
+            break
+
+    # sort by last modification time, the higher rotation number is older on equal times
+    return sorted(
+        generations,
+        key=lambda g: (g.timestamp, -_get_generation_num(g.logfile.name)),
+    )
 
 
 def add_ignore_rule(files_glob: str, regex: str) -> None:
@@ -77,6 +130,66 @@ def add_ignore_rule(files_glob: str, regex: str) -> None:
             infile.write(f"{files_glob};;{regex}\n")
 
 
+def _get_seek_offsets(state_dir: Path, glob_list: Iterable[str]) -> Dict[str, Dict[int, int]]:
+    """Record end-of-file of each generation of each log file described by the globs.
+
+    The end-of-file is used as a starting offset for searching the log file generation.
+    """
+    # resolve the globs
+    _expanded_paths = [list(state_dir.glob(glob_item)) for glob_item in glob_list]
+    # flatten the list, skip rotated logs, they will be handled by `get_log_generations`
+    expanded_paths = [
+        p for p in itertools.chain.from_iterable(_expanded_paths) if not ROTATED_RE.match(p.name)
+    ]
+    return {str(p): {g.inode: g.size for g in get_log_generations(p)} for p in expanded_paths}
+
+
+class LogLine(NamedTuple):
+    logfile: Path
+    line: str
+    offset: int
+
+
+def _find_line(
+    logfile: Path,
+    generation_offsets: Dict[int, int],
+    regex_comp: Pattern[str],
+    whole_lines: bool = False,
+) -> Optional[LogLine]:
+    """Find first line matching the regex in new lines of all generations of the log file.
+
+    Args:
+        logfile: A path to the "live" log file.
+        generation_offsets: Offsets where to start the search, keyed by inode of the log file
+            generation. New generations of the log file are searched from the beginning.
+            The offsets are updated in place to where the search ended.
+        regex_comp: A compiled regex to search for.
+        whole_lines: A bool indicating whether to ignore the last line of the log file
+            when the line is not complete yet.
+
+    Returns:
+        Optional[LogLine]: A record of the matching line (path to the log file generation,
+            the line and its offset), None when no line matched.
+    """
+    for generation in get_log_generations(logfile):
+        seek = generation_offsets.get(generation.inode, 0)
+        if seek >= generation.size:
+            continue
+        with open(generation.logfile, "rb") as infile:
+            infile.seek(seek)
+            for bline in infile:
+                if whole_lines and not bline.endswith(b"\n"):
+                    break
+                line_offset = seek
+                seek += len(bline)
+                generation_offsets[generation.inode] = seek
+                line = bline.decode("utf-8", errors="replace")
+                if regex_comp.search(line):
+                    return LogLine(logfile=generation.logfile, line=line, offset=line_offset)
+
+    return None
+
+
 @contextlib.contextmanager
 def expect_errors(regex_pairs: List[Tuple[str, str]]) -> Iterator[None]:
     """Make sure expected errors are present in logs.
@@ -91,14 +204,7 @@ def expect_errors(regex_pairs: List[Tuple[str, str]]) -> Iterator[None]:
     for files_glob, regex in regex_pairs:
         add_ignore_rule(files_glob, regex)  # don't report errors that are expected
         glob_list.append(files_glob)
-    # resolve the globs
-    _expanded_paths = [list(state_dir.glob(glob_item)) for glob_item in glob_list]
-    # flatten the list
-    expanded_paths = list(itertools.chain.from_iterable(_expanded_paths))
-    # record each end-of-file as a starting offset for searching the log file
-    seek_offsets = {str(p): helpers.get_eof_offset(p) for p in expanded_paths}
-
-    timestamp = time.time()
+    seek_offsets = _get_seek_offsets(state_dir=state_dir, glob_list=glob_list)
 
     yield
 
@@ -107,31 +213,70 @@ def expect_errors(regex_pairs: List[Tuple[str, str]]) -> Iterator[None]:
         # get list of records (file names and offsets) for given glob
         matching_files = fnmatch.filter(seek_offsets, f"{state_dir}/{files_glob}")
         for logfile in matching_files:
-            # skip if the log file is rotated log, it will be handled by `get_rotated_logs`
-            if ROTATED_RE.match(logfile):
-                continue
-
             # search for the expected error
-            seek = seek_offsets.get(logfile) or 0
-            line_found = False
-            for logfile_rec in get_rotated_logs(
-                logfile=Path(logfile), seek=seek, timestamp=timestamp
+            if not _find_line(
+                logfile=Path(logfile),
+                generation_offsets=dict(seek_offsets[logfile]),
+                regex_comp=regex_comp,
             ):
-                with open(logfile_rec.logfile) as infile:
-                    infile.seek(seek)
-                    for line in infile:
-                        if regex_comp.search(line):
-                            line_found = True
-                            break
-                if line_found:
-                    break
-            else:
                 raise AssertionError(f"No line matching `{regex}` found in '{logfile}'.")
 
 
-def _get_seek(fpath: Path) -> int:
-    with open(fpath) as infile:
-        return int(infile.readline().strip())
+def wait_for_log_line(
+    files_glob: str,
+    regex: str,
+    timeout: float,
+    state_dir: Optional[Path] = None,
+    poll_interval: float = 2.0,
+    silent: bool = False,
+) -> Optional[LogLine]:
+    """Wait until a line matching the regex is written to any of the log files.
+
+    Only lines written after the function was called are searched. The log files are searched
+    every time they change (or every `poll_interval` seconds when `inotify` is not available).
+
+    Args:
+        files_glob: A glob describing the log files in cluster state dir.
+        regex: A regex to search for.
+        timeout: A number of seconds to wait for the line.
+        state_dir: A cluster state dir (optional, the current cluster instance by default).
+        poll_interval: A number of seconds between searches when `inotify` is not available.
+        silent: A bool indicating whether to return None instead of raising `AssertionError`
+            when no line matched in time.
+
+    Returns:
+        Optional[LogLine]: A record of the matching line (path to the log file generation,
+            the line and its offset).
+    """
+    state_dir = state_dir or cluster_nodes.get_cluster_env().state_dir
+    end_time = time.time() + timeout
+    regex_comp = re.compile(regex)
+    seek_offsets = _get_seek_offsets(state_dir=state_dir, glob_list=[files_glob])
+
+    dir_watch = _DirWatch(dir_path=state_dir, poll_interval=poll_interval)
+    try:
+        while True:
+            for logfile, generation_offsets in seek_offsets.items():
+                log_line = _find_line(
+                    logfile=Path(logfile),
+                    generation_offsets=generation_offsets,
+                    regex_comp=regex_comp,
+                    whole_lines=True,
+                )
+                if log_line:
+                    return log_line
+
+            remaining = end_time - time.time()
+            if remaining <= 0:
+                break
+            # changes made before the directory is watched are picked up after `poll_interval`
+            dir_watch.wait(timeout=min(remaining, poll_interval))
+    finally:
+        dir_watch.close()
+
+    if not silent:
+        raise AssertionError(f"No line matching `{regex}` found in '{files_glob}' in time.")
+    return None
 
 
 def get_ignore_rules(rules_file: Path) -> List[Tuple[str, str]]:
@@ -161,50 +306,641 @@ def get_ignore_regex(ignore_rules: List[Tuple[str, str]], regexes: List[str], lo
     return "|".join(regex_list)
 
 
-def search_cluster_artifacts() -> List[Tuple[Path, str]]:
-    """Search cluster artifacts for errors."""
-    state_dir = cluster_nodes.get_cluster_env().state_dir
-    rules_file = state_dir / ERRORS_RULES_FILE_NAME
+def _is_live_logfile(logfile_name: str) -> bool:
+    """Check that the file is a "live" log file, i.e. not a status file or a rotated log."""
+    return not (logfile_name.startswith(".") or ROTATED_RE.match(logfile_name))
+
+
+@functools.lru_cache(maxsize=32)
+def _get_ignore_rules_cached(
+    rules_file: Path, mtime_ns: int, size: int
+) -> Tuple[Tuple[str, str], ...]:
+    """Get rules for ignored errors, cached per version (mtime and size) of the rules file."""
+    # pylint: disable=unused-argument
+    return tuple(get_ignore_rules(rules_file))
+
+
+@functools.lru_cache(maxsize=256)
+def _get_ignore_re(
+    ignore_rules: Tuple[Tuple[str, str], ...], logfile_name: str
+) -> Optional[Pattern[str]]:
+    """Get compiled combined regex of ignored errors for the given log file."""
+    errors_ignored = get_ignore_regex(
+        ignore_rules=list(ignore_rules), regexes=ERRORS_IGNORED, logfile=Path(logfile_name)
+    )
+    return re.compile(errors_ignored) if errors_ignored else None
 
+
+def _get_ignore_rules_current(rules_file: Path) -> Tuple[Tuple[str, str], ...]:
+    """Get current rules for ignored errors."""
     with helpers.FileLockIfXdist(f"{helpers.get_basetemp()}/ignore_rules.lock"):
-        ignore_rules = get_ignore_rules(rules_file)
+        try:
+            rules_stat = rules_file.stat()
+        except FileNotFoundError:
+            return ()
+        return _get_ignore_rules_cached(rules_file, rules_stat.st_mtime_ns, rules_stat.st_size)
+
+
+def _get_candidate_lines(mm: mmap.mmap, start: int, end: int) -> Iterator[Tuple[int, int]]:
+    """Yield start and end offsets of lines that contain any of the `ERRORS_KEYWORDS`."""
+    pos = start
+    while pos < end:
+        # make sure the chunk ends at line boundary, so no keyword is split between chunks
+        chunk_end = min(pos + SCAN_CHUNK_SIZE, end)
+        if chunk_end < end:
+            line_end = mm.rfind(b"\n", pos, chunk_end)
+            if line_end == -1:
+                line_end = mm.find(b"\n", chunk_end, end)
+            chunk_end = end if line_end == -1 else line_end + 1
+
+        # searching lowercase chunk for keywords is much faster than case insensitive regex
+        chunk = mm[pos:chunk_end].lower()
+        lines = {}
+        for keyword in ERRORS_KEYWORDS:
+            idx = chunk.find(keyword)
+            while idx != -1:
+                line_start = chunk.rfind(b"\n", 0, idx) + 1
+                line_end = chunk.find(b"\n", idx)
+                line_end = len(chunk) if line_end == -1 else line_end + 1
+                lines[line_start] = line_end
+                idx = chunk.find(keyword, line_end)
+
+        for line_start in sorted(lines):
+            yield pos + line_start, pos + lines[line_start]
+
+        pos = chunk_end
+
+
+def _search_errors_bytes(
+    logfile: Path, seek: int, errors_ignored_re: Optional[Pattern[str]], whole_lines: bool = False
+) -> Tuple[List[str], int]:
+    """Search the log file for errors, starting at the `seek` offset.
+
+    The file is memory mapped and searched for the error keywords at the byte level. Only lines
+    that contain the error keywords are decoded and matched against the regexes.
 
-    errors = []
-    for logfile in state_dir.glob("*.std*"):
-        # skip if the log file is status file or rotated log
-        if logfile.name.endswith(".offset") or ROTATED_RE.match(logfile.name):
-            continue
+    Args:
+        logfile: A path to the log file.
+        seek: An offset to start the search at.
+        errors_ignored_re: A compiled regex of ignored errors (optional).
+        whole_lines: A bool indicating whether to stop the search at the end of the last
+            complete line (for files that are still being written to).
+
+    Returns:
+        Tuple[List[str], int]: A tuple of list of error lines and an offset where the search
+            ended.
+    """
+    errors: List[str] = []
+
+    with open(logfile, "rb") as infile:
+        end = os.fstat(infile.fileno()).st_size
+        if end <= seek:
+            return errors, end
+
+        with mmap.mmap(infile.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if whole_lines:
+                end = mm.rfind(b"\n", seek, end) + 1 or seek
+
+            for line_start, line_end in _get_candidate_lines(mm=mm, start=seek, end=end):
+                line = mm[line_start:line_end].decode("utf-8", errors="replace")
+                if not ERRORS_RE.search(line):
+                    continue
+                if errors_ignored_re and errors_ignored_re.search(line):
+                    continue
+                errors.append(line)
+
+    return errors, end
+
+
+def _load_state(state_file: Path) -> Dict[str, Dict[str, Any]]:
+    """Load state (e.g. offsets) of all generations of all log files from the state file."""
+    try:
+        with open(state_file, encoding="utf-8") as in_json:
+            offsets = json.load(in_json)
+    except FileNotFoundError:
+        return {}
+    except ValueError:
+        LOGGER.warning(f"Failed to load log files state from '{state_file}'.")
+        return {}
+    return offsets if isinstance(offsets, dict) else {}
+
+
+def _save_state(state_file: Path, state: Dict[str, Dict[str, Any]]) -> None:
+    """Save state (e.g. offsets) of all generations of all log files to the state file."""
+    tmp_file = state_file.parent / f"{state_file.name}.tmp"
+    with open(tmp_file, "w", encoding="utf-8") as out_json:
+        json.dump(state, out_json, separators=(",", ":"))
+    os.replace(tmp_file, state_file)
+
+
+def _search_logfile(
+    logfile: Path, ignore_rules: Tuple[Tuple[str, str], ...], offsets: Dict[str, int]
+) -> Tuple[List[Tuple[Path, str]], Dict[str, int]]:
+    """Search new lines of all generations of the log file for errors.
+
+    Args:
+        logfile: A path to the "live" log file.
+        ignore_rules: Rules (file glob and regex) for ignored errors.
+        offsets: Offsets where the last search ended, keyed by inode of the log file generation.
 
-        # read seek offset (from where to start searching) and timestamp of last search
-        offset_file = logfile.parent / f".{logfile.name}.offset"
-        if offset_file.exists():
-            seek = _get_seek(offset_file)
-            timestamp = os.path.getmtime(offset_file)
-        else:
+    Returns:
+        Tuple[List[Tuple[Path, str]], Dict[str, int]]: A tuple of list of errors and offsets
+            where the search ended, keyed by inode of the log file generation.
+    """
+    errors_ignored_re = _get_ignore_re(ignore_rules=ignore_rules, logfile_name=logfile.name)
+
+    errors: List[Tuple[Path, str]] = []
+    # offsets of generations that no longer exist are dropped
+    new_offsets: Dict[str, int] = {}
+    for generation in get_log_generations(logfile):
+        inode = str(generation.inode)
+        seek = offsets.get(inode, 0)
+        # the log file was truncated, or the inode was reused by a new log file
+        if seek > generation.size:
             seek = 0
-            timestamp = 0.0
 
-        errors_ignored = get_ignore_regex(
-            ignore_rules=ignore_rules, regexes=ERRORS_IGNORED, logfile=logfile
-        )
-        errors_ignored_re = re.compile(errors_ignored)
+        if seek < generation.size:
+            lines, seek = _search_errors_bytes(
+                logfile=generation.logfile,
+                seek=seek,
+                errors_ignored_re=errors_ignored_re,
+                whole_lines=generation.logfile == logfile,
+            )
+            errors.extend((logfile, line) for line in lines)
+
+        new_offsets[inode] = seek
+
+    return errors, new_offsets
+
+
+def search_cluster_artifacts(
+    state_dir: Optional[Path] = None, logfile_names: Optional[Iterable[str]] = None
+) -> List[Tuple[Path, str]]:
+    """Search cluster artifacts for errors.
 
-        # record offset for the "live" log file
-        with open(offset_file, "w") as outfile:
-            outfile.write(str(helpers.get_eof_offset(logfile)))
+    Each byte of each log file is searched only once, even when the log file is rotated.
+    The offsets where the last search ended are kept in a single state file in the cluster
+    state dir.
 
-        for logfile_rec in get_rotated_logs(logfile=logfile, seek=seek, timestamp=timestamp):
-            with open(logfile_rec.logfile) as infile:
-                infile.seek(seek)
-                for line in infile:
-                    if ERRORS_RE.search(line) and not (
-                        errors_ignored and errors_ignored_re.search(line)
-                    ):
-                        errors.append((logfile, line))
+    Args:
+        state_dir: A cluster state dir (optional, the current cluster instance by default).
+        logfile_names: Names of log files to search (optional, all log files by default).
+
+    Returns:
+        List[Tuple[Path, str]]: A list of tuples containing log file path and the error line.
+    """
+    state_dir = state_dir or cluster_nodes.get_cluster_env().state_dir
+    ignore_rules = _get_ignore_rules_current(state_dir / ERRORS_RULES_FILE_NAME)
+
+    if logfile_names is None:
+        logfiles = list(state_dir.glob("*.std*"))
+    else:
+        logfiles = [state_dir / n for n in logfile_names]
+
+    errors = []
+    state_file = state_dir / LOGFILES_STATE_FILE_NAME
+    # the state file is shared by all pytest workers running tests on the cluster instance
+    logfiles_lock = LOGFILES_LOCK_TEMPLATE.format(state_dir.name)
+    with helpers.FileLockIfXdist(f"{helpers.get_basetemp()}/{logfiles_lock}"):
+        offsets = _load_state(state_file)
+        orig_offsets = {k: v.copy() for k, v in offsets.items()}
+
+        for logfile in logfiles:
+            # skip if the log file is status file or rotated log
+            if not _is_live_logfile(logfile.name):
+                continue
+            try:
+                logfile_errors, offsets[logfile.name] = _search_logfile(
+                    logfile=logfile,
+                    ignore_rules=ignore_rules,
+                    offsets=offsets.get(logfile.name) or {},
+                )
+            except FileNotFoundError:
+                # the cluster instance is being restarted and the log files were removed
+                continue
+            errors.extend(logfile_errors)
+
+        if offsets != orig_offsets:
+            try:
+                _save_state(state_file=state_file, state=offsets)
+            except FileNotFoundError:
+                # the cluster instance is being restarted and the state dir was removed
+                pass
+
+        # keep the time index up to date as the log files grow
+        _update_time_index(state_dir=state_dir, logfiles=logfiles)
 
     return errors
 
 
+def _get_timestamp(match: Any) -> float:
+    """Convert timestamp of a log line to seconds since the epoch."""
+    timestamp = calendar.timegm(time.strptime(match.group(1).decode(), "%Y-%m-%d %H:%M:%S"))
+    fraction = match.group(2)
+    return timestamp + float(fraction) if fraction else float(timestamp)
+
+
+def _index_generation(logfile: Path, index: Dict[str, Any]) -> Dict[str, Any]:
+    """Extend sparse time index of a log file generation with lines written since last update.
+
+    The index records timestamp and offset of the first timestamped line roughly every
+    `TIME_INDEX_STEP` bytes.
+    """
+    next_pos: int = index.get("next") or 0
+    points: List[List[float]] = index.get("points") or []
+
+    with open(logfile, "rb") as infile:
+        size = os.fstat(infile.fileno()).st_size
+        # the log file was truncated, or the inode was reused by a new log file
+        if next_pos > size:
+            next_pos, points = 0, []
+        if next_pos >= size:
+            return {"next": next_pos, "points": points}
+
+        with mmap.mmap(infile.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            while next_pos < size:
+                line_start = mm.find(b"\n", next_pos - 1, size) + 1 if next_pos else 0
+                if not line_start and next_pos:
+                    # no complete line yet
+                    break
+
+                lookahead_end = min(line_start + TIME_INDEX_LOOKAHEAD, size)
+                match = TIMESTAMP_RE.search(mm, line_start, lookahead_end)  # type: ignore
+                if not match:
+                    if lookahead_end == size:
+                        # try again once more lines are written
+                        next_pos = line_start
+                        break
+                    next_pos = line_start + TIME_INDEX_STEP
+                    continue
+
+                match_line_start = mm.rfind(b"\n", line_start, match.start()) + 1 or line_start
+                points.append([_get_timestamp(match), match_line_start])
+                next_pos = match_line_start + TIME_INDEX_STEP
+
+    return {"next": next_pos, "points": points}
+
+
+def _update_time_index(state_dir: Path, logfiles: Iterable[Path]) -> Dict[str, Dict[str, Any]]:
+    """Update sparse time index of all generations of the log files.
+
+    Needs to be called with the cluster instance log files lock held.
+    """
+    index_file = state_dir / TIME_INDEX_FILE_NAME
+    index = _load_state(index_file)
+    orig_index = {k: v.copy() for k, v in index.items()}
+
+    for logfile in logfiles:
+        if not _is_live_logfile(logfile.name):
+            continue
+        logfile_index = index.get(logfile.name) or {}
+        new_logfile_index = {}
+        try:
+            for generation in get_log_generations(logfile):
+                inode = str(generation.inode)
+                new_logfile_index[inode] = _index_generation(
+                    logfile=generation.logfile, index=logfile_index.get(inode) or {}
+                )
+        except FileNotFoundError:
+            # the cluster instance is being restarted and the log files were removed
+            continue
+        index[logfile.name] = new_logfile_index
+
+    if index != orig_index:
+        try:
+            _save_state(state_file=index_file, state=index)
+        except FileNotFoundError:
+            pass
+
+    return index
+
+
+def _read_generation_window(
+    logfile: Path, points: List[List[float]], start: float, end: float
+) -> List[str]:
+    """Read lines of a log file generation with timestamps in the given time window."""
+    timestamps = [p[0] for p in points]
+    # start reading at the last indexed line that is safely before the window
+    start_idx = bisect.bisect_left(timestamps, start - TIME_INDEX_SLACK) - 1
+    seek = int(points[start_idx][1]) if start_idx >= 0 else 0
+    # stop reading at the first indexed line that is safely after the window
+    end_idx = bisect.bisect_right(timestamps, end + TIME_INDEX_SLACK)
+    stop = int(points[end_idx][1]) if end_idx < len(points) else -1
+
+    with open(logfile, "rb") as infile:
+        infile.seek(seek)
+        content = infile.read(stop - seek if stop != -1 else -1)
+
+    lines = []
+    in_window = False
+    for line in content.splitlines(keepends=True):
+        match = TIMESTAMP_RE.search(line)
+        # lines without timestamp belong to the preceding line
+        if match:
+            in_window = start <= _get_timestamp(match) <= end
+        if in_window:
+            lines.append(line.decode("utf-8", errors="replace"))
+
+    return lines
+
+
+def read_window(instance_num: int, start: float, end: float) -> List[Tuple[Path, str]]:
+    """Read lines of node logs of a cluster instance that were logged in the given time window.
+
+    The sparse time index is used to read only the relevant part of each log file.
+
+    Args:
+        instance_num: A number of cluster instance.
+        start: A start of the time window (seconds since the epoch).
+        end: An end of the time window (seconds since the epoch).
+
+    Returns:
+        List[Tuple[Path, str]]: A list of tuples containing log file path and the log line.
+    """
+    state_dir = cluster_nodes.get_cardano_node_socket_path(instance_num).parent
+    logfiles = [f for f in state_dir.glob("*.stdout") if _is_live_logfile(f.name)]
+
+    logfiles_lock = LOGFILES_LOCK_TEMPLATE.format(state_dir.name)
+    with helpers.FileLockIfXdist(f"{helpers.get_basetemp()}/{logfiles_lock}"):
+        index = _update_time_index(state_dir=state_dir, logfiles=logfiles)
+
+    window_lines: List[Tuple[Path, str]] = []
+    for logfile in logfiles:
+        logfile_index = index.get(logfile.name) or {}
+        for generation in get_log_generations(logfile):
+            # skip generations that were last modified before the window
+            if generation.timestamp < start - TIME_INDEX_SLACK:
+                continue
+            points = (logfile_index.get(str(generation.inode)) or {}).get("points") or []
+            try:
+                lines = _read_generation_window(
+                    logfile=generation.logfile, points=points, start=start, end=end
+                )
+            except FileNotFoundError:
+                continue
+            window_lines.extend((logfile, line) for line in lines)
+
+    return window_lines
+
+
+class _DirWatch:
+    """Wait for changes of files in a directory.
+
+    Uses `inotify` when it's available, falls back to polling otherwise. The `wait` method is
+    meant to be called from a single thread, `read_pending` can be called from any thread.
+    """
+
+    # pylint: disable=too-few-public-methods
+
+    IN_MODIFY = 0x00000002
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_DELETE_SELF = 0x00000400
+    IN_IGNORED = 0x00008000
+    EVENT_HEADER = struct.Struct("iIII")
+
+    def __init__(self, dir_path: Path, poll_interval: float) -> None:
+        self.dir_path = dir_path
+        self.poll_interval = poll_interval
+        self._fd = -1
+        self._gone = False
+        self._lock = threading.Lock()
+
+        self._libc: Optional[ctypes.CDLL] = None
+        libc_name = ctypes.util.find_library("c")
+        if libc_name:
+            libc = ctypes.CDLL(libc_name, use_errno=True)
+            if hasattr(libc, "inotify_init1"):
+                self._libc = libc
+
+    def _add_watch(self) -> bool:
+        """Start watching the directory using `inotify`."""
+        if not self._libc or not self.dir_path.is_dir():
+            return False
+
+        fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if fd < 0:
+            return False
+
+        mask = self.IN_MODIFY | self.IN_MOVED_TO | self.IN_CREATE | self.IN_DELETE_SELF
+        if self._libc.inotify_add_watch(fd, str(self.dir_path).encode(), mask) < 0:
+            os.close(fd)
+            return False
+
+        self._fd = fd
+        return True
+
+    def start(self) -> bool:
+        """Start watching the directory, so changes are recorded even before the first `wait`."""
+        with self._lock:
+            if self._gone:
+                # the directory was removed (e.g. cluster restart), start watching it again
+                self._close()
+            return self._fd != -1 or self._add_watch()
+
+    def _close(self) -> None:
+        if self._fd != -1:
+            os.close(self._fd)
+            self._fd = -1
+        self._gone = False
+
+    def close(self) -> None:
+        """Stop watching the directory."""
+        with self._lock:
+            self._close()
+
+    def _read_events(self) -> Optional[Set[str]]:
+        """Return names of changed files, `None` if the watched directory is gone.
+
+        Needs to be called with the lock held.
+        """
+        if self._gone:
+            return None
+
+        changed: Set[str] = set()
+        try:
+            buf = os.read(self._fd, 65536)
+        except BlockingIOError:
+            return changed
+
+        pos = 0
+        while pos < len(buf):
+            __, mask, __, name_len = self.EVENT_HEADER.unpack_from(buf, pos)
+            pos += self.EVENT_HEADER.size
+            name = buf[pos : pos + name_len].rstrip(b"\0").decode()
+            pos += name_len
+            if mask & (self.IN_DELETE_SELF | self.IN_IGNORED):
+                self._gone = True
+                return None
+            if name:
+                changed.add(name)
+
+        return changed
+
+    def wait(self, timeout: float) -> Optional[Set[str]]:
+        """Wait for changes in the directory.
+
+        Returns:
+            Optional[Set[str]]: Names of changed files, or `None` when the names are not
+                known (polling) and all files need to be checked.
+        """
+        if not self.start():
+            time.sleep(min(timeout, self.poll_interval))
+            return None
+
+        # the file descriptor is closed only by `start` and `close`, i.e. not by other threads
+        # while waiting
+        ready, __, __ = select.select([self._fd], [], [], timeout)
+        if not ready:
+            return set()
+
+        with self._lock:
+            return self._read_events()
+
+    def read_pending(self) -> Optional[Set[str]]:
+        """Return names of files changed since the last `wait`, without waiting.
+
+        Returns:
+            Optional[Set[str]]: Names of changed files, or `None` when the names are not
+                known (polling, or the watched directory is gone).
+        """
+        with self._lock:
+            if self._fd == -1:
+                return None
+            return self._read_events()
+
+
+class LogWatcher:
+    """Watch log files of a cluster instance in background and collect errors.
+
+    New lines are searched for errors as soon as they are written to the log files, so there's
+    no need to scan all the log files once a test is finished. The log files are searched only
+    while the watcher is resumed, i.e. while a test is running on the cluster instance.
+    Changes that were not searched yet are kept as pending until the next search.
+    """
+
+    def __init__(self, state_dir: Path, poll_interval: float = 2.0, delay: float = 0.5) -> None:
+        self.state_dir = state_dir
+        self.poll_interval = poll_interval
+        self.delay = delay
+
+        self._errors: List[Tuple[Path, str]] = []
+        self._errors_lock = threading.Lock()
+        self._search_lock = threading.Lock()
+        # names of log files that are known to the watcher, and of those not searched yet
+        self._tracked: Set[str] = set()
+        self._pending: Set[str] = set()
+        self._dir_watch = _DirWatch(dir_path=state_dir, poll_interval=poll_interval)
+        self._resumed = threading.Event()
+        self._search_all = threading.Event()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _add_pending(self, changed: Iterable[str]) -> None:
+        """Record changed log files, needs to be called with the search lock held."""
+        # change of a rotated log means that the "live" log file needs to be searched
+        live_names = {_get_live_name(n) for n in changed}
+        live_names = {n for n in live_names if _is_live_logfile(n) and fnmatch.fnmatch(n, "*.std*")}
+        self._tracked.update(live_names)
+        self._pending.update(live_names)
+
+    def _search_pending(self) -> None:
+        """Search log files with pending changes, needs to be called with the search lock held."""
+        logfile_names, self._pending = self._pending, set()
+        if not logfile_names:
+            return
+        errors = search_cluster_artifacts(
+            state_dir=self.state_dir, logfile_names=sorted(logfile_names)
+        )
+        if errors:
+            with self._errors_lock:
+                self._errors.extend(errors)
+
+    def _search(self) -> None:
+        with self._search_lock:
+            # check the flag again, the watcher could be paused while waiting for the lock;
+            # the changes are left pending in that case
+            if not self._resumed.is_set():
+                return
+            self._search_pending()
+
+    def _run(self) -> None:
+        try:
+            while not self._stopped.is_set():
+                if not self._resumed.wait(timeout=self.poll_interval):
+                    continue
+
+                changed: Optional[Set[str]] = None
+                if self._search_all.is_set():
+                    self._search_all.clear()
+                else:
+                    changed = self._dir_watch.wait(timeout=self.poll_interval)
+                if changed is None:
+                    changed = {f.name for f in self.state_dir.glob("*.std*")}
+                with self._search_lock:
+                    self._add_pending(changed)
+                    if not self._pending:
+                        continue
+
+                # let more lines accumulate, the node writes to the log files many times
+                # per second
+                time.sleep(self.delay)
+
+                try:
+                    self._search()
+                except Exception as exc:
+                    LOGGER.error(f"Failed to search log files in '{self.state_dir}': {exc}")
+        finally:
+            self._dir_watch.close()
+
+    def start(self) -> None:
+        """Start the background thread."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stopped.clear()
+        self._dir_watch.start()
+        self._thread = threading.Thread(
+            target=self._run, name=f"log_watcher_{self.state_dir.name}", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the background thread."""
+        self._stopped.set()
+        self._resumed.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+        self._resumed.clear()
+
+    def resume(self) -> None:
+        """Start searching the log files, e.g. when a test started."""
+        # search all log files first, new lines might have been written while paused
+        self._search_all.set()
+        self._resumed.set()
+        self.start()
+
+    def pause(self) -> None:
+        """Stop searching the log files, e.g. when a test finished.
+
+        Waits until the search that is currently in progress is finished, and searches the lines
+        that were written since the last search, so they are not attributed to the next test.
+        Only the log files with pending changes are searched, or all the tracked log files
+        when names of the changed files are not known.
+        """
+        self._resumed.clear()
+        with self._search_lock:
+            changed = self._dir_watch.read_pending()
+            self._add_pending(self._tracked if changed is None else changed)
+            self._search_pending()
+
+    def get_errors(self) -> List[Tuple[Path, str]]:
+        """Return errors found since the last call and remove them from the index."""
+        with self._errors_lock:
+            errors, self._errors = self._errors, []
+        return errors
+
+
 def report_artifacts_errors(errors: List[Tuple[Path, str]]) -> None:
     """Report errors found in artifacts."""
     err = [f"{e[0]}: {e[1]}" for e in errors]
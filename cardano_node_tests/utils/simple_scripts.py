@@ -0,0 +1,185 @@
+"""In-process tools for simple scripts (multi-signature and time locking scripts).
+
+The scripts are JSON files in the same format as used by `cardano-cli`. Script hashes (and
+policy IDs) and script addresses are the same as the ones computed by `cardano-cli`.
+"""
+import hashlib
+import json
+from pathlib import Path
+from typing import List
+
+import cbor2
+from cardano_clusterlib import clusterlib
+
+from cardano_node_tests.utils import cbor_raw
+from cardano_node_tests.utils import keys
+from cardano_node_tests.utils.types import FileType
+
+SCRIPT_HASH_SIZE = 28
+# prefix of serialized simple script when computing the script hash
+SIMPLE_SCRIPT_TAG = b"\x00"
+
+
+class ScriptTypes:
+    SIG = "sig"
+    ALL = clusterlib.MultiSigTypeArgs.ALL
+    ANY = clusterlib.MultiSigTypeArgs.ANY
+    AT_LEAST = clusterlib.MultiSigTypeArgs.AT_LEAST
+    AFTER = clusterlib.MultiSlotTypeArgs.AFTER
+    BEFORE = clusterlib.MultiSlotTypeArgs.BEFORE
+
+
+# CBOR tags of script types; "after" is the start and "before" is the end of validity interval
+_SCRIPT_TAGS = {
+    ScriptTypes.SIG: 0,
+    ScriptTypes.ALL: 1,
+    ScriptTypes.ANY: 2,
+    ScriptTypes.AT_LEAST: 3,
+    ScriptTypes.AFTER: 4,
+    ScriptTypes.BEFORE: 5,
+}
+
+
+def encode_script(script: dict) -> bytes:
+    """Serialize simple script to CBOR, the same way as the ledger does."""
+    script_type = script.get("type")
+    tag = _SCRIPT_TAGS.get(script_type or "")
+    if tag is None:
+        raise AssertionError(f"Unknown type of script: '{script_type}'")
+
+    encoded_tag = cbor2.dumps(tag)
+    if script_type == ScriptTypes.SIG:
+        items = [encoded_tag, cbor2.dumps(bytes.fromhex(script["keyHash"]))]
+    elif script_type in (ScriptTypes.AFTER, ScriptTypes.BEFORE):
+        items = [encoded_tag, cbor2.dumps(script["slot"])]
+    else:
+        sub_scripts = cbor_raw.encode_array(encode_script(s) for s in script["scripts"])
+        items = [encoded_tag, sub_scripts]
+        if script_type == ScriptTypes.AT_LEAST:
+            items.insert(1, cbor2.dumps(script["required"]))
+
+    return cbor_raw.encode_array(items, indefinite_allowed=False)
+
+
+def read_script(script_file: FileType) -> dict:
+    """Read simple script from JSON file."""
+    with open(Path(script_file).expanduser(), encoding="utf-8") as in_json:
+        script: dict = json.load(in_json)
+    return script
+
+
+def get_script_cbor_hash(script_cbor: bytes) -> bytes:
+    """Return blake2b-224 hash of the CBOR serialized simple script."""
+    return hashlib.blake2b(SIMPLE_SCRIPT_TAG + script_cbor, digest_size=SCRIPT_HASH_SIZE).digest()
+
+
+def get_script_hash_bytes(script: dict) -> bytes:
+    """Return blake2b-224 hash of the simple script."""
+    return get_script_cbor_hash(encode_script(script))
+
+
+def get_policyid(script_file: FileType) -> str:
+    """Return policy ID (script hash) of the script, the same as `ClusterLib.get_policyid`."""
+    return get_script_hash_bytes(read_script(script_file)).hex()
+
+
+def build_script_address(script_file: FileType, network_id: int = keys.NETWORK_ID_TESTNET) -> str:
+    """Build enterprise script address, the same as `address build-script`."""
+    header = keys.ADDR_TYPE_SCRIPT_ENTERPRISE << 4 | network_id
+    addr_bytes = bytes([header]) + get_script_hash_bytes(read_script(script_file))
+    return keys.encode_address(prefix="addr", network_id=network_id, addr_bytes=addr_bytes)
+
+
+def gen_script_addr(
+    addr_name: str,
+    cluster_obj: clusterlib.ClusterLib,
+    script_file: FileType,
+    destination_dir: FileType = ".",
+) -> str:
+    """Generate a script address, the same as `ClusterLib.gen_script_addr`.
+
+    Args:
+        addr_name: A name of payment address.
+        cluster_obj: An instance of `clusterlib.ClusterLib`.
+        script_file: A path to corresponding script file.
+        destination_dir: A path to directory for storing artifacts (optional).
+
+    Returns:
+        str: A generated script address.
+    """
+    address = build_script_address(
+        script_file=script_file, network_id=keys.get_network_id(cluster_obj)
+    )
+    out_file = Path(destination_dir).expanduser() / f"{addr_name}_script.addr"
+    with open(out_file, "w", encoding="utf-8") as out_addr:
+        out_addr.write(address)
+    return address
+
+
+def _write_script(out_file: Path, script: dict) -> Path:
+    with open(out_file, "w", encoding="utf-8") as out_json:
+        json.dump(script, out_json, indent=4)
+    return out_file
+
+
+def build_sig_script(
+    script_name: str, payment_vkey_file: FileType, destination_dir: FileType = "."
+) -> Path:
+    """Build a simple script that requires signature of the given key.
+
+    Args:
+        script_name: A name of the script.
+        payment_vkey_file: A path to payment vkey file.
+        destination_dir: A path to directory for storing artifacts (optional).
+
+    Returns:
+        Path: A path to the script file (`<script_name>.script`).
+    """
+    script = {"keyHash": keys.get_key_hash(payment_vkey_file), "type": ScriptTypes.SIG}
+    return _write_script(
+        out_file=Path(destination_dir).expanduser() / f"{script_name}.script", script=script
+    )
+
+
+def build_multisig_script(
+    script_name: str,
+    script_type_arg: str,
+    payment_vkey_files: clusterlib.OptionalFiles,
+    required: int = 0,
+    slot: int = 0,
+    slot_type_arg: str = "",
+    destination_dir: FileType = ".",
+) -> Path:
+    """Build a multi-signature script, the same as `ClusterLib.build_multisig_script`.
+
+    Args:
+        script_name: A name of the script.
+        script_type_arg: A script type, see `MultiSigTypeArgs`.
+        payment_vkey_files: A list of paths to payment vkey files.
+        required: A number of required keys for the "atLeast" script type (optional).
+        slot: A slot that sets script validity, depending on value of `slot_type_arg`
+            (optional).
+        slot_type_arg: A slot validity type, see `MultiSlotTypeArgs` (optional).
+        destination_dir: A path to directory for storing artifacts (optional).
+
+    Returns:
+        Path: A path to the script file.
+    """
+    scripts_l: List[dict] = [
+        {"keyHash": keys.get_key_hash(f), "type": ScriptTypes.SIG} for f in payment_vkey_files
+    ]
+    if slot:
+        scripts_l.append({"slot": slot, "type": slot_type_arg})
+
+    script: dict = {
+        "scripts": scripts_l,
+        "type": script_type_arg,
+    }
+
+    if script_type_arg == ScriptTypes.AT_LEAST:
+        script["required"] = required
+
+    return _write_script(
+        out_file=Path(destination_dir).expanduser() / f"{script_name}_multisig.script",
+        script=script,
+    )
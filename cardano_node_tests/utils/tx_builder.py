@@ -0,0 +1,456 @@
+"""In-process building of transaction bodies.
+
+The tx body files are byte for byte the same as the files created by `cardano-cli transaction
+build-raw` in Shelley, Allegra and Mary eras. As no `cardano-cli` process is started, there's no
+limit on number of inputs and outputs given by maximal length of command line.
+"""
+import hashlib
+from pathlib import Path
+from typing import Dict
+from typing import Iterable
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+import cbor2
+from cardano_clusterlib import clusterlib
+
+from cardano_node_tests.utils import bech32
+from cardano_node_tests.utils import cbor_raw
+from cardano_node_tests.utils import keys
+from cardano_node_tests.utils.types import FileType
+
+# envelope types of tx body files
+TX_BODY_ENVELOPE_TYPES = {
+    clusterlib.Eras.SHELLEY: "TxUnsignedShelley",
+    clusterlib.Eras.ALLEGRA: "TxBodyAllegra",
+    clusterlib.Eras.MARY: "TxBodyMary",
+}
+# era used by `cardano-cli` when no era argument is passed
+DEFAULT_TX_ERA = clusterlib.Eras.MARY
+
+# tx body keys
+BODY_INPUTS = 0
+BODY_OUTPUTS = 1
+BODY_FEE = 2
+BODY_TTL = 3
+BODY_CERTS = 4
+BODY_WITHDRAWALS = 5
+BODY_METADATA_HASH = 7
+BODY_VALIDITY_START = 8
+BODY_MINT = 9
+
+AUX_DATA_HASH_SIZE = 32
+
+_BASE58_ALPHABET = "123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz"
+
+MultiAssetType = Dict[bytes, Dict[bytes, int]]
+
+
+def _decode_base58(base58_str: str) -> bytes:
+    num = 0
+    for char in base58_str:
+        idx = _BASE58_ALPHABET.find(char)
+        if idx == -1:
+            raise AssertionError(f"Invalid character '{char}' in address '{base58_str}'")
+        num = num * 58 + idx
+    # leading "1"s are leading zero bytes
+    leading_zeros = len(base58_str) - len(base58_str.lstrip("1"))
+    return b"\x00" * leading_zeros + num.to_bytes((num.bit_length() + 7) // 8, "big")
+
+
+def get_address_bytes(address: str) -> bytes:
+    """Return raw bytes of Shelley (bech32) or Byron (base58) address."""
+    if address.startswith(("addr", "stake")):
+        return bech32.decode(address).data
+    return _decode_base58(address)
+
+
+def _encode_base58(data: bytes) -> str:
+    num = int.from_bytes(data, "big")
+    chars = []
+    while num:
+        num, idx = divmod(num, 58)
+        chars.append(_BASE58_ALPHABET[idx])
+    # leading zero bytes are leading "1"s
+    leading_zeros = len(data) - len(data.lstrip(b"\x00"))
+    return "1" * leading_zeros + "".join(reversed(chars))
+
+
+def get_address_str(addr_bytes: bytes) -> str:
+    """Return Shelley (bech32) or Byron (base58) address for the raw address bytes."""
+    addr_type, network_id = addr_bytes[0] >> 4, addr_bytes[0] & 0x0F
+    if addr_type == keys.ADDR_TYPE_BYRON:
+        return _encode_base58(addr_bytes)
+    prefix = "stake" if addr_type >= keys.ADDR_TYPE_REWARD else "addr"
+    return keys.encode_address(prefix=prefix, network_id=network_id, addr_bytes=addr_bytes)
+
+
+def _get_era(cluster_obj: clusterlib.ClusterLib) -> str:
+    era = cluster_obj.tx_era or DEFAULT_TX_ERA
+    if era not in TX_BODY_ENVELOPE_TYPES:
+        raise AssertionError(f"Unsupported transaction era '{era}'")
+    return era
+
+
+def _parse_coin(coin: str) -> Tuple[bytes, bytes]:
+    """Return policy ID and asset name of the "policyid.asset_name" coin."""
+    policyid, __, asset_name = coin.partition(".")
+    return bytes.fromhex(policyid), asset_name.encode("utf-8")
+
+
+def _sum_value(records: Iterable[clusterlib.TxOut]) -> Tuple[int, MultiAssetType]:
+    """Sum amounts of Lovelace and other assets, leave out zero amounts."""
+    lovelace = 0
+    assets: MultiAssetType = {}
+    for rec in records:
+        if not rec.coin or rec.coin == clusterlib.DEFAULT_COIN:
+            lovelace += rec.amount
+            continue
+        policyid, asset_name = _parse_coin(rec.coin)
+        policy_assets = assets.setdefault(policyid, {})
+        policy_assets[asset_name] = policy_assets.get(asset_name, 0) + rec.amount
+
+    nonzero_assets = {}
+    for policyid, policy_assets in assets.items():
+        nonzero = {n: a for n, a in policy_assets.items() if a}
+        if nonzero:
+            nonzero_assets[policyid] = nonzero
+    return lovelace, nonzero_assets
+
+
+def _encode_multiasset(assets: MultiAssetType) -> bytes:
+    """Encode multi-asset map, keys are ordered the same way as in Haskell `Map`."""
+    return cbor_raw.encode_map(
+        cbor2.dumps(policyid)
+        + cbor_raw.encode_map(
+            cbor2.dumps(name) + cbor2.dumps(assets[policyid][name])
+            for name in sorted(assets[policyid])
+        )
+        for policyid in sorted(assets)
+    )
+
+
+def _encode_txins(txins: Iterable[clusterlib.UTXOData]) -> bytes:
+    # the ledger keeps the inputs in a set ordered by tx ID and index
+    unique_txins = {(bytes.fromhex(t.utxo_hash), t.utxo_ix) for t in txins}
+    return cbor_raw.encode_array(
+        cbor_raw.encode_array((cbor2.dumps(txid), cbor2.dumps(idx)))
+        for txid, idx in sorted(unique_txins)
+    )
+
+
+def _encode_txout(address: str, records: List[clusterlib.TxOut], era: str) -> bytes:
+    lovelace, assets = _sum_value(records)
+    if not assets:
+        value = cbor2.dumps(lovelace)
+    elif era == clusterlib.Eras.MARY:
+        value = cbor_raw.encode_array((cbor2.dumps(lovelace), _encode_multiasset(assets)))
+    else:
+        raise AssertionError(f"Multi-asset outputs are not supported in '{era}' era")
+    return cbor_raw.encode_array((cbor2.dumps(get_address_bytes(address)), value))
+
+
+def _encode_txouts(txouts: Iterable[clusterlib.TxOut], join_txouts: bool, era: str) -> bytes:
+    if join_txouts:
+        # aggregate TX outputs by address, the same way as `clusterlib` does
+        txouts_by_addr: Dict[str, List[clusterlib.TxOut]] = {}
+        for rec in txouts:
+            txouts_by_addr.setdefault(rec.address, []).append(rec)
+        grouped = list(txouts_by_addr.items())
+    else:
+        grouped = [(rec.address, [rec]) for rec in txouts]
+
+    return cbor_raw.encode_array(
+        _encode_txout(address=addr, records=recs, era=era) for addr, recs in grouped
+    )
+
+
+def _reward_account_sort_key(reward_account: bytes) -> Tuple[int, int, bytes]:
+    """Order reward accounts the same way as the ledger does.
+
+    Accounts are ordered by network, then script credentials go before key credentials.
+    """
+    header = reward_account[0]
+    return header & 0x0F, 0 if header & 0x10 else 1, reward_account[1:]
+
+
+def _encode_withdrawals(withdrawals: Iterable[clusterlib.TxOut]) -> bytes:
+    amounts: Dict[bytes, int] = {}
+    for rec in withdrawals:
+        amounts[get_address_bytes(rec.address)] = rec.amount
+    return cbor_raw.encode_map(
+        cbor2.dumps(acc) + cbor2.dumps(amounts[acc])
+        for acc in sorted(amounts, key=_reward_account_sort_key)
+    )
+
+
+def _read_certificates(certificate_files: Iterable[FileType]) -> List[bytes]:
+    return [bytes.fromhex(keys.read_text_envelope(f)["cborHex"]) for f in certificate_files]
+
+
+def _read_metadata(metadata_cbor_files: Iterable[FileType]) -> dict:
+    metadata: dict = {}
+    for metadata_file in metadata_cbor_files:
+        with open(Path(metadata_file).expanduser(), "rb") as in_cbor:
+            file_metadata = cbor2.load(in_cbor)
+        duplicate_keys = metadata.keys() & file_metadata.keys()
+        if duplicate_keys:
+            raise AssertionError(f"Duplicate metadata keys: {sorted(duplicate_keys)}")
+        metadata.update(file_metadata)
+    return metadata
+
+
+def encode_aux_data(metadata: dict, era: str) -> bytes:
+    """Encode auxiliary data (metadata) the same way as `cardano-cli` does."""
+    metadata_cbor = cbor_raw.encode_map(
+        cbor2.dumps(key) + cbor2.dumps(metadata[key]) for key in sorted(metadata)
+    )
+    if era == clusterlib.Eras.SHELLEY:
+        return metadata_cbor
+    # Allegra and Mary auxiliary data are metadata and auxiliary scripts
+    return cbor_raw.encode_array((metadata_cbor, cbor_raw.encode_array(())))
+
+
+def _get_unsupported(
+    tx_files: clusterlib.TxFiles,
+    invalid_before: Optional[int],
+    mint: Iterable[clusterlib.TxOut],
+    era: str,
+) -> List[str]:
+    unsupported = []
+    if tx_files.proposal_files:
+        unsupported.append("update proposals")
+    if tx_files.metadata_json_files:
+        unsupported.append("JSON metadata")
+    if tx_files.script_files and any(tx_files.script_files):
+        unsupported.append("scripts")
+    if era == clusterlib.Eras.SHELLEY and invalid_before is not None:
+        unsupported.append("validity interval start")
+    if era != clusterlib.Eras.MARY and mint:
+        unsupported.append("minting")
+    return unsupported
+
+
+def _check_supported(
+    tx_files: clusterlib.TxFiles,
+    invalid_before: Optional[int],
+    mint: Iterable[clusterlib.TxOut],
+    era: str,
+) -> None:
+    unsupported = _get_unsupported(
+        tx_files=tx_files, invalid_before=invalid_before, mint=mint, era=era
+    )
+    if unsupported:
+        raise AssertionError(f"Not supported by the tx builder in '{era}' era: {unsupported}")
+
+
+def is_supported(
+    cluster_obj: clusterlib.ClusterLib,
+    tx_files: Optional[clusterlib.TxFiles] = None,
+    invalid_before: Optional[int] = None,
+    mint: clusterlib.OptionalTxOuts = (),
+) -> bool:
+    """Check if the transaction can be built in-process."""
+    era = cluster_obj.tx_era or DEFAULT_TX_ERA
+    if era not in TX_BODY_ENVELOPE_TYPES:
+        return False
+    return not _get_unsupported(
+        tx_files=tx_files or clusterlib.TxFiles(),
+        invalid_before=invalid_before,
+        mint=list(mint),
+        era=era,
+    )
+
+
+def build_tx_body(
+    cluster_obj: clusterlib.ClusterLib,
+    txins: Iterable[clusterlib.UTXOData],
+    txouts: Iterable[clusterlib.TxOut],
+    tx_files: clusterlib.TxFiles,
+    fee: int,
+    withdrawals: Iterable[clusterlib.TxOut] = (),
+    invalid_hereafter: Optional[int] = None,
+    invalid_before: Optional[int] = None,
+    mint: Iterable[clusterlib.TxOut] = (),
+    join_txouts: bool = True,
+) -> bytes:
+    """Build a transaction body and return the content of tx body file (CBOR).
+
+    See `build_raw_tx_bare` for description of arguments.
+    """
+    # pylint: disable=too-many-arguments
+    era = _get_era(cluster_obj)
+    withdrawals = list(withdrawals)
+    mint = list(mint)
+    _check_supported(tx_files=tx_files, invalid_before=invalid_before, mint=mint, era=era)
+
+    aux_data = None
+    metadata = _read_metadata(tx_files.metadata_cbor_files)
+    if metadata:
+        aux_data = encode_aux_data(metadata=metadata, era=era)
+
+    fields: List[Tuple[int, bytes]] = [
+        (BODY_INPUTS, _encode_txins(txins)),
+        (BODY_OUTPUTS, _encode_txouts(txouts=txouts, join_txouts=join_txouts, era=era)),
+        (BODY_FEE, cbor2.dumps(fee)),
+    ]
+    if invalid_hereafter is not None:
+        fields.append((BODY_TTL, cbor2.dumps(invalid_hereafter)))
+    elif era == clusterlib.Eras.SHELLEY:
+        raise AssertionError("TTL (`invalid_hereafter`) is mandatory in Shelley era")
+    certificates = _read_certificates(tx_files.certificate_files)
+    if certificates:
+        fields.append((BODY_CERTS, cbor_raw.encode_array(certificates)))
+    if withdrawals:
+        fields.append((BODY_WITHDRAWALS, _encode_withdrawals(withdrawals)))
+    if aux_data:
+        fields.append(
+            (
+                BODY_METADATA_HASH,
+                cbor2.dumps(hashlib.blake2b(aux_data, digest_size=AUX_DATA_HASH_SIZE).digest()),
+            )
+        )
+    if invalid_before is not None:
+        fields.append((BODY_VALIDITY_START, cbor2.dumps(invalid_before)))
+    __, mint_assets = _sum_value(mint)
+    if mint_assets:
+        fields.append((BODY_MINT, _encode_multiasset(mint_assets)))
+
+    body = cbor_raw.encode_map(cbor2.dumps(key) + value for key, value in fields)
+    # tx body file contains the body, scripts and auxiliary data
+    return cbor_raw.encode_array(
+        (body, cbor_raw.encode_list(()), aux_data or cbor_raw.NULL), indefinite_allowed=False
+    )
+
+
+def build_raw_tx_bare(
+    cluster_obj: clusterlib.ClusterLib,
+    out_file: FileType,
+    txins: List[clusterlib.UTXOData],
+    txouts: List[clusterlib.TxOut],
+    tx_files: clusterlib.TxFiles,
+    fee: int,
+    ttl: Optional[int] = None,
+    withdrawals: clusterlib.OptionalTxOuts = (),
+    invalid_hereafter: Optional[int] = None,
+    invalid_before: Optional[int] = None,
+    mint: clusterlib.OptionalTxOuts = (),
+    join_txouts: bool = True,
+) -> clusterlib.TxRawOutput:
+    """Build a raw transaction in-process, the same as `ClusterLib.build_raw_tx_bare`.
+
+    Args:
+        cluster_obj: An instance of `clusterlib.ClusterLib`.
+        out_file: An output file.
+        txins: An iterable of `UTXOData`, specifying input UTxOs.
+        txouts: A list (iterable) of `TxOuts`, specifying transaction outputs.
+        tx_files: A `TxFiles` tuple containing files needed for the transaction.
+        fee: A fee amount.
+        ttl: A last block when the transaction is still valid
+            (deprecated in favor of `invalid_hereafter`, optional).
+        withdrawals: A list (iterable) of `TxOuts`, specifying reward withdrawals (optional).
+        invalid_hereafter: A last block when the transaction is still valid (optional).
+        invalid_before: A first block when the transaction is valid (optional).
+        mint: A list (iterable) of `TxOuts`, specifying minted tokens (optional).
+        join_txouts: A bool indicating whether to aggregate transaction outputs
+            by payment address (True by default).
+
+    Returns:
+        TxRawOutput: A tuple with transaction output details.
+    """
+    # pylint: disable=too-many-arguments
+    out_file = Path(out_file)
+    invalid_hereafter = invalid_hereafter if invalid_hereafter is not None else ttl
+
+    tx_body = build_tx_body(
+        cluster_obj=cluster_obj,
+        txins=txins,
+        txouts=txouts,
+        tx_files=tx_files,
+        fee=fee,
+        withdrawals=withdrawals,
+        invalid_hereafter=invalid_hereafter,
+        invalid_before=invalid_before,
+        mint=mint,
+        join_txouts=join_txouts,
+    )
+    keys.write_cbor_text_envelope(
+        out_file=out_file,
+        type=TX_BODY_ENVELOPE_TYPES[_get_era(cluster_obj)],
+        description="",
+        cbor_data=tx_body,
+    )
+
+    return clusterlib.TxRawOutput(
+        txins=txins,
+        txouts=txouts,
+        tx_files=tx_files,
+        out_file=out_file,
+        fee=fee,
+        invalid_hereafter=invalid_hereafter,
+        invalid_before=invalid_before,
+        withdrawals=withdrawals,
+        mint=mint,
+    )
+
+
+def build_raw_tx(
+    cluster_obj: clusterlib.ClusterLib,
+    src_address: str,
+    tx_name: str,
+    txins: clusterlib.OptionalUTXOData = (),
+    txouts: clusterlib.OptionalTxOuts = (),
+    tx_files: Optional[clusterlib.TxFiles] = None,
+    fee: int = 0,
+    ttl: Optional[int] = None,
+    withdrawals: clusterlib.OptionalTxOuts = (),
+    deposit: Optional[int] = None,
+    invalid_hereafter: Optional[int] = None,
+    invalid_before: Optional[int] = None,
+    mint: clusterlib.OptionalTxOuts = (),
+    join_txouts: bool = True,
+    destination_dir: FileType = ".",
+) -> clusterlib.TxRawOutput:
+    """Balance inputs and outputs and build a raw transaction in-process.
+
+    The same as `ClusterLib.build_raw_tx`, see it for description of arguments.
+    """
+    # pylint: disable=too-many-arguments
+    out_file = Path(destination_dir).expanduser() / f"{tx_name}_tx.body"
+    if out_file.exists():
+        raise AssertionError(f"The expected file `{out_file}` already exist.")
+
+    tx_files = tx_files or clusterlib.TxFiles()
+    if (
+        ttl is None
+        and invalid_hereafter is None
+        and _get_era(cluster_obj) == clusterlib.Eras.SHELLEY
+    ):
+        invalid_hereafter = cluster_obj.calculate_tx_ttl()
+    withdrawals = withdrawals and cluster_obj.get_withdrawals(withdrawals)
+
+    txins_copy, txouts_copy = cluster_obj.get_tx_ins_outs(
+        src_address=src_address,
+        tx_files=tx_files,
+        txins=txins,
+        txouts=txouts,
+        fee=fee,
+        deposit=deposit,
+        withdrawals=withdrawals,
+        mint=mint,
+    )
+
+    return build_raw_tx_bare(
+        cluster_obj=cluster_obj,
+        out_file=out_file,
+        txins=txins_copy,
+        txouts=txouts_copy,
+        tx_files=tx_files,
+        fee=fee,
+        withdrawals=withdrawals,
+        invalid_hereafter=invalid_hereafter if invalid_hereafter is not None else ttl,
+        invalid_before=invalid_before,
+        mint=mint,
+        join_txouts=join_txouts,
+    )
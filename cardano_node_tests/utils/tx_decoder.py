@@ -0,0 +1,188 @@
+"""Lazy decoding of transaction body and signed transaction files.
+
+Only the raw CBOR structure of the transaction is split when the file is loaded. Individual
+fields of the transaction body are decoded when they are accessed, and the transaction ID is
+computed from the original bytes of the body, without calling `cardano-cli`.
+"""
+import functools
+from typing import Any
+from typing import Dict
+from typing import List
+from typing import NamedTuple
+from typing import Optional
+
+import cbor2
+from cardano_clusterlib import clusterlib
+
+from cardano_node_tests.utils import cbor_raw
+from cardano_node_tests.utils import keys
+from cardano_node_tests.utils import tx_builder
+from cardano_node_tests.utils import tx_signing
+from cardano_node_tests.utils.types import FileType
+
+# envelope types of tx body and signed transaction files
+TX_FILE_TYPES = frozenset(
+    (
+        *tx_signing.TX_ENVELOPE_TYPES,
+        *(t.tx for t in tx_signing.TX_ENVELOPE_TYPES.values()),
+    )
+)
+
+
+class TxIn(NamedTuple):
+    utxo_hash: str
+    utxo_ix: int
+
+
+def _decode_coin(policyid: bytes, asset_name: bytes) -> str:
+    """Return coin in the "policyid.asset_name" format used by `clusterlib`.
+
+    Asset names are arbitrary bytes, names that are not valid UTF-8 are returned hex encoded.
+    """
+    if not asset_name:
+        return policyid.hex()
+    try:
+        name = asset_name.decode("utf-8")
+    except UnicodeDecodeError:
+        name = asset_name.hex()
+    return f"{policyid.hex()}.{name}"
+
+
+def _decode_multiasset(
+    assets: Dict[bytes, Dict[bytes, int]], address: str = ""
+) -> List[clusterlib.TxOut]:
+    return [
+        clusterlib.TxOut(address=address, amount=amount, coin=_decode_coin(policyid, name))
+        for policyid, policy_assets in assets.items()
+        for name, amount in policy_assets.items()
+    ]
+
+
+def _decode_txout(txout: list) -> List[clusterlib.TxOut]:
+    """Decode transaction output, there's one `TxOut` record for each coin of the output."""
+    addr_bytes, value = txout
+    address = tx_builder.get_address_str(addr_bytes)
+    if isinstance(value, int):
+        return [clusterlib.TxOut(address=address, amount=value)]
+    lovelace, assets = value
+    return [
+        clusterlib.TxOut(address=address, amount=lovelace),
+        *_decode_multiasset(assets=assets, address=address),
+    ]
+
+
+class Tx:
+    """Transaction body or signed transaction, the fields are decoded when accessed."""
+
+    def __init__(self, envelope_type: str, cbor_data: bytes):
+        if envelope_type not in TX_FILE_TYPES:
+            raise AssertionError(f"Unsupported type of transaction file: '{envelope_type}'")
+        self.envelope_type = envelope_type
+        self.cbor_data = cbor_data
+
+    @functools.cached_property
+    def _parts(self) -> List[bytes]:
+        # body, scripts (or witness set for signed tx) and auxiliary data
+        parts = cbor_raw.split_array(self.cbor_data)
+        if len(parts) != 3:
+            raise AssertionError("Unexpected format of transaction, expected 3 parts")
+        return parts
+
+    @property
+    def body(self) -> bytes:
+        """Raw CBOR encoded transaction body."""
+        return self._parts[0]
+
+    @functools.cached_property
+    def _body_fields(self) -> Dict[int, bytes]:
+        """Split the body map into raw CBOR encoded values, keyed by field number."""
+        return {cbor2.loads(k): v for k, v in cbor_raw.split_map(self.body)}
+
+    def _get_field(self, key: int, default: Any = None) -> Any:
+        raw_value = self._body_fields.get(key)
+        if raw_value is None:
+            return default
+        return cbor2.loads(raw_value)
+
+    @functools.cached_property
+    def txid(self) -> str:
+        """Transaction ID, i.e. hash of the transaction body."""
+        return tx_signing.get_tx_body_hash(self.body).hex()
+
+    @functools.cached_property
+    def txins(self) -> List[TxIn]:
+        return [
+            TxIn(utxo_hash=txid.hex(), utxo_ix=ix)
+            for txid, ix in self._get_field(tx_builder.BODY_INPUTS, default=())
+        ]
+
+    @functools.cached_property
+    def txouts(self) -> List[clusterlib.TxOut]:
+        return [
+            rec
+            for txout in self._get_field(tx_builder.BODY_OUTPUTS, default=())
+            for rec in _decode_txout(txout)
+        ]
+
+    @functools.cached_property
+    def fee(self) -> int:
+        fee: int = self._get_field(tx_builder.BODY_FEE, default=0)
+        return fee
+
+    @functools.cached_property
+    def invalid_before(self) -> Optional[int]:
+        invalid_before: Optional[int] = self._get_field(tx_builder.BODY_VALIDITY_START)
+        return invalid_before
+
+    @functools.cached_property
+    def invalid_hereafter(self) -> Optional[int]:
+        """The TTL, the validity interval end is optional in Allegra+ eras."""
+        invalid_hereafter: Optional[int] = self._get_field(tx_builder.BODY_TTL)
+        return invalid_hereafter
+
+    @functools.cached_property
+    def certificates(self) -> List[list]:
+        certificates: List[list] = self._get_field(tx_builder.BODY_CERTS, default=[])
+        return certificates
+
+    @functools.cached_property
+    def withdrawals(self) -> List[clusterlib.TxOut]:
+        return [
+            clusterlib.TxOut(address=tx_builder.get_address_str(addr_bytes), amount=amount)
+            for addr_bytes, amount in self._get_field(
+                tx_builder.BODY_WITHDRAWALS, default={}
+            ).items()
+        ]
+
+    @functools.cached_property
+    def mint(self) -> List[clusterlib.TxOut]:
+        """Minted (positive amount) and burned (negative amount) tokens, without address."""
+        return _decode_multiasset(self._get_field(tx_builder.BODY_MINT, default={}))
+
+    @functools.cached_property
+    def metadata(self) -> dict:
+        """Transaction metadata, without the auxiliary scripts."""
+        aux_data = self._parts[2]
+        if aux_data == cbor_raw.NULL:
+            return {}
+
+        # in Allegra+ eras the auxiliary data can be an array of metadata and scripts
+        if cbor_raw.read_head(aux_data)[0] == cbor_raw.MAJOR_ARRAY:
+            aux_data = cbor_raw.split_array(aux_data)[0]
+        metadata: dict = cbor2.loads(aux_data)
+        return metadata
+
+
+def decode_tx(envelope: dict) -> Tx:
+    """Decode content of a transaction body or signed transaction text envelope."""
+    return Tx(envelope_type=envelope["type"], cbor_data=bytes.fromhex(envelope["cborHex"]))
+
+
+def read_tx(tx_file: FileType) -> Tx:
+    """Read a transaction body file or a signed transaction file."""
+    return decode_tx(keys.read_text_envelope(tx_file))
+
+
+def get_txid(tx_file: FileType) -> str:
+    """Return transaction ID, the same as `ClusterLib.get_txid`."""
+    return read_tx(tx_file).txid
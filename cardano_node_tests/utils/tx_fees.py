@@ -0,0 +1,262 @@
+"""Offline estimation of transaction size and fee.
+
+The fee is estimated the same way as `cardano-cli transaction calculate-min-fee` does it, i.e.
+size of the transaction without witnesses is increased by expected size of the witnesses, and
+the fee is `txFeeFixed + txFeePerByte * size`.
+"""
+import functools
+import logging
+import time
+from pathlib import Path
+from typing import Callable
+from typing import Dict
+from typing import Iterable
+from typing import List
+from typing import NamedTuple
+from typing import Optional
+from typing import Tuple
+
+import cbor2
+from cardano_clusterlib import clusterlib
+
+from cardano_node_tests.utils import keys
+from cardano_node_tests.utils import tx_builder
+from cardano_node_tests.utils import tx_signing
+from cardano_node_tests.utils.types import FileType
+
+LOGGER = logging.getLogger(__name__)
+
+# sizes of CBOR encoded parts of a key witness
+_ARRAY_HEADER_SIZE = 1
+_VKEY_SIZE = 2 + 32
+_SIGNATURE_SIZE = 2 + 64
+_CHAIN_CODE_SIZE = 2 + 32
+
+SHELLEY_WITNESS_SIZE = _ARRAY_HEADER_SIZE + _VKEY_SIZE + _SIGNATURE_SIZE
+
+# Byron address attributes key of the network magic
+_BYRON_ATTR_NETWORK_MAGIC = 2
+
+
+class FeeParams(NamedTuple):
+    fee_fixed: int
+    fee_per_byte: int
+    max_tx_size: int
+    min_utxo_value: int = 0
+
+
+class TxSize(NamedTuple):
+    tx_size: int  # size of the transaction without witnesses
+    witness_count: int = 1
+    byron_witness_count: int = 0
+
+
+# fee params cached until the end of epoch, keyed by cluster state dir
+_FEE_PARAMS_CACHE: Dict[Path, Tuple[float, FeeParams]] = {}
+
+
+def get_fee_params(cluster_obj: clusterlib.ClusterLib, fresh: bool = False) -> FeeParams:
+    """Return protocol parameters needed for fee calculation and coin selection.
+
+    Protocol parameters can change only on epoch boundary, so they are queried only once
+    per epoch unless `fresh` is requested.
+    """
+    cached = _FEE_PARAMS_CACHE.get(cluster_obj.state_dir)
+    if cached and not fresh and time.time() < cached[0]:
+        return cached[1]
+
+    valid_until = time.time() + cluster_obj.time_to_epoch_end()
+    pparams = cluster_obj.get_protocol_params()
+    fee_params = FeeParams(
+        fee_fixed=pparams["txFeeFixed"],
+        fee_per_byte=pparams["txFeePerByte"],
+        max_tx_size=pparams["maxTxSize"],
+        min_utxo_value=pparams.get("minUTxOValue") or 0,
+    )
+
+    # don't cache the values if the epoch could have changed while querying them
+    if time.time() < valid_until:
+        _FEE_PARAMS_CACHE[cluster_obj.state_dir] = (valid_until, fee_params)
+
+    return fee_params
+
+
+def forget_fee_params(state_dir: Path) -> None:
+    """Forget cached fee params of the cluster instance, e.g. when the cluster instance was respun.
+
+    The new chain can have different protocol parameters and its epochs start at different times.
+    """
+    _FEE_PARAMS_CACHE.pop(state_dir, None)
+
+
+@functools.lru_cache
+def get_byron_witness_size(network_magic: Optional[int] = None) -> int:
+    """Return size of a Byron witness, `network_magic` is `None` on mainnet."""
+    attributes = {} if network_magic is None else {_BYRON_ATTR_NETWORK_MAGIC: network_magic}
+    encoded_attributes = cbor2.dumps({k: cbor2.dumps(v) for k, v in attributes.items()})
+    return SHELLEY_WITNESS_SIZE + _CHAIN_CODE_SIZE + 2 + len(encoded_attributes)
+
+
+def _get_network_magic(cluster_obj: clusterlib.ClusterLib) -> Optional[int]:
+    if keys.get_network_id(cluster_obj) == keys.NETWORK_ID_MAINNET:
+        return None
+    return int(cluster_obj.network_magic)
+
+
+def get_tx_size(tx_body: tx_signing.TxBody) -> int:
+    """Return size of the transaction without witnesses."""
+    return len(tx_signing.sign_tx_body(tx_body=tx_body, signing_keys=()))
+
+
+def get_tx_size_from_file(tx_body_file: FileType) -> int:
+    """Return size of the transaction without witnesses, read the tx body from a file."""
+    return get_tx_size(tx_signing.read_tx_body(tx_body_file))
+
+
+def estimate_fees(
+    fee_params: FeeParams,
+    tx_sizes: Iterable[TxSize],
+    network_magic: Optional[int] = None,
+) -> List[int]:
+    """Estimate fees for many transactions at once.
+
+    Args:
+        fee_params: A `FeeParams` tuple with protocol parameters.
+        tx_sizes: An iterable of `TxSize`, specifying sizes of transactions without witnesses
+            and numbers of witnesses.
+        network_magic: A network magic, needed only for Byron witnesses (optional,
+            `None` on mainnet).
+
+    Returns:
+        List[int]: A list of estimated fees.
+    """
+    fee_fixed, fee_per_byte = fee_params.fee_fixed, fee_params.fee_per_byte
+    byron_witness_size = get_byron_witness_size(network_magic)
+    return [
+        fee_fixed
+        + fee_per_byte
+        * (size + witnesses * SHELLEY_WITNESS_SIZE + byron_witnesses * byron_witness_size)
+        for size, witnesses, byron_witnesses in tx_sizes
+    ]
+
+
+def estimate_fee_bare(
+    fee_params: FeeParams,
+    tx_size: int,
+    witness_count: int = 1,
+    byron_witness_count: int = 0,
+    network_magic: Optional[int] = None,
+) -> int:
+    """Estimate fee of a transaction with the given size (without witnesses)."""
+    return estimate_fees(
+        fee_params=fee_params,
+        tx_sizes=[
+            TxSize(
+                tx_size=tx_size,
+                witness_count=witness_count,
+                byron_witness_count=byron_witness_count,
+            )
+        ],
+        network_magic=network_magic,
+    )[0]
+
+
+def estimate_fee(
+    cluster_obj: clusterlib.ClusterLib,
+    txbody_file: FileType,
+    witness_count: int = 1,
+    byron_witness_count: int = 0,
+) -> int:
+    """Estimate the minimum fee for a transaction, the same as `ClusterLib.estimate_fee`.
+
+    Args:
+        cluster_obj: An instance of `clusterlib.ClusterLib`.
+        txbody_file: A path to file with transaction body.
+        witness_count: A number of witnesses (optional).
+        byron_witness_count: A number of Byron witnesses (optional).
+
+    Returns:
+        int: An estimated fee.
+    """
+    return estimate_fee_bare(
+        fee_params=get_fee_params(cluster_obj),
+        tx_size=get_tx_size_from_file(txbody_file),
+        witness_count=witness_count,
+        byron_witness_count=byron_witness_count,
+        network_magic=_get_network_magic(cluster_obj),
+    )
+
+
+def calculate_tx_fee(
+    cluster_obj: clusterlib.ClusterLib,
+    src_address: str,
+    tx_name: str,
+    dst_addresses: Optional[List[str]] = None,
+    txins: clusterlib.OptionalUTXOData = (),
+    txouts: clusterlib.OptionalTxOuts = (),
+    tx_files: Optional[clusterlib.TxFiles] = None,
+    ttl: Optional[int] = None,
+    withdrawals: clusterlib.OptionalTxOuts = (),
+    invalid_hereafter: Optional[int] = None,
+    mint: clusterlib.OptionalTxOuts = (),
+    witness_count_add: int = 0,
+    join_txouts: bool = True,
+    destination_dir: FileType = ".",
+) -> int:
+    """Build "dummy" transaction and calculate (estimate) it's fee.
+
+    The same as `ClusterLib.calculate_tx_fee`, see it for description of arguments. The tx body
+    is built in-process when possible, and the fee is estimated offline.
+    """
+    # pylint: disable=too-many-arguments
+    tx_files = tx_files or clusterlib.TxFiles()
+    if (cluster_obj.tx_era or tx_builder.DEFAULT_TX_ERA) not in tx_builder.TX_BODY_ENVELOPE_TYPES:
+        # tx bodies of later eras are not supported, use `cardano-cli`
+        return cluster_obj.calculate_tx_fee(
+            src_address=src_address,
+            tx_name=tx_name,
+            dst_addresses=dst_addresses,
+            txins=txins,
+            txouts=txouts,
+            tx_files=tx_files,
+            ttl=ttl,
+            withdrawals=withdrawals,
+            invalid_hereafter=invalid_hereafter,
+            mint=mint,
+            witness_count_add=witness_count_add,
+            join_txouts=join_txouts,
+            destination_dir=destination_dir,
+        )
+
+    if dst_addresses and txouts:
+        LOGGER.warning(
+            "The value of `dst_addresses` is ignored when value for `txouts` is available."
+        )
+    txouts_filled = txouts or [clusterlib.TxOut(address=r, amount=1) for r in (dst_addresses or ())]
+
+    build_raw_tx: Callable[..., clusterlib.TxRawOutput]
+    if tx_builder.is_supported(cluster_obj=cluster_obj, tx_files=tx_files, mint=mint):
+        build_raw_tx = functools.partial(tx_builder.build_raw_tx, cluster_obj=cluster_obj)
+    else:
+        build_raw_tx = cluster_obj.build_raw_tx
+
+    tx_raw_output = build_raw_tx(
+        src_address=src_address,
+        tx_name=f"{tx_name}_estimate",
+        txins=txins,
+        txouts=txouts_filled,
+        tx_files=tx_files,
+        fee=0,
+        withdrawals=withdrawals,
+        invalid_hereafter=invalid_hereafter or ttl,
+        deposit=0,
+        mint=mint,
+        join_txouts=join_txouts,
+        destination_dir=destination_dir,
+    )
+
+    return estimate_fee(
+        cluster_obj=cluster_obj,
+        txbody_file=tx_raw_output.out_file,
+        witness_count=len(tx_files.signing_key_files) + witness_count_add,
+    )
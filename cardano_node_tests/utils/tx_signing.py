@@ -0,0 +1,238 @@
+"""In-process signing of transactions and creation of transaction witnesses.
+
+The signed transaction and witness files are text envelopes in the same format as the files
+written by `cardano-cli transaction sign` and `cardano-cli transaction witness`.
+"""
+import hashlib
+from pathlib import Path
+from typing import Dict
+from typing import Iterable
+from typing import List
+from typing import NamedTuple
+
+import cbor2
+import nacl.signing
+
+from cardano_node_tests.utils import cbor_raw
+from cardano_node_tests.utils import keys
+from cardano_node_tests.utils import simple_scripts
+from cardano_node_tests.utils.types import FileType
+
+TX_BODY_HASH_SIZE = 32
+
+# witness set keys
+WITNESS_SET_VKEYS = 0
+WITNESS_SET_SCRIPTS = 1
+
+# tag of key witness in witness files, bootstrap witnesses are not supported
+KEY_WITNESS_TAG = 0
+
+
+class EnvelopeTypes(NamedTuple):
+    tx: str
+    witness: str
+
+
+# envelope types of signed transaction and witness files, keyed by envelope type of tx body
+TX_ENVELOPE_TYPES: Dict[str, EnvelopeTypes] = {
+    "TxUnsignedShelley": EnvelopeTypes(tx="TxSignedShelley", witness="TxWitnessShelley"),
+    "TxBodyAllegra": EnvelopeTypes(tx="Tx AllegraEra", witness="TxWitness AllegraEra"),
+    "TxBodyMary": EnvelopeTypes(tx="Tx MaryEra", witness="TxWitness MaryEra"),
+}
+
+
+class TxBody(NamedTuple):
+    envelope_types: EnvelopeTypes
+    # raw CBOR encoded parts of the tx body file
+    body: bytes
+    scripts: bytes
+    metadata: bytes
+
+    @property
+    def body_hash(self) -> bytes:
+        return get_tx_body_hash(self.body)
+
+
+class VKeyWitness(NamedTuple):
+    vkey: bytes
+    signature: bytes
+
+
+def get_tx_body_hash(body: bytes) -> bytes:
+    """Return blake2b-256 hash of the raw CBOR encoded transaction body (the transaction ID)."""
+    return hashlib.blake2b(body, digest_size=TX_BODY_HASH_SIZE).digest()
+
+
+def decode_tx_body(envelope_type: str, cbor_data: bytes) -> TxBody:
+    """Decode content of a transaction body file, keep the original bytes of the body."""
+    envelope_types = TX_ENVELOPE_TYPES.get(envelope_type)
+    if not envelope_types:
+        raise AssertionError(f"Unsupported type of tx body file: '{envelope_type}'")
+
+    parts = cbor_raw.split_array(cbor_data)
+    if len(parts) != 3:
+        raise AssertionError("Unexpected format of tx body, expected body, scripts and metadata")
+    body, scripts, metadata = parts
+
+    return TxBody(envelope_types=envelope_types, body=body, scripts=scripts, metadata=metadata)
+
+
+def read_tx_body(tx_body_file: FileType) -> TxBody:
+    """Read a transaction body file, keep the original bytes of the body."""
+    envelope = keys.read_text_envelope(tx_body_file)
+    return decode_tx_body(
+        envelope_type=envelope["type"], cbor_data=bytes.fromhex(envelope["cborHex"])
+    )
+
+
+def _read_signing_key(skey_file: FileType) -> nacl.signing.SigningKey:
+    envelope_type = keys.read_text_envelope(skey_file)["type"]
+    # extended (bip32) keys need a different signing algorithm
+    if "SigningKey" not in envelope_type or not envelope_type.endswith("_ed25519"):
+        raise AssertionError(f"Unsupported type of signing key file: '{envelope_type}'")
+    return nacl.signing.SigningKey(keys.read_key(skey_file))
+
+
+def make_vkey_witness(body_hash: bytes, signing_key: nacl.signing.SigningKey) -> VKeyWitness:
+    """Sign the transaction body hash."""
+    return VKeyWitness(
+        vkey=bytes(signing_key.verify_key), signature=signing_key.sign(body_hash).signature
+    )
+
+
+def _encode_vkey_witness(witness: VKeyWitness) -> bytes:
+    return cbor2.dumps([witness.vkey, witness.signature])
+
+
+def _encode_witness_set(witnesses: Iterable[VKeyWitness], scripts: bytes) -> bytes:
+    """Encode the witness set, the same way as the ledger does."""
+    # the ledger keeps the witnesses in a set ordered by key hash
+    unique_witnesses = {w.vkey: w for w in witnesses}
+    sorted_witnesses = sorted(
+        unique_witnesses.values(), key=lambda w: keys.get_key_hash_bytes(w.vkey)
+    )
+
+    # the ledger keeps the scripts in a map ordered by script hash
+    unique_scripts = {
+        simple_scripts.get_script_cbor_hash(s): s for s in cbor_raw.split_array(scripts)
+    }
+    sorted_scripts = [unique_scripts[h] for h in sorted(unique_scripts)]
+
+    fields = []
+    if sorted_witnesses:
+        fields.append(
+            cbor_raw.encode_head(cbor_raw.MAJOR_UINT, WITNESS_SET_VKEYS)
+            + cbor_raw.encode_array(_encode_vkey_witness(w) for w in sorted_witnesses)
+        )
+    if sorted_scripts:
+        fields.append(
+            cbor_raw.encode_head(cbor_raw.MAJOR_UINT, WITNESS_SET_SCRIPTS)
+            + cbor_raw.encode_array(sorted_scripts)
+        )
+    return cbor_raw.encode_map(fields)
+
+
+def _write_envelope(out_file: Path, type: str, cbor_data: bytes) -> Path:
+    # pylint: disable=redefined-builtin
+    if out_file.exists():
+        raise AssertionError(f"The expected file `{out_file}` already exist.")
+    return keys.write_cbor_text_envelope(
+        out_file=out_file, type=type, description="", cbor_data=cbor_data
+    )
+
+
+def _write_witness(tx_body: TxBody, skey_file: FileType, out_file: Path) -> Path:
+    witness = make_vkey_witness(
+        body_hash=tx_body.body_hash, signing_key=_read_signing_key(skey_file)
+    )
+    witness_cbor = cbor_raw.encode_array(
+        (
+            cbor_raw.encode_head(cbor_raw.MAJOR_UINT, KEY_WITNESS_TAG),
+            _encode_vkey_witness(witness),
+        )
+    )
+    return _write_envelope(
+        out_file=out_file, type=tx_body.envelope_types.witness, cbor_data=witness_cbor
+    )
+
+
+def sign_tx_body(tx_body: TxBody, signing_keys: Iterable[nacl.signing.SigningKey]) -> bytes:
+    """Sign the transaction body, return the CBOR encoded signed transaction."""
+    body_hash = tx_body.body_hash
+    witnesses = [make_vkey_witness(body_hash=body_hash, signing_key=k) for k in signing_keys]
+    return cbor_raw.encode_array(
+        (tx_body.body, _encode_witness_set(witnesses, tx_body.scripts), tx_body.metadata),
+        indefinite_allowed=False,
+    )
+
+
+def sign_tx(
+    tx_body_file: FileType,
+    signing_key_files: Iterable[FileType],
+    tx_name: str,
+    destination_dir: FileType = ".",
+) -> Path:
+    """Sign a transaction, the same as `ClusterLib.sign_tx`.
+
+    Args:
+        tx_body_file: A path to file with transaction body.
+        signing_key_files: A list of paths to signing key files.
+        tx_name: A name of the transaction.
+        destination_dir: A path to directory for storing artifacts (optional).
+
+    Returns:
+        Path: A path to signed transaction file.
+    """
+    out_file = Path(destination_dir).expanduser() / f"{tx_name}_tx.signed"
+    tx_body = read_tx_body(tx_body_file)
+    signed_tx = sign_tx_body(
+        tx_body=tx_body, signing_keys=[_read_signing_key(f) for f in signing_key_files]
+    )
+    return _write_envelope(out_file=out_file, type=tx_body.envelope_types.tx, cbor_data=signed_tx)
+
+
+def witness_tx(
+    tx_body_file: FileType,
+    witness_name: str,
+    signing_key_files: Iterable[FileType],
+    destination_dir: FileType = ".",
+) -> Path:
+    """Create a transaction witness, the same as `ClusterLib.witness_tx`.
+
+    Args:
+        tx_body_file: A path to file with transaction body.
+        witness_name: A name of the transaction witness.
+        signing_key_files: A list with path to the signing key file (exactly one key).
+        destination_dir: A path to directory for storing artifacts (optional).
+
+    Returns:
+        Path: A path to transaction witness file.
+    """
+    skey_files = list(signing_key_files)
+    if len(skey_files) != 1:
+        raise AssertionError(f"Exactly one signing key file is needed, got {len(skey_files)}.")
+
+    return _write_witness(
+        tx_body=read_tx_body(tx_body_file),
+        skey_file=skey_files[0],
+        out_file=Path(destination_dir).expanduser() / f"{witness_name}_tx.witness",
+    )
+
+
+def witness_tx_files(
+    tx_body_file: FileType,
+    signing_key_files: Iterable[FileType],
+    tx_name: str,
+    destination_dir: FileType = ".",
+) -> List[Path]:
+    """Create a witness file `<tx_name>_skey<index>_tx.witness` for each signing key."""
+    destination_dir = Path(destination_dir).expanduser()
+    tx_body = read_tx_body(tx_body_file)
+    return [
+        _write_witness(
+            tx_body=tx_body,
+            skey_file=skey_file,
+            out_file=destination_dir / f"{tx_name}_skey{idx}_tx.witness",
+        )
+        for idx, skey_file in enumerate(signing_key_files)
+    ]